@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import typing
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, Exists, OuterRef, Q, Subquery
+from django.utils.functional import cached_property
+
+from actions.models import (
+    Action, ActionResponsibleParty, AttributeCategoryChoice, AttributeChoice, AttributeChoiceWithText, Category,
+)
+from orgs.models import Organization
+
+if typing.TYPE_CHECKING:
+    from django.db.models import Expression, QuerySet
+    from actions.models.action import ActionQuerySet
+
+
+# Deep enough for the category hierarchies used in plans
+CATEGORY_MAX_DEPTH = 5
+
+
+def category_descendants(category_id: int) -> QuerySet[Category]:
+    """Return the category and its descendants as a queryset usable as a subquery."""
+    q = Q(id=category_id)
+    lookup = 'parent'
+    for _ in range(CATEGORY_MAX_DEPTH - 1):
+        q |= Q(**{lookup: category_id})
+        lookup = f'{lookup}__parent'
+    return Category.objects.filter(q)
+
+
+def in_category(category_id: int) -> Exists:
+    """Match actions that belong to the category or one of its descendants."""
+    return Exists(Action.categories.through.objects.filter(
+        action=OuterRef('pk'), category__in=category_descendants(category_id),
+    ))
+
+
+@dataclass
+class AttributeFilter:
+    attribute_type: int
+    choice: int | None = None
+    category: int | None = None
+
+    def get_condition(self) -> Expression:
+        action_type = ContentType.objects.get_for_model(Action)
+        attribute_filter = dict(content_type=action_type, object_id=OuterRef('pk'), type=self.attribute_type)
+        if self.category is not None:
+            return Exists(AttributeCategoryChoice.objects.filter(**attribute_filter, categories=self.category))
+        return (
+            Exists(AttributeChoice.objects.filter(**attribute_filter, choice=self.choice))
+            | Exists(AttributeChoiceWithText.objects.filter(**attribute_filter, choice=self.choice))
+        )
+
+
+@dataclass
+class ActionFilter:
+    """Server-side version of the action list filters of the UI (`actions.blocks.filters`).
+
+    All the given filters must match. Responsible party and category filters also match the
+    actions of sub-organizations and subcategories.
+    """
+
+    responsible_party: int | None = None
+    primary_org: int | None = None
+    implementation_phase: int | None = None
+    status: int | None = None
+    schedule: int | None = None
+    categories: list[int] = field(default_factory=list)
+    attributes: list[AttributeFilter] = field(default_factory=list)
+
+    @classmethod
+    def from_input(cls, data: dict | None) -> ActionFilter:
+        """Build a filter from the GraphQL input. Raises ValueError on invalid IDs."""
+        if not data:
+            return cls()
+
+        def to_int(value):
+            return None if value is None else int(value)
+
+        return cls(
+            responsible_party=to_int(data.get('responsible_party')),
+            primary_org=to_int(data.get('primary_org')),
+            implementation_phase=to_int(data.get('implementation_phase')),
+            status=to_int(data.get('status')),
+            schedule=to_int(data.get('schedule')),
+            categories=[int(cat) for cat in data.get('categories') or []],
+            attributes=[
+                AttributeFilter(
+                    attribute_type=int(attr['attribute_type']),
+                    choice=to_int(attr.get('choice')),
+                    category=to_int(attr.get('category')),
+                ) for attr in data.get('attributes') or []
+            ],
+        )
+
+    @cached_property
+    def category_types(self) -> dict[int, int]:
+        if not self.categories:
+            return {}
+        return dict(Category.objects.filter(id__in=self.categories).values_list('id', 'type_id'))
+
+    def get_conditions(
+        self, exclude: str | None = None, exclude_category_type: int | None = None,
+        exclude_attribute_type: int | None = None,
+    ) -> list[Q | Expression]:
+        """Return the conditions of the filter, leaving out the ones of the facet being counted."""
+        conditions: list[Q | Expression] = []
+        if self.responsible_party is not None and exclude != 'responsible_party':
+            org_path = Organization.objects.filter(id=self.responsible_party).values('path')[:1]
+            conditions.append(Exists(ActionResponsibleParty.objects.filter(
+                action=OuterRef('pk'), organization__path__startswith=Subquery(org_path),
+            )))
+        if self.primary_org is not None and exclude != 'primary_org':
+            conditions.append(Q(primary_org=self.primary_org))
+        if self.implementation_phase is not None and exclude != 'implementation_phase':
+            conditions.append(Q(implementation_phase=self.implementation_phase))
+        if self.status is not None and exclude != 'status':
+            conditions.append(Q(status=self.status))
+        if self.schedule is not None and exclude != 'schedule':
+            conditions.append(Exists(Action.schedule.through.objects.filter(
+                action=OuterRef('pk'), actionschedule=self.schedule,
+            )))
+        for category in self.categories:
+            if exclude_category_type is not None and self.category_types.get(category) == exclude_category_type:
+                continue
+            conditions.append(in_category(category))
+        for attribute in self.attributes:
+            if attribute.attribute_type == exclude_attribute_type:
+                continue
+            conditions.append(attribute.get_condition())
+        return conditions
+
+    def apply(self, qs: ActionQuerySet, **exclude) -> ActionQuerySet:
+        for condition in self.get_conditions(**exclude):
+            qs = qs.filter(condition)
+        return qs
+
+
+class ActionFacets:
+    """Counts the actions matching each value of a filter.
+
+    The count of a value is the number of actions that would match if the value was selected,
+    so the other values of the same filter are not applied when counting it.
+    """
+
+    def __init__(self, qs: ActionQuerySet, action_filter: ActionFilter):
+        # Clear the ordering so that it is not added to the GROUP BY of the counts
+        self.qs = qs.order_by()
+        self.filter = action_filter
+
+    def total_count(self) -> int:
+        return self.filter.apply(self.qs).count()
+
+    def _count_field(self, field_name: str) -> dict[int, int]:
+        qs = self.filter.apply(self.qs, exclude=field_name).filter(**{f'{field_name}__isnull': False})
+        return dict(qs.values_list(field_name).annotate(count=Count('id')))
+
+    def primary_org(self) -> dict[int, int]:
+        return self._count_field('primary_org')
+
+    def implementation_phase(self) -> dict[int, int]:
+        return self._count_field('implementation_phase')
+
+    def status(self) -> dict[int, int]:
+        return self._count_field('status')
+
+    def schedule(self) -> dict[int, int]:
+        actions = self.filter.apply(self.qs, exclude='schedule')
+        rows = (
+            Action.schedule.through.objects.filter(action__in=actions)
+            .values_list('actionschedule').annotate(count=Count('action'))
+        )
+        return dict(rows)
+
+    def responsible_party(self) -> dict[int, int]:
+        # An organization is counted for the actions of its sub-organizations, too
+        actions = self.filter.apply(self.qs, exclude='responsible_party')
+        rows = (
+            ActionResponsibleParty.objects.filter(action__in=actions).order_by()
+            .values_list('action_id', 'organization__path').distinct()
+        )
+        actions_by_path: dict[str, set[int]] = defaultdict(set)
+        steplen = Organization.steplen
+        for action_id, path in rows:
+            for depth in range(1, len(path) // steplen + 1):
+                actions_by_path[path[:depth * steplen]].add(action_id)
+        if not actions_by_path:
+            return {}
+        org_ids = dict(Organization.objects.filter(path__in=actions_by_path.keys()).values_list('path', 'id'))
+        return {org_ids[path]: len(ids) for path, ids in actions_by_path.items() if path in org_ids}
+
+    def category(self, category_type: int) -> dict[int, int]:
+        # A category is counted for the actions of its subcategories, too
+        actions = self.filter.apply(self.qs, exclude_category_type=category_type)
+        rows = Action.categories.through.objects.filter(
+            action__in=actions, category__type=category_type,
+        ).values_list('action_id', 'category_id')
+        parents = dict(Category.objects.filter(type=category_type).values_list('id', 'parent_id'))
+        actions_by_category: dict[int, set[int]] = defaultdict(set)
+        for action_id, category_id in rows:
+            seen = set()
+            while category_id is not None and category_id not in seen:
+                seen.add(category_id)
+                actions_by_category[category_id].add(action_id)
+                category_id = parents.get(category_id)
+        return {category_id: len(ids) for category_id, ids in actions_by_category.items()}
+
+    def attribute(self, attribute_type: int) -> dict[int, int]:
+        """Count the choices of a choice attribute type, or the categories of a category choice type."""
+        actions = self.filter.apply(self.qs, exclude_attribute_type=attribute_type).values('id')
+        action_type = ContentType.objects.get_for_model(Action)
+        attribute_filter = dict(content_type=action_type, object_id__in=actions, type=attribute_type)
+        counts: dict[int, int] = defaultdict(int)
+        for model in (AttributeChoice, AttributeChoiceWithText):
+            rows = (
+                model.objects.filter(**attribute_filter, choice__isnull=False).order_by()
+                .values_list('choice').annotate(count=Count('id'))
+            )
+            for choice, count in rows:
+                counts[choice] += count
+        category_rows = (
+            AttributeCategoryChoice.categories.through.objects.filter(
+                **{f'attributecategorychoice__{key}': value for key, value in attribute_filter.items()}
+            ).values_list('category').annotate(count=Count('attributecategorychoice'))
+        )
+        for category, count in category_rows:
+            counts[category] += count
+        return dict(counts)
@@ -4,6 +4,7 @@ import datetime
 from enum import Enum
 from typing import Callable, NotRequired, TypedDict, TYPE_CHECKING
 
+from django.db.models import CharField, Case, Value, When
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -11,7 +12,7 @@ from aplans.utils import ConstantMetadata, MetadataEnum
 
 if TYPE_CHECKING:
     from actions.models import Action, Plan, ActionStatus
-    from aplans.cache import WatchObjectCache
+    from aplans.cache import PlanSpecificCache, WatchObjectCache
 
 Sentiment = Enum('Sentiment', names='POSITIVE NEGATIVE NEUTRAL')
 
@@ -20,6 +21,7 @@ class SummaryContext(TypedDict, total=False):
     plan: Plan
     plan_id: int
     cache: NotRequired[WatchObjectCache]
+    plan_cache: NotRequired[PlanSpecificCache]
 
 
 class ActionStatusSummary(ConstantMetadata['ActionStatusSummaryIdentifier', SummaryContext]):
@@ -51,12 +53,15 @@ class ActionStatusSummary(ConstantMetadata['ActionStatusSummaryIdentifier', Summ
             raise ValueError('with_identifier must be called before with_context')
         plan = context.get('plan')
         identifier: str = self.identifier.name.lower()
+        plan_cache = context.get('plan_cache')
         cache = context.get('cache')
-        if cache is not None:
+        if plan_cache is None and cache is not None:
             plan_id = context.get('plan_id')
             if plan_id is None and plan is not None:
                 plan_id = plan.id
-            status = context['cache'].for_plan_id(plan_id).get_action_status(identifier=identifier)
+            plan_cache = cache.for_plan_id(plan_id)
+        if plan_cache is not None:
+            status = plan_cache.get_action_status(identifier=identifier)
         else:
             status = plan.action_statuses.filter(plan=plan, identifier=identifier).first()
         if status is not None:
@@ -149,30 +154,43 @@ class ActionStatusSummaryIdentifier(MetadataEnum):
     def for_status(cls, status: 'ActionStatus'):
         if status is None:
             return cls.UNDEFINED
-        status_identifier = status.identifier.lower() if status else None
+        return cls.for_status_identifier(status.identifier)
+
+    @classmethod
+    def for_status_identifier(cls, status_identifier: str | None):
+        if status_identifier is None:
+            return cls.UNDEFINED
+        status_identifier = status_identifier.lower()
         try:
             return next(s for s in cls if s.name.lower() == status_identifier)
         except StopIteration:
             return cls.UNDEFINED
 
     @classmethod
-    def for_action(cls, action: 'Action'):
+    def for_identifiers(cls, status_identifier: str | None, phase_identifier: str | None, is_merged: bool):
         # FIXME: Some plans in production have inconsistent Capitalized identifiers
         # Once the db has been cleaned up, this match logic
         # should be revisited
-        status_identifier = action.status.identifier.lower() if action.status else None
-        phase = action.implementation_phase.identifier.lower() if action.implementation_phase else None
-        if action.merged_with_id is not None:
+        phase = phase_identifier.lower() if phase_identifier else None
+        if is_merged:
             return cls.MERGED
         # TODO: check phase "completed" property
         if phase == 'completed':
             return cls.COMPLETED
         # phase: "begun"? "implementation?"
-        status_match = cls.for_status(action.status)
+        status_match = cls.for_status_identifier(status_identifier)
         if status_match == cls.UNDEFINED and phase == 'not_started':
             return cls.NOT_STARTED
         return status_match
 
+    @classmethod
+    def for_action(cls, action: 'Action'):
+        return cls.for_identifiers(
+            action.status.identifier if action.status else None,
+            action.implementation_phase.identifier if action.implementation_phase else None,
+            action.merged_with_id is not None,
+        )
+
 
 Comparison = Enum('Comparison', names='LTE GT')
 
@@ -246,12 +264,35 @@ class ActionTimelinessIdentifier(MetadataEnum):
     )
 
     @classmethod
-    def for_action(cls, action: 'Action'):
+    def for_action(cls, action: 'Action', now: datetime.datetime | None = None):
         plan = action.plan
-        age = timezone.now() - action.updated_at
+        if now is None:
+            now = timezone.now()
+        age = now - action.updated_at
         if age <= datetime.timedelta(days=cls.OPTIMAL.value.boundary(plan)):
             return cls.OPTIMAL
         if age <= datetime.timedelta(days=cls.ACCEPTABLE.value.boundary(plan)):
             return cls.ACCEPTABLE
         # We do not distinguish between late and stale for now
         return cls.LATE
+
+    @classmethod
+    def get_expression(cls, plan: 'Plan', now: datetime.datetime | None = None) -> Case:
+        """Return an SQL expression evaluating to the timeliness identifier name of an action.
+
+        Must match the logic in `for_action`.
+        """
+        if now is None:
+            now = timezone.now()
+        return Case(
+            When(
+                updated_at__gte=now - datetime.timedelta(days=cls.OPTIMAL.value.boundary(plan)),
+                then=Value(cls.OPTIMAL.name),
+            ),
+            When(
+                updated_at__gte=now - datetime.timedelta(days=cls.ACCEPTABLE.value.boundary(plan)),
+                then=Value(cls.ACCEPTABLE.name),
+            ),
+            default=Value(cls.LATE.name),
+            output_field=CharField(),
+        )
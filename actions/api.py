@@ -11,9 +11,11 @@ from django.core.exceptions import FieldDoesNotExist
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.db.models import Model
+from django.http import HttpResponse
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from rest_framework import exceptions, permissions, serializers, viewsets
+from rest_framework.decorators import action
 
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, extend_schema_field, OpenApiParameter
@@ -32,6 +34,7 @@ from aplans.rest_api import (
 )
 from aplans.types import AuthenticatedWatchRequest, WatchAdminRequest, WatchAPIRequest
 from aplans.utils import generate_identifier, public_fields, register_view_helper
+from orgs.geo import BoundingBox, organization_feature_collection, validate_zoom
 from orgs.models import Organization
 from people.models import Person
 from users.models import User
@@ -1491,7 +1494,7 @@ class OrganizationViewSet(HandleProtectedErrorMixin, BulkModelViewSet):
         return self.bulk_update(request, *args, **kwargs)
 
     def get_permissions(self):
-        if self.action == 'list':
+        if self.action in ('list', 'locations'):
             permission_classes = [AnonReadOnly]
         else:
             permission_classes = [OrganizationPermission]
@@ -1508,6 +1511,38 @@ class OrganizationViewSet(HandleProtectedErrorMixin, BulkModelViewSet):
             raise exceptions.NotFound(detail="Plan not found")
         return Organization.objects.available_for_plan(plan)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='plan', type=OpenApiTypes.STR, required=True),
+            OpenApiParameter(name='bbox', type=OpenApiTypes.STR, description='min_lon,min_lat,max_lon,max_lat'),
+            OpenApiParameter(name='zoom', type=OpenApiTypes.INT),
+            OpenApiParameter(name='cluster', type=OpenApiTypes.BOOL),
+        ],
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    @action(detail=False, methods=['get'])
+    def locations(self, request):
+        """Return the located organizations of a plan as a GeoJSON FeatureCollection."""
+        params = request.query_params
+        if 'plan' not in params:
+            raise exceptions.ValidationError({'plan': _('This parameter is required.')})
+        try:
+            bbox = BoundingBox.from_string(params['bbox']) if params.get('bbox') else None
+        except ValueError as e:
+            raise exceptions.ValidationError({'bbox': str(e)})
+        try:
+            zoom = int(params['zoom']) if params.get('zoom') else None
+        except ValueError:
+            raise exceptions.ValidationError({'zoom': _('A valid integer is required.')})
+        try:
+            zoom = validate_zoom(zoom) if zoom is not None else None
+        except ValueError as e:
+            raise exceptions.ValidationError({'zoom': str(e)})
+        cluster = params.get('cluster', '').lower() in ('1', 'true')
+        content = organization_feature_collection(self.get_queryset(), bbox=bbox, zoom=zoom, cluster=cluster)
+        # The collection is serialized already, so it is not passed through a renderer
+        return HttpResponse(content, content_type='application/geo+json')
+
 
 class PersonSerializer(
     BulkSerializerValidationInstanceMixin,
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import typing
+from enum import Enum
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import models
+
+from aplans.utils import InstancesVisibleForMixin
+
+from .models.attributes import AttributeType, AttributeTypeChoiceOption
+
+if typing.TYPE_CHECKING:
+    from aplans.types import UserOrAnon
+    from indicators.models import Unit
+    from .models import Action, CategoryType, Plan
+
+
+VisibleFor = InstancesVisibleForMixin.VisibleFor
+
+
+class VisibilityRole(Enum):
+    ANONYMOUS = 'anonymous'
+    AUTHENTICATED = 'authenticated'
+    # Superusers are general admins for all plans
+    PLAN_ADMIN = 'plan_admin'
+
+    @classmethod
+    def for_user(cls, user: UserOrAnon | None, plan: Plan) -> VisibilityRole:
+        if user is None or not user.is_authenticated:
+            return cls.ANONYMOUS
+        if user.is_general_admin_for_plan(plan):
+            return cls.PLAN_ADMIN
+        return cls.AUTHENTICATED
+
+
+# Values of `instances_visible_for` that are visible for everyone having the role regardless of the action.
+# Contact persons and moderators of an action are checked separately.
+ROLE_VISIBILITY: dict[VisibilityRole, frozenset[str]] = {
+    VisibilityRole.ANONYMOUS: frozenset([VisibleFor.PUBLIC]),
+    VisibilityRole.AUTHENTICATED: frozenset([VisibleFor.PUBLIC, VisibleFor.AUTHENTICATED]),
+    VisibilityRole.PLAN_ADMIN: frozenset(VisibleFor.values),
+}
+
+
+class AttributeTypeRegistry:
+    """Attribute types of a plan with their choice options and visibility.
+
+    The registry contains the action attribute types of the plan and the attribute types
+    of the plan's category types. It is built with a couple of queries, stored in the cache
+    and invalidated when an attribute type or a choice option of the plan, or a unit or a
+    category type related to them, is saved or deleted.
+    """
+
+    CACHE_KEY = 'attribute-types:{plan_id}'
+    CACHE_TIMEOUT = 3600
+
+    plan_id: int
+    types: list[AttributeType]
+    by_id: dict[int, AttributeType]
+    by_scope: dict[tuple[int, int, int], list[AttributeType]]
+    visible_type_ids: dict[VisibilityRole, frozenset[int]]
+
+    def __init__(self, plan_id: int, types: list[AttributeType]):
+        self.plan_id = plan_id
+        self.types = types
+        self.by_id = {at.id: at for at in types}
+        self.by_scope = {}
+        for at in types:
+            key = (at.object_content_type_id, at.scope_content_type_id, at.scope_id)
+            self.by_scope.setdefault(key, []).append(at)
+        self.visible_type_ids = {
+            role: frozenset(at.id for at in types if at.instances_visible_for in visible_for)
+            for role, visible_for in ROLE_VISIBILITY.items()
+        }
+
+    @classmethod
+    def build(cls, plan: Plan) -> AttributeTypeRegistry:
+        qs = (
+            (AttributeType.objects.for_actions(plan) | AttributeType.objects.for_categories(plan))
+            .select_related('unit', 'attribute_category_type')
+            .prefetch_related('choice_options')
+            .order_by('scope_content_type', 'scope_id', 'order')
+        )
+        return cls(plan.id, list(qs))
+
+    @classmethod
+    def get_cache_key(cls, plan_id: int) -> str:
+        return cls.CACHE_KEY.format(plan_id=plan_id)
+
+    @classmethod
+    def for_plan(cls, plan: Plan) -> AttributeTypeRegistry:
+        key = cls.get_cache_key(plan.id)
+        registry = cache.get(key)
+        if registry is None:
+            registry = cls.build(plan)
+            cache.set(key, registry, timeout=cls.CACHE_TIMEOUT)
+        return registry
+
+    @classmethod
+    def invalidate(cls, plan_id: int):
+        cache.delete(cls.get_cache_key(plan_id))
+
+    def get_type(self, type_id: int) -> AttributeType | None:
+        return self.by_id.get(type_id)
+
+    def get_types(self, object_model: type[models.Model], scope: Plan | CategoryType) -> list[AttributeType]:
+        """Return the ordered attribute types for objects of `object_model` within `scope`."""
+        key = (
+            ContentType.objects.get_for_model(object_model).id,
+            ContentType.objects.get_for_model(scope).id,
+            scope.pk,
+        )
+        return self.by_scope.get(key, [])
+
+    def is_visible(
+        self, attribute_type: AttributeType, role: VisibilityRole, user: UserOrAnon | None, action: Action | None,
+    ) -> bool:
+        """Equivalent to `attribute_type.is_instance_visible_for()` for a user having `role` in the plan."""
+        if attribute_type.id in self.visible_type_ids[role]:
+            return True
+        if role != VisibilityRole.AUTHENTICATED or action is None:
+            return False
+        assert user is not None
+        if attribute_type.instances_visible_for == VisibleFor.CONTACT_PERSONS:
+            return user.is_contact_person_for_action(action)
+        if attribute_type.instances_visible_for == VisibleFor.MODERATORS:
+            from .models import ActionContactPerson
+            return user.has_contact_person_role_for_action(ActionContactPerson.Role.MODERATOR, action)
+        return False
+
+
+def get_plan_id_for_attribute_type(attribute_type: AttributeType) -> int | None:
+    from .models import CategoryType, Plan
+
+    scope_ct = ContentType.objects.get_for_id(attribute_type.scope_content_type_id)
+    if scope_ct.model_class() is Plan:
+        return attribute_type.scope_id
+    if scope_ct.model_class() is CategoryType:
+        return CategoryType.objects.filter(id=attribute_type.scope_id).values_list('plan_id', flat=True).first()
+    return None
+
+
+def invalidate_attribute_type_registry(instance: AttributeType | AttributeTypeChoiceOption | Unit | CategoryType):
+    from indicators.models import Unit
+    from .models import CategoryType
+
+    if isinstance(instance, (Unit, CategoryType)):
+        # The units and the category types of the attribute types are stored in the registries
+        if isinstance(instance, CategoryType):
+            AttributeTypeRegistry.invalidate(instance.plan_id)
+            related = AttributeType.objects.filter(attribute_category_type=instance)
+        else:
+            related = AttributeType.objects.filter(unit=instance)
+        for attribute_type in related:
+            invalidate_attribute_type_registry(attribute_type)
+        return
+    if isinstance(instance, AttributeTypeChoiceOption):
+        try:
+            instance = instance.type
+        except AttributeType.DoesNotExist:
+            return
+    plan_id = get_plan_id_for_attribute_type(instance)
+    if plan_id is not None:
+        AttributeTypeRegistry.invalidate(plan_id)
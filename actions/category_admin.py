@@ -1,7 +1,9 @@
 from django.core.exceptions import ValidationError
 from django.contrib.admin import SimpleListFilter
 from django.db import transaction
+from django.shortcuts import redirect
 from django.utils.translation import gettext_lazy as _
+from wagtail.admin import messages
 from wagtail.admin.panels import (
     FieldPanel, FieldRowPanel, InlinePanel, MultiFieldPanel, ObjectList,
 )
@@ -13,6 +15,7 @@ from wagtail_modeladmin.views import DeleteView
 from wagtailorderable.modeladmin.mixins import OrderableMixin
 from wagtailsvg.edit_handlers import SvgChooserPanel
 
+from .common_categories import PropagationStatus, get_previous_values, schedule_propagation
 from .models import Category, CategoryType, CommonCategory, CommonCategoryType
 from admin_site.wagtail import (
     ActionListPageBlockFormMixin, AplansAdminModelForm, AplansCreateView, AplansEditView, AplansModelAdmin,
@@ -498,20 +501,37 @@ class CommonCategoryCreateView(CommonCategoryTypeQueryParameterMixin, AplansCrea
 
     @transaction.atomic()
     def form_valid(self, form):
-        """Create category corresponding to this common category for all plans using this common category's type."""
+        """Create category corresponding to this common category for all plans using this common category's type.
+
+        The categories are created in a Celery task because the type may be used by many plans.
+        """
         result = super().form_valid(form)
-        for plan in self.instance.type.plans.all():
-            ct = self.instance.type.category_type_instances.get(plan=plan)
-            self.instance.instantiate_for_category_type(ct)
+        if self.instance.pk:
+            schedule_propagation(self.instance.pk, 'create')
         return result
 
 
 class CommonCategoryEditView(CommonCategoryTypeQueryParameterMixin, AplansEditView):
-    pass
+    @transaction.atomic()
+    def form_valid(self, form):
+        """Copy the changes to the categories corresponding to this common category in a Celery task."""
+        previous_values = get_previous_values(self.instance)
+        result = super().form_valid(form)
+        schedule_propagation(self.instance.pk, 'update', previous_values)
+        return result
 
 
 class CommonCategoryDeleteView(CommonCategoryTypeQueryParameterMixin, DeleteView):
-    pass
+    def post(self, request, *args, **kwargs):
+        if not self.instance.category_instances.exists():
+            return super().post(request, *args, **kwargs)
+        # The categories corresponding to this one are deleted in a Celery task, which deletes this one at the end
+        schedule_propagation(self.instance.pk, 'delete')
+        messages.success(request, _("%(model_name)s '%(object)s' will be deleted after deleting it from the plans.") % {
+            'model_name': self.verbose_name,
+            'object': self.instance,
+        })
+        return redirect(self.index_url)
 
 
 class CommonCategoryAdminButtonHelper(ButtonHelper):
@@ -564,7 +584,7 @@ class CommonCategoryEditHandler(AplansTabbedInterface):
 class CommonCategoryAdmin(OrderableMixin, AplansModelAdmin):
     menu_label = _('Common categories')
     menu_icon = 'kausal-categories'  # FIXME
-    list_display = ('name', 'identifier', 'type')
+    list_display = ('name', 'identifier', 'type', 'propagation_status')
     list_filter = (CommonCategoryTypeFilter,)
     model = CommonCategory
 
@@ -586,6 +606,11 @@ class CommonCategoryAdmin(OrderableMixin, AplansModelAdmin):
     def get_menu_item(self, order=None):
         return CommonCategoryAdminMenuItem(self, order or self.get_menu_order())
 
+    def propagation_status(self, obj):
+        status = PropagationStatus.get(obj.pk)
+        return str(status) if status is not None else None
+    propagation_status.short_description = _('Propagation to plans')
+
     def get_edit_handler(self):
         request = ctx_request.get()
         instance = ctx_instance.get()
@@ -0,0 +1,295 @@
+"""Propagation of common categories to the plans that use their common category type.
+
+A plan that uses a common category type has a category type instantiating it and, in that category
+type, a category instantiating each of the common categories. Creating, editing and deleting common
+categories is propagated to those plan-specific categories in Celery tasks because a common category
+type may be used by many plans.
+"""
+from __future__ import annotations
+
+import logging
+import typing
+from dataclasses import asdict, dataclass, field
+from typing import ClassVar
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+from django.utils.translation import gettext as _
+from modeltrans.translator import get_i18n_field
+from sentry_sdk import capture_exception
+
+from .models import Category, CategoryType, CommonCategory, Plan
+
+if typing.TYPE_CHECKING:
+    from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+PROPAGATION_STATUS_TIMEOUT = 7 * 24 * 3600
+# The progress is stored in the cache after this many plans have been handled
+PROGRESS_INTERVAL = 20
+# Fields that are not copied to the plan-specific categories when a common category is edited
+EDIT_EXCLUDED_FIELDS = ('id', 'uuid')
+
+
+def propagation_status_key(common_category_id: int) -> str:
+    return f'common-category-propagation:{common_category_id}'
+
+
+@dataclass
+class PropagationStatus:
+    """Progress of the latest propagation of a common category, stored in the cache for the admin UI."""
+
+    QUEUED: ClassVar = 'queued'
+    RUNNING: ClassVar = 'running'
+    DONE: ClassVar = 'done'
+    FAILED: ClassVar = 'failed'
+
+    operation: str
+    state: str = QUEUED
+    total: int = 0
+    processed: int = 0
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    errors: list[str] = field(default_factory=list)
+
+    @classmethod
+    def get(cls, common_category_id: int) -> PropagationStatus | None:
+        data = cache.get(propagation_status_key(common_category_id))
+        if data is None:
+            return None
+        return cls(**data)
+
+    def store(self, common_category_id: int):
+        cache.set(propagation_status_key(common_category_id), asdict(self), PROPAGATION_STATUS_TIMEOUT)
+
+    def fail(self, error: str):
+        self.errors.append(error)
+        self.state = self.FAILED
+
+    def __str__(self):
+        if self.state == self.QUEUED:
+            return _('Waiting to be propagated to plans')
+        if self.state == self.RUNNING:
+            return _('Propagating to plans: %(processed)d / %(total)d') % asdict(self)
+        if self.state == self.FAILED:
+            return _('Propagation to plans failed: %(errors)s') % {'errors': '; '.join(self.errors)}
+        return _('Propagated to %(total)d plans (%(created)d created, %(updated)d updated, %(deleted)d deleted)') % (
+            asdict(self)
+        )
+
+
+def get_previous_values(common_category: CommonCategory) -> dict[str, Any]:
+    """Return the stored field values of the common category in a form that can be passed to a task."""
+    stored = CommonCategory.objects.get(pk=common_category.pk)
+    return {
+        f.attname: f.value_from_object(stored) for f in CommonCategory._meta.concrete_fields
+        if f.attname not in EDIT_EXCLUDED_FIELDS
+    }
+
+
+def get_category_types(common_category: CommonCategory) -> dict[int, CategoryType]:
+    """Return the category types instantiating the type of the common category by plan ID."""
+    qs = (
+        CategoryType.objects.filter(common=common_category.type_id, plan__common_category_types=common_category.type_id)
+        .select_related('plan')
+    )
+    return {ct.plan_id: ct for ct in qs}
+
+
+def get_model_fields(values: typing.Iterable[str]) -> list[str]:
+    """Map the keys of `CommonCategory.get_instance_values()` to the model fields they are stored in."""
+    translated_fields = get_i18n_field(Category).fields
+    model_fields = set()
+    for name in values:
+        if name not in translated_fields and name.startswith(tuple(f'{f}_' for f in translated_fields)):
+            # Translations of the other languages are stored in the `i18n` field
+            model_fields.add('i18n')
+        else:
+            model_fields.add(name)
+    return sorted(model_fields)
+
+
+class CommonCategoryPropagator:
+    def __init__(self, common_category: CommonCategory, status: PropagationStatus):
+        self.common_category = common_category
+        self.status = status
+
+    def report_progress(self):
+        self.status.processed += 1
+        if self.status.processed % PROGRESS_INTERVAL == 0:
+            self.status.store(self.common_category.pk)
+
+    def get_changes(self, previous: CommonCategory | None, plan: Plan) -> dict[str, tuple[Any, Any]]:
+        if previous is None:
+            return {}
+        old_values = previous.get_instance_values(plan)
+        new_values = self.common_category.get_instance_values(plan)
+        return {
+            name: (old_values.get(name), new_values.get(name))
+            for name in old_values.keys() | new_values.keys()
+            if old_values.get(name) != new_values.get(name)
+        }
+
+    def propagate_to_plan(
+        self, ct: CategoryType, category: Category | None, previous: CommonCategory | None,
+        to_create: list[Category], to_update: dict[tuple[str, ...], list[Category]],
+    ):
+        cc = self.common_category
+        if category is None:
+            category = Category(type=ct, common=cc, **cc.get_instance_values(ct.plan))
+            if ct.synchronize_with_pages:
+                # Saving one by one creates the pages of the category
+                category.save()
+                self.status.created += 1
+            else:
+                to_create.append(category)
+            return
+
+        changed = []
+        for name, (old, new) in self.get_changes(previous, ct.plan).items():
+            if getattr(category, name) == old:
+                setattr(category, name, new)
+                changed.append(name)
+        if not changed:
+            return
+        if ct.synchronize_with_pages:
+            category.type = ct
+            category.save()
+            self.status.updated += 1
+        else:
+            to_update.setdefault(tuple(get_model_fields(changed)), []).append(category)
+
+    def set_order(self, categories: list[Category]):
+        """Place the new categories last in their category types like `OrderedModel.save()` would."""
+        if not categories:
+            return
+        max_orders = dict(
+            Category.objects.filter(type__in={category.type_id for category in categories})
+            .order_by().values('type').annotate(max_order=Max('order')).values_list('type', 'max_order')
+        )
+        for category in categories:
+            category.order = (max_orders.get(category.type_id) or 0) + 1
+
+    def propagate(self, previous_values: dict[str, Any] | None = None):
+        """Create the missing plan-specific categories and update the existing ones.
+
+        Categories are only created in the category types that don't have one yet, so this can be run again
+        after a failure. If the values of the common category before an edit are given, the changed values are
+        copied to the categories that still have the previous value, so changes made in a plan are kept.
+        """
+        cc = self.common_category
+        previous = None
+        if previous_values:
+            previous = CommonCategory(**previous_values)
+            previous.type = cc.type
+        category_types = get_category_types(cc)
+        plans = list(cc.type.plans.all())
+        existing = {
+            category.type_id: category
+            for category in Category.objects.filter(common=cc, type__in=category_types.values())
+        }
+        self.status.total = len(plans)
+        self.status.state = self.status.RUNNING
+        self.status.store(cc.pk)
+
+        to_create: list[Category] = []
+        to_update: dict[tuple[str, ...], list[Category]] = {}
+        for plan in plans:
+            ct = category_types.get(plan.id)
+            if ct is None:
+                self.status.fail(_('Plan %(plan)s has no category type for %(type)s') % {
+                    'plan': plan, 'type': cc.type,
+                })
+                self.report_progress()
+                continue
+            category = existing.get(ct.id)
+            try:
+                # Use a savepoint so that a failing plan doesn't abort the whole transaction
+                with transaction.atomic():
+                    self.propagate_to_plan(ct, category, previous, to_create, to_update)
+            except Exception as e:
+                logger.exception(f'Error propagating common category {cc} to plan {ct.plan}')
+                capture_exception(e)
+                self.status.fail(_('Plan %(plan)s: %(error)s') % {'plan': ct.plan, 'error': e})
+            self.report_progress()
+
+        self.set_order(to_create)
+        Category.objects.bulk_create(to_create)
+        self.status.created += len(to_create)
+        for fields, categories in to_update.items():
+            Category.objects.bulk_update(categories, fields)
+            self.status.updated += len(categories)
+        if self.status.created or self.status.updated:
+            Plan.objects.filter(id__in=[plan.id for plan in plans]).update(cache_invalidated_at=timezone.now())
+
+    def delete(self):
+        """Delete the plan-specific categories and then the common category.
+
+        Categories that are used by actions or indicators are kept and reported as failures, in which case
+        the common category is not deleted either.
+        """
+        cc = self.common_category
+        instances = Category.objects.filter(common=cc)
+        in_use = instances.filter(Q(actions__isnull=False) | Q(indicators__isnull=False)).distinct()
+        plan_ids = list(instances.values_list('type__plan', flat=True).distinct())
+        self.status.total = len(plan_ids)
+        self.status.state = self.status.RUNNING
+        self.status.store(cc.pk)
+
+        for category in in_use.select_related('type__plan'):
+            self.status.fail(_('Category %(category)s is in use in plan %(plan)s') % {
+                'category': category, 'plan': category.type.plan,
+            })
+        _total, deleted_by_model = instances.exclude(id__in=in_use.values('id')).delete()
+        self.status.deleted = deleted_by_model.get(Category._meta.label, 0)
+        self.status.processed = self.status.total
+        if self.status.state != self.status.FAILED:
+            cc.delete()
+        if plan_ids:
+            Plan.objects.filter(id__in=plan_ids).update(cache_invalidated_at=timezone.now())
+
+
+def run_propagation(common_category_id: int, operation: str, previous_values: dict[str, Any] | None = None):
+    common_category = CommonCategory.objects.filter(id=common_category_id).select_related('type').first()
+    if common_category is None:
+        return None
+    status = PropagationStatus(operation=operation)
+    propagator = CommonCategoryPropagator(common_category, status)
+    try:
+        with transaction.atomic():
+            if operation == 'delete':
+                propagator.delete()
+            else:
+                propagator.propagate(previous_values)
+    except Exception as e:
+        logger.exception(f'Error propagating common category {common_category}')
+        capture_exception(e)
+        status.fail(str(e))
+    if status.state == status.RUNNING:
+        status.state = status.DONE
+    status.store(common_category_id)
+    return status
+
+
+def schedule_propagation(common_category_id: int, operation: str, previous_values: dict[str, Any] | None = None):
+    """Propagate the common category to the plans in a Celery task after the current transaction."""
+    from .tasks import propagate_common_category
+
+    PropagationStatus(operation=operation).store(common_category_id)
+
+    def schedule():
+        try:
+            propagate_common_category.delay(common_category_id, operation, previous_values)
+        except Exception as e:
+            logger.warning(f'Error scheduling propagation of common category {common_category_id}: {e}')
+            capture_exception(e)
+            status = PropagationStatus(operation=operation)
+            status.fail(_('The propagation could not be scheduled'))
+            status.store(common_category_id)
+
+    transaction.on_commit(schedule)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import typing
+from typing import Iterable
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from wagtail.models import Revision, WorkflowState
+
+from aplans.graphql_types import WorkflowStateEnum
+
+if typing.TYPE_CHECKING:
+    from .models import Action
+
+
+class RevisionObjectCache:
+    """Cache of objects rebuilt from Wagtail revisions.
+
+    Rebuilding an action from the JSON content of a revision instantiates the whole model
+    graph, including child objects and draft attributes. The rebuilt object is pickled and
+    stored by revision id. The content of a revision never changes, but the rebuilt object
+    also copies some fields from the live object, so the cached objects of an object's
+    earlier revisions are dropped when a new revision is created.
+    """
+
+    CACHE_KEY = 'revision-object:{revision_id}'
+    CACHE_TIMEOUT = 24 * 3600
+
+    @classmethod
+    def get_cache_key(cls, revision_id: int) -> str:
+        return cls.CACHE_KEY.format(revision_id=revision_id)
+
+    @classmethod
+    def get_objects(cls, revisions: dict[int, Action]) -> dict[int, Action]:
+        """Return rebuilt objects for a dict mapping revision ids to the live objects."""
+        keys = {cls.get_cache_key(revision_id): revision_id for revision_id in revisions}
+        cached = cache.get_many(keys.keys())
+        result = {keys[key]: obj for key, obj in cached.items()}
+        missing = [revision_id for revision_id in revisions if revision_id not in result]
+        if not missing:
+            return result
+
+        to_cache = {}
+        for revision_id, content in Revision.objects.filter(id__in=missing).values_list('id', 'content'):
+            # Same as `Revision.as_object()` but without fetching the live object again
+            obj = revisions[revision_id].with_content_json(content)
+            result[revision_id] = obj
+            to_cache[cls.get_cache_key(revision_id)] = obj
+        cache.set_many(to_cache, timeout=cls.CACHE_TIMEOUT)
+        return result
+
+    @classmethod
+    def get_object(cls, revision_id: int, live_object: Action) -> Action | None:
+        return cls.get_objects({revision_id: live_object}).get(revision_id)
+
+    @classmethod
+    def invalidate_for_revision(cls, revision: Revision):
+        """Drop the cached objects of the other revisions of the revision's object."""
+        revision_ids = (
+            Revision.objects.filter(content_type_id=revision.content_type_id, object_id=revision.object_id)
+            .exclude(id=revision.id)
+            .values_list('id', flat=True)
+        )
+        cache.delete_many([cls.get_cache_key(revision_id) for revision_id in revision_ids])
+
+
+def get_approved_revision_ids(actions: list[Action]) -> dict[int, int]:
+    """Map action ids to the revisions whose publishing task is in progress."""
+    from .models import Action
+
+    plans = {action.plan_id: action.plan for action in actions}
+    publishing_tasks = {
+        plan_id: plan.get_next_workflow_task(WorkflowStateEnum.APPROVED) for plan_id, plan in plans.items()
+    }
+    if not any(publishing_tasks.values()):
+        return {}
+    states = (
+        WorkflowState.objects.active()
+        .filter(content_type=ContentType.objects.get_for_model(Action), object_id__in=[str(a.pk) for a in actions])
+        .select_related('current_task_state')
+    )
+    current_task_states = {int(state.object_id): state.current_task_state for state in states}
+    result = {}
+    for action in actions:
+        task = publishing_tasks[action.plan_id]
+        task_state = current_task_states.get(action.pk)
+        if task is None or task_state is None:
+            continue
+        if task_state.task_id == task.id:
+            result[action.pk] = task_state.revision_id
+    return result
+
+
+def load_draft_actions(actions: Iterable[Action], workflow_state: WorkflowStateEnum) -> list[Action]:
+    """Replace the actions having unpublished changes with their versions in the given workflow state.
+
+    The revisions are looked up and rebuilt in bulk, using `RevisionObjectCache`.
+    """
+    actions = list(actions)
+    if workflow_state == WorkflowStateEnum.PUBLISHED:
+        return actions
+    changed = [action for action in actions if action.has_unpublished_changes]
+    if not changed:
+        return actions
+
+    if workflow_state == WorkflowStateEnum.DRAFT:
+        revision_ids = {action.pk: action.latest_revision_id for action in changed if action.latest_revision_id}
+    elif workflow_state == WorkflowStateEnum.APPROVED:
+        revision_ids = get_approved_revision_ids(changed)
+    else:
+        return actions
+
+    by_id = {action.pk: action for action in changed}
+    objects = RevisionObjectCache.get_objects({
+        revision_id: by_id[action_id] for action_id, revision_id in revision_ids.items()
+    })
+    drafts = {action_id: objects.get(revision_id) for action_id, revision_id in revision_ids.items()}
+    return [drafts.get(action.pk) or action for action in actions]
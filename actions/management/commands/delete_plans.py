@@ -1,9 +1,12 @@
+from collections import Counter
+
+from django.core import management
 from django.core.management import CommandError
 from django.core.management.base import BaseCommand
 from django.conf import settings
-from django.db import transaction
 
 from actions.models.plan import Plan
+from aplans.purge import BATCH_SIZE, Purge, PurgeError
 from orgs.models import Organization
 
 
@@ -22,6 +25,22 @@ class Command(BaseCommand):
             action='store_true',
             help="Do not ask for confirmation but delete right away",
         )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Only report the number of rows that would be deleted or updated for each model",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help="Number of rows deleted in one transaction",
+        )
+        parser.add_argument(
+            '--skip-update-index',
+            action='store_true',
+            help="Do not update the search index after deleting",
+        )
 
     def handle(self, *args, **options):
         if not settings.DEBUG or settings.DEPLOYMENT_TYPE != 'production':
@@ -40,10 +59,11 @@ class Command(BaseCommand):
         delete_identifiers = plans_to_delete.values_list('identifier', flat=True)
         orgs_to_keep = Organization.objects.available_for_plans(plans_to_keep)
         orgs_to_delete = Organization.objects.exclude(id__in=orgs_to_keep)
-        num_delete_suborgs = {}
-        for org in orgs_to_delete.filter(depth=1):
-            # Unnecessarily inefficient, but what the hell...
-            num_delete_suborgs[org] = orgs_to_delete.filter(id__in=org.get_descendants()).count()
+        # Count the deleted suborganizations of each deleted root organization by the path prefix of the root
+        org_paths = list(orgs_to_delete.values_list('path', flat=True))
+        num_paths_by_root = Counter(path[:Organization.steplen] for path in org_paths)
+        roots = orgs_to_delete.filter(depth=1)
+        num_delete_suborgs = {org: num_paths_by_root[org.path] - 1 for org in roots}
         if options['exclude']:
             self.stdout.write(f"The following plans will not be deleted: {', '.join(options['exclude'])}")
         if delete_identifiers:
@@ -58,19 +78,48 @@ class Command(BaseCommand):
                     string += f' (and {n} suborganizations)'
                 strings.append(string)
             self.stdout.write(f"The following organizations will be deleted: {', '.join(strings)}")
+
+        purge = Purge(batch_size=options['batch_size'])
+        purge.add(plans_to_delete)
+        purge.add(orgs_to_delete)
+        purge.collect()
+        self.report(purge)
+        protected = purge.get_protected()
+        if protected:
+            for field, pks in protected.items():
+                self.stderr.write(
+                    f"{len(pks)} rows of {field.model._meta.label} that are not deleted reference deleted rows in "
+                    f"the protected field '{field.name}'."
+                )
+            raise CommandError("Nothing was deleted because of protected references.")
+        if options['dry_run']:
+            return
+
         if not options['no_confirm']:
             confirmation = input("Do you want to proceed? [y/N] ").lower()
             if confirmation != 'y':
                 self.stdout.write(self.style.WARNING("Aborted by user."))
                 return
-        self.delete_data(plans_to_delete, orgs_to_delete)
+        self.delete_data(purge, update_index=not options['skip_update_index'])
+
+    def report(self, purge: Purge):
+        self.stdout.write("Rows to be deleted:")
+        for label, n in purge.get_counts().items():
+            self.stdout.write(f"  {label}: {n}")
+        update_counts = purge.get_update_counts()
+        if update_counts:
+            self.stdout.write("Rows whose reference to a deleted row will be cleared:")
+            for field, n in update_counts.items():
+                self.stdout.write(f"  {field}: {n}")
 
-    @transaction.atomic
-    def delete_data(self, plans_to_delete, orgs_to_delete):
-        _, by_type = plans_to_delete.delete()
-        for model_name, n in by_type.items():
+    def delete_data(self, purge: Purge, update_index: bool = True):
+        try:
+            counts = purge.delete()
+        except PurgeError as e:
+            raise CommandError(str(e))
+        for model_name, n in counts.items():
             self.stdout.write(f"Deleted {n} instances of {model_name}.")
-        num_orgs = orgs_to_delete.count()
-        orgs_to_delete.delete()
-        # Treebeard won't tell us the deleted numbers -_-
-        self.stdout.write(f"Deleted {num_orgs} organizations; information on deleted related rows not available.")
+        purge.delete_files()
+        if update_index:
+            # Delete signals are not sent when purging, so the deleted objects are removed from the index by updating it
+            management.call_command('update_index')
@@ -1,15 +1,19 @@
 from django.core.management.base import BaseCommand
-from actions.models import Action
+from actions.models import Action, Plan
+from actions.monitoring_quality import determine_monitoring_quality
 
 
 class Command(BaseCommand):
     help = 'Recalculates statuses and completions for all actions'
 
     def handle(self, *args, **options):
+        for plan in Plan.objects.all():
+            determine_monitoring_quality(plan)
+
         for action in Action.objects.all():
             old_status = action.status
             old_completion = action.completion
-            action.recalculate_status()
+            action.recalculate_status(update_monitoring_quality=False)
             new_status = action.status
             if old_status != new_status:
                 print("%s:\n\t%s -> %s" % (action, old_status, new_status))
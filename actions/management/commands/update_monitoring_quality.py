@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from actions.models import Plan
+from actions.monitoring_quality import determine_monitoring_quality
+
+
+class Command(BaseCommand):
+    help = 'Recalculates monitoring quality points for all actions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--plan', type=str, help='Identifier of the plan to process')
+
+    def handle(self, *args, **options):
+        plans = Plan.objects.all()
+        if options['plan']:
+            plans = plans.filter(identifier=options['plan'])
+        for plan in plans:
+            with transaction.atomic():
+                added, removed = determine_monitoring_quality(plan)
+            if added or removed:
+                print("%s: %d points added, %d removed" % (plan, added, removed))
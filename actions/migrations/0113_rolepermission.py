@@ -0,0 +1,26 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('actions', '0112_alter_action_visibility'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RolePermission',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(max_length=50)),
+                ('permission', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name='+', to='auth.permission'
+                )),
+            ],
+            options={
+                'unique_together': {('role', 'permission')},
+            },
+        ),
+    ]
@@ -11,6 +11,7 @@ from .category import (
     Category, CategoryType, CategoryLevel, CategoryIcon, CommonCategory, CommonCategoryIcon, CommonCategoryType
 )
 from .features import PlanFeatures
+from .perms import RolePermission
 from .plan import GeneralPlanAdmin, ImpactGroup, Plan, PlanDomain, MonitoringQualityPoint, Scenario, PublicationStatus, PlanPublicSiteViewer
 
 
@@ -43,6 +44,7 @@ __all__ = [
     'CommonCategoryIcon',
     'CommonCategoryType',
     'RestrictedVisibilityModel',
+    'RolePermission',
     'GeneralPlanAdmin',
     'ImpactGroup',
     'ImpactGroupAction',
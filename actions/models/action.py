@@ -7,12 +7,11 @@ from typing import TYPE_CHECKING, ClassVar, Iterable, Literal, Optional, Protoco
 import uuid
 
 from django.contrib.contenttypes.fields import GenericRelation
-from django.contrib.contenttypes.models import ContentType
 from django.contrib.admin import display
 from django.core.exceptions import FieldDoesNotExist, ValidationError
 from django.core.validators import URLValidator
 from django.db import models
-from django.db.models import IntegerField, Max, Q
+from django.db.models import BooleanField, Case, Count, IntegerField, Max, Q, Value, When
 from django.db.models.functions import Cast
 from django.urls import reverse
 from django.utils import timezone, translation
@@ -38,6 +37,7 @@ from users.models import User
 from search.backends import TranslatedSearchField, TranslatedAutocompleteField
 
 from ..action_status_summary import ActionStatusSummaryIdentifier, ActionTimelinessIdentifier, SummaryContext
+from ..attribute_registry import AttributeTypeRegistry, VisibilityRole
 from ..attributes import AttributeFieldPanel, AttributeType
 from ..monitoring_quality import determine_monitoring_quality
 from .attributes import AttributeType as AttributeTypeModel, ModelWithAttributes
@@ -94,6 +94,34 @@ class ActionQuerySet(SearchableQuerySetMixin, models.QuerySet):
             return self.filter(visibility=RestrictedVisibilityModel.VisibilityState.PUBLIC)
         return self
 
+    def status_summary_counts(self) -> dict[ActionStatusSummaryIdentifier, int]:
+        is_merged = Case(
+            When(merged_with__isnull=False, then=Value(True)), default=Value(False), output_field=BooleanField()
+        )
+        rows = (
+            self.order_by().annotate(is_merged=is_merged)
+            .values('status__identifier', 'implementation_phase__identifier', 'is_merged')
+            .annotate(count=Count('id'))
+        )
+        counts = {identifier: 0 for identifier in ActionStatusSummaryIdentifier}
+        for row in rows:
+            identifier = ActionStatusSummaryIdentifier.for_identifiers(
+                row['status__identifier'], row['implementation_phase__identifier'], row['is_merged'],
+            )
+            counts[identifier] += row['count']
+        return counts
+
+    def timeliness_counts(self, plan: Plan) -> dict[ActionTimelinessIdentifier, int]:
+        rows = (
+            self.order_by().annotate(timeliness=ActionTimelinessIdentifier.get_expression(plan))
+            .values('timeliness')
+            .annotate(count=Count('id'))
+        )
+        counts = {identifier: 0 for identifier in ActionTimelinessIdentifier}
+        for row in rows:
+            counts[ActionTimelinessIdentifier[row['timeliness']]] += row['count']
+        return counts
+
     def complete_for_report(self, report):
         from reports.models import ActionSnapshot
         action_ids = (
@@ -455,24 +483,26 @@ class Action(  # type: ignore[django-manager-missing]
         )
 
     def _calculate_status_from_indicators(self):
-        progress_indicators = self.related_indicators.filter(indicates_action_progress=True)
+        progress_indicators = self.related_indicators.filter(indicates_action_progress=True).select_related(
+            'indicator__latest_value', 'indicator__summary__first_value', 'indicator__summary__latest_goal',
+            'indicator__summary__closest_goal',
+        )
         total_completion = 0.0
         total_indicators = 0
         is_late = False
 
         for action_ind in progress_indicators:
             ind = action_ind.indicator
-            try:
-                latest_value = ind.values.latest()
-            except ind.values.model.DoesNotExist:
+            latest_value = ind.latest_value
+            if latest_value is None:
                 continue
 
-            start_value = ind.values.first()
+            summary = ind.get_summary()
+            start_value = summary.first_value
             assert start_value is not None
 
-            try:
-                last_goal = ind.goals.latest()
-            except ind.goals.model.DoesNotExist:
+            last_goal = summary.latest_goal
+            if last_goal is None:
                 continue
 
             diff = last_goal.value - start_value.value
@@ -487,7 +517,7 @@ class Action(  # type: ignore[django-manager-missing]
 
             # Figure out if the action is late or not by comparing
             # the latest measured value to the closest goal
-            closest_goal = ind.goals.filter(date__lte=latest_value.date).last()
+            closest_goal = summary.closest_goal
             if closest_goal is None:
                 continue
 
@@ -552,7 +582,7 @@ class Action(  # type: ignore[django-manager-missing]
 
         return by_id['late']
 
-    def recalculate_status(self, force_update=False):
+    def recalculate_status(self, force_update=False, update_monitoring_quality=True):
         if self.merged_with is not None or self.manual_status:
             return
 
@@ -562,7 +592,8 @@ class Action(  # type: ignore[django-manager-missing]
                 self.save(update_fields=['completion'])
             return
 
-        determine_monitoring_quality(self, self.plan.monitoring_quality_points.all())
+        if update_monitoring_quality:
+            determine_monitoring_quality(self.plan, Action.objects.filter(id=self.id))
 
         indicator_status = self._calculate_status_from_indicators()
         if indicator_status:
@@ -692,21 +723,17 @@ class Action(  # type: ignore[django-manager-missing]
             only_in_reporting_tab=only_in_reporting_tab,
             unless_in_reporting_tab=unless_in_reporting_tab
         )
-        return [at for at in attribute_types if at.instance.is_instance_visible_for(user, self.plan, self)]
+        registry = AttributeTypeRegistry.for_plan(self.plan)
+        role = VisibilityRole.for_user(user, self.plan)
+        return [at for at in attribute_types if registry.is_visible(at.instance, role, user, self)]
 
     @classmethod
     def get_attribute_types_for_plan(cls, plan: Plan, only_in_reporting_tab=False, unless_in_reporting_tab=False):
-        action_ct = ContentType.objects.get_for_model(Action)
-        plan_ct = ContentType.objects.get_for_model(plan)
-        at_qs: Iterable[AttributeTypeModel] = AttributeTypeModel.objects.filter(
-            object_content_type=action_ct,
-            scope_content_type=plan_ct,
-            scope_id=plan.id,
-        )
+        at_qs: Iterable[AttributeTypeModel] = AttributeTypeRegistry.for_plan(plan).get_types(Action, plan)
         if only_in_reporting_tab:
-            at_qs = at_qs.filter(show_in_reporting_tab=True)
+            at_qs = [at for at in at_qs if at.show_in_reporting_tab]
         if unless_in_reporting_tab:
-            at_qs = at_qs.filter(show_in_reporting_tab=False)
+            at_qs = [at for at in at_qs if not at.show_in_reporting_tab]
         # Convert to wrapper objects
         return [AttributeType.from_model_instance(at) for at in at_qs]
 
@@ -769,7 +796,7 @@ class Action(  # type: ignore[django-manager-missing]
         return True
 
     def mark_as_complete_for_report(self, report, user):
-        from reports.models import ActionSnapshot
+        from reports.models import ActionSnapshot, ActionSnapshotAttribute
         if self.is_complete_for_report(report):
             raise ValueError(_("The action is already marked as complete for report %s.") % report)
         with reversion.create_revision():
@@ -778,10 +805,12 @@ class Action(  # type: ignore[django-manager-missing]
                 _("Marked action '%(action)s' as complete for report '%(report)s'") % {
                     'action': self, 'report': report})
             reversion.set_user(user)
-        ActionSnapshot.for_action(
+        snapshot = ActionSnapshot.for_action(
             report=report,
             action=self,
-        ).save()
+        )
+        snapshot.save()
+        ActionSnapshotAttribute.create_for_snapshots([snapshot])
 
     def undo_marking_as_complete_for_report(self, report, user):
         from reports.models import ActionSnapshot
@@ -803,10 +832,16 @@ class Action(  # type: ignore[django-manager-missing]
     def get_status_summary(
             self, cache: WatchObjectCache | None = None
     ) -> ConstantMetadata['ActionStatusSummaryIdentifier', SummaryContext]:
-        return ActionStatusSummaryIdentifier.for_action(self).get_data({'plan_id': self.plan_id, 'cache': cache})
+        identifier = ActionStatusSummaryIdentifier.for_action(self)
+        if cache is not None:
+            return cache.for_plan_id(self.plan_id).get_action_status_summary(identifier)
+        return identifier.get_data({'plan': self.plan})
 
     def get_timeliness(self, cache: WatchObjectCache | None = None):
-        return ActionTimelinessIdentifier.for_action(self).get_data({'plan': self.plan, 'cache': cache})
+        identifier = ActionTimelinessIdentifier.for_action(self)
+        if cache is not None:
+            return cache.for_plan_id(self.plan_id).get_action_timeliness(identifier)
+        return identifier.get_data({'plan': self.plan})
 
     def get_color(self, cache: WatchObjectCache | None = None):
         if self.status and self.status.color:
@@ -6,7 +6,6 @@ from typing import Any, Self, Tuple, Iterable, Sequence
 import uuid
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericRelation
-from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from django.db import models, transaction
 from django.db.models import Q
@@ -22,8 +21,9 @@ from modeltrans.utils import get_available_languages
 from wagtail.models import Page, Collection
 from wagtailsvg.models import Svg  # type: ignore
 
+from ..attribute_registry import AttributeTypeRegistry, VisibilityRole
 from ..attributes import AttributeFieldPanel, AttributeType
-from .attributes import AttributeType as AttributeTypeModel, ModelWithAttributes
+from .attributes import ModelWithAttributes
 from aplans.utils import (
     IdentifierField, InstancesEditableByMixin, ModelWithPrimaryLanguage, OrderedModel, PlanRelatedModel,
     ReferenceIndexedModelMixin, UserOrAnon, generate_identifier, validate_css_color, get_supported_languages
@@ -367,29 +367,36 @@ class CommonCategory(CategoryBase, ClusterableModel):
     def __str__(self):
         return '[%s] %s' % (self.identifier, self.name)
 
-    def instantiate_for_category_type(self, category_type):
-        """Create category corresponding to this one and set its type to the given one."""
-        if category_type.categories.filter(common=self).exists():
-            raise Exception(f"Instantiation of common category '{self}' for category type '{category_type}' exists "
-                            "already")
+    def get_instance_values(self, plan: Plan) -> dict[str, Any]:
+        """Return the field values of the category corresponding to this one in the given plan."""
         translated_fields = get_i18n_field(Category).fields
         other_languages = [lang.replace('-', '_')
                            for lang in get_available_languages()
-                           if lang != category_type.plan.primary_language]
+                           if lang != plan.primary_language]
         # Inherit fields from CategoryBase, but instead of `name` we want `name_<lang>`, where `<lang>` is the primary
         # language of the the active plan, and the same for other translated fields.
         # TODO: Duplicated in CommonCategoryType.instantiate_for_plan()
         # Temporarily override language so that the `_i18n` suffix field falls back to the original field
-        with translation.override(category_type.plan.primary_language):
+        with translation.override(plan.primary_language):
             translated_values = {field: getattr(self, f'{field}_i18n') for field in translated_fields}
         for field in translated_fields:
             for lang in other_languages:
                 value = getattr(self, f'{field}_{lang}')
                 if value:
                     translated_values[f'{field}_{lang}'] = value
-        inherited_fields = [f.name for f in CategoryBase._meta.fields if f.name not in translated_fields + ('uuid',)]
+        # Use the attribute names of foreign keys so that the related objects are not fetched
+        inherited_fields = [
+            f.attname for f in CategoryBase._meta.fields if f.name not in translated_fields + ('uuid',)
+        ]
         inherited_values = {field: getattr(self, field) for field in inherited_fields}
-        return category_type.categories.create(common=self, **inherited_values, **translated_values)
+        return {**inherited_values, **translated_values}
+
+    def instantiate_for_category_type(self, category_type):
+        """Create category corresponding to this one and set its type to the given one."""
+        if category_type.categories.filter(common=self).exists():
+            raise Exception(f"Instantiation of common category '{self}' for category type '{category_type}' exists "
+                            "already")
+        return category_type.categories.create(common=self, **self.get_instance_values(category_type.plan))
 
     def get_icon(self, language=None):
         """Get CommonCategoryIcon in the given language, falling back to an icon without a language."""
@@ -570,26 +577,18 @@ class Category(ModelWithAttributes, CategoryBase, ClusterableModel, PlanRelatedM
         return None
 
     def get_editable_attribute_types(self, user: UserOrAnon) -> list[AttributeType]:
-        category_ct = ContentType.objects.get_for_model(Category)
-        category_type_ct = ContentType.objects.get_for_model(self.type)
-        at_qs = AttributeTypeModel.objects.filter(
-            object_content_type=category_ct,
-            scope_content_type=category_type_ct,
-            scope_id=self.type.id,
-        )
-        attribute_types = (at for at in at_qs if at.is_instance_editable_by(user, self.type.plan, None))
+        plan = self.type.plan
+        at_qs = AttributeTypeRegistry.for_plan(plan).get_types(Category, self.type)
+        attribute_types = (at for at in at_qs if at.is_instance_editable_by(user, plan, None))
         # Convert to wrapper objects
         return [AttributeType.from_model_instance(at) for at in attribute_types]
 
     def get_visible_attribute_types(self, user: UserOrAnon) -> list[AttributeType]:
-        category_ct = ContentType.objects.get_for_model(Category)
-        category_type_ct = ContentType.objects.get_for_model(self.type)
-        at_qs = AttributeTypeModel.objects.filter(
-            object_content_type=category_ct,
-            scope_content_type=category_type_ct,
-            scope_id=self.type.id,
-        )
-        attribute_types = (at for at in at_qs if at.is_instance_visible_for(user, self.type.plan, None))
+        plan = self.type.plan
+        registry = AttributeTypeRegistry.for_plan(plan)
+        role = VisibilityRole.for_user(user, plan)
+        at_qs = registry.get_types(Category, self.type)
+        attribute_types = (at for at in at_qs if registry.is_visible(at, role, user, None))
         # Convert to wrapper objects
         return [AttributeType.from_model_instance(at) for at in attribute_types]
 
@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class RolePermission(models.Model):
+    """A permission granted to a role in the permission manifest of `actions.perms`.
+
+    The rows are compiled from the manifest after each migration, so the permissions of a role can be looked up
+    by their IDs without resolving codenames on every login.
+    """
+    role = models.CharField(max_length=50)
+    permission = models.ForeignKey('auth.Permission', on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        unique_together = (('role', 'permission'),)
+
+    def __str__(self):
+        return '%s: %s' % (self.role, self.permission_id)
@@ -14,6 +14,7 @@ from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator, RegexValidator, MaxValueValidator, MinValueValidator
 from django.db import models, transaction
 from django.db.models import Q
+from django.db.models.expressions import RawSQL
 from django.utils import timezone, translation
 from django.utils.functional import cached_property
 from django.utils.text import format_lazy
@@ -699,21 +700,45 @@ class Plan(ClusterableModel, ModelWithPrimaryLanguage):
 
         return qs
 
-    def get_superseded_plans(self, recursive=False):
-        result = self.superseded_plans.all()
-        if recursive:
-            # To optimize, use recursive queries as in https://stackoverflow.com/a/39933958/14595546
-            for child in list(result):
-                result |= child.get_superseded_plans(recursive=True)
-        return result
+    # Guard against cycles in the superseded_by chain
+    MAX_SUPERSEDING_DEPTH = 100
+
+    def get_superseded_plans(self, recursive=False) -> PlanQuerySet:
+        if not recursive:
+            return self.superseded_plans.all()
+        table = Plan._meta.db_table
+        sql = f"""
+            WITH RECURSIVE superseded(id) AS (
+                SELECT id FROM {table} WHERE superseded_by_id = %s
+                UNION
+                SELECT p.id FROM {table} p JOIN superseded s ON p.superseded_by_id = s.id
+            )
+            SELECT id FROM superseded
+        """
+        return Plan.objects.filter(id__in=RawSQL(sql, [self.id]))
 
-    def get_superseding_plans(self, recursive=False):
-        if self.superseded_by is None:
+    def get_superseding_plans(self, recursive=False) -> list[Plan]:
+        if self.superseded_by_id is None:
             return []
-        result = [self.superseded_by]
-        if recursive:
-            # To optimize, use recursive queries as in https://stackoverflow.com/a/39933958/14595546
-            result += self.superseded_by.get_superseding_plans(recursive=True)
+        if not recursive:
+            return [self.superseded_by]
+        table = Plan._meta.db_table
+        # Ordered from the closest superseding plan to the most recent one
+        sql = f"""
+            WITH RECURSIVE superseding(id, depth) AS (
+                SELECT superseded_by_id, 1 FROM {table} WHERE id = %s
+                UNION ALL
+                SELECT p.superseded_by_id, s.depth + 1 FROM {table} p JOIN superseding s ON p.id = s.id
+                WHERE p.superseded_by_id IS NOT NULL AND s.depth < %s
+            )
+            SELECT p.* FROM {table} p JOIN superseding s ON p.id = s.id ORDER BY s.depth
+        """
+        result = []
+        seen = {self.id}
+        for plan in Plan.objects.raw(sql, [self.id, self.MAX_SUPERSEDING_DEPTH]):
+            if plan.id not in seen:
+                seen.add(plan.id)
+                result.append(plan)
         return result
 
     def get_action_days_until_considered_stale(self):
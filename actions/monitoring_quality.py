@@ -1,55 +1,109 @@
+from __future__ import annotations
+
 import logging
+import typing
 from datetime import timedelta
-from django.utils import timezone
+from django.db.models import BooleanField, Case, Exists, OuterRef, Q, Value, When
+
+if typing.TYPE_CHECKING:
+    from django.db.models import Expression, QuerySet
+    from .models import Action, MonitoringQualityPoint, Plan
 
 
 logger = logging.getLogger(__name__)
 
 
-def determine_basic_info(action):
-    if not action.contact_persons.exists():
-        return False
-    if not action.description.strip():
-        return False
-    if not action.tasks.exists():
-        return False
-    return True
+def basic_info_expression(plan: Plan) -> Expression:
+    from .models import ActionContactPerson, ActionTask
+
+    has_contact_persons = Exists(ActionContactPerson.objects.filter(action=OuterRef('pk')))
+    has_tasks = Exists(ActionTask.objects.filter(action=OuterRef('pk')))
+    has_description = Q(description__isnull=False) & ~Q(description__regex=r'^\s*$')
+    return Case(
+        When(has_contact_persons & has_tasks & has_description, then=Value(True)),
+        default=Value(False), output_field=BooleanField(),
+    )
 
 
-def determine_future_task(action):
-    now = action.plan.now_in_local_timezone()
+def future_task_expression(plan: Plan) -> Expression:
+    from .models import ActionTask
+
+    now = plan.now_in_local_timezone()
     year_from_now = now + timedelta(days=365)
-    if not action.tasks.active().filter(due_at__lte=year_from_now).exists():
-        return False
-    return True
+    tasks = ActionTask.objects.active().filter(action=OuterRef('pk'), due_at__lte=year_from_now.date())
+    return Exists(tasks)
+
 
+def indicator_expression(plan: Plan) -> Expression:
+    from indicators.models import ActionIndicator
 
-def determine_indicator(action):
-    ais = action.related_indicators.filter(indicates_action_progress=True).select_related('indicator')
-    for ai in ais:
-        ind = ai.indicator
-        if ind.has_current_goals() and ind.has_current_data():
-            return True
-    return False
+    today = plan.now_in_local_timezone().date()
+    progress_indicators = ActionIndicator.objects.filter(
+        action=OuterRef('pk'),
+        indicates_action_progress=True,
+        indicator__latest_value__isnull=False,
+        indicator__goals__date__gte=today,
+    )
+    return Exists(progress_indicators)
 
 
 POINT_MAP = {
-    'basic_info': determine_basic_info,
-    'future_task': determine_future_task,
-    'indicator': determine_indicator,
+    'basic_info': basic_info_expression,
+    'future_task': future_task_expression,
+    'indicator': indicator_expression,
 }
 
 
-def determine_monitoring_quality(action, points):
-    new_points = set()
+def determine_monitoring_quality(
+    plan: Plan, actions: QuerySet[Action] | None = None, points: typing.Iterable[MonitoringQualityPoint] | None = None,
+) -> tuple[int, int]:
+    """Evaluate monitoring quality points for the actions of a plan and store the changes.
+
+    All points are evaluated for all given actions in one query, and the memberships are updated
+    with a diff against the through table. By default, the actions whose status is calculated
+    automatically are evaluated. Returns the number of added and removed memberships.
+    """
+    from .models import Action
+
+    if actions is None:
+        actions = plan.actions.unmerged().filter(manual_status=False).exclude(status__is_completed=True)
+    if points is None:
+        points = plan.monitoring_quality_points.all()
+
+    annotations: dict[str, Expression] = {}
+    point_ids: dict[str, int] = {}
     for point in points:
-        determine_func = POINT_MAP.get(point.identifier)
-        if not determine_func:
+        get_expression = POINT_MAP.get(point.identifier)
+        if not get_expression:
             logger.error("Do not know how to determine monitoring quality for '%s'" % point.identifier)
             continue
-        if determine_func(action):
-            new_points.add(point.id)
+        key = 'mq_%d' % point.id
+        annotations[key] = get_expression(plan)
+        point_ids[key] = point.id
+
+    action_ids = set()
+    new_points = set()
+    rows = actions.order_by().annotate(**annotations).values('id', *annotations.keys())
+    for row in rows:
+        action_ids.add(row['id'])
+        for key, point_id in point_ids.items():
+            if row[key]:
+                new_points.add((row['id'], point_id))
 
-    existing_points = {p.id for p in action.monitoring_quality_points.all()}
-    if new_points != existing_points:
-        action.monitoring_quality_points.set(new_points)
+    Through = Action.monitoring_quality_points.through
+    existing = {
+        (action_id, point_id): pk for pk, action_id, point_id in (
+            Through.objects.filter(action__in=action_ids)
+            .values_list('id', 'action_id', 'monitoringqualitypoint_id')
+        )
+    }
+    to_remove = [pk for key, pk in existing.items() if key not in new_points]
+    to_add = [
+        Through(action_id=action_id, monitoringqualitypoint_id=point_id)
+        for action_id, point_id in new_points if (action_id, point_id) not in existing
+    ]
+    if to_remove:
+        Through.objects.filter(id__in=to_remove).delete()
+    if to_add:
+        Through.objects.bulk_create(to_add)
+    return len(to_add), len(to_remove)
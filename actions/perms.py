@@ -1,9 +1,16 @@
-from functools import lru_cache
+from __future__ import annotations
 
+import logging
+from collections import defaultdict
+from typing import Iterable
+
+from django.apps import apps
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group, Permission
-from django.contrib.contenttypes.models import ContentType
-from wagtail.models import GroupPagePermission, PAGE_PERMISSION_TYPES
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.db.models import QuerySet
+from wagtail.models import GroupCollectionPermission, GroupPagePermission, Page, PAGE_PERMISSION_TYPES
 
 from content.models import SiteGeneralContent
 from indicators.models import (
@@ -18,197 +25,25 @@ from reports.models import Report, ReportType
 from .models import (
     Action, AttributeRichText, AttributeType, AttributeChoice, AttributeTypeChoiceOption,
     ActionContactPerson, ActionImpact, ActionResponsibleParty, ActionSchedule, ActionStatus, ActionStatusUpdate,
-    ActionTask, Category, CategoryType, ImpactGroup, ImpactGroupAction, MonitoringQualityPoint, Plan,
+    ActionTask, Category, CategoryType, ImpactGroup, ImpactGroupAction, MonitoringQualityPoint, Plan, RolePermission,
 )
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
 
 ACTIONS_APP = 'actions'
 
 ALL_PERMS = ('view', 'change', 'publish', 'delete', 'add')
 
-
-def _get_perm_objs(model, perms):
-    content_type = ContentType.objects.get_for_model(model)
-    perms = ['%s_%s' % (x, model._meta.model_name) for x in perms]
-    perm_objs = Permission.objects.filter(content_type=content_type, codename__in=perms)
-    return list(perm_objs)
-
-
-@lru_cache
-def get_wagtail_contact_person_perms():
-    perms = []
-    perms += list(Permission.objects.filter(
-        content_type__app_label='wagtaildocs',
-        codename__in=('add_document', 'change_document', 'delete_document')
-    ))
-    perms += list(Permission.objects.filter(
-        content_type__app_label='wagtailimages',
-        codename__in=('add_image', 'change_image', 'delete_image')
-    ))
-    perms += list(Permission.objects.filter(
-        content_type__app_label='wagtailcore',
-        codename__in=['add_collection', 'view_collection']
-    ))
-    return perms
-
-
-@lru_cache
-def get_wagtail_plan_admin_perms():
-    perms = []
-    perms += list(Permission.objects.filter(
-        content_type__app_label='wagtailcore',
-        codename__in=[
-            'change_collection', 'delete_collection',
-        ]
-    ))
-    return perms
-
-
-@lru_cache
-def get_action_contact_person_perms():
-    new_perms = []
-
-    # Add general permissions
-    new_perms += _get_perm_objs(Action, ('view', 'change', 'publish'))
-    new_perms += _get_perm_objs(ActionTask, ('view', 'change', 'delete', 'add'))
-    new_perms += _get_perm_objs(Person, ('view', 'change', 'add'))
-    new_perms += _get_perm_objs(ActionContactPerson, ALL_PERMS)
-    new_perms += _get_perm_objs(ActionStatusUpdate, ALL_PERMS)
-    new_perms += _get_perm_objs(ActionIndicator, ('view',))
-    new_perms += _get_perm_objs(Indicator, ('view',))
-
-    new_perms += [Permission.objects.get(content_type__app_label='wagtailadmin', codename='access_admin')]
-    new_perms += get_wagtail_contact_person_perms()
-
-    for model in (
-        ActionResponsibleParty,
-    ):
-        new_perms += _get_perm_objs(model, ALL_PERMS)
-    new_perms += _get_perm_objs(Organization, ('view',))
-
-    return new_perms
-
-
-@lru_cache
-def get_indicator_contact_person_perms():
-    new_perms = []
-
-    new_perms += _get_perm_objs(Action, ('view',))
-    new_perms += _get_perm_objs(Person, ('view', 'change', 'add'))
-    new_perms += _get_perm_objs(ActionIndicator, ('view',))
-    new_perms += _get_perm_objs(Indicator, ('view', 'change'))
-    new_perms += _get_perm_objs(IndicatorGoal, ('view', 'change'))
-    new_perms += _get_perm_objs(IndicatorValue, ('view', 'change', 'add'))
-    new_perms += _get_perm_objs(IndicatorContactPerson, ALL_PERMS)
-
-    new_perms += [Permission.objects.get(content_type__app_label='wagtailadmin', codename='access_admin')]
-    new_perms += get_wagtail_contact_person_perms()
-
-    return new_perms
-
-
-def _get_or_create_group(name, perms=None):
-    group, _ = Group.objects.get_or_create(name=name)
-
-    if perms is None:
-        return group
-
-    existing_perms = set(list(group.permissions.all()))
-    new_perms = set(perms)
-    if existing_perms != new_perms:
-        group.permissions.clear()
-        group.permissions.add(*new_perms)
-
-    return group
-
-
-def get_or_create_action_contact_person_group():
-    perms = get_action_contact_person_perms()
-    group = _get_or_create_group('Action contact persons', perms)
-    return group
-
-
-@lru_cache
-def get_or_create_indicator_contact_person_group():
-    perms = get_indicator_contact_person_perms()
-    group = _get_or_create_group('Indicator contact persons', perms)
-    return group
-
-
-def _sync_group_collection_perms(root_collection, group, perms):
-    current_perms = set([obj.permission for obj in group.collection_permissions.filter(collection=root_collection)])
-    for perm in perms:
-        if perm not in current_perms:
-            group.collection_permissions.create(collection=root_collection, permission=perm)
-    for perm in current_perms:
-        if perm not in perms:
-            group.collection_permissions.get(collection=root_collection, permission=perm).delete()
-
-
-def _sync_group_page_perms(root_pages, group):
-    # Delete all page permissions connected to another root page. (Root pages can be either plan root pages or
-    # documentation root pages, and their respective translations are also root pages.)
-    qs = GroupPagePermission.objects.filter(group=group)
-    for page in root_pages:
-        qs = qs.exclude(page=page)
-    qs.delete()
-
-    current_perms = GroupPagePermission.objects.filter(group=group)
-    perm_set = {gpp.permission.codename for gpp in current_perms}
-    new_perm_set = {x[0] for x in PAGE_PERMISSION_TYPES}
-    page_set = {gpp.page for gpp in current_perms}
-    new_page_set = set(root_pages)
-    if perm_set != new_perm_set or page_set != new_page_set:
-        current_perms.delete()
-        for codename in new_perm_set:
-            for page in new_page_set:
-                permission = Permission.objects.get(content_type__app_label='wagtailcore', codename=codename)
-                GroupPagePermission.objects.create(page=page, group=group, permission=permission)
-
-
-def _sync_contact_person_groups(user):
-    plans = user.get_adminable_plans()
-    groups = user.groups.filter(contact_person_for_plan__isnull=False).exclude(contact_person_for_plan__in=plans)
-
-    for group in groups:
-        user.groups.remove(group)
-
-    wagtail_perms = get_wagtail_contact_person_perms()
-
-    for plan in plans:
-        if plan.contact_person_group is None:
-            continue
-        group = plan.contact_person_group
-        user.groups.add(group)
-        if plan.root_collection is None:
-            continue
-        _sync_group_collection_perms(plan.root_collection, group, wagtail_perms)
-
-
-def add_contact_person_perms(user, model):
-    if model == Action:
-        group = get_or_create_action_contact_person_group()
-    else:
-        group = get_or_create_indicator_contact_person_group()
-    user.groups.add(group)
-
-    # Make sure user is able to access the admin UI
-    if not user.is_staff:
-        user.is_staff = True
-        user.save(update_fields=['is_staff'])
-    _sync_contact_person_groups(user)
-
-
-def remove_contact_person_perms(user, model):
-    if model == Action:
-        group = get_or_create_action_contact_person_group()
-    else:
-        group = get_or_create_indicator_contact_person_group()
-    user.groups.remove(group)
-    _sync_contact_person_groups(user)
-
+# Roles of the permission manifest
+WAGTAIL_CONTACT_PERSON = 'wagtail_contact_person'
+WAGTAIL_PLAN_ADMIN = 'wagtail_plan_admin'
+ACTION_CONTACT_PERSON = 'action_contact_person'
+INDICATOR_CONTACT_PERSON = 'indicator_contact_person'
+PLAN_ADMIN = 'plan_admin'
+PLAN_ADMIN_PAGES = 'plan_admin_pages'
 
 PLAN_ADMIN_PERMS = (
     (Plan, ('view', 'change')),
@@ -257,44 +92,356 @@ PLAN_ADMIN_PERMS = (
     (User, ('view',))
 )
 
+# The permissions of each role. An entry is either the name of another role, whose permissions are included,
+# a model with the actions on it or an app label with permission codenames.
+ROLE_PERMISSIONS = {
+    # Granted on the root collection of a plan to its contact person group
+    WAGTAIL_CONTACT_PERSON: (
+        ('wagtaildocs', ('add_document', 'change_document', 'delete_document')),
+        ('wagtailimages', ('add_image', 'change_image', 'delete_image')),
+        ('wagtailcore', ('add_collection', 'view_collection')),
+    ),
+    # Granted on the root collection of a plan to its admin group
+    WAGTAIL_PLAN_ADMIN: (
+        ('wagtailcore', ('change_collection', 'delete_collection')),
+    ),
+    ACTION_CONTACT_PERSON: (
+        (Action, ('view', 'change', 'publish')),
+        (ActionTask, ('view', 'change', 'delete', 'add')),
+        (Person, ('view', 'change', 'add')),
+        (ActionContactPerson, ALL_PERMS),
+        (ActionStatusUpdate, ALL_PERMS),
+        (ActionIndicator, ('view',)),
+        (Indicator, ('view',)),
+        ('wagtailadmin', ('access_admin',)),
+        WAGTAIL_CONTACT_PERSON,
+        (ActionResponsibleParty, ALL_PERMS),
+        (Organization, ('view',)),
+    ),
+    INDICATOR_CONTACT_PERSON: (
+        (Action, ('view',)),
+        (Person, ('view', 'change', 'add')),
+        (ActionIndicator, ('view',)),
+        (Indicator, ('view', 'change')),
+        (IndicatorGoal, ('view', 'change')),
+        (IndicatorValue, ('view', 'change', 'add')),
+        (IndicatorContactPerson, ALL_PERMS),
+        ('wagtailadmin', ('access_admin',)),
+        WAGTAIL_CONTACT_PERSON,
+    ),
+    PLAN_ADMIN: (
+        ACTION_CONTACT_PERSON,
+        INDICATOR_CONTACT_PERSON,
+        *PLAN_ADMIN_PERMS,
+        WAGTAIL_PLAN_ADMIN,
+    ),
+    # Granted on the root pages of a plan to its admin group
+    PLAN_ADMIN_PAGES: (
+        ('wagtailcore', tuple(codename for codename, *_ in PAGE_PERMISSION_TYPES)),
+    ),
+}
+
+ROLE_PERMISSIONS_CACHE_KEY = 'role-permissions'
+ROLE_PERMISSIONS_CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def _resolve_role(role, permissions_by_model, permissions_by_app, resolving=()):
+    if role in resolving:
+        raise ValueError("Role '%s' includes itself" % role)
+    ids = set()
+    for entry in ROLE_PERMISSIONS[role]:
+        if isinstance(entry, str):
+            ids |= _resolve_role(entry, permissions_by_model, permissions_by_app, resolving + (role,))
+            continue
+        target, actions = entry
+        if isinstance(target, str):
+            keys = [(target, codename) for codename in actions]
+            perms = permissions_by_app
+        else:
+            # Permissions of proxy models are looked up from the concrete model like ContentType.get_for_model()
+            opts = target._meta.concrete_model._meta
+            keys = [(opts.app_label, opts.model_name, '%s_%s' % (action, opts.model_name)) for action in actions]
+            perms = permissions_by_model
+        for key in keys:
+            if key in perms:
+                ids.add(perms[key])
+            elif isinstance(target, str):
+                # Models are given with ALL_PERMS even if they cannot be published, but codenames must exist
+                logger.warning("Permission %s of role '%s' does not exist" % ('.'.join(key), role))
+    return ids
+
+
+def resolve_role_permissions(using=DEFAULT_DB_ALIAS) -> dict[str, set[int]]:
+    """Resolve the permission IDs of each role in the manifest with one query."""
+    permissions_by_model = {}
+    permissions_by_app = {}
+    rows = Permission.objects.using(using).values_list(
+        'id', 'content_type__app_label', 'content_type__model', 'codename',
+    )
+    for permission_id, app_label, model_name, codename in rows:
+        permissions_by_model[(app_label, model_name, codename)] = permission_id
+        permissions_by_app[(app_label, codename)] = permission_id
+    return {
+        role: _resolve_role(role, permissions_by_model, permissions_by_app)
+        for role in ROLE_PERMISSIONS
+    }
+
+
+def compile_role_permissions(using=DEFAULT_DB_ALIAS) -> dict[str, set[int]]:
+    """Store the permissions of the manifest in the `RolePermission` table and refresh the cache."""
+    role_perms = resolve_role_permissions(using=using)
+    desired = {(role, permission_id) for role, ids in role_perms.items() for permission_id in ids}
+    existing = {
+        (role, permission_id): pk
+        for pk, role, permission_id in RolePermission.objects.using(using).values_list('id', 'role', 'permission_id')
+    }
+    with transaction.atomic(using=using):
+        extra = [pk for key, pk in existing.items() if key not in desired]
+        if extra:
+            RolePermission.objects.using(using).filter(id__in=extra).delete()
+        RolePermission.objects.using(using).bulk_create([
+            RolePermission(role=role, permission_id=permission_id)
+            for role, permission_id in desired if (role, permission_id) not in existing
+        ])
+    cache.set(ROLE_PERMISSIONS_CACHE_KEY, role_perms, ROLE_PERMISSIONS_CACHE_TIMEOUT)
+    return role_perms
+
+
+def _get_role_permissions() -> dict[str, set[int]]:
+    role_perms = cache.get(ROLE_PERMISSIONS_CACHE_KEY)
+    if role_perms is not None:
+        return role_perms
+    role_perms = defaultdict(set)
+    for role, permission_id in RolePermission.objects.values_list('role', 'permission_id'):
+        role_perms[role].add(permission_id)
+    if role_perms.keys() != ROLE_PERMISSIONS.keys():
+        # The table has not been compiled after the manifest was changed
+        return compile_role_permissions()
+    role_perms = dict(role_perms)
+    cache.set(ROLE_PERMISSIONS_CACHE_KEY, role_perms, ROLE_PERMISSIONS_CACHE_TIMEOUT)
+    return role_perms
+
+
+def get_role_permission_ids(role: str) -> set[int]:
+    return _get_role_permissions()[role]
+
+
+def refresh_role_permissions(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Compile the manifest after migrations, which may have added or removed permissions."""
+    # Permissions of each app are created when post_migrate is sent for it, so wait until the last app
+    app_configs = [app_config for app_config in apps.get_app_configs() if app_config.models_module is not None]
+    if sender is not app_configs[-1]:
+        return
+    if not router.allow_migrate_model(using, RolePermission):
+        return
+    if RolePermission._meta.db_table not in connections[using].introspection.table_names():
+        # Migrated backwards past the creation of the table
+        return
+    compile_role_permissions(using=using)
+
+
+def _sync_group_permissions(group: Group, permission_ids: set[int]):
+    through = Group.permissions.through
+    existing = set(through.objects.filter(group=group).values_list('permission_id', flat=True))
+    missing = permission_ids - existing
+    if missing:
+        through.objects.bulk_create([through(group=group, permission_id=permission_id) for permission_id in missing])
+    extra = existing - permission_ids
+    if extra:
+        through.objects.filter(group=group, permission_id__in=extra).delete()
+
+
+def _get_or_create_group(name, role=None):
+    group, _ = Group.objects.get_or_create(name=name)
+
+    if role is None:
+        return group
+
+    _sync_group_permissions(group, get_role_permission_ids(role))
+    return group
+
+
+def get_or_create_action_contact_person_group():
+    return _get_or_create_group('Action contact persons', ACTION_CONTACT_PERSON)
+
+
+def get_or_create_indicator_contact_person_group():
+    return _get_or_create_group('Indicator contact persons', INDICATOR_CONTACT_PERSON)
+
+
+def _get_plan_root_page_ids(plans: list[Plan]) -> dict[int, set[int]]:
+    # Root pages can be either plan root pages or documentation root pages, and their respective translations are
+    # also root pages.
+    translation_keys = {
+        plan.root_page.translation_key for plan in plans if plan.root_page is not None
+    }
+    translations = defaultdict(set)
+    if translation_keys:
+        for page_id, translation_key in Page.objects.filter(
+            translation_key__in=translation_keys
+        ).values_list('id', 'translation_key'):
+            translations[translation_key].add(page_id)
+
+    root_page_ids = {}
+    for plan in plans:
+        page_ids = {page.id for page in plan.documentation_root_pages.all()}
+        if plan.root_page is not None:
+            page_ids |= translations[plan.root_page.translation_key]
+        root_page_ids[plan.id] = page_ids
+    return root_page_ids
+
+
+def _sync_collection_perms(desired: set[tuple[int, int, int]]):
+    """Make the (group, collection, permission) rows of the given group-collection pairs match `desired`."""
+    pairs = {(group_id, collection_id) for group_id, collection_id, _ in desired}
+    existing = {}
+    if pairs:
+        rows = GroupCollectionPermission.objects.filter(
+            group__in={group_id for group_id, _ in pairs},
+            collection__in={collection_id for _, collection_id in pairs},
+        ).values_list('id', 'group_id', 'collection_id', 'permission_id')
+        existing = {
+            (group_id, collection_id, permission_id): pk
+            for pk, group_id, collection_id, permission_id in rows
+            # Only the permissions on the plan's own root collection are managed here
+            if (group_id, collection_id) in pairs
+        }
+    extra = [pk for key, pk in existing.items() if key not in desired]
+    if extra:
+        GroupCollectionPermission.objects.filter(id__in=extra).delete()
+    missing = desired - existing.keys()
+    if missing:
+        GroupCollectionPermission.objects.bulk_create([
+            GroupCollectionPermission(group_id=group_id, collection_id=collection_id, permission_id=permission_id)
+            for group_id, collection_id, permission_id in missing
+        ])
+
+
+def _sync_page_perms(group_ids: set[int], desired: set[tuple[int, int, int]]):
+    """Make the (group, page, permission) rows of the given groups match `desired`."""
+    existing = {}
+    if group_ids:
+        rows = GroupPagePermission.objects.filter(group__in=group_ids).values_list(
+            'id', 'group_id', 'page_id', 'permission_id'
+        )
+        existing = {(group_id, page_id, permission_id): pk for pk, group_id, page_id, permission_id in rows}
+    extra = [pk for key, pk in existing.items() if key not in desired]
+    if extra:
+        GroupPagePermission.objects.filter(id__in=extra).delete()
+    missing = desired - existing.keys()
+    if missing:
+        # Parts of Wagtail still use the deprecated `permission_type` field, which is only filled in automatically
+        # when the permission is given as an object
+        codenames = dict(Permission.objects.filter(
+            id__in={permission_id for _, _, permission_id in missing}
+        ).values_list('id', 'codename'))
+        GroupPagePermission.objects.bulk_create([
+            GroupPagePermission(
+                group_id=group_id, page_id=page_id, permission_id=permission_id,
+                permission_type=codenames[permission_id].removesuffix('_page'),
+            )
+            for group_id, page_id, permission_id in missing
+        ])
+
+
+def sync_plan_groups(plans: QuerySet[Plan] | None = None, admin_groups=True, contact_person_groups=True):
+    """Synchronize the collection and page permissions of the groups of plans.
+
+    The admin group of a plan gets the admin permissions on the plan's root collection and on its root pages, and
+    the contact person group the contact person permissions on the root collection. The permissions of all plans
+    are compared and changed with a constant number of queries.
+    """
+    if plans is None:
+        plans = Plan.objects.all()
+    plans = list(
+        plans.select_related('admin_group', 'contact_person_group', 'root_collection', 'site__root_page')
+        .prefetch_related('documentation_root_pages')
+    )
+    collection_perms = set()
+    page_perms = set()
+    admin_group_ids = set()
+    if contact_person_groups:
+        permission_ids = get_role_permission_ids(WAGTAIL_CONTACT_PERSON)
+        for plan in plans:
+            if plan.contact_person_group_id is None or plan.root_collection_id is None:
+                continue
+            collection_perms |= {
+                (plan.contact_person_group_id, plan.root_collection_id, permission_id)
+                for permission_id in permission_ids
+            }
+    if admin_groups:
+        permission_ids = get_role_permission_ids(WAGTAIL_PLAN_ADMIN)
+        page_permission_ids = get_role_permission_ids(PLAN_ADMIN_PAGES)
+        plans_with_group = [plan for plan in plans if plan.admin_group_id is not None]
+        root_page_ids = _get_plan_root_page_ids(plans_with_group)
+        for plan in plans_with_group:
+            admin_group_ids.add(plan.admin_group_id)
+            if plan.root_collection_id is not None:
+                collection_perms |= {
+                    (plan.admin_group_id, plan.root_collection_id, permission_id) for permission_id in permission_ids
+                }
+            page_perms |= {
+                (plan.admin_group_id, page_id, permission_id)
+                for page_id in root_page_ids[plan.id] for permission_id in page_permission_ids
+            }
+
+    with transaction.atomic():
+        _sync_collection_perms(collection_perms)
+        _sync_page_perms(admin_group_ids, page_perms)
+
+
+def _set_user_plan_groups(user, groups: Iterable[Group], groups_to_remove: QuerySet[Group]):
+    groups_to_remove = list(groups_to_remove)
+    if groups_to_remove:
+        user.groups.remove(*groups_to_remove)
+    groups = [group for group in groups if group is not None]
+    if groups:
+        user.groups.add(*groups)
+
+
+def _sync_contact_person_groups(user):
+    plans = user.get_adminable_plans()
+    groups_to_remove = user.groups.filter(contact_person_for_plan__isnull=False).exclude(
+        contact_person_for_plan__in=plans
+    )
+    plans = plans.select_related('contact_person_group')
+    _set_user_plan_groups(user, [plan.contact_person_group for plan in plans], groups_to_remove)
+    sync_plan_groups(plans, admin_groups=False)
+
+
+def add_contact_person_perms(user, model):
+    if model == Action:
+        group = get_or_create_action_contact_person_group()
+    else:
+        group = get_or_create_indicator_contact_person_group()
+    user.groups.add(group)
 
-def get_plan_admin_perms():
-    all_perms = list(get_action_contact_person_perms())
-    all_perms += get_indicator_contact_person_perms()
-    for model, perms in PLAN_ADMIN_PERMS:
-        all_perms += _get_perm_objs(model, perms)
+    # Make sure user is able to access the admin UI
+    if not user.is_staff:
+        user.is_staff = True
+        user.save(update_fields=['is_staff'])
+    _sync_contact_person_groups(user)
 
-    all_perms += get_wagtail_plan_admin_perms()
 
-    return all_perms
+def remove_contact_person_perms(user, model):
+    if model == Action:
+        group = get_or_create_action_contact_person_group()
+    else:
+        group = get_or_create_indicator_contact_person_group()
+    user.groups.remove(group)
+    _sync_contact_person_groups(user)
 
 
 def get_or_create_plan_admin_group():
-    perms = get_plan_admin_perms()
-    group = _get_or_create_group('Plan admins', perms)
-    return group
+    return _get_or_create_group('Plan admins', PLAN_ADMIN)
 
 
 def _sync_plan_admin_groups(user):
     plans = user.get_adminable_plans()
     groups_to_remove = user.groups.filter(admin_for_plan__isnull=False).exclude(admin_for_plan__in=plans)
-    for group in groups_to_remove:
-        user.groups.remove(group)
-    wagtail_perms = get_wagtail_plan_admin_perms()
-
-    for plan in plans:
-        group = plan.admin_group
-        if group is None:
-            continue
-
-        user.groups.add(group)
-        if plan.root_collection is not None:
-            _sync_group_collection_perms(plan.root_collection, group, wagtail_perms)
-        root_pages = set()
-        if plan.root_page is not None:
-            root_pages |= set(plan.root_page.get_translations(inclusive=True))
-        root_pages |= set(plan.documentation_root_pages.all())
-        _sync_group_page_perms(root_pages, group)
+    plans = plans.select_related('admin_group')
+    _set_user_plan_groups(user, [plan.admin_group for plan in plans], groups_to_remove)
+    sync_plan_groups(plans, contact_person_groups=False)
 
 
 def remove_plan_admin_perms(user):
@@ -6,7 +6,7 @@ import logging
 import sentry_sdk
 import typing
 import uuid
-from django.db.models import Q, Prefetch
+from django.db.models import Exists, OuterRef, Prefetch
 from django.forms import ModelForm
 from django.utils.translation import get_language
 from graphene_django import DjangoObjectType
@@ -14,13 +14,14 @@ from graphene_django.converter import convert_django_field_with_choices
 from graphql.error import GraphQLError
 from grapple.registry import registry as grapple_registry
 from grapple.types.pages import PageInterface
-from itertools import chain
 from typing import Generic, Iterable, Optional, Protocol, TypeVar
 from urllib.parse import urlparse
-from wagtail.rich_text import RichText
 
 
 from actions.action_admin import ActionAdmin
+from actions.action_filters import ActionFacets, ActionFilter, in_category
+from actions.attribute_registry import VisibilityRole
+from actions.drafts import load_draft_actions
 from actions.models import (
     Action, ActionContactPerson, ActionImpact,
     ActionImplementationPhase, ActionLink, ActionResponsibleParty,
@@ -39,7 +40,8 @@ from actions.models.action import ActionQuerySet
 from actions.models.attributes import ModelWithAttributes
 from orgs.models import Organization
 from users.models import User
-from aplans.graphql_helpers import AdminButtonsMixin, UpdateModelInstanceMutation
+from aplans.graphql_helpers import AdminButtonsMixin, UpdateModelInstanceMutation, get_fields
+from aplans.graphql_pagination import connection_from_queryset
 from aplans.graphql_types import (
     DjangoNode,
     GQLInfo,
@@ -51,6 +53,7 @@ from aplans.graphql_types import (
     register_graphene_node,
     set_active_plan
 )
+from aplans.rich_text import RichText
 from aplans.utils import hyphenate, public_fields
 from pages import schema as pages_schema
 from pages.models import AplansPage, CategoryPage, Page, ActionListPage
@@ -215,14 +218,40 @@ class PlanNode(DjangoNode):
     action_timeliness_classes = graphene.List(
         graphene.NonNull('actions.schema.ActionTimelinessNode'), required=True
     )
+    action_status_summary_counts = graphene.List(
+        graphene.NonNull('actions.schema.ActionStatusSummaryCountNode'), required=True,
+        description='Number of actions visible to the user per status summary',
+    )
+    action_timeliness_counts = graphene.List(
+        graphene.NonNull('actions.schema.ActionTimelinessCountNode'), required=True,
+        description='Number of actions visible to the user per timeliness class',
+    )
+
+    @staticmethod
+    def resolve_action_status_summaries(root: Plan, info: GQLInfo):
+        return list(info.context.watch_cache.for_plan(root).action_status_summaries.values())
+
+    @staticmethod
+    def resolve_action_timeliness_classes(root: Plan, info: GQLInfo):
+        return list(info.context.watch_cache.for_plan(root).action_timeliness_classes.values())
 
     @staticmethod
-    def resolve_action_status_summaries(root: Plan, info):
-        return list(a.get_data({'plan': root}) for a in ActionStatusSummaryIdentifier)
+    def resolve_action_status_summary_counts(root: Plan, info: GQLInfo):
+        plan_cache = info.context.watch_cache.for_plan(root)
+        qs = Action.objects.get_queryset().visible_for_user(info.context.user).filter(plan=root)
+        return [
+            dict(summary=plan_cache.get_action_status_summary(identifier), count=count)
+            for identifier, count in qs.status_summary_counts().items()
+        ]
 
     @staticmethod
-    def resolve_action_timeliness_classes(root: Plan, info):
-        return list(a.get_data({'plan': root}) for a in ActionTimelinessIdentifier)
+    def resolve_action_timeliness_counts(root: Plan, info: GQLInfo):
+        plan_cache = info.context.watch_cache.for_plan(root)
+        qs = Action.objects.get_queryset().visible_for_user(info.context.user).filter(plan=root)
+        return [
+            dict(timeliness=plan_cache.get_action_timeliness(identifier), count=count)
+            for identifier, count in qs.timeliness_counts(plan_cache.plan).items()
+        ]
 
     @staticmethod
     def resolve_last_action_identifier(root: Plan, info):
@@ -320,7 +349,8 @@ class PlanNode(DjangoNode):
 
     @staticmethod
     def resolve_action_attribute_types(root: Plan, info):
-        return root.action_attribute_types.order_by('pk')
+        registry = info.context.watch_cache.for_plan(root).attribute_types
+        return sorted(registry.get_types(Action, root), key=lambda at: at.pk)
 
     @staticmethod
     def resolve_primary_orgs(root: Plan, info):
@@ -349,11 +379,8 @@ class PlanNode(DjangoNode):
         return not root.features.has_action_official_name
 
     @staticmethod
-    @gql_optimizer.resolver_hints(
-        select_related=('parent',),
-    )
-    def resolve_all_related_plans(root: Plan, info):
-        return root.get_all_related_plans()
+    def resolve_all_related_plans(root: Plan, info: GQLInfo):
+        return info.context.watch_cache.for_plan(root).get_all_related_plans()
 
     @staticmethod
     @gql_optimizer.resolver_hints(
@@ -557,7 +584,8 @@ class CategoryTypeNode(ResolveShortDescriptionFromLeadParagraphShim, DjangoNode)
 
     @staticmethod
     def resolve_attribute_types(root: CategoryType, info):
-        return root.attribute_types.order_by('pk')
+        registry = info.context.watch_cache.for_plan_id(root.plan_id).attribute_types
+        return sorted(registry.get_types(Category, root), key=lambda at: at.pk)
 
     @staticmethod
     @gql_optimizer.resolver_hints(
@@ -573,20 +601,24 @@ class CategoryTypeNode(ResolveShortDescriptionFromLeadParagraphShim, DjangoNode)
     def resolve_categories(root: CategoryType, info, only_root: bool, only_with_actions: bool):
         qs = root.categories.all()
         if only_with_actions:
-            with_actions = set()
-            categories = {cat.pk: cat for cat in qs.prefetch_related('actions')}
-            for cat in categories.values():
-                if cat.actions.count() == 0:
+            visible_actions = (
+                Action.objects.get_queryset().visible_for_user(info.context.user).filter(categories=OuterRef('pk'))
+            )
+            categories = list(qs.annotate(has_actions=Exists(visible_actions)))
+            by_id = {cat.pk: cat for cat in categories}
+            # A category is included if it or any of its descendants has visible actions
+            with_actions: set[int] = set()
+            for cat in categories:
+                if not cat.has_actions:
                     continue
-                with_actions.add(cat)
-                parent_pk = cat.parent_id
-                while parent_pk is not None:
-                    parent = categories[parent_pk]
-                    with_actions.add(parent)
-                    parent_pk = parent.parent_id
-            if only_root:
-                return [c for c in with_actions if c.parent_id is None]
-            return list(with_actions)
+                cat_id = cat.pk
+                while cat_id is not None and cat_id not in with_actions and cat_id in by_id:
+                    with_actions.add(cat_id)
+                    cat_id = by_id[cat_id].parent_id
+            return [
+                cat for cat in categories
+                if cat.pk in with_actions and (not only_root or cat.parent_id is None)
+            ]
         if only_root:
             qs = qs.filter(parent__isnull=True)
         return qs
@@ -610,19 +642,33 @@ class AttributesMixin:
     @staticmethod
     @gql_optimizer.resolver_hints(
         prefetch_related=[
-            *chain(*[('%s' % rel, '%s__type' % rel) for rel in ModelWithAttributes.ATTRIBUTE_RELATIONS]),
+            *ModelWithAttributes.ATTRIBUTE_RELATIONS,
             *['choice_attributes__choice', 'choice_with_text_attributes__choice']
         ]
     )
     def resolve_attributes(root: Category | Action, info: GQLInfo, id: str | None = None):
         request = info.context
         plan = get_plan_from_context(info)
+        # The attribute types come from the registry, so they are not fetched for each object
+        registry = request.watch_cache.for_plan(plan).attribute_types
+        role = VisibilityRole.for_user(request.user, plan)
+        action = root if isinstance(root, Action) else None
 
         def filter_attrs(attributes: Iterable[Attribute]) -> list[Attribute]:
             result = []
             for attribute in attributes:
-                id_mismatch = id is not None and attribute.type.identifier != id
-                if not id_mismatch and attribute.is_visible_for_user(request.user, plan):
+                attribute_type = registry.get_type(attribute.type_id)
+                if attribute_type is None:
+                    # Attribute type from another plan, e.g., of an action in a related plan
+                    if id is not None and attribute.type.identifier != id:
+                        continue
+                    if attribute.is_visible_for_user(request.user, plan):
+                        result.append(attribute)
+                    continue
+                attribute.type = attribute_type
+                if id is not None and attribute_type.identifier != id:
+                    continue
+                if registry.is_visible(attribute_type, role, request.user, action):
                     result.append(attribute)
             return result
 
@@ -823,7 +869,7 @@ class ActionTaskNode(DjangoNode):
         if comment is None:
             return None
 
-        return RichText(comment)
+        return RichText(comment, references=info.context.watch_cache.rich_text)
 
 
 ActionStatusSummaryIdentifierNode = graphene.Enum.from_enum(ActionStatusSummaryIdentifier)
@@ -860,6 +906,24 @@ class ActionTimelinessNode(graphene.ObjectType):
         name = 'ActionTimeliness'
 
 
+@register_graphene_node
+class ActionStatusSummaryCountNode(graphene.ObjectType):
+    summary = graphene.Field(ActionStatusSummaryNode, required=True)
+    count = graphene.Int(required=True)
+
+    class Meta:
+        name = 'ActionStatusSummaryCount'
+
+
+@register_graphene_node
+class ActionTimelinessCountNode(graphene.ObjectType):
+    timeliness = graphene.Field(ActionTimelinessNode, required=True)
+    count = graphene.Int(required=True)
+
+    class Meta:
+        name = 'ActionTimelinessCount'
+
+
 def _get_visible_action(root, field_name, user: Optional[User]):
     action_id = getattr(root, f'{field_name}_id')
     if action_id is None:
@@ -947,7 +1011,7 @@ class ActionNode(AdminButtonsMixin, AttributesMixin, DjangoNode):
         description = root.description_i18n
         if description is None:
             return None
-        return RichText(description)
+        return RichText(description, references=info.context.watch_cache.rich_text)
 
     @staticmethod
     @gql_optimizer.resolver_hints(
@@ -1022,8 +1086,8 @@ class ActionNode(AdminButtonsMixin, AttributesMixin, DjangoNode):
         return root.get_status_summary(cache=info.context.watch_cache)
 
     @staticmethod
-    def resolve_timeliness(root: Action, info):
-        return root.get_timeliness()
+    def resolve_timeliness(root: Action, info: GQLInfo):
+        return root.get_timeliness(cache=info.context.watch_cache)
 
 
 class ActionScheduleNode(DjangoNode):
@@ -1094,19 +1158,109 @@ class ActionLinkNode(DjangoNode):
         return root.title_i18n
 
 
-def plans_actions_queryset(plans, category, first, order_by, user):
+class ActionAttributeFilterInput(graphene.InputObjectType):
+    attribute_type = graphene.ID(required=True)
+    choice = graphene.ID(description='Choice option of a choice attribute')
+    category = graphene.ID(description='Category of a category choice attribute')
+
+
+class ActionFilterInput(graphene.InputObjectType):
+    """Filters of the action list. All the given filters must match."""
+
+    responsible_party = graphene.ID(description='Organization; its sub-organizations also match')
+    primary_org = graphene.ID()
+    implementation_phase = graphene.ID()
+    status = graphene.ID()
+    schedule = graphene.ID()
+    categories = graphene.List(graphene.NonNull(graphene.ID), description='Categories; subcategories also match')
+    attributes = graphene.List(graphene.NonNull(ActionAttributeFilterInput))
+
+
+def get_action_filter(data: dict | None) -> ActionFilter:
+    try:
+        return ActionFilter.from_input(data)
+    except ValueError:
+        raise GraphQLError('Invalid ID in action filter')
+
+
+class ActionFacetValue(graphene.ObjectType):
+    value = graphene.ID(required=True)
+    count = graphene.Int(required=True)
+
+
+def _facet_values(counts: dict[int, int]) -> list[ActionFacetValue]:
+    return [ActionFacetValue(value=value, count=count) for value, count in sorted(counts.items())]
+
+
+class ActionFacetsNode(graphene.ObjectType):
+    """Number of actions matching each filter value when combined with the other filters."""
+
+    total_count = graphene.Int(required=True)
+    responsible_party = graphene.List(graphene.NonNull(ActionFacetValue), required=True)
+    primary_org = graphene.List(graphene.NonNull(ActionFacetValue), required=True)
+    implementation_phase = graphene.List(graphene.NonNull(ActionFacetValue), required=True)
+    status = graphene.List(graphene.NonNull(ActionFacetValue), required=True)
+    schedule = graphene.List(graphene.NonNull(ActionFacetValue), required=True)
+    category = graphene.List(
+        graphene.NonNull(ActionFacetValue), category_type=graphene.ID(required=True), required=True,
+    )
+    attribute = graphene.List(
+        graphene.NonNull(ActionFacetValue), attribute_type=graphene.ID(required=True), required=True,
+    )
+
+    class Meta:
+        name = 'ActionFacets'
+
+    @staticmethod
+    def resolve_total_count(root: ActionFacets, info):
+        return root.total_count()
+
+    @staticmethod
+    def resolve_responsible_party(root: ActionFacets, info):
+        return _facet_values(root.responsible_party())
+
+    @staticmethod
+    def resolve_primary_org(root: ActionFacets, info):
+        return _facet_values(root.primary_org())
+
+    @staticmethod
+    def resolve_implementation_phase(root: ActionFacets, info):
+        return _facet_values(root.implementation_phase())
+
+    @staticmethod
+    def resolve_status(root: ActionFacets, info):
+        return _facet_values(root.status())
+
+    @staticmethod
+    def resolve_schedule(root: ActionFacets, info):
+        return _facet_values(root.schedule())
+
+    @staticmethod
+    def resolve_category(root: ActionFacets, info, category_type):
+        return _facet_values(root.category(int(category_type)))
+
+    @staticmethod
+    def resolve_attribute(root: ActionFacets, info, attribute_type):
+        return _facet_values(root.attribute(int(attribute_type)))
+
+
+class ActionConnection(graphene.relay.Connection):
+    total_count = graphene.Int(required=True)
+
+    class Meta:
+        node = ActionNode
+
+    @staticmethod
+    def resolve_total_count(root, info):
+        return root.queryset.count()
+
+
+def plans_actions_queryset(plans, category, first, order_by, user, action_filter: ActionFilter | None = None):
     qs = Action.objects.get_queryset().visible_for_user(user).filter(plan__in=plans)
     if category is not None:
-        # FIXME: This is sucky, maybe convert Category to a proper tree model?
-        f = (
-            Q(id=category) |
-            Q(parent=category) |
-            Q(parent__parent=category) |
-            Q(parent__parent__parent=category) |
-            Q(parent__parent__parent__parent=category)
-        )
-        descendant_cats = Category.objects.filter(f)
-        qs = qs.filter(categories__in=descendant_cats).distinct()
+        qs = qs.filter(in_category(category))
+    if action_filter is not None:
+        qs = action_filter.apply(qs)
     qs = order_queryset(qs, ActionNode, order_by)
     if first is not None:
         qs = qs[0:first]
@@ -1136,25 +1290,21 @@ def _resolve_published_action(
         return None
 
 
-def _resolve_draft_action(action, workflow_state):
-    if not action.has_unpublished_changes:
-        return action
-    if workflow_state == WorkflowStateEnum.DRAFT:
-        return action.get_latest_revision_as_object()
-    if workflow_state == WorkflowStateEnum.APPROVED:
-        # Draft has been approved if the next workflow task
-        # (publishing) is in progress
-        task = action.plan.get_next_workflow_task(WorkflowStateEnum.APPROVED)
-        if not task:
-            return action
-        current_state = action.current_workflow_state
-        if current_state is None:
-            return action
-        if current_state.current_task_state.task == task:
-            return current_state.current_task_state.revision.as_object()
-        return action
+def _get_workflow_state_for_plan(info: GQLInfo, plan: Plan) -> WorkflowStateEnum:
+    """Return the workflow state requested with the @workflow directive, limited by the user's permissions."""
+    workflow_state = info.context.watch_cache.query_workflow_state
+    user = info.context.user
+    if not user.is_authenticated:
+        return WorkflowStateEnum.PUBLISHED
+    if workflow_state == WorkflowStateEnum.DRAFT and not user.can_access_admin(plan=plan):
+        workflow_state = WorkflowStateEnum.APPROVED
+    if workflow_state == WorkflowStateEnum.APPROVED and not user.can_access_public_site(plan=plan):
+        workflow_state = WorkflowStateEnum.PUBLISHED
+    return workflow_state
+
 
-    return action
+def _resolve_draft_action(action, workflow_state):
+    return load_draft_actions([action], workflow_state)[0]
 
 
 class Query:
@@ -1167,6 +1317,15 @@ class Query:
     plan_actions = graphene.List(
         graphene.NonNull(ActionNode), plan=graphene.ID(required=True), first=graphene.Int(),
         category=graphene.ID(), order_by=graphene.String(),
+        action_filter=graphene.Argument(ActionFilterInput, name='filter'),
+    )
+    plan_actions_connection = graphene.Field(
+        ActionConnection, plan=graphene.ID(required=True), first=graphene.Int(), after=graphene.String(),
+        order_by=graphene.String(), action_filter=graphene.Argument(ActionFilterInput, name='filter'),
+    )
+    plan_action_facets = graphene.Field(
+        ActionFacetsNode, plan=graphene.ID(required=True),
+        action_filter=graphene.Argument(ActionFilterInput, name='filter'),
     )
     related_plan_actions = graphene.List(
         graphene.NonNull(ActionNode), plan=graphene.ID(required=True), first=graphene.Int(),
@@ -1243,12 +1402,47 @@ class Query:
         return gql_optimizer.query(plans, info)
 
     @staticmethod
-    def resolve_plan_actions(root, info, plan, first=None, category=None, order_by=None, **kwargs):
+    def resolve_plan_actions(
+        root, info, plan, first=None, category=None, order_by=None, action_filter=None, **kwargs
+    ):
         plan_obj = get_plan_from_context(info, plan)
         if plan_obj is None:
             return None
-        qs = plans_actions_queryset([plan_obj], category, first, order_by, info.context.user)
-        return gql_optimizer.query(qs, info)
+        qs = plans_actions_queryset(
+            [plan_obj], category, first, order_by, info.context.user, get_action_filter(action_filter),
+        )
+        qs = gql_optimizer.query(qs, info)
+        workflow_state = _get_workflow_state_for_plan(info, plan_obj)
+        actions = load_draft_actions(qs, workflow_state)
+        if 'description' in get_fields(info):
+            # Expand the links in all descriptions at once
+            info.context.watch_cache.rich_text.prefetch(action.description_i18n for action in actions)
+        return actions
+
+    @staticmethod
+    def resolve_plan_actions_connection(
+        root, info, plan, first=None, after=None, order_by=None, action_filter=None, **kwargs
+    ):
+        plan_obj = get_plan_from_context(info, plan)
+        if plan_obj is None:
+            return None
+        qs = plans_actions_queryset(
+            [plan_obj], None, None, order_by, info.context.user, get_action_filter(action_filter),
+        )
+        qs = gql_optimizer.query(qs, info)
+        workflow_state = _get_workflow_state_for_plan(info, plan_obj)
+        return connection_from_queryset(
+            ActionConnection, qs, first=first, after=after,
+            transform=lambda actions: load_draft_actions(actions, workflow_state),
+        )
+
+    @staticmethod
+    def resolve_plan_action_facets(root, info, plan, action_filter=None, **kwargs):
+        plan_obj = get_plan_from_context(info, plan)
+        if plan_obj is None:
+            return None
+        qs = Action.objects.get_queryset().visible_for_user(info.context.user).filter(plan=plan_obj)
+        return ActionFacets(qs, get_action_filter(action_filter))
 
     @staticmethod
     def resolve_related_plan_actions(root, info, plan, first=None, category=None, order_by=None, **kwargs):
@@ -1256,7 +1450,7 @@ class Query:
         if plan_obj is None:
             return None
 
-        plans = plan_obj.get_all_related_plans()
+        plans = info.context.watch_cache.for_plan(plan_obj).get_all_related_plans()
         qs = plans_actions_queryset(plans, category, first, order_by, info.context.user)
         return gql_optimizer.query(qs, info)
 
@@ -1286,12 +1480,6 @@ class Query:
         if identifier and not plan:
             raise GraphQLError("You must supply the 'plan' argument when using 'identifier'")
 
-        workflow_state = info.context.watch_cache.query_workflow_state
-
-        user = info.context.user
-        if not user.is_authenticated:
-            workflow_state = WorkflowStateEnum.PUBLISHED
-
         action = _resolve_published_action(id, identifier, plan, info)
 
         if action and not identifier:
@@ -1301,14 +1489,7 @@ class Query:
         if plan_obj is None:
             return action
 
-        if workflow_state == WorkflowStateEnum.DRAFT:
-            if not user.can_access_admin(plan=plan_obj):
-                workflow_state = WorkflowStateEnum.APPROVED
-
-        if workflow_state == WorkflowStateEnum.APPROVED:
-            if not user.can_access_public_site(plan=plan_obj):
-                workflow_state == WorkflowStateEnum.PUBLISHED
-
+        workflow_state = _get_workflow_state_for_plan(info, plan_obj)
         if workflow_state != WorkflowStateEnum.PUBLISHED:
             action = _resolve_draft_action(action, workflow_state)
 
@@ -1,11 +1,17 @@
 import logging
 from anymail.signals import pre_send, post_send
-from django.db.models.signals import post_save
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_delete, post_migrate, post_save
 from django.dispatch import receiver
+from wagtail.models import Revision
 from wagtail.signals import task_submitted, task_cancelled
 
+from .attribute_registry import invalidate_attribute_type_registry
+from .drafts import RevisionObjectCache
 from .mail import ActionModeratorApprovalTaskStateSubmissionEmailNotifier, ActionModeratorCancelTaskStateSubmissionEmailNotifier
-from .models import Plan, PlanFeatures
+from .models import Action, AttributeType, AttributeTypeChoiceOption, CategoryType, Plan, PlanFeatures
+from .perms import refresh_role_permissions
+from indicators.models import Unit
 from notifications.models import NotificationSettings
 
 logger = logging.getLogger(__name__)
@@ -23,6 +29,23 @@ def create_plan_features(sender, instance, created, **kwargs):
         PlanFeatures.objects.create(plan=instance)
 
 
+@receiver(post_save, sender=AttributeType)
+@receiver(post_delete, sender=AttributeType)
+@receiver(post_save, sender=AttributeTypeChoiceOption)
+@receiver(post_delete, sender=AttributeTypeChoiceOption)
+@receiver(post_save, sender=CategoryType)
+@receiver(post_delete, sender=CategoryType)
+@receiver(post_save, sender=Unit)
+def invalidate_attribute_types(sender, instance, **kwargs):
+    invalidate_attribute_type_registry(instance)
+
+
+@receiver(post_save, sender=Revision)
+def invalidate_revision_objects(sender, instance: Revision, created, **kwargs):
+    if created and instance.content_type_id == ContentType.objects.get_for_model(Action).id:
+        RevisionObjectCache.invalidate_for_revision(instance)
+
+
 @receiver(pre_send)
 def log_email_before_sending(sender, message, esp_name, **kwargs):
     logger.info(f"Sending email with subject '{message.subject}' via {esp_name} to recipients {message.to}")
@@ -42,6 +65,7 @@ action_moderator_cancel_task_submission_email_notifier = ActionModeratorCancelTa
 
 
 def register_signal_handlers():
+    post_migrate.connect(refresh_role_permissions, dispatch_uid='refresh_role_permissions')
     task_submitted.connect(
         action_moderator_approval_task_submission_email_notifier,
         dispatch_uid='action_moderator_approval_task_submitted_email_notification',
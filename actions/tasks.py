@@ -1,13 +1,25 @@
 from celery import shared_task
 from django.core import management
 
+from .common_categories import run_propagation
+
 
 @shared_task
 def update_action_status():
     management.call_command('update_action_status')
 
 
+@shared_task
+def update_monitoring_quality():
+    management.call_command('update_monitoring_quality')
+
+
 @shared_task
 def update_index():
     # Actually this is not specific to the `actions` app, so maybe should be in a different file
     management.call_command('update_index')
+
+
+@shared_task
+def propagate_common_category(common_category_id, operation, previous_values=None):
+    run_propagation(common_category_id, operation, previous_values)
@@ -0,0 +1,303 @@
+import random
+from collections import Counter
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from actions.action_filters import ActionFacets, ActionFilter, AttributeFilter
+from actions.models import Action, AttributeChoice, AttributeType
+
+pytestmark = pytest.mark.django_db
+
+ACTION_COUNT = 120
+FILTER_SAMPLES = 40
+
+PLAN_ACTIONS_CONNECTION = '''
+    query($plan: ID!, $first: Int, $after: String, $filter: ActionFilterInput) {
+      planActionsConnection(plan: $plan, first: $first, after: $after, filter: $filter) {
+        totalCount
+        edges {
+          cursor
+          node {
+            id
+          }
+        }
+        pageInfo {
+          hasNextPage
+          endCursor
+        }
+      }
+    }
+'''
+
+PLAN_ACTION_FACETS = '''
+    query($plan: ID!, $filter: ActionFilterInput, $categoryType: ID!) {
+      planActionFacets(plan: $plan, filter: $filter) {
+        totalCount
+        status {
+          value
+          count
+        }
+        category(categoryType: $categoryType) {
+          value
+          count
+        }
+      }
+    }
+'''
+
+
+@pytest.fixture
+def generated_plan(
+    plan, organization_factory, action_factory, action_status_factory, action_implementation_phase_factory,
+    action_schedule_factory, category_type_factory, category_factory, attribute_type_factory,
+    attribute_type_choice_option_factory, attribute_choice_factory, action_responsible_party_factory,
+):
+    """Generate a plan with enough actions and filter values that most filter combinations match something."""
+    rng = random.Random(1234)
+    org = plan.organization
+    departments = [organization_factory(parent=org) for _ in range(3)]
+    units = [organization_factory(parent=rng.choice(departments)) for _ in range(6)]
+    orgs = [org] + departments + units
+    statuses = [action_status_factory(plan=plan) for _ in range(4)]
+    phases = [action_implementation_phase_factory(plan=plan) for _ in range(4)]
+    schedules = [action_schedule_factory(plan=plan) for _ in range(3)]
+    category_type = category_type_factory(plan=plan)
+    top_categories = [category_factory(type=category_type) for _ in range(3)]
+    sub_categories = [category_factory(type=category_type, parent=rng.choice(top_categories)) for _ in range(6)]
+    categories = top_categories + sub_categories
+    attribute_type = attribute_type_factory(
+        object_content_type=ContentType.objects.get_for_model(Action), scope=plan,
+        format=AttributeType.AttributeFormat.ORDERED_CHOICE,
+    )
+    choices = [attribute_type_choice_option_factory(type=attribute_type) for _ in range(3)]
+
+    for _ in range(ACTION_COUNT):
+        action = action_factory(
+            plan=plan, image=None,
+            status=rng.choice(statuses + [None]),
+            implementation_phase=rng.choice(phases + [None]),
+            primary_org=rng.choice(orgs + [None]),
+            schedule=rng.sample(schedules, rng.randint(0, 2)),
+            categories=rng.sample(categories, rng.randint(0, 2)),
+        )
+        for rp_org in rng.sample(orgs, rng.randint(0, 2)):
+            action_responsible_party_factory(action=action, organization=rp_org)
+        if rng.random() < 0.7:
+            attribute_choice_factory(type=attribute_type, content_object=action, choice=rng.choice(choices))
+
+    return dict(
+        plan=plan, orgs=orgs, statuses=statuses, phases=phases, schedules=schedules, category_type=category_type,
+        categories=categories, attribute_type=attribute_type, choices=choices, rng=rng,
+    )
+
+
+class ReferenceAction:
+    """The filterable values of an action, loaded without any filtering in the database."""
+
+    def __init__(self, action: Action, choices: dict[int, int]):
+        self.id = action.id
+        self.status = action.status_id
+        self.implementation_phase = action.implementation_phase_id
+        self.primary_org = action.primary_org_id
+        self.schedules = {s.id for s in action.schedule.all()}
+        # Organizations and categories match their descendants, so collect all ancestors
+        self.orgs = set()
+        for rp in action.responsible_parties.all():
+            self.orgs |= {o.id for o in rp.organization.get_ancestors()} | {rp.organization_id}
+        self.categories = set()
+        for cat in action.categories.all():
+            while cat is not None:
+                self.categories.add(cat.id)
+                cat = cat.parent
+        self.choices = choices
+
+    def matches(self, f: ActionFilter, exclude=None, exclude_category_type=None, category_types=None) -> bool:
+        if f.responsible_party is not None and exclude != 'responsible_party' and f.responsible_party not in self.orgs:
+            return False
+        if f.primary_org is not None and exclude != 'primary_org' and f.primary_org != self.primary_org:
+            return False
+        if f.implementation_phase is not None and exclude != 'implementation_phase' \
+                and f.implementation_phase != self.implementation_phase:
+            return False
+        if f.status is not None and exclude != 'status' and f.status != self.status:
+            return False
+        if f.schedule is not None and exclude != 'schedule' and f.schedule not in self.schedules:
+            return False
+        for cat in f.categories:
+            if exclude_category_type is not None and category_types[cat] == exclude_category_type:
+                continue
+            if cat not in self.categories:
+                return False
+        for attr in f.attributes:
+            if self.choices.get(attr.attribute_type) != attr.choice:
+                return False
+        return True
+
+
+@pytest.fixture
+def reference_actions(generated_plan):
+    action_type = ContentType.objects.get_for_model(Action)
+    actions = []
+    for action in Action.objects.filter(plan=generated_plan['plan']):
+        choices = {
+            attr.type_id: attr.choice_id
+            for attr in AttributeChoice.objects.filter(content_type=action_type, object_id=action.id)
+        }
+        actions.append(ReferenceAction(action, choices))
+    return actions
+
+
+def random_filter(generated_plan) -> ActionFilter:
+    rng = generated_plan['rng']
+
+    def maybe(values):
+        return rng.choice(values).id if rng.random() < 0.4 else None
+
+    f = ActionFilter(
+        responsible_party=maybe(generated_plan['orgs']),
+        primary_org=maybe(generated_plan['orgs']),
+        implementation_phase=maybe(generated_plan['phases']),
+        status=maybe(generated_plan['statuses']),
+        schedule=maybe(generated_plan['schedules']),
+    )
+    if rng.random() < 0.4:
+        f.categories = [rng.choice(generated_plan['categories']).id]
+    if rng.random() < 0.3:
+        f.attributes = [AttributeFilter(
+            attribute_type=generated_plan['attribute_type'].id, choice=rng.choice(generated_plan['choices']).id,
+        )]
+    return f
+
+
+def test_filters_match_reference(generated_plan, reference_actions):
+    qs = Action.objects.filter(plan=generated_plan['plan'])
+    for _ in range(FILTER_SAMPLES):
+        f = random_filter(generated_plan)
+        expected = sorted(a.id for a in reference_actions if a.matches(f))
+        assert sorted(f.apply(qs).values_list('id', flat=True)) == expected, f
+
+
+def test_facets_match_reference(generated_plan, reference_actions):
+    qs = Action.objects.filter(plan=generated_plan['plan'])
+    category_type = generated_plan['category_type'].id
+    category_types = {cat.id: cat.type_id for cat in generated_plan['categories']}
+    for _ in range(FILTER_SAMPLES // 4):
+        f = random_filter(generated_plan)
+        facets = ActionFacets(qs, f)
+        assert facets.total_count() == sum(1 for a in reference_actions if a.matches(f))
+
+        for name in ('status', 'implementation_phase', 'primary_org'):
+            expected = Counter(
+                getattr(a, name) for a in reference_actions if a.matches(f, exclude=name) and getattr(a, name)
+            )
+            assert getattr(facets, name)() == dict(expected), (name, f)
+
+        expected = Counter(
+            s for a in reference_actions if a.matches(f, exclude='schedule') for s in a.schedules
+        )
+        assert facets.schedule() == dict(expected)
+
+        expected = Counter(
+            o for a in reference_actions if a.matches(f, exclude='responsible_party') for o in a.orgs
+        )
+        assert facets.responsible_party() == dict(expected)
+
+        expected = Counter(
+            c for a in reference_actions
+            if a.matches(f, exclude_category_type=category_type, category_types=category_types)
+            for c in a.categories
+        )
+        assert facets.category(category_type) == dict(expected)
+
+
+def test_connection_pages_through_filtered_actions(generated_plan, reference_actions, graphql_client_query_data):
+    plan = generated_plan['plan']
+    status = generated_plan['statuses'][0]
+    expected = [a.id for a in reference_actions if a.status == status.id]
+    variables = dict(plan=plan.identifier, first=7, filter=dict(status=str(status.id)))
+
+    ids = []
+    after = None
+    while True:
+        data = graphql_client_query_data(PLAN_ACTIONS_CONNECTION, variables=dict(variables, after=after))
+        connection = data['planActionsConnection']
+        assert connection['totalCount'] == len(expected)
+        ids += [int(edge['node']['id']) for edge in connection['edges']]
+        if not connection['pageInfo']['hasNextPage']:
+            break
+        after = connection['pageInfo']['endCursor']
+    # Actions are in the default order of the plan
+    assert ids == list(Action.objects.filter(id__in=expected).order_by('order', 'id').values_list('id', flat=True))
+
+
+def test_plan_actions_filter_argument(generated_plan, reference_actions, graphql_client_query_data):
+    plan = generated_plan['plan']
+    org = generated_plan['orgs'][1]
+    data = graphql_client_query_data(
+        '''
+        query($plan: ID!, $filter: ActionFilterInput) {
+          planActions(plan: $plan, filter: $filter) {
+            id
+          }
+        }
+        ''',
+        variables=dict(plan=plan.identifier, filter=dict(responsibleParty=str(org.id))),
+    )
+    expected = {a.id for a in reference_actions if org.id in a.orgs}
+    assert {int(a['id']) for a in data['planActions']} == expected
+
+
+def test_facets_query(generated_plan, reference_actions, graphql_client_query_data):
+    plan = generated_plan['plan']
+    category_type = generated_plan['category_type']
+    data = graphql_client_query_data(
+        PLAN_ACTION_FACETS, variables=dict(plan=plan.identifier, categoryType=str(category_type.id)),
+    )
+    facets = data['planActionFacets']
+    assert facets['totalCount'] == len(reference_actions)
+    expected = Counter(a.status for a in reference_actions if a.status)
+    assert {int(v['value']): v['count'] for v in facets['status']} == dict(expected)
+    expected = Counter(c for a in reference_actions for c in a.categories)
+    assert {int(v['value']): v['count'] for v in facets['category']} == dict(expected)
+
+
+def test_invalid_cursor(plan, graphql_client_query, contains_error):
+    response = graphql_client_query(PLAN_ACTIONS_CONNECTION, variables=dict(plan=plan.identifier, after='invalid'))
+    assert contains_error(response, message='Invalid cursor')
+
+
+def test_connection_query_count_does_not_depend_on_page_size(
+    generated_plan, reference_actions, graphql_client_query_data
+):
+    query = '''
+        query($plan: ID!, $first: Int) {
+          planActionsConnection(plan: $plan, first: $first) {
+            edges {
+              cursor
+              node {
+                id
+                name
+                primaryOrg {
+                  id
+                }
+                responsibleParties {
+                  organization {
+                    id
+                  }
+                }
+              }
+            }
+          }
+        }
+    '''
+    variables = dict(plan=generated_plan['plan'].identifier)
+    query_counts = []
+    for first in (5, 50):
+        with CaptureQueriesContext(connection) as ctx:
+            data = graphql_client_query_data(query, variables=dict(variables, first=first))
+        assert len(data['planActionsConnection']['edges']) == first
+        query_counts.append(len(ctx.captured_queries))
+    assert query_counts[0] == query_counts[1]
@@ -0,0 +1,117 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from actions.attribute_registry import AttributeTypeRegistry, VisibilityRole
+from actions.models import Action, AttributeType
+
+pytestmark = pytest.mark.django_db
+
+ATTRIBUTES_QUERY = '''
+    query($plan: ID!, $first: Int) {
+      planActions(plan: $plan, first: $first) {
+        id
+        attributes {
+          __typename
+          id
+          type {
+            id
+            identifier
+            choiceOptions {
+              id
+            }
+          }
+          ... on AttributeChoice {
+            choice {
+              id
+            }
+          }
+        }
+      }
+    }
+'''
+
+
+def test_attribute_resolution_query_count_is_constant(plan, actions_having_attributes, graphql_client_query_data):
+    def count_queries(first):
+        with CaptureQueriesContext(connection) as ctx:
+            data = graphql_client_query_data(ATTRIBUTES_QUERY, variables={'plan': plan.identifier, 'first': first})
+        return len(ctx.captured_queries), data['planActions']
+
+    # Fill the registry cache so that both requests see the same state
+    AttributeTypeRegistry.for_plan(plan)
+    few_count, few_actions = count_queries(2)
+    all_count, all_actions = count_queries(len(actions_having_attributes))
+    assert len(few_actions) == 2
+    assert len(all_actions) == len(actions_having_attributes)
+    assert all(action['attributes'] for action in all_actions)
+    assert all_count == few_count
+
+
+def test_registry_is_cached_and_invalidated(
+    plan, action_attribute_type__ordered_choice, attribute_type_choice_option_factory, django_assert_num_queries,
+):
+    cache.clear()
+    registry = AttributeTypeRegistry.for_plan(plan)
+    assert registry.get_types(Action, plan) == [action_attribute_type__ordered_choice]
+    with django_assert_num_queries(0):
+        registry = AttributeTypeRegistry.for_plan(plan)
+        at = registry.get_type(action_attribute_type__ordered_choice.id)
+        assert list(at.choice_options.all()) == []
+
+    option = attribute_type_choice_option_factory(type=action_attribute_type__ordered_choice)
+    at = AttributeTypeRegistry.for_plan(plan).get_type(action_attribute_type__ordered_choice.id)
+    assert list(at.choice_options.all()) == [option]
+
+    action_attribute_type__ordered_choice.name = 'Renamed'
+    action_attribute_type__ordered_choice.save()
+    at = AttributeTypeRegistry.for_plan(plan).get_type(action_attribute_type__ordered_choice.id)
+    assert at.name == 'Renamed'
+
+    action_attribute_type__ordered_choice.delete()
+    assert AttributeTypeRegistry.for_plan(plan).get_types(Action, plan) == []
+
+
+
+def test_registry_is_invalidated_on_related_changes(
+    plan, action_attribute_type_factory, category_type_factory, unit_factory,
+):
+    unit = unit_factory()
+    category_type = category_type_factory(plan=plan)
+    numeric = action_attribute_type_factory(scope=plan, format=AttributeType.AttributeFormat.NUMERIC, unit=unit)
+    category_choice = action_attribute_type_factory(
+        scope=plan, format=AttributeType.AttributeFormat.CATEGORY_CHOICE, attribute_category_type=category_type,
+    )
+    cache.clear()
+    AttributeTypeRegistry.for_plan(plan)
+
+    unit.name = 'Renamed unit'
+    unit.save()
+    assert AttributeTypeRegistry.for_plan(plan).get_type(numeric.id).unit.name == 'Renamed unit'
+
+    category_type.name = 'Renamed category type'
+    category_type.save()
+    registry = AttributeTypeRegistry.for_plan(plan)
+    assert registry.get_type(category_choice.id).attribute_category_type.name == 'Renamed category type'
+
+
+@pytest.mark.parametrize('visible_for,anonymous,authenticated,plan_admin', [
+    (AttributeType.VisibleFor.PUBLIC, True, True, True),
+    (AttributeType.VisibleFor.AUTHENTICATED, False, True, True),
+    (AttributeType.VisibleFor.CONTACT_PERSONS, False, False, True),
+    (AttributeType.VisibleFor.PLAN_ADMINS, False, False, True),
+])
+def test_registry_visibility_matches_attribute_type(
+    plan, action, action_attribute_type__text, user_factory, plan_admin_user, visible_for, anonymous, authenticated,
+    plan_admin,
+):
+    user = user_factory()
+    action_attribute_type__text.instances_visible_for = visible_for
+    action_attribute_type__text.save()
+    registry = AttributeTypeRegistry.for_plan(plan)
+    at = registry.get_type(action_attribute_type__text.id)
+    for u, expected in ((AnonymousUser(), anonymous), (user, authenticated), (plan_admin_user, plan_admin)):
+        assert registry.is_visible(at, VisibilityRole.for_user(u, plan), u, action) is expected
+        assert at.is_instance_visible_for(u, plan, action) is expected
@@ -0,0 +1,95 @@
+import pytest
+
+from actions.common_categories import PropagationStatus, get_previous_values, run_propagation
+from actions.models import Category, CommonCategory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def common_category_type(plan_factory, category_type_factory, common_category_type_factory):
+    cct = common_category_type_factory()
+    for _ in range(3):
+        plan = plan_factory()
+        category_type_factory(plan=plan, common=cct)
+        plan.common_category_types.add(cct)
+    return cct
+
+
+def test_create_is_idempotent(common_category_type, common_category_factory):
+    cc = common_category_factory(type=common_category_type)
+    status = run_propagation(cc.id, 'create')
+    assert status.state == PropagationStatus.DONE
+    assert status.created == 3
+    categories = Category.objects.filter(common=cc)
+    assert sorted(c.type.plan_id for c in categories) == sorted(p.id for p in common_category_type.plans.all())
+    assert all(c.identifier == cc.identifier and c.name == cc.name and c.image_id == cc.image_id for c in categories)
+
+    status = run_propagation(cc.id, 'create')
+    assert status.state == PropagationStatus.DONE
+    assert status.created == 0
+    assert categories.count() == 3
+    assert PropagationStatus.get(cc.id) == status
+
+
+def test_created_categories_are_placed_last(common_category_type, common_category_factory, category_factory):
+    category_types = list(common_category_type.category_type_instances.order_by('id'))
+    existing = category_factory(type=category_types[0])
+    Category.objects.filter(pk=existing.pk).update(order=5)
+    cc = common_category_factory(type=common_category_type)
+    run_propagation(cc.id, 'create')
+    orders = {c.type_id: c.order for c in Category.objects.filter(common=cc)}
+    assert orders[category_types[0].id] == 6
+    assert orders[category_types[1].id] == orders[category_types[2].id] == 1
+
+
+def test_plan_without_category_type_is_reported(common_category_type, common_category_factory, plan_factory):
+    plan = plan_factory()
+    plan.common_category_types.add(common_category_type)
+    cc = common_category_factory(type=common_category_type)
+    status = run_propagation(cc.id, 'create')
+    assert status.state == PropagationStatus.FAILED
+    assert len(status.errors) == 1
+    assert status.created == 3
+    assert status.processed == 4
+
+
+def test_edit_keeps_changes_made_in_plans(common_category_type, common_category_factory):
+    cc = common_category_factory(type=common_category_type, color='#ff0000')
+    run_propagation(cc.id, 'create')
+    customized = Category.objects.filter(common=cc).first()
+    customized.name = 'Customized'
+    customized.save()
+
+    previous_values = get_previous_values(cc)
+    cc.name = 'Renamed'
+    cc.color = '#00ff00'
+    cc.save()
+    status = run_propagation(cc.id, 'update', previous_values)
+    assert status.state == PropagationStatus.DONE
+    assert status.updated == 3
+
+    customized.refresh_from_db()
+    assert customized.name == 'Customized'
+    assert customized.color == '#00ff00'
+    others = Category.objects.filter(common=cc).exclude(id=customized.id)
+    assert [c.name for c in others] == ['Renamed', 'Renamed']
+
+
+def test_delete_keeps_categories_in_use(common_category_type, common_category_factory, action_factory):
+    cc = common_category_factory(type=common_category_type)
+    run_propagation(cc.id, 'create')
+    used = Category.objects.filter(common=cc).select_related('type').first()
+    action = action_factory(plan=used.type.plan, categories=[used])
+
+    status = run_propagation(cc.id, 'delete')
+    assert status.state == PropagationStatus.FAILED
+    assert status.deleted == 2
+    assert list(Category.objects.filter(common=cc)) == [used]
+    assert CommonCategory.objects.filter(id=cc.id).exists()
+
+    action.categories.clear()
+    status = run_propagation(cc.id, 'delete')
+    assert status.state == PropagationStatus.DONE
+    assert status.deleted == 1
+    assert not CommonCategory.objects.filter(id=cc.id).exists()
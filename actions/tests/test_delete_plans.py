@@ -0,0 +1,119 @@
+import pytest
+from django.core.management import call_command
+
+from actions.models import Action, ActionResponsibleParty, Category, CategoryType, Plan
+from aplans.purge import Purge
+from orgs.models import Organization
+from people.models import Person
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def generate_plan(
+    plan_factory, organization_factory, action_factory, category_type_factory, category_factory,
+    action_responsible_party_factory, person_factory,
+):
+    def generate():
+        plan = plan_factory()
+        departments = [organization_factory(parent=plan.organization) for _ in range(2)]
+        units = [organization_factory(parent=department) for department in departments]
+        category_type = category_type_factory(plan=plan)
+        top_category = category_factory(type=category_type)
+        categories = [top_category, category_factory(type=category_type, parent=top_category)]
+        for i in range(10):
+            action = action_factory(plan=plan, categories=[categories[i % 2]])
+            action_responsible_party_factory(action=action, organization=units[i % 2])
+        person_factory(organization=departments[0])
+        return plan
+    return generate
+
+
+def plan_snapshot(plan: Plan) -> dict:
+    org = plan.organization
+    orgs = Organization.objects.filter(path__startswith=org.path)
+    return dict(
+        actions=sorted(Action.objects.filter(plan=plan).values_list('id', 'categories')),
+        category_types=sorted(CategoryType.objects.filter(plan=plan).values_list('id', flat=True)),
+        categories=sorted(Category.objects.filter(type__plan=plan).values_list('id', 'parent')),
+        responsible_parties=sorted(
+            ActionResponsibleParty.objects.filter(action__plan=plan).values_list('id', 'organization')
+        ),
+        organizations=sorted(orgs.values_list('id', 'path', 'numchild')),
+        people=sorted(Person.objects.filter(organization__in=orgs).values_list('id', flat=True)),
+    )
+
+
+def purge_plan(plan: Plan, **kwargs) -> Purge:
+    purge = Purge(**kwargs)
+    purge.add(Plan.objects.filter(id=plan.id))
+    purge.add(Organization.objects.filter(path__startswith=plan.organization.path))
+    purge.collect()
+    return purge
+
+
+def test_purge_leaves_other_plans_unaffected(generate_plan):
+    plan = generate_plan()
+    other_plan = generate_plan()
+    before = plan_snapshot(other_plan)
+
+    # A small batch size makes sure that deleting in many batches works
+    purge = purge_plan(plan, batch_size=3)
+    counts = purge.get_counts()
+    assert counts['actions.Plan'] == 1
+    assert counts['actions.Action'] == 10
+    assert counts['actions.Category'] == 2
+    assert counts['orgs.Organization'] == 5
+    assert counts['people.Person'] == 1
+    assert not purge.get_protected()
+
+    deleted = purge.delete()
+    assert deleted == counts
+    assert not Plan.objects.filter(id=plan.id).exists()
+    assert not Action.objects.filter(plan_id=plan.id).exists()
+    assert not Organization.objects.filter(path__startswith=plan.organization.path).exists()
+    assert plan_snapshot(other_plan) == before
+
+
+def test_dry_run_counts_match_django_cascade(generate_plan):
+    plan = generate_plan()
+    generate_plan()
+    counts = purge_plan(plan).get_counts()
+    _, cascade_counts = Plan.objects.filter(id=plan.id).delete()
+    for label, n in cascade_counts.items():
+        if n:
+            assert counts[label] == n, label
+
+
+def test_purge_updates_tree_parents(generate_plan, organization_factory):
+    plan = generate_plan()
+    department = Organization.objects.filter(path__startswith=plan.organization.path, depth=2).first()
+    organization_factory(parent=department)
+    department.refresh_from_db()
+    assert department.numchild == 2
+
+    purge = Purge()
+    purge.add(Organization.objects.filter(id=department.get_children().last().id))
+    purge.delete()
+    department.refresh_from_db()
+    assert department.numchild == 1
+
+
+def test_protected_references_block_purge(generate_plan):
+    plan = generate_plan()
+    purge = Purge()
+    purge.add(Organization.objects.filter(id=plan.organization.id))
+    purge.collect()
+    protected = purge.get_protected()
+    assert [field.name for field in protected] == ['organization']
+    assert list(protected.values()) == [{plan.id}]
+
+
+def test_delete_plans_command_dry_run(generate_plan, settings, capsys):
+    settings.DEBUG = True
+    settings.DEPLOYMENT_TYPE = 'production'
+    plan = generate_plan()
+    other_plan = generate_plan()
+    call_command('delete_plans', exclude=[other_plan.identifier], dry_run=True)
+    assert 'actions.Action: 10' in capsys.readouterr().out
+    assert Plan.objects.filter(id=plan.id).exists()
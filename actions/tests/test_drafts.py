@@ -0,0 +1,98 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from wagtail.models import Workflow
+
+from actions.attributes import DraftAttributes
+from actions.drafts import RevisionObjectCache, load_draft_actions
+from actions.models import Action
+from aplans.graphql_types import WorkflowStateEnum
+
+pytestmark = pytest.mark.django_db
+
+DRAFT_ACTIONS_QUERY = '''
+    query($plan: ID!) @workflow(state: DRAFT) {
+      planActions(plan: $plan) {
+        identifier
+        name
+      }
+    }
+'''
+
+
+def save_draft(action, name, user):
+    action.name = name
+    action.draft_attributes = DraftAttributes()
+    return action.save_revision(user=user)
+
+
+@pytest.fixture
+def draft_actions(plan, action_factory, superuser):
+    plan.features.moderation_workflow = Workflow.objects.create(name='Test workflow')
+    plan.features.save()
+    actions = [action_factory(plan=plan, name=f'Published name {i}') for i in range(3)]
+    for i, action in enumerate(actions):
+        save_draft(action, f'Draft name {i}', superuser)
+    return actions
+
+
+def get_plan_actions(plan):
+    return list(Action.objects.filter(plan=plan).order_by('order'))
+
+
+def test_load_draft_actions_matches_latest_revision(plan, draft_actions):
+    cache.clear()
+    live_actions = get_plan_actions(plan)
+    assert all(action.has_unpublished_changes for action in live_actions)
+    for _ in range(2):
+        # The second round is served from the cache
+        drafts = load_draft_actions(get_plan_actions(plan), WorkflowStateEnum.DRAFT)
+        assert [a.name for a in drafts] == [f'Draft name {i}' for i in range(3)]
+        for live, draft in zip(live_actions, drafts):
+            assert draft.pk == live.pk
+            assert draft.serializable_data() == live.get_latest_revision_as_object().serializable_data()
+
+
+def test_load_draft_actions_published_state_returns_live_actions(plan, draft_actions, django_assert_num_queries):
+    live_actions = get_plan_actions(plan)
+    with django_assert_num_queries(0):
+        result = load_draft_actions(live_actions, WorkflowStateEnum.PUBLISHED)
+    assert result == live_actions
+    assert [a.name for a in result] == [f'Published name {i}' for i in range(3)]
+
+
+def test_revisions_are_loaded_in_one_query_and_cached(plan, draft_actions, django_assert_num_queries):
+    cache.clear()
+    live_actions = get_plan_actions(plan)
+    with CaptureQueriesContext(connection) as ctx:
+        load_draft_actions(live_actions, WorkflowStateEnum.DRAFT)
+    # Rebuilding the objects may check foreign keys, but the revisions are fetched at once
+    revision_queries = [q for q in ctx.captured_queries if 'wagtailcore_revision' in q['sql']]
+    assert len(revision_queries) == 1
+    with django_assert_num_queries(0):
+        load_draft_actions(live_actions, WorkflowStateEnum.DRAFT)
+
+
+def test_new_revision_invalidates_cached_objects(plan, draft_actions, superuser):
+    action = get_plan_actions(plan)[0]
+    old_revision_id = action.latest_revision_id
+    assert RevisionObjectCache.get_object(old_revision_id, action).name == 'Draft name 0'
+    assert cache.get(RevisionObjectCache.get_cache_key(old_revision_id)) is not None
+
+    save_draft(action, 'Updated draft name', superuser)
+    assert cache.get(RevisionObjectCache.get_cache_key(old_revision_id)) is None
+    action = Action.objects.get(pk=action.pk)
+    drafts = load_draft_actions([action], WorkflowStateEnum.DRAFT)
+    assert drafts[0].name == 'Updated draft name'
+
+
+def test_plan_actions_in_draft_state(client, plan, draft_actions, superuser, graphql_client_query_data):
+    client.force_login(superuser)
+    data = graphql_client_query_data(DRAFT_ACTIONS_QUERY, variables={'plan': plan.identifier})
+    assert [a['name'] for a in data['planActions']] == [f'Draft name {i}' for i in range(3)]
+
+
+def test_plan_actions_draft_state_not_visible_to_anonymous(plan, draft_actions, graphql_client_query_data):
+    data = graphql_client_query_data(DRAFT_ACTIONS_QUERY, variables={'plan': plan.identifier})
+    assert [a['name'] for a in data['planActions']] == [f'Published name {i}' for i in range(3)]
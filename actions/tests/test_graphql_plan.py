@@ -1,6 +1,10 @@
 import json
 import pytest
+from datetime import timedelta
 from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from actions.models import AttributeType
 from pages.models import StaticPage
@@ -382,3 +386,123 @@ def test_footer_children_only_shown(graphql_client_query_data, plan_with_pages):
         }
     }
     assert data == expected
+
+
+def test_action_status_summary_counts(graphql_client_query_data, plan, action_factory, action_status_factory):
+    on_time = action_status_factory(plan=plan, identifier='on_time')
+    late = action_status_factory(plan=plan, identifier='late')
+    action_factory(plan=plan, status=on_time)
+    action_factory(plan=plan, status=on_time)
+    action_factory(plan=plan, status=late)
+    # Internal actions are not counted for anonymous users
+    action_factory(plan=plan, status=late, visibility='internal')
+    data = graphql_client_query_data(
+        '''
+        query($plan: ID!) {
+          plan(id: $plan) {
+            actionStatusSummaryCounts {
+              summary {
+                identifier
+                label
+              }
+              count
+            }
+          }
+        }
+        ''',
+        variables=dict(plan=plan.identifier)
+    )
+    counts = {c['summary']['identifier']: c['count'] for c in data['plan']['actionStatusSummaryCounts']}
+    assert counts['ON_TIME'] == 2
+    assert counts['LATE'] == 1
+    assert counts['COMPLETED'] == 0
+    labels = {c['summary']['identifier']: c['summary']['label'] for c in data['plan']['actionStatusSummaryCounts']}
+    assert labels['LATE'] == late.name
+
+
+def test_action_timeliness_counts(graphql_client_query_data, plan, action_factory):
+    now = timezone.now()
+    action_factory(plan=plan, updated_at=now)
+    action_factory(plan=plan, updated_at=now - timedelta(days=plan.action_update_target_interval + 1))
+    action_factory(plan=plan, updated_at=now - timedelta(days=plan.action_update_acceptable_interval + 1))
+    data = graphql_client_query_data(
+        '''
+        query($plan: ID!) {
+          plan(id: $plan) {
+            actionTimelinessCounts {
+              timeliness {
+                identifier
+              }
+              count
+            }
+          }
+        }
+        ''',
+        variables=dict(plan=plan.identifier)
+    )
+    counts = {c['timeliness']['identifier']: c['count'] for c in data['plan']['actionTimelinessCounts']}
+    assert counts == {'OPTIMAL': 1, 'ACCEPTABLE': 1, 'LATE': 1, 'STALE': 0}
+
+
+CATEGORIES_WITH_ACTIONS_QUERY = '''
+    query($plan: ID!, $onlyRoot: Boolean) {
+      plan(id: $plan) {
+        categoryTypes {
+          categories(onlyWithActions: true, onlyRoot: $onlyRoot) {
+            identifier
+          }
+        }
+      }
+    }
+'''
+
+
+@pytest.fixture
+def category_tree(plan, category_type, category_factory, action_factory):
+    # a1 > a2 > a3 > a4 with a public action in a4
+    a1 = category_factory(type=category_type, identifier='a1')
+    a2 = category_factory(type=category_type, identifier='a2', parent=a1)
+    a3 = category_factory(type=category_type, identifier='a3', parent=a2)
+    a4 = category_factory(type=category_type, identifier='a4', parent=a3)
+    action_factory(plan=plan, categories=[a4])
+    # b1 > b2 with an internal action in b2
+    b1 = category_factory(type=category_type, identifier='b1')
+    b2 = category_factory(type=category_type, identifier='b2', parent=b1)
+    action_factory(plan=plan, categories=[b2], visibility='internal')
+    # c1 without actions
+    category_factory(type=category_type, identifier='c1')
+    return category_type
+
+
+def query_categories_with_actions(graphql_client_query_data, plan, only_root=False):
+    data = graphql_client_query_data(
+        CATEGORIES_WITH_ACTIONS_QUERY, variables=dict(plan=plan.identifier, onlyRoot=only_root)
+    )
+    [category_type] = data['plan']['categoryTypes']
+    return [c['identifier'] for c in category_type['categories']]
+
+
+def test_categories_only_with_actions_includes_ancestors(graphql_client_query_data, plan, category_tree):
+    assert query_categories_with_actions(graphql_client_query_data, plan) == ['a1', 'a2', 'a3', 'a4']
+    assert query_categories_with_actions(graphql_client_query_data, plan, only_root=True) == ['a1']
+
+
+def test_categories_only_with_actions_respects_visibility(
+    client, graphql_client_query_data, plan, category_tree, superuser,
+):
+    client.force_login(superuser)
+    assert query_categories_with_actions(graphql_client_query_data, plan) == ['a1', 'a2', 'a3', 'a4', 'b1', 'b2']
+
+
+def test_categories_only_with_actions_query_count(
+    graphql_client_query_data, plan, category_tree, category_factory, action_factory, django_assert_max_num_queries,
+):
+    with CaptureQueriesContext(connection) as ctx:
+        query_categories_with_actions(graphql_client_query_data, plan)
+    parent = None
+    for i in range(5):
+        parent = category_factory(type=category_tree, identifier=f'd{i}', parent=parent)
+        action_factory(plan=plan, categories=[parent])
+    with django_assert_max_num_queries(len(ctx.captured_queries)):
+        identifiers = query_categories_with_actions(graphql_client_query_data, plan)
+    assert identifiers == ['a1', 'a2', 'a3', 'a4', 'd0', 'd1', 'd2', 'd3', 'd4']
@@ -9,8 +9,10 @@ from wagtail.models import Locale
 
 from actions.attributes import AttributeType
 from actions.models import Action, ActionContactPerson
+from actions.monitoring_quality import determine_monitoring_quality
 from actions.tests.factories import (
-    ActionFactory, ActionContactFactory, AttributeTextFactory, AttributeTypeFactory, CategoryFactory, CategoryTypeFactory, PlanFactory
+    ActionFactory, ActionContactFactory, ActionTaskFactory, AttributeTextFactory, AttributeTypeFactory, CategoryFactory,
+    CategoryTypeFactory, MonitoringQualityPointFactory, PlanFactory
 )
 from aplans.utils import InstancesEditableByMixin, InstancesVisibleForMixin
 from pages.models import CategoryPage, CategoryTypePage
@@ -510,3 +512,58 @@ def test_action_on_form_save_no_commit(
     # Clear all attributes again to check if the previously set values are removed
     save_form(cleaned_data_attributes_cleared)
     assert action.draft_attributes.get_serialized_data() == expected_result_attributes_cleared
+
+
+def test_determine_monitoring_quality(plan):
+    basic_info = MonitoringQualityPointFactory(plan=plan, identifier='basic_info')
+    future_task = MonitoringQualityPointFactory(plan=plan, identifier='future_task')
+    complete_action = ActionFactory(plan=plan, manual_status=False)
+    ActionContactFactory(action=complete_action)
+    ActionTaskFactory(action=complete_action, due_at=date.today() + timedelta(days=30))
+    incomplete_action = ActionFactory(plan=plan, manual_status=False, description=' ')
+    ActionTaskFactory(action=incomplete_action, due_at=date.today() + timedelta(days=30))
+    stale_action = ActionFactory(plan=plan, manual_status=False, monitoring_quality_points=[basic_info])
+
+    assert determine_monitoring_quality(plan) == (3, 1)
+    assert set(complete_action.monitoring_quality_points.all()) == {basic_info, future_task}
+    assert set(incomplete_action.monitoring_quality_points.all()) == {future_task}
+    assert not stale_action.monitoring_quality_points.exists()
+    # Evaluating again does not change anything
+    assert determine_monitoring_quality(plan) == (0, 0)
+
+
+def test_determine_monitoring_quality_query_count(plan, django_assert_max_num_queries):
+    MonitoringQualityPointFactory(plan=plan, identifier='basic_info')
+    MonitoringQualityPointFactory(plan=plan, identifier='future_task')
+    MonitoringQualityPointFactory(plan=plan, identifier='indicator')
+    for _ in range(10):
+        action = ActionFactory(plan=plan, manual_status=False)
+        ActionContactFactory(action=action)
+        ActionTaskFactory(action=action, due_at=date.today() + timedelta(days=30))
+    with django_assert_max_num_queries(4):
+        determine_monitoring_quality(plan)
+
+
+def test_plan_get_superseded_plans_recursive_single_query(django_assert_num_queries):
+    plan1 = PlanFactory()
+    plan2 = PlanFactory(superseded_by=plan1)
+    plan3 = PlanFactory(superseded_by=plan2)
+    plan4 = PlanFactory(superseded_by=plan2)
+    with django_assert_num_queries(1):
+        assert set(plan1.get_superseded_plans(recursive=True)) == {plan2, plan3, plan4}
+
+
+def test_plan_get_superseding_plans_recursive_single_query(django_assert_num_queries):
+    plan1 = PlanFactory()
+    plan2 = PlanFactory(superseded_by=plan1)
+    plan3 = PlanFactory(superseded_by=plan2)
+    with django_assert_num_queries(1):
+        assert plan3.get_superseding_plans(recursive=True) == [plan2, plan1]
+
+
+def test_plan_get_superseding_plans_recursive_cycle():
+    plan1 = PlanFactory()
+    plan2 = PlanFactory(superseded_by=plan1)
+    plan1.superseded_by = plan2
+    plan1.save()
+    assert plan1.get_superseding_plans(recursive=True) == [plan2]
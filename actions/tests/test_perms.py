@@ -0,0 +1,138 @@
+import pytest
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from wagtail.models import GroupCollectionPermission, GroupPagePermission
+
+from actions.models import RolePermission
+from actions.perms import (
+    ACTION_CONTACT_PERSON, PLAN_ADMIN, ROLE_PERMISSIONS_CACHE_KEY, WAGTAIL_CONTACT_PERSON, WAGTAIL_PLAN_ADMIN,
+    add_plan_admin_perms, compile_role_permissions, get_or_create_plan_admin_group, get_role_permission_ids,
+    sync_plan_groups,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def role_permission_rows():
+    return set(RolePermission.objects.values_list('role', 'permission_id'))
+
+
+def group_permission_rows(plans):
+    groups = [group for plan in plans for group in (plan.admin_group, plan.contact_person_group)]
+    return (
+        set(GroupCollectionPermission.objects.filter(group__in=groups).values_list(
+            'group', 'collection', 'permission'
+        )),
+        set(GroupPagePermission.objects.filter(group__in=groups).values_list('group', 'page', 'permission')),
+    )
+
+
+def count_queries(func):
+    with CaptureQueriesContext(connection) as ctx:
+        func()
+    return len(ctx.captured_queries)
+
+
+def test_compile_role_permissions_is_idempotent():
+    compile_role_permissions()
+    rows = role_permission_rows()
+    ids = set(RolePermission.objects.values_list('id', flat=True))
+    compile_role_permissions()
+    assert role_permission_rows() == rows
+    # Unchanged rows are kept
+    assert set(RolePermission.objects.values_list('id', flat=True)) == ids
+
+    codenames = set(Permission.objects.filter(id__in=get_role_permission_ids(ACTION_CONTACT_PERSON)).values_list(
+        'content_type__app_label', 'codename'
+    ))
+    assert ('actions', 'publish_action') in codenames
+    assert ('wagtaildocs', 'add_document') in codenames
+    # Included roles are part of the role
+    assert get_role_permission_ids(WAGTAIL_CONTACT_PERSON) < get_role_permission_ids(ACTION_CONTACT_PERSON)
+    assert get_role_permission_ids(ACTION_CONTACT_PERSON) < get_role_permission_ids(PLAN_ADMIN)
+
+
+def test_post_migrate_refreshes_role_permissions():
+    RolePermission.objects.filter(role=ACTION_CONTACT_PERSON).delete()
+    cache.delete(ROLE_PERMISSIONS_CACHE_KEY)
+    emit_post_migrate_signal(verbosity=0, interactive=False, db=connection.alias)
+    assert RolePermission.objects.filter(role=ACTION_CONTACT_PERSON).exists()
+    assert cache.get(ROLE_PERMISSIONS_CACHE_KEY)[ACTION_CONTACT_PERSON] == get_role_permission_ids(
+        ACTION_CONTACT_PERSON
+    )
+
+
+def test_role_permissions_are_read_from_table():
+    compile_role_permissions()
+    cache.delete(ROLE_PERMISSIONS_CACHE_KEY)
+    with CaptureQueriesContext(connection) as ctx:
+        ids = get_role_permission_ids(PLAN_ADMIN)
+        get_role_permission_ids(ACTION_CONTACT_PERSON)
+    assert len(ctx.captured_queries) == 1
+    assert ids == set(RolePermission.objects.filter(role=PLAN_ADMIN).values_list('permission', flat=True))
+
+
+def test_group_sync_is_idempotent():
+    group = get_or_create_plan_admin_group()
+    expected = get_role_permission_ids(PLAN_ADMIN)
+    assert set(group.permissions.values_list('id', flat=True)) == expected
+
+    stray = Permission.objects.exclude(id__in=expected).first()
+    group.permissions.add(stray)
+    group.permissions.remove(*list(expected)[:3])
+    group = get_or_create_plan_admin_group()
+    assert set(group.permissions.values_list('id', flat=True)) == expected
+
+    # Nothing is written when the permissions are in sync
+    assert count_queries(get_or_create_plan_admin_group) == 2
+
+
+def test_sync_plan_groups_is_idempotent(plan_with_pages):
+    plan = plan_with_pages
+    sync_plan_groups()
+    collection_perms, page_perms = group_permission_rows([plan])
+    assert {perm for _, _, perm in collection_perms} == (
+        get_role_permission_ids(WAGTAIL_PLAN_ADMIN) | get_role_permission_ids(WAGTAIL_CONTACT_PERSON)
+    )
+    assert {page for _, page, _ in page_perms} == {page.id for page in plan.root_page.get_translations(inclusive=True)}
+
+    # Permissions on other root pages are removed and missing ones restored
+    GroupPagePermission.objects.filter(group=plan.admin_group).first().delete()
+    other_page = plan.root_page.get_parent()
+    GroupPagePermission.objects.create(
+        group=plan.admin_group, page=other_page, permission=Permission.objects.get(codename='add_page'),
+    )
+    sync_plan_groups()
+    assert group_permission_rows([plan]) == (collection_perms, page_perms)
+
+
+def test_sync_plan_groups_query_count(plan_factory):
+    plans = [plan_factory() for _ in range(3)]
+    get_role_permission_ids(PLAN_ADMIN)
+    first_sync = count_queries(sync_plan_groups)
+    before = group_permission_rows(plans)
+    resync = count_queries(sync_plan_groups)
+    assert group_permission_rows(plans) == before
+    assert resync < first_sync
+
+    plans += [plan_factory() for _ in range(10)]
+    # Syncing many plans takes as many queries as syncing a few
+    assert count_queries(sync_plan_groups) == first_sync
+    assert count_queries(sync_plan_groups) == resync
+    collection_perms, _ = group_permission_rows(plans)
+    assert {group for group, _, _ in collection_perms} == {
+        group.id for plan in plans for group in (plan.admin_group, plan.contact_person_group)
+    }
+
+
+def test_add_plan_admin_perms_is_idempotent(plan_with_pages, plan_admin_user):
+    add_plan_admin_perms(plan_admin_user)
+    groups = set(plan_admin_user.groups.all())
+    rows = group_permission_rows([plan_with_pages])
+    assert plan_with_pages.admin_group in groups
+    add_plan_admin_perms(plan_admin_user)
+    assert set(plan_admin_user.groups.all()) == groups
+    assert group_permission_rows([plan_with_pages]) == rows
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import typing
+from typing import Callable, Generic, TypeVar
+
+from django.db import connections
+from sentry_sdk import capture_exception
+
+if typing.TYPE_CHECKING:
+    from django.db.models import Model
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar('M', bound='Model')
+
+
+class BulkCreateBuffer(Generic[M]):
+    """Collect model instances in memory and write them to the database in batches.
+
+    The buffer is flushed when it reaches `max_size` entries, when its oldest entry is older than
+    `flush_interval` seconds and the next entry is added or `flush_if_due()` is called, and when
+    the worker process exits. If `flush_in_background` is set, a timer thread also flushes the
+    buffer `flush_interval` seconds after its first entry was added, so entries do not wait for
+    the next request on an idle worker. Entries that have not been flushed yet are still lost if
+    the process is killed. Subclasses set `model`.
+    """
+
+    model: type[M]
+
+    def __init__(
+        self, max_size: int, flush_interval: float, clock: Callable[[], float] = time.monotonic,
+        flush_in_background: bool = False,
+    ):
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.flush_in_background = flush_in_background
+        self.entries: list[M] = []
+        self.oldest_at: float | None = None
+        self.timer: threading.Timer | None = None
+        self.lock = threading.Lock()
+
+    def add(self, entry: M):
+        with self.lock:
+            if not self.entries:
+                self.oldest_at = self.clock()
+                if self.flush_in_background:
+                    self._start_timer()
+            self.entries.append(entry)
+            is_full = len(self.entries) >= self.max_size
+        if is_full or self.is_due():
+            self.flush()
+
+    def _start_timer(self):
+        # Called with the lock held
+        if self.timer is not None:
+            return
+        self.timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def _flush_from_timer(self):
+        with self.lock:
+            self.timer = None
+        try:
+            self.flush()
+        finally:
+            # The thread opened its own database connection
+            connections.close_all()
+
+    def is_due(self) -> bool:
+        oldest_at = self.oldest_at
+        return oldest_at is not None and self.clock() - oldest_at >= self.flush_interval
+
+    def flush_if_due(self):
+        if self.is_due():
+            self.flush()
+
+    def flush(self) -> int:
+        with self.lock:
+            entries = self.entries
+            self.entries = []
+            self.oldest_at = None
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if not entries:
+            return 0
+        try:
+            self.model.objects.bulk_create(entries)
+        except Exception as e:
+            logger.warning(f'Error writing {len(entries)} {self.model._meta.verbose_name_plural}: {e}')
+            capture_exception(e)
+            return 0
+        return len(entries)
+
+    def __len__(self):
+        return len(self.entries)
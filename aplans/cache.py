@@ -1,8 +1,15 @@
 from __future__ import annotations
+from copy import copy
 from functools import cached_property
 
 from aplans.graphql_types import WorkflowStateEnum
+from actions.attribute_registry import AttributeTypeRegistry
+from actions.action_status_summary import (
+    ActionStatusSummary, ActionStatusSummaryIdentifier, ActionTimeliness, ActionTimelinessIdentifier
+)
 from actions.models import ActionStatus, ActionImplementationPhase, Plan
+from aplans.rich_text import RichTextReferences
+from images.renditions import RenditionURLCache
 from reports.models import Report
 
 
@@ -33,6 +40,42 @@ class PlanSpecificCache:
                     return a_s
         return None
 
+    @cached_property
+    def action_status_summaries(self) -> dict[ActionStatusSummaryIdentifier, ActionStatusSummary]:
+        # The enum values are shared between plans, so we work on copies
+        return {
+            identifier: copy(identifier.value).with_identifier(identifier).with_context({
+                'plan': self.plan, 'plan_cache': self,
+            })
+            for identifier in ActionStatusSummaryIdentifier
+        }
+
+    def get_action_status_summary(self, identifier: ActionStatusSummaryIdentifier) -> ActionStatusSummary:
+        return self.action_status_summaries[identifier]
+
+    @cached_property
+    def action_timeliness_classes(self) -> dict[ActionTimelinessIdentifier, ActionTimeliness]:
+        return {
+            identifier: copy(identifier.value).with_identifier(identifier).with_context({'plan': self.plan})
+            for identifier in ActionTimelinessIdentifier
+        }
+
+    def get_action_timeliness(self, identifier: ActionTimelinessIdentifier) -> ActionTimeliness:
+        return self.action_timeliness_classes[identifier]
+
+    @cached_property
+    def attribute_types(self) -> AttributeTypeRegistry:
+        return AttributeTypeRegistry.for_plan(self.plan)
+
+    @cached_property
+    def related_plans(self) -> list[Plan]:
+        return list(self.plan.get_all_related_plans())
+
+    def get_all_related_plans(self, inclusive: bool = False) -> list[Plan]:
+        if inclusive:
+            return [self.plan, *self.related_plans]
+        return self.related_plans
+
     @cached_property
     def latest_reports(self) -> list[Report]:
         qs = (
@@ -52,10 +95,14 @@ class WatchObjectCache:
     plan_caches: dict[int, PlanSpecificCache]
     admin_plan_cache: PlanSpecificCache | None
     query_workflow_state: WorkflowStateEnum
+    image_renditions: RenditionURLCache
+    rich_text: RichTextReferences
     def __init__(self):
         self.plan_caches = {}
         self.admin_plan_cache = None
         self.query_workflow_state = WorkflowStateEnum.PUBLISHED
+        self.image_renditions = RenditionURLCache()
+        self.rich_text = RichTextReferences()
 
     def for_plan_id(self, plan_id: int) -> PlanSpecificCache:
         plan_cache = self.plan_caches.get(plan_id)
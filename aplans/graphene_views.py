@@ -1,9 +1,17 @@
+from __future__ import annotations
+
 import hashlib
 import importlib
 import json
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from loguru import logger
 
 from django.conf import settings
+from django.db import connection
+from django.db.models import QuerySet
 from django.utils import translation
 from django.core.cache import cache
 
@@ -12,7 +20,7 @@ from sentry_sdk import tracing as sentry_tracing
 from actions.models import Plan
 from django.core.exceptions import ValidationError
 from graphene_django.views import GraphQLView
-from graphql import DirectiveNode, ExecutionResult, GraphQLResolveInfo
+from graphql import DirectiveNode, ExecutionResult, GraphQLResolveInfo, get_nullable_type, is_list_type
 from graphql.execution import ExecutionContext
 from graphql.error import GraphQLError
 from graphql.language.ast import VariableNode, StringValueNode
@@ -33,6 +41,7 @@ SUPPORTED_LANGUAGES = {x[0].lower() for x in settings.LANGUAGES}
 
 PLAN_IDENTIFIER_HEADER = 'x-cache-plan-identifier'
 PLAN_DOMAIN_HEADER = 'x-cache-plan-domain'
+TRACING_HEADER = 'x-graphql-tracing'
 
 
 class APITokenMiddleware:
@@ -154,6 +163,125 @@ class LocaleMiddleware:
         return next(root, info, **kwargs)
 
 
+@dataclass
+class FieldTrace:
+    calls: int = 0
+    time_ns: int = 0
+    sql_queries: int = 0
+    sql_time_ns: int = 0
+    # Number of rows in the querysets returned by the resolver
+    rows: int = 0
+    started_at: datetime | None = None
+
+    def as_dict(self):
+        return dict(
+            calls=self.calls,
+            time_ms=round(self.time_ns / 1e6, 3),
+            sql_queries=self.sql_queries,
+            sql_time_ms=round(self.sql_time_ns / 1e6, 3),
+            rows=self.rows,
+        )
+
+
+class GraphQLTracer:
+    """Record the time and SQL queries spent in each resolver, aggregated by field path.
+
+    The tracer acts as a Graphene middleware and, inside `trace()`, as a database
+    execute wrapper. SQL queries are attributed to the resolver being run when they
+    are executed; queries run outside of resolvers are recorded under `UNATTRIBUTED`.
+    """
+
+    UNATTRIBUTED = '(outside resolvers)'
+
+    def __init__(self, include_in_response: bool = False):
+        self.include_in_response = include_in_response
+        self.fields: dict[str, FieldTrace] = {}
+        self.current_path: list[str] = []
+        self.total_time_ns = 0
+
+    @staticmethod
+    def get_field_path(info: GraphQLResolveInfo) -> str:
+        # List indices are left out so that the items of a list are aggregated together
+        return '.'.join(key for key in info.path.as_list() if isinstance(key, str))
+
+    def get_field(self, path: str) -> FieldTrace:
+        field = self.fields.get(path)
+        if field is None:
+            field = self.fields[path] = FieldTrace(started_at=datetime.now(timezone.utc))
+        return field
+
+    def resolve(self, next, root, info: GraphQLResolveInfo, **kwargs):
+        path = self.get_field_path(info)
+        field = self.get_field(path)
+        self.current_path.append(path)
+        start = time.perf_counter_ns()
+        try:
+            result = next(root, info, **kwargs)
+            if isinstance(result, QuerySet):
+                if result._result_cache is not None:
+                    field.rows += len(result)
+                elif is_list_type(get_nullable_type(info.return_type)):
+                    # Evaluating the queryset here would change the queries being traced, so its queries are
+                    # attributed to this field when the executor iterates it.
+                    return self.iterate_queryset(path, field, result)
+            return result
+        finally:
+            field.time_ns += time.perf_counter_ns() - start
+            field.calls += 1
+            self.current_path.pop()
+
+    def iterate_queryset(self, path: str, field: FieldTrace, queryset: QuerySet):
+        self.current_path.append(path)
+        start = time.perf_counter_ns()
+        try:
+            rows = list(queryset)
+        finally:
+            field.time_ns += time.perf_counter_ns() - start
+            self.current_path.pop()
+        field.rows += len(rows)
+        yield from rows
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter_ns()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            field = self.get_field(self.current_path[-1] if self.current_path else self.UNATTRIBUTED)
+            field.sql_queries += 1
+            field.sql_time_ns += time.perf_counter_ns() - start
+
+    @contextmanager
+    def trace(self):
+        start = time.perf_counter_ns()
+        try:
+            with connection.execute_wrapper(self.execute_wrapper):
+                yield self
+        finally:
+            self.total_time_ns += time.perf_counter_ns() - start
+
+    def get_summary(self) -> dict:
+        fields = sorted(self.fields.items(), key=lambda item: item[1].time_ns + item[1].sql_time_ns, reverse=True)
+        return dict(
+            time_ms=round(self.total_time_ns / 1e6, 3),
+            sql_queries=sum(field.sql_queries for field in self.fields.values()),
+            fields={path: field.as_dict() for path, field in fields},
+        )
+
+    def add_sentry_spans(self, span: sentry_tracing.Span):
+        """Add one child span per field path, starting when the field was first resolved."""
+        for path, field in self.fields.items():
+            child = span.start_child(op='graphql.resolve', description=path, start_timestamp=field.started_at)
+            for key, val in field.as_dict().items():
+                child.set_data(key, val)
+            child.finish(end_timestamp=field.started_at + timedelta(microseconds=field.time_ns / 1000))
+
+    def log(self, operation_name: str | None):
+        summary = self.get_summary()
+        logger.bind(graphql_tracing=summary).info('GraphQL request %s traced: %d SQL queries in %.1f ms' % (
+            operation_name, summary['sql_queries'], summary['time_ms'],
+        ))
+
+
 if importlib.util.find_spec('kausal_watch_extensions') is not None:
     from kausal_watch_extensions.auth.authentication import IDTokenAuthentication
 else:
@@ -176,12 +304,35 @@ class SentryGraphQLView(GraphQLView):
     graphiql_sri = "sha256-qQ6pw7LwTLC+GfzN+cJsYXfVWRKH9O5o7+5H96gTJhQ="
     graphiql_css_sri = "sha256-gQryfbGYeYFxnJYnfPStPYFt0+uv8RP8Dm++eh00G9c="
 
+    tracer: GraphQLTracer | None = None
+
     def __init__(self, *args, **kwargs):
         if 'middleware' not in kwargs:
             middleware = (APITokenMiddleware, WorkflowStateMiddleware, LocaleMiddleware)
             kwargs['middleware'] = middleware
         super().__init__(*args, **kwargs)
 
+    def get_middleware(self, request):
+        middleware = super().get_middleware(request)
+        if self.tracer is None:
+            return middleware
+        # The first middleware is the innermost one, so the tracer measures only the resolver itself
+        return [self.tracer, *middleware]
+
+    def get_tracer(self, request: WatchAPIRequest) -> GraphQLTracer | None:
+        user = request.user
+        is_superuser = bool(user and user.is_authenticated and user.is_superuser)
+        if is_superuser and request.headers.get(TRACING_HEADER):
+            return GraphQLTracer(include_in_response=True)
+        if settings.GRAPHQL_TRACING:
+            return GraphQLTracer(include_in_response=is_superuser)
+        return None
+
+    def json_encode(self, request, d, pretty=False):
+        if self.tracer is not None and self.tracer.include_in_response:
+            d.setdefault('extensions', {})['tracing'] = self.tracer.get_summary()
+        return super().json_encode(request, d, pretty)
+
     def get_cache_key(self, request, data, query, variables):
         plan_identifier = request.headers.get(PLAN_IDENTIFIER_HEADER)
         plan_domain = request.headers.get(PLAN_DOMAIN_HEADER)
@@ -268,14 +419,22 @@ class SentryGraphQLView(GraphQLView):
                 # No tracing activated, use an inert Span
                 span = sentry_tracing.Span()
 
+            self.tracer = self.get_tracer(request)
             with span:
-                if request.user and request.user.is_authenticated:
-                    # Uncached execution for authenticated requests
-                    result = super().execute_graphql_request(request, data, query, variables, operation_name, *args, **kwargs)
-                else:
-                    result = self.caching_execute_graphql_request(
-                        span, request, data, query, variables, operation_name, *args, **kwargs
-                    )
+                with self.tracer.trace() if self.tracer is not None else nullcontext():
+                    if request.user and request.user.is_authenticated:
+                        # Uncached execution for authenticated requests
+                        result = super().execute_graphql_request(
+                            request, data, query, variables, operation_name, *args, **kwargs
+                        )
+                    else:
+                        result = self.caching_execute_graphql_request(
+                            span, request, data, query, variables, operation_name, *args, **kwargs
+                        )
+                if self.tracer is not None and self.tracer.fields:
+                    if transaction is not None:
+                        self.tracer.add_sentry_spans(span)
+                    self.tracer.log(operation_name)
             # If 'invalid' is set, it's a bad request
             if result and result.errors:
                 if settings.LOG_SQL_QUERIES:
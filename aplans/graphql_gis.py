@@ -1,6 +1,6 @@
 import json
 from django.contrib.gis.db import models as gis_models
-from django.contrib.gis.geos import GEOSGeometry
+from django.contrib.gis.geos import GEOSGeometry, GeometryCollection
 from graphql.language import ast
 from graphene.types import Scalar
 from graphene_django.converter import convert_django_field
@@ -18,7 +18,10 @@ class GISScalar(Scalar):
 
     @staticmethod
     def serialize(geometry):
-        return json.loads(geometry.geojson)
+        if isinstance(geometry, GeometryCollection):
+            return json.loads(geometry.geojson)
+        # Build simple geometries directly instead of serializing and parsing them again
+        return {'type': geometry.geom_type, 'coordinates': geometry.coords}
 
     @classmethod
     def parse_literal(cls, node):
@@ -53,6 +56,17 @@ class PolygonScalar(GISScalar):
         description = "A GIS Polygon geojson"
 
 
+class FeatureCollectionScalar(Scalar):
+    class Meta:
+        name = 'GeoJSONFeatureCollection'
+        description = "A GeoJSON FeatureCollection"
+
+    @staticmethod
+    def serialize(value):
+        # The collection is serialized with the database's GeoJSON output, so it is parsed only once
+        return json.loads(value)
+
+
 GIS_FIELD_SCALAR = {
     "PointField": PointScalar,
     "LineStringField": LineStringScalar,
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import typing
+from typing import Callable, Sequence
+
+import graphene
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from graphql.error import GraphQLError
+
+if typing.TYPE_CHECKING:
+    from django.db.models import Field, Model, QuerySet
+
+
+class KeysetCursor:
+    """Relay cursors that encode the values of the ordering fields of a row.
+
+    The ordering of the queryset (or the default ordering of the model) is made unique by adding
+    the primary key. The ordering fields must be non-nullable fields of the model itself.
+    """
+
+    keys: list[tuple[Field, bool]]
+
+    def __init__(self, qs: QuerySet):
+        opts = qs.model._meta
+        ordering = list(qs.query.order_by or opts.ordering)
+        self.keys = []
+        for name in ordering:
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            field = opts.pk if name == 'pk' else opts.get_field(name)
+            self.keys.append((field, descending))
+        if opts.pk not in [field for field, _ in self.keys]:
+            self.keys.append((opts.pk, False))
+
+    def order(self, qs: QuerySet) -> QuerySet:
+        field_names, defer = qs.query.deferred_loading
+        if field_names and not defer:
+            # The queryset is limited with only(), so make sure the cursors can be encoded without
+            # loading the deferred ordering fields row by row
+            qs = qs.only(*field_names, *[field.name for field, _ in self.keys])
+        return qs.order_by(*[('-' if descending else '') + field.name for field, descending in self.keys])
+
+    def encode(self, obj: Model) -> str:
+        values = [field.value_to_string(obj) for field, _ in self.keys]
+        return base64.urlsafe_b64encode(json.dumps(values).encode('utf8')).decode('ascii')
+
+    def decode(self, cursor: str) -> list:
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            if not isinstance(values, list) or len(values) != len(self.keys):
+                raise ValueError()
+            return [field.to_python(value) for (field, _), value in zip(self.keys, values)]
+        except (binascii.Error, UnicodeError, ValueError, ValidationError):
+            raise GraphQLError('Invalid cursor')
+
+    def filter_after(self, qs: QuerySet, cursor: str) -> QuerySet:
+        """Return the rows that come after the row of `cursor`."""
+        values = self.decode(cursor)
+        q = Q(pk__in=[])  # always false
+        equal: dict = {}
+        for (field, descending), value in zip(self.keys, values):
+            lookup = 'lt' if descending else 'gt'
+            q |= Q(**equal, **{f'{field.name}__{lookup}': value})
+            equal[field.name] = value
+        return qs.filter(q)
+
+
+def connection_from_queryset(
+    connection_type: type[graphene.relay.Connection], qs: QuerySet, first: int | None = None,
+    after: str | None = None, transform: Callable[[Sequence[Model]], Sequence[Model]] | None = None,
+) -> graphene.relay.Connection:
+    """Return a page of `qs` as a Relay connection, paginated with `KeysetCursor`.
+
+    `transform` is called with the objects of the page and returns the nodes of the edges.
+    Only forward pagination is supported. The unpaginated queryset is available in the
+    `queryset` attribute of the connection, e.g. for computing the total count.
+    """
+    if first is not None and first < 0:
+        raise GraphQLError("'first' must not be negative")
+    cursor = KeysetCursor(qs)
+    page_qs = cursor.order(qs)
+    if after:
+        page_qs = cursor.filter_after(page_qs, after)
+    if first is not None:
+        # Fetch one extra row to find out whether there is a next page
+        objs = list(page_qs[:first + 1])
+        has_next_page = len(objs) > first
+        objs = objs[:first]
+    else:
+        objs = list(page_qs)
+        has_next_page = False
+
+    cursors = [cursor.encode(obj) for obj in objs]
+    nodes = transform(objs) if transform is not None else objs
+    edges = [connection_type.Edge(node=node, cursor=c) for node, c in zip(nodes, cursors)]
+    connection = connection_type(
+        edges=edges,
+        page_info=graphene.relay.PageInfo(
+            start_cursor=cursors[0] if cursors else None,
+            end_cursor=cursors[-1] if cursors else None,
+            has_previous_page=bool(after),
+            has_next_page=has_next_page,
+        ),
+    )
+    connection.queryset = qs
+    return connection
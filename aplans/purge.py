@@ -0,0 +1,298 @@
+"""Deleting large sets of rows together with everything that depends on them.
+
+`QuerySet.delete()` loads every object of the cascade into memory and deletes them in one transaction, so
+memory use and lock time grow with the amount of data. `Purge` walks the relations between the models and
+collects only the primary keys of the rows to delete, with one query per relation and batch of rows, which
+also gives exact counts for a dry run. The rows are then deleted in batches in dependency order.
+"""
+from __future__ import annotations
+
+import logging
+import typing
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+from typing import Iterable, Iterator
+
+from django.contrib.contenttypes.fields import GenericRelation
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+from django.db.models import Q
+from django.db.models.deletion import get_candidate_relations_to_delete
+from treebeard.mp_tree import MP_Node
+
+if typing.TYPE_CHECKING:
+    from django.db.models import Field, Model, QuerySet
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+ModelType = type['Model']
+
+
+class PurgeError(Exception):
+    pass
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def is_tree_model(model: ModelType) -> bool:
+    """Return true if the rows of the model are treebeard tree nodes, i.e., the tree columns are in its table."""
+    return issubclass(model, MP_Node) and any(f.name == 'path' for f in model._meta.local_fields)
+
+
+class Purge:
+    """Deletes rows and all the rows that Django would delete with them in a cascade.
+
+    Like `QuerySet.delete()`, this deletes the rows referencing the purged rows with `on_delete=CASCADE`, sets the
+    fields referencing them with `SET_NULL` and `SET_DEFAULT` and refuses to delete rows referenced with `PROTECT`
+    or `RESTRICT`. Rows related with a `GenericRelation`, the parent rows of multi-table inherited models and the
+    descendants of treebeard nodes are deleted, too.
+
+    The rows are deleted with `_raw_delete()`, which is safe because all the relations have been handled by the
+    purge itself. Delete signals are not sent, so `delete_files()` must be called afterwards to delete the files of
+    the deleted rows and the search index must be updated.
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE):
+        self.batch_size = batch_size
+        self.pks: dict[ModelType, set] = defaultdict(set)
+        # Primary keys of the rows whose field references a purged row
+        self.field_updates: dict[Field, set] = defaultdict(set)
+        self.protected: dict[Field, set] = defaultdict(set)
+        # Paths of the parents of purged tree nodes; their `numchild` must be updated
+        self.tree_parents: dict[ModelType, set[str]] = defaultdict(set)
+        self.files: dict[Field, set[str]] = defaultdict(set)
+        self._queue: list[tuple[ModelType, set]] = []
+
+    def add(self, qs: QuerySet):
+        self._add(qs.model, qs.values_list('pk', flat=True))
+
+    def _add(self, model: ModelType, pks: Iterable):
+        model = model._meta.concrete_model
+        new_pks = set(pks) - self.pks[model]
+        if new_pks:
+            self.pks[model] |= new_pks
+            self._queue.append((model, new_pks))
+
+    def collect(self):
+        """Find the rows that depend on the added rows."""
+        while self._queue:
+            model, pks = self._queue.pop()
+            for batch in chunked(pks, self.batch_size):
+                self._collect_parents(model, batch)
+                if is_tree_model(model):
+                    self._collect_tree_descendants(model, batch)
+                self._collect_related(model, batch)
+                self._collect_generic_related(model, batch)
+
+    def _collect_parents(self, model: ModelType, batch: list):
+        # The row of a multi-table inherited model is deleted with the row of its parent model
+        for parent, parent_link in model._meta.parents.items():
+            if parent_link is not None:
+                self._add(parent, model._base_manager.filter(pk__in=batch).values_list(parent_link.attname, flat=True))
+
+    def _collect_tree_descendants(self, model: ModelType, batch: list):
+        nodes = model._base_manager.filter(pk__in=batch).values_list('path', 'depth')
+        paths = []
+        for path, depth in nodes:
+            paths.append(path)
+            if depth > 1:
+                self.tree_parents[model].add(path[:-model.steplen])
+        if paths:
+            descendants = model._base_manager.filter(reduce(or_, (Q(path__startswith=path) for path in paths)))
+            self._add(model, descendants.values_list('pk', flat=True))
+
+    def _collect_related(self, model: ModelType, batch: list):
+        for relation in get_candidate_relations_to_delete(model._meta):
+            field = relation.field
+            on_delete = field.remote_field.on_delete
+            if on_delete == models.DO_NOTHING:
+                continue
+            if field.target_field.primary_key:
+                targets = batch
+            else:
+                targets = model._base_manager.filter(pk__in=batch).values(field.target_field.attname)
+            referencing = (
+                field.model._base_manager.filter(**{f'{field.name}__in': targets}).values_list('pk', flat=True)
+            )
+            if on_delete == models.CASCADE:
+                self._add(field.model, referencing)
+            elif on_delete in (models.SET_NULL, models.SET_DEFAULT):
+                self.field_updates[field] |= set(referencing)
+            elif on_delete in (models.PROTECT, models.RESTRICT):
+                self.protected[field] |= set(referencing)
+            else:
+                raise PurgeError(f"Unsupported on_delete handler for {field.model._meta.label}.{field.name}")
+
+    def _collect_generic_related(self, model: ModelType, batch: list):
+        for field in model._meta.private_fields:
+            if not isinstance(field, GenericRelation):
+                continue
+            related_model = field.related_model
+            content_type = ContentType.objects.db_manager(related_model._base_manager.db).get_for_model(
+                model, for_concrete_model=field.for_concrete_model,
+            )
+            object_id_field = related_model._meta.get_field(field.object_id_field_name)
+            related = related_model._base_manager.filter(**{
+                field.content_type_field_name: content_type,
+                f'{field.object_id_field_name}__in': [object_id_field.to_python(pk) for pk in batch],
+            })
+            self._add(related_model, related.values_list('pk', flat=True))
+
+    def get_protected(self) -> dict[Field, set]:
+        """Return the rows that are not purged but reference purged rows and prevent deleting them."""
+        protected = {}
+        for field, pks in self.protected.items():
+            remaining = pks - self.pks.get(field.model._meta.concrete_model, set())
+            if remaining:
+                protected[field] = remaining
+        return protected
+
+    def get_counts(self) -> dict[str, int]:
+        """Return the number of rows to delete by model label."""
+        return dict(sorted((model._meta.label, len(pks)) for model, pks in self.pks.items() if pks))
+
+    def get_update_counts(self) -> dict[str, int]:
+        """Return the number of rows whose field is to be set to null or its default by field."""
+        counts = {}
+        for field, pks in self.field_updates.items():
+            remaining = pks - self.pks.get(field.model._meta.concrete_model, set())
+            if remaining:
+                counts[f'{field.model._meta.label}.{field.name}'] = len(remaining)
+        return dict(sorted(counts.items()))
+
+    def get_deletion_order(self) -> list[list[ModelType]]:
+        """Return groups of models so that the rows of a group only reference rows of later groups or themselves.
+
+        A group has more than one model if the models reference each other.
+        """
+        graph: dict[ModelType, set[ModelType]] = {model: set() for model, pks in self.pks.items() if pks}
+        for model in graph:
+            for field in model._meta.local_concrete_fields:
+                if not field.is_relation or field.remote_field.on_delete in (models.SET_NULL, models.SET_DEFAULT):
+                    # Fields that are set to null or their default are updated before deleting
+                    continue
+                target = field.related_model._meta.concrete_model
+                if target in graph:
+                    graph[model].add(target)
+        return list(reversed(strongly_connected_components(graph)))
+
+    def _references_itself(self, model: ModelType) -> bool:
+        return any(
+            field.is_relation and field.related_model._meta.concrete_model is model
+            for field in model._meta.local_concrete_fields
+        )
+
+    def delete(self) -> dict[str, int]:
+        """Delete the collected rows and return the number of deleted rows by model label.
+
+        Each batch is deleted in its own transaction, except for models whose rows reference each other, which
+        are deleted in one transaction. If this is interrupted, it can be run again for the remaining rows.
+        """
+        self.collect()
+        protected = self.get_protected()
+        if protected:
+            fields = ', '.join(f'{field.model._meta.label}.{field.name}' for field in protected)
+            raise PurgeError(f"Rows to be deleted are referenced by protected foreign keys: {fields}")
+
+        for field, pks in self.field_updates.items():
+            value = None if field.remote_field.on_delete == models.SET_NULL else field.get_default()
+            remaining = pks - self.pks.get(field.model._meta.concrete_model, set())
+            for batch in chunked(remaining, self.batch_size):
+                with transaction.atomic():
+                    field.model._base_manager.filter(pk__in=batch).update(**{field.attname: value})
+
+        counts = {}
+        for group in self.get_deletion_order():
+            if len(group) > 1 or self._references_itself(group[0]):
+                with transaction.atomic():
+                    for model in group:
+                        counts[model._meta.label] = self._delete_rows(model)
+            else:
+                counts[group[0]._meta.label] = self._delete_rows(group[0])
+        self._update_tree_parents()
+        return counts
+
+    def _delete_rows(self, model: ModelType) -> int:
+        file_fields = [field for field in model._meta.local_concrete_fields if isinstance(field, models.FileField)]
+        deleted = 0
+        for batch in chunked(sorted(self.pks[model]), self.batch_size):
+            with transaction.atomic():
+                qs = model._base_manager.filter(pk__in=batch)
+                for field in file_fields:
+                    self.files[field] |= {name for name in qs.values_list(field.attname, flat=True) if name}
+                deleted += qs._raw_delete(qs.db)
+        return deleted
+
+    def _update_tree_parents(self):
+        """Update the number of children of the remaining parents of the deleted tree nodes."""
+        for model, parent_paths in self.tree_parents.items():
+            manager = model._base_manager
+            for batch in chunked(parent_paths, self.batch_size):
+                parents = list(manager.filter(path__in=batch))
+                if not parents:
+                    continue
+                children = manager.filter(reduce(or_, (
+                    Q(path__startswith=parent.path, depth=parent.depth + 1) for parent in parents
+                ))).values_list('path', flat=True)
+                numchild: dict[str, int] = defaultdict(int)
+                for path in children:
+                    numchild[path[:-model.steplen]] += 1
+                for parent in parents:
+                    parent.numchild = numchild[parent.path]
+                with transaction.atomic():
+                    manager.bulk_update(parents, ['numchild'])
+
+    def delete_files(self):
+        """Delete the files of the deleted rows that are not used by remaining rows."""
+        for field, names in self.files.items():
+            for batch in chunked(names, self.batch_size):
+                used = set(field.model._base_manager.filter(**{f'{field.attname}__in': batch}).values_list(
+                    field.attname, flat=True,
+                ))
+                for name in set(batch) - used:
+                    try:
+                        field.storage.delete(name)
+                    except Exception:
+                        logger.exception(f"Error deleting file {name}")
+
+
+def strongly_connected_components(graph: dict[ModelType, set[ModelType]]) -> list[list[ModelType]]:
+    """Return the strongly connected components of the graph so that a component comes after its successors."""
+    index: dict[ModelType, int] = {}
+    lowlink: dict[ModelType, int] = {}
+    stack: list[ModelType] = []
+    on_stack: set[ModelType] = set()
+    components: list[list[ModelType]] = []
+
+    def visit(node: ModelType):
+        index[node] = lowlink[node] = len(index)
+        stack.append(node)
+        on_stack.add(node)
+        for successor in graph[node]:
+            if successor not in index:
+                visit(successor)
+                lowlink[node] = min(lowlink[node], lowlink[successor])
+            elif successor in on_stack:
+                lowlink[node] = min(lowlink[node], index[successor])
+        if lowlink[node] == index[node]:
+            component = []
+            while True:
+                member = stack.pop()
+                on_stack.remove(member)
+                component.append(member)
+                if member is node:
+                    break
+            components.append(component)
+
+    for node in sorted(graph, key=lambda model: model._meta.label):
+        if node not in index:
+            visit(node)
+    return components
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import typing
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Iterable, Iterator
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils import translation
+from wagtail.rich_text import RichText as WagtailRichText, features
+from wagtail.rich_text.rewriters import (
+    FIND_A_TAG, FIND_EMBED_TAG, EmbedRewriter, LinkRewriter, MultiRuleRewriter, extract_attrs
+)
+
+if typing.TYPE_CHECKING:
+    from django.db.models import Model, QuerySet
+    from wagtail.rich_text import EntityHandler
+
+
+ENTITY_CACHE_TIMEOUT = 24 * 3600
+
+ctx_rich_text_references: ContextVar[RichTextReferences] = ContextVar('rich_text_references')
+
+
+class PrefetchedEntityHandlerMixin:
+    """Mixin for rich text entity handlers whose instances can be fetched in bulk by `RichTextReferences`.
+
+    Must come before the Wagtail handler class in the bases.
+    """
+
+    identifier: str
+
+    @classmethod
+    def get_queryset(cls) -> QuerySet:
+        return cls.get_model()._default_manager.all()  # type: ignore[attr-defined]
+
+    @classmethod
+    def prefetch_related(cls, instances: list[Model]):
+        """Fetch in bulk what is needed to expand the given instances, which have just been fetched."""
+        pass
+
+    @classmethod
+    def get_instance(cls, attrs: dict) -> Model:
+        references = ctx_rich_text_references.get(None)
+        if references is not None:
+            instance = references.get_instance(cls, attrs['id'])
+            if instance is not None:
+                return instance
+        return super().get_instance(attrs)  # type: ignore[misc]
+
+
+def iter_entities(html: str) -> Iterator[tuple[type[EntityHandler], dict]]:
+    """Yield the handlers and attributes of the links and embeds in database-representation HTML."""
+    link_types = features.get_link_types()
+    for attr_string in FIND_A_TAG.findall(html):
+        attrs = extract_attrs(attr_string)
+        handler = link_types.get(attrs.get('linktype'))
+        if handler is not None and 'id' in attrs:
+            yield handler, attrs
+    embed_types = features.get_embed_types()
+    for attr_string in FIND_EMBED_TAG.findall(html):
+        attrs = extract_attrs(attr_string)
+        handler = embed_types.get(attrs.get('embedtype'))
+        if handler is not None and 'id' in attrs:
+            yield handler, attrs
+
+
+class RichTextReferences:
+    """Expands the links and embeds of rich text with one query per model.
+
+    Before rich text is expanded, the entities referenced in it are collected. Their expanded HTML is
+    looked up from this object and then from the cache, and the instances of the remaining ones are
+    fetched with one `in_bulk()` query per handler. Use `prefetch()` to do this for a list of rich
+    text sources at once.
+
+    The cached expansions of a handler are invalidated with `invalidate()` when one of its instances
+    is saved or deleted. One object should be used per request.
+    """
+
+    CACHE_KEY = 'rich-text-entity:{identifier}:{version}:{language}:{digest}'
+    VERSION_CACHE_KEY = 'rich-text-entity-version:{identifier}'
+
+    instances: dict[type[EntityHandler], dict[int, Model | None]]
+    expansions: dict[str, str]
+    versions: dict[str, str]
+
+    def __init__(self):
+        self.instances = {}
+        self.expansions = {}
+        self.versions = {}
+
+    @classmethod
+    def get_version_cache_key(cls, identifier: str) -> str:
+        return cls.VERSION_CACHE_KEY.format(identifier=identifier)
+
+    @classmethod
+    def invalidate(cls, handler: type[EntityHandler]):
+        cache.set(cls.get_version_cache_key(handler.identifier), uuid4().hex, timeout=None)
+
+    def get_version(self, handler: type[EntityHandler]) -> str:
+        version = self.versions.get(handler.identifier)
+        if version is None:
+            key = self.get_version_cache_key(handler.identifier)
+            version = cache.get(key)
+            if version is None:
+                cache.add(key, uuid4().hex, timeout=None)
+                version = cache.get(key)
+            self.versions[handler.identifier] = version
+        return version
+
+    def get_cache_key(self, handler: type[EntityHandler], attrs: dict) -> str:
+        digest = hashlib.md5(json.dumps(attrs, sort_keys=True).encode('utf8')).hexdigest()
+        return self.CACHE_KEY.format(
+            identifier=handler.identifier, version=self.get_version(handler), language=translation.get_language(),
+            digest=digest,
+        )
+
+    @contextmanager
+    def activate(self):
+        token = ctx_rich_text_references.set(self)
+        try:
+            yield
+        finally:
+            ctx_rich_text_references.reset(token)
+
+    def get_instance(self, handler: type[EntityHandler], id: str) -> Model | None:
+        """Return the prefetched instance, or None if it has not been fetched."""
+        instances = self.instances.get(handler)
+        try:
+            pk = int(id)
+        except ValueError:
+            return None
+        if instances is None or pk not in instances:
+            return None
+        instance = instances[pk]
+        if instance is None:
+            raise handler.get_model().DoesNotExist()
+        return instance
+
+    def fetch_instances(self, handler: type[PrefetchedEntityHandlerMixin], ids: Iterable[str]):
+        instances = self.instances.setdefault(handler, {})  # type: ignore[arg-type]
+        pks = {int(id) for id in ids if id.isdigit()} - instances.keys()
+        if not pks:
+            return
+        found = handler.get_queryset().in_bulk(pks)
+        handler.prefetch_related(list(found.values()))
+        for pk in pks:
+            instances[pk] = found.get(pk)
+
+    def expand_entity(self, handler: type[EntityHandler], attrs: dict) -> str:
+        key = self.get_cache_key(handler, attrs)
+        html = self.expansions.get(key)
+        if html is None:
+            with self.activate():
+                html = handler.expand_db_attributes(attrs)
+            self.expansions[key] = html
+        return html
+
+    def prefetch(self, sources: Iterable[str | None]):
+        """Expand the entities referenced in the given rich text sources in bulk."""
+        entities: dict[str, tuple[type[EntityHandler], dict]] = {}
+        for source in sources:
+            if not source:
+                continue
+            for handler, attrs in iter_entities(source):
+                if not issubclass(handler, PrefetchedEntityHandlerMixin):
+                    continue
+                key = self.get_cache_key(handler, attrs)
+                if key not in self.expansions:
+                    entities[key] = (handler, attrs)
+        if not entities:
+            return
+
+        self.expansions.update(cache.get_many(entities.keys()))
+        missing = {key: entity for key, entity in entities.items() if key not in self.expansions}
+        ids_by_handler: dict[type[PrefetchedEntityHandlerMixin], set[str]] = {}
+        for handler, attrs in missing.values():
+            ids_by_handler.setdefault(handler, set()).add(attrs['id'])  # type: ignore[arg-type]
+        for handler, ids in ids_by_handler.items():
+            self.fetch_instances(handler, ids)
+
+        expanded = {key: self.expand_entity(handler, attrs) for key, (handler, attrs) in missing.items()}
+        cache.set_many(expanded, timeout=ENTITY_CACHE_TIMEOUT)
+
+    def get_rule(self, handler: type[EntityHandler]):
+        if issubclass(handler, PrefetchedEntityHandlerMixin):
+            return partial(self.expand_entity, handler)
+        return handler.expand_db_attributes
+
+    def expand(self, html: str) -> str:
+        """Same as Wagtail's `expand_db_html()`, but with the entities fetched in bulk."""
+        self.prefetch([html])
+        rewriter = MultiRuleRewriter([
+            LinkRewriter({linktype: self.get_rule(handler) for linktype, handler in features.get_link_types().items()}),
+            EmbedRewriter({
+                embedtype: self.get_rule(handler) for embedtype, handler in features.get_embed_types().items()
+            }),
+        ])
+        return rewriter(html)
+
+
+class RichText(WagtailRichText):
+    """Rich text value whose links and embeds are expanded with `RichTextReferences`.
+
+    Pass the references of the request (`watch_cache.rich_text`) to share the fetched entities between fields.
+    """
+
+    def __init__(self, source, references: RichTextReferences | None = None):
+        super().__init__(source)
+        self.references = references
+
+    def __html__(self):
+        references = self.references or RichTextReferences()
+        return render_to_string('wagtailcore/shared/richtext.html', {'html': references.expand(self.source)})
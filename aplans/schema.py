@@ -90,7 +90,7 @@ class Query(
             return None
 
         if include_related_plans:
-            plans = list(plan_obj.get_all_related_plans(inclusive=True))
+            plans = info.context.watch_cache.for_plan(plan_obj).get_all_related_plans(inclusive=True)
         else:
             plans = [plan_obj]
 
@@ -71,6 +71,7 @@ env = environ.FileAwareEnv(
     ADMIN_BASE_URL=(str, 'http://localhost:8000'),
     LOG_SQL_QUERIES=(bool, False),
     LOG_GRAPHQL_QUERIES=(bool, False),
+    GRAPHQL_TRACING=(bool, False),
     AWS_S3_ENDPOINT_URL=(str, ''),
     AWS_STORAGE_BUCKET_NAME=(str, ''),
     AWS_ACCESS_KEY_ID=(str, ''),
@@ -78,6 +79,15 @@ env = environ.FileAwareEnv(
     REQUEST_LOG_MAX_DAYS=(int, 90),
     REQUEST_LOG_METHODS=(list, ['POST', 'PUT', 'PATCH', 'DELETE']),
     REQUEST_LOG_IGNORE_PATHS=(list, ['/v1/graphql/']),
+    REQUEST_LOG_BUFFER_SIZE=(int, 50),
+    REQUEST_LOG_FLUSH_INTERVAL=(float, 10),
+    FEEDBACK_RATE_LIMIT_PER_IP=(int, 10),
+    FEEDBACK_RATE_LIMIT_PER_PLAN=(int, 200),
+    FEEDBACK_DUPLICATE_WINDOW=(int, 24 * 3600),
+    FEEDBACK_MIN_FILL_TIME=(float, 3),
+    FEEDBACK_QUEUED=(bool, False),
+    FEEDBACK_BUFFER_SIZE=(int, 20),
+    FEEDBACK_FLUSH_INTERVAL=(float, 30),
 )
 
 BASE_DIR = root()
@@ -378,6 +388,7 @@ CORS_ALLOW_HEADERS = list(default_cors_headers) + [
     'sentry-trace',
     'x-cache-plan-identifier',
     'x-cache-plan-domain',
+    'x-graphql-tracing',
 ]
 
 #
@@ -390,6 +401,9 @@ GRAPHENE = {
     ],
     'DJANGO_CHOICE_FIELD_ENUM_V2_NAMING': True,
 }
+# Record the time and SQL queries spent in each resolver of every GraphQL request.
+# Superusers can trace single requests with the `x-graphql-tracing` header.
+GRAPHQL_TRACING = env('GRAPHQL_TRACING')
 
 # Internationalization
 # https://docs.djangoproject.com/en/2.1/topics/i18n/
@@ -666,6 +680,10 @@ THUMBNAIL_PROCESSORS = (
 IMAGE_CROPPING_JQUERY_URL = None
 THUMBNAIL_HIGH_RESOLUTION = True
 
+# Renditions and avatar thumbnails generated in the background when an image is uploaded or changed
+IMAGE_PREGENERATED_FILTER_SPECS = ['fill-800x600-c50', 'max-800x600']
+AVATAR_PREGENERATED_SIZES = ['50x50', '360x360']
+
 WAGTAIL_SLIM_SIDEBAR = False
 WAGTAIL_WORKFLOW_ENABLED = False
 WAGTAILADMIN_NOTIFICATION_INCLUDE_SUPERUSERS = False  # prevents adding superusers to workflow notification recipients
@@ -829,6 +847,22 @@ if env('CONFIGURE_LOGGING') and 'LOGGING' not in locals():
 REQUEST_LOG_MAX_DAYS = env('REQUEST_LOG_MAX_DAYS')
 REQUEST_LOG_METHODS = env('REQUEST_LOG_METHODS')
 REQUEST_LOG_IGNORE_PATHS = env('REQUEST_LOG_IGNORE_PATHS')
+# Logged requests are written in batches of this size, or when the oldest one is older than this many seconds
+REQUEST_LOG_BUFFER_SIZE = env('REQUEST_LOG_BUFFER_SIZE')
+REQUEST_LOG_FLUSH_INTERVAL = env('REQUEST_LOG_FLUSH_INTERVAL')
+
+# Maximum number of user feedback submissions per hour from one IP address and to one plan
+FEEDBACK_RATE_LIMIT_PER_IP = env('FEEDBACK_RATE_LIMIT_PER_IP')
+FEEDBACK_RATE_LIMIT_PER_PLAN = env('FEEDBACK_RATE_LIMIT_PER_PLAN')
+# Identical submissions within this many seconds are stored only once
+FEEDBACK_DUPLICATE_WINDOW = env('FEEDBACK_DUPLICATE_WINDOW')
+# Submissions of forms filled in faster than this many seconds are considered spam
+FEEDBACK_MIN_FILL_TIME = env('FEEDBACK_MIN_FILL_TIME')
+# If set, user feedback is stored in batches like logged requests. Queued submissions are written within
+# FEEDBACK_FLUSH_INTERVAL seconds, but they are lost if the worker process is killed before that.
+FEEDBACK_QUEUED = env('FEEDBACK_QUEUED')
+FEEDBACK_BUFFER_SIZE = env('FEEDBACK_BUFFER_SIZE')
+FEEDBACK_FLUSH_INTERVAL = env('FEEDBACK_FLUSH_INTERVAL')
 
 
 if SENTRY_DSN:
@@ -869,6 +903,10 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'actions.tasks.update_index',
         'schedule': crontab(hour=3, minute=0),
     },
+    'prune-request-log': {
+        'task': 'request_log.tasks.prune_request_log',
+        'schedule': crontab(hour=2, minute=30),
+    },
 }
 # Required for Celery exporter: https://github.com/OvalMoney/celery-exporter
 # For configuration, see also another exporter: https://github.com/danihodovic/celery-exporter
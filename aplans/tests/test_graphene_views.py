@@ -0,0 +1,62 @@
+import pytest
+
+from aplans.graphene_views import GraphQLTracer
+
+pytestmark = pytest.mark.django_db
+
+QUERY = '''
+    query($plan: ID!) {
+      planActions(plan: $plan) {
+        id
+        nextAction {
+          id
+        }
+      }
+    }
+'''
+
+
+@pytest.fixture
+def traced_query(client, graphql_client_query, plan, action_factory):
+    for _ in range(3):
+        action_factory(plan=plan)
+
+    def func(user, **headers):
+        client.force_login(user)
+        return graphql_client_query(QUERY, variables={'plan': plan.identifier}, headers=headers)
+    return func
+
+
+def test_tracing_attributes_n_plus_one_queries(traced_query, superuser):
+    response = traced_query(superuser, HTTP_X_GRAPHQL_TRACING='1')
+    assert 'errors' not in response
+    tracing = response['extensions']['tracing']
+    fields = tracing['fields']
+    # `nextAction` runs one query for each action
+    assert fields['planActions.nextAction']['calls'] == 3
+    assert fields['planActions.nextAction']['sql_queries'] == 3
+    assert fields['planActions.id']['sql_queries'] == 0
+    assert fields['planActions']['sql_queries'] >= 1
+    assert fields['planActions']['rows'] == 3
+    assert tracing['sql_queries'] == sum(field['sql_queries'] for field in fields.values())
+
+
+def test_tracing_requires_superuser(traced_query, user):
+    response = traced_query(user, HTTP_X_GRAPHQL_TRACING='1')
+    assert 'errors' not in response
+    assert 'extensions' not in response
+
+
+def test_tracing_disabled_by_default(traced_query, superuser):
+    response = traced_query(superuser)
+    assert 'errors' not in response
+    assert 'extensions' not in response
+
+
+def test_tracing_enabled_in_settings(traced_query, superuser, settings, monkeypatch):
+    settings.GRAPHQL_TRACING = True
+    logged = []
+    monkeypatch.setattr(GraphQLTracer, 'log', lambda self, operation_name: logged.append(self.get_summary()))
+    response = traced_query(superuser)
+    assert response['extensions']['tracing'] == logged[0]
+    assert logged[0]['fields']['planActions.nextAction']['sql_queries'] == 3
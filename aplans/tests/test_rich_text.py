@@ -0,0 +1,141 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from wagtail.models import Collection, Page, Site
+from wagtail.rich_text import expand_db_html
+from wagtail.test.utils.wagtail_factories import DocumentFactory
+
+from aplans.rich_text import RichTextReferences
+from images.tests.factories import AplansImageFactory
+
+pytestmark = pytest.mark.django_db
+
+LINK_COUNT = 60
+
+
+@pytest.fixture
+def documents():
+    collection = Collection.get_first_root_node()
+    return [DocumentFactory(collection=collection, title=f'Document {i}') for i in range(LINK_COUNT)]
+
+
+def document_links(documents):
+    return ''.join(f'<p><a linktype="document" id="{doc.id}">{doc.title}</a></p>' for doc in documents)
+
+
+@pytest.fixture
+def rich_text(documents):
+    # Links to a missing document and an external page are rendered as usual
+    return document_links(documents) + (
+        '<p><a linktype="document" id="0">Missing</a><a href="https://example.com/">x</a></p>'
+    )
+
+
+def test_links_are_expanded_with_one_query(rich_text, django_assert_num_queries):
+    expected = expand_db_html(rich_text)
+    cache.clear()
+    with django_assert_num_queries(1):
+        html = RichTextReferences().expand(rich_text)
+    assert html == expected
+    assert '<a>Missing</a>' in html
+
+    # Other requests get the expanded links from the cache
+    with django_assert_num_queries(0):
+        assert RichTextReferences().expand(rich_text) == expected
+
+
+def test_prefetch_across_sources(documents, django_assert_num_queries):
+    sources = [document_links(documents[i:i + 10]) for i in range(0, LINK_COUNT, 10)]
+    cache.clear()
+    references = RichTextReferences()
+    with django_assert_num_queries(1):
+        references.prefetch(sources)
+        for source in sources:
+            assert references.expand(source) == expand_db_html(source)
+
+
+def test_saving_document_invalidates_cached_links(documents, rich_text, django_assert_num_queries):
+    RichTextReferences().expand(rich_text)
+    doc = documents[0]
+    doc.file.name = 'documents/renamed.pdf'
+    doc.save()
+    with django_assert_num_queries(1):
+        html = RichTextReferences().expand(rich_text)
+    assert 'renamed.pdf' in html
+
+    doc.delete()
+    html = RichTextReferences().expand(rich_text)
+    assert 'renamed.pdf' not in html
+
+
+def test_plan_actions_description_links_are_fetched_once(
+    plan, action_factory, documents, graphql_client_query_data,
+):
+    query = '''
+        query($plan: ID!) {
+          planActions(plan: $plan) {
+            id
+            description
+          }
+        }
+    '''
+    actions = [action_factory(plan=plan, description='<p>No links</p>') for _ in range(3)]
+
+    def count_queries():
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            data = graphql_client_query_data(query, variables={'plan': plan.identifier})
+        return len(ctx.captured_queries), data['planActions']
+
+    baseline, _ = count_queries()
+    links_per_action = LINK_COUNT // len(actions)
+    for i, action in enumerate(actions):
+        action.description = document_links(documents[i * links_per_action:(i + 1) * links_per_action])
+        action.save()
+    count, data = count_queries()
+    assert count == baseline + 1
+    assert all(doc.url in ''.join(a['description'] for a in data) for doc in documents)
+
+
+def count_expand_queries(rich_text):
+    cache.clear()
+    with CaptureQueriesContext(connection) as ctx:
+        html = RichTextReferences().expand(rich_text)
+    assert html == expand_db_html(rich_text)
+    return len(ctx.captured_queries)
+
+
+@pytest.fixture
+def pages():
+    root = Site.objects.get(is_default_site=True).root_page
+    return [root.add_child(instance=Page(title=f'Page {i}', slug=f'page-{i}')) for i in range(LINK_COUNT)]
+
+
+def page_links(pages):
+    return ''.join(f'<p><a linktype="page" id="{page.id}">{page.title}</a></p>' for page in pages)
+
+
+def test_page_links_are_expanded_in_bulk(pages):
+    # The active locale and the translations of the pages are looked up once for all links
+    assert count_expand_queries(page_links(pages)) == count_expand_queries(page_links(pages[:5]))
+    html = RichTextReferences().expand(page_links(pages))
+    assert all(f'href="{page.url}"' in html for page in pages)
+
+
+@pytest.fixture
+def images():
+    images = [AplansImageFactory() for _ in range(LINK_COUNT)]
+    for image in images:
+        image.get_rendition('width-500')
+    return images
+
+
+def image_embeds(images):
+    return ''.join(f'<embed embedtype="image" id="{image.id}" format="left" alt="Image"/>' for image in images)
+
+
+def test_image_embeds_are_expanded_in_bulk(images):
+    # The images and their renditions are fetched with one query each
+    assert count_expand_queries(image_embeds(images)) == 2
+    assert count_expand_queries(image_embeds(images[:5])) == 2
@@ -0,0 +1,8 @@
+"""GraphQL performance regression benchmarks.
+
+The benchmarks seed a large synthetic plan and run a curated set of frontend
+queries against the GraphQL endpoint, comparing the number of SQL queries and
+the wall time against the budgets in `budgets.json`, which is generated from a
+measured run with `--update-budgets`. They are not part of the default test
+run; run them with `pytest --benchmarks benchmarks`.
+"""
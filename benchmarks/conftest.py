@@ -0,0 +1,40 @@
+from pathlib import Path
+import pytest
+
+from .harness import BudgetFile, write_report
+from .seed import SeedSize, seed_plan
+
+
+@pytest.fixture(scope='session')
+def benchmark_scale(request):
+    return request.config.getoption('budget_scale')
+
+
+@pytest.fixture(scope='session')
+def benchmark_budgets():
+    return BudgetFile.load()
+
+
+@pytest.fixture(scope='session')
+def benchmark_plan(django_db_setup, django_db_blocker, benchmark_scale):
+    """Seed the synthetic plan once for the whole session."""
+    with django_db_blocker.unblock():
+        return seed_plan(SeedSize().scaled(benchmark_scale))
+
+
+@pytest.fixture(scope='session')
+def benchmark_results(request, benchmark_budgets, benchmark_scale):
+    """Collect the measurements and write the report and budgets at the end of the session."""
+    results = []
+    yield results
+    if not results:
+        return
+    config = request.config
+    if config.getoption('update_budgets'):
+        benchmark_budgets.update_from(results, benchmark_scale)
+        benchmark_budgets.save()
+    report_path = config.getoption('budget_report')
+    if report_path:
+        write_report(
+            Path(report_path), results, benchmark_budgets, benchmark_scale, config.getoption('budget_baseline'),
+        )
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+import math
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+
+BENCHMARK_DIR = Path(__file__).parent
+QUERY_DIR = BENCHMARK_DIR / 'queries'
+BUDGET_FILE = BENCHMARK_DIR / 'budgets.json'
+GRAPHQL_URL = '/v1/graphql/'
+
+# Headroom added to the measured values when budgets are regenerated. The number of SQL queries is
+# deterministic, so a couple of extra queries is enough to tolerate small changes while catching N+1 queries.
+QUERY_HEADROOM = 2
+TIME_HEADROOM = 1.5
+
+
+@dataclass
+class Measurement:
+    name: str
+    sql_queries: int
+    times_ms: list[float] = field(default_factory=list)
+
+    @property
+    def time_ms(self) -> float:
+        return statistics.median(self.times_ms)
+
+
+@dataclass
+class Budget:
+    sql_queries: int
+    time_ms: int
+
+
+@dataclass
+class BudgetFile:
+    scale: float
+    budgets: dict[str, Budget]
+
+    @classmethod
+    def load(cls, path: Path = BUDGET_FILE) -> BudgetFile:
+        if not path.exists():
+            return cls(scale=1.0, budgets={})
+        data = json.loads(path.read_text())
+        return cls(
+            scale=data['scale'],
+            budgets={name: Budget(**budget) for name, budget in data['budgets'].items()},
+        )
+
+    def save(self, path: Path = BUDGET_FILE):
+        data = dict(scale=self.scale, budgets={name: asdict(b) for name, b in sorted(self.budgets.items())})
+        path.write_text(json.dumps(data, indent=2) + '\n')
+
+    def update_from(self, measurements: list[Measurement], scale: float):
+        if scale != self.scale:
+            # Time budgets from a different data volume are meaningless
+            self.budgets = {}
+            self.scale = scale
+        for m in measurements:
+            self.budgets[m.name] = Budget(
+                sql_queries=m.sql_queries + QUERY_HEADROOM,
+                time_ms=int(math.ceil(m.time_ms * TIME_HEADROOM / 100) * 100),
+            )
+
+
+def load_queries() -> dict[str, str]:
+    return {path.stem: path.read_text() for path in sorted(QUERY_DIR.glob('*.graphql'))}
+
+
+def run_query(client: Client, name: str, query: str, variables: dict, rounds: int) -> Measurement:
+    """Run a query `rounds` times through the GraphQL view and measure it.
+
+    The caches are cleared before each round, so the SQL query count is that
+    of the first request after a deploy or a cache flush.
+    """
+    body = json.dumps(dict(query=query, variables=variables))
+    measurement: Measurement | None = None
+    for _ in range(rounds):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            response = client.post(GRAPHQL_URL, body, content_type='application/json')
+            elapsed = (time.perf_counter() - start) * 1000
+        data = json.loads(response.content)
+        if 'errors' in data:
+            raise AssertionError('Query %s failed: %s' % (name, data['errors']))
+        if measurement is None:
+            measurement = Measurement(name=name, sql_queries=len(ctx.captured_queries))
+        measurement.times_ms.append(elapsed)
+    assert measurement is not None
+    return measurement
+
+
+def check_budget(measurement: Measurement, budget: Budget | None, check_time: bool) -> list[str]:
+    """Return the budget violations of a measurement."""
+    if budget is None:
+        return ['%s: no budget defined, generate the budgets with --update-budgets' % measurement.name]
+    errors = []
+    if measurement.sql_queries > budget.sql_queries:
+        errors.append('%s: %d SQL queries, budget is %d' % (
+            measurement.name, measurement.sql_queries, budget.sql_queries,
+        ))
+    if check_time and measurement.time_ms > budget.time_ms:
+        errors.append('%s: %.0f ms, budget is %d ms' % (measurement.name, measurement.time_ms, budget.time_ms))
+    return errors
+
+
+def render_report(
+    measurements: list[Measurement], budgets: BudgetFile, scale: float, baseline: dict[str, dict] | None = None,
+) -> str:
+    """Render a Markdown table comparing the measurements to the budgets and an optional earlier report."""
+    lines = [
+        '# GraphQL benchmark report (scale %s)' % scale,
+        '',
+        '| Query | SQL queries | Budget | Δ baseline | Time (ms) | Budget (ms) | Δ baseline |',
+        '|---|---:|---:|---:|---:|---:|---:|',
+    ]
+    baseline = baseline or {}
+    for m in measurements:
+        budget = budgets.budgets.get(m.name)
+        base = baseline.get(m.name)
+        lines.append('| %s | %d | %s | %s | %.0f | %s | %s |' % (
+            m.name,
+            m.sql_queries,
+            budget.sql_queries if budget else '-',
+            '%+d' % (m.sql_queries - base['sql_queries']) if base else '-',
+            m.time_ms,
+            budget.time_ms if budget else '-',
+            '%+.0f' % (m.time_ms - base['time_ms']) if base else '-',
+        ))
+    return '\n'.join(lines) + '\n'
+
+
+def write_report(path: Path, measurements: list[Measurement], budgets: BudgetFile, scale: float, baseline_path=None):
+    """Write the results as JSON or, for other file extensions, as a Markdown report."""
+    if path.suffix == '.json':
+        data = dict(scale=scale, results={
+            m.name: dict(sql_queries=m.sql_queries, time_ms=m.time_ms, times_ms=m.times_ms) for m in measurements
+        })
+        path.write_text(json.dumps(data, indent=2) + '\n')
+        return
+    baseline = None
+    if baseline_path is not None:
+        baseline = json.loads(Path(baseline_path).read_text())['results']
+    path.write_text(render_report(measurements, budgets, scale, baseline))
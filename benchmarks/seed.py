@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import datetime
+import random
+import typing
+from dataclasses import dataclass
+
+from actions.tests.factories import (
+    ActionFactory, ActionImpactFactory, ActionImplementationPhaseFactory, ActionResponsiblePartyFactory,
+    ActionScheduleFactory, ActionStatusFactory, CategoryFactory, CategoryTypeFactory, PlanFactory,
+)
+from indicators.tests.factories import (
+    ActionIndicatorFactory, IndicatorFactory, IndicatorGoalFactory, IndicatorLevelFactory, IndicatorValueFactory,
+    QuantityFactory, UnitFactory,
+)
+from orgs.tests.factories import OrganizationClassFactory, OrganizationFactory
+
+if typing.TYPE_CHECKING:
+    from actions.models import Plan
+
+
+@dataclass
+class SeedSize:
+    organizations: int = 300
+    category_types: int = 3
+    categories: int = 200
+    actions: int = 2000
+    indicators: int = 1000
+    responsible_parties_per_action: int = 2
+    categories_per_action: int = 2
+    indicators_per_action: int = 2
+    values_per_indicator: int = 5
+
+    def scaled(self, scale: float) -> SeedSize:
+        def scale_count(count: int) -> int:
+            return max(1, round(count * scale))
+
+        return SeedSize(
+            organizations=scale_count(self.organizations),
+            category_types=self.category_types,
+            categories=scale_count(self.categories),
+            actions=scale_count(self.actions),
+            indicators=scale_count(self.indicators),
+            responsible_parties_per_action=self.responsible_parties_per_action,
+            categories_per_action=self.categories_per_action,
+            indicators_per_action=self.indicators_per_action,
+            values_per_indicator=self.values_per_indicator,
+        )
+
+
+def seed_plan(size: SeedSize, seed: int = 0) -> Plan:
+    """Create a plan with the given number of actions, indicators, categories and organizations.
+
+    The objects are created with the regular test factories so that the data looks
+    like what the frontend sees. Shared objects (statuses, units and so on) are passed
+    in explicitly so that the factories do not create one for every action.
+    """
+    rnd = random.Random(seed)
+
+    org_class = OrganizationClassFactory()
+    root_org = OrganizationFactory(classification=org_class)
+    # Two-level hierarchy under the plan organization
+    departments = [
+        OrganizationFactory(classification=org_class, parent=root_org)
+        for _ in range(max(1, size.organizations // 10))
+    ]
+    organizations = list(departments)
+    while len(organizations) < size.organizations:
+        organizations.append(OrganizationFactory(classification=org_class, parent=rnd.choice(departments)))
+
+    plan = PlanFactory(organization=root_org, image=None)
+    plan.create_default_site()
+    plan.save()
+
+    statuses = [ActionStatusFactory(plan=plan) for _ in range(4)]
+    phases = [ActionImplementationPhaseFactory(plan=plan) for _ in range(4)]
+    impacts = [ActionImpactFactory(plan=plan) for _ in range(3)]
+    schedules = [ActionScheduleFactory(plan=plan) for _ in range(2)]
+
+    categories = []
+    per_type = max(1, size.categories // size.category_types)
+    for _ in range(size.category_types):
+        ct = CategoryTypeFactory(plan=plan, common=None, usable_for_actions=True, usable_for_indicators=True)
+        roots = [CategoryFactory(type=ct, image=None, common=None) for _ in range(max(1, per_type // 5))]
+        children = [
+            CategoryFactory(type=ct, image=None, common=None, parent=rnd.choice(roots))
+            for _ in range(per_type - len(roots))
+        ]
+        categories += roots + children
+
+    actions = []
+    for _ in range(size.actions):
+        action = ActionFactory(
+            plan=plan, image=None, status=rnd.choice(statuses), implementation_phase=rnd.choice(phases),
+            impact=rnd.choice(impacts), schedule=[rnd.choice(schedules)],
+            categories=rnd.sample(categories, min(len(categories), size.categories_per_action)),
+        )
+        for org in rnd.sample(organizations, min(len(organizations), size.responsible_parties_per_action)):
+            ActionResponsiblePartyFactory(action=action, organization=org)
+        actions.append(action)
+
+    unit = UnitFactory()
+    quantity = QuantityFactory()
+    for _ in range(size.indicators):
+        indicator = IndicatorFactory(
+            organization=rnd.choice(organizations), unit=unit, quantity=quantity, common=None,
+        )
+        IndicatorLevelFactory(indicator=indicator, plan=plan)
+        for year in range(size.values_per_indicator):
+            IndicatorValueFactory(
+                indicator=indicator, date=datetime.date(2015 + year, 12, 31), value=rnd.uniform(0, 100),
+            )
+        IndicatorGoalFactory(indicator=indicator, date=datetime.date(2030, 12, 31), value=rnd.uniform(0, 100))
+        indicator.handle_values_update()
+        for action in rnd.sample(actions, min(len(actions), size.indicators_per_action)):
+            ActionIndicatorFactory(action=action, indicator=indicator)
+
+    return plan
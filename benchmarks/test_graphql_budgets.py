@@ -0,0 +1,29 @@
+import pytest
+
+from .harness import check_budget, load_queries, run_query
+
+pytestmark = pytest.mark.django_db
+
+QUERIES = load_queries()
+
+
+def get_variables(name, plan):
+    variables = dict(plan=plan.identifier)
+    if name == 'action_details':
+        variables['action'] = plan.actions.order_by('order').first().identifier
+    return variables
+
+
+@pytest.mark.parametrize('name', QUERIES.keys())
+def test_graphql_query_budget(
+    name, client, request, benchmark_plan, benchmark_budgets, benchmark_scale, benchmark_results,
+):
+    measurement = run_query(
+        client, name, QUERIES[name], get_variables(name, benchmark_plan), request.config.getoption('budget_rounds'),
+    )
+    benchmark_results.append(measurement)
+    if request.config.getoption('update_budgets'):
+        return
+    check_time = benchmark_scale == benchmark_budgets.scale
+    errors = check_budget(measurement, benchmark_budgets.budgets.get(name), check_time)
+    assert not errors, '\n'.join(errors)
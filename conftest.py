@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from pathlib import Path
 from typing import Protocol, Type
 import factory
 import json
@@ -38,6 +39,41 @@ import logging
 logging.getLogger('pytest_factoryboy.codegen').setLevel(logging.WARN)
 
 
+BENCHMARKS_DIR = Path(__file__).resolve().parent / 'benchmarks'
+
+
+def pytest_addoption(parser):
+    # The options of the benchmarks in `benchmarks` are registered here, because options can only be added in the
+    # root conftest when the tests are not run from the benchmarks directory
+    group = parser.getgroup('graphql benchmarks')
+    group.addoption(
+        '--benchmarks', action='store_true',
+        help="Run the GraphQL benchmarks, which are not collected otherwise",
+    )
+    group.addoption(
+        '--budget-scale', type=float, default=1.0,
+        help="Multiplier for the size of the seeded plan (time budgets are only checked at the budget file's scale)",
+    )
+    group.addoption('--budget-rounds', type=int, default=3, help="Number of times each query is run")
+    group.addoption(
+        '--budget-report', metavar='PATH',
+        help="Write the results to PATH (JSON if the name ends with .json, otherwise a Markdown report)",
+    )
+    group.addoption(
+        '--budget-baseline', metavar='PATH', help="JSON results of an earlier run to compare against in the report",
+    )
+    group.addoption(
+        '--update-budgets', action='store_true',
+        help="Write the measured values to the budget file instead of checking",
+    )
+
+
+def pytest_ignore_collect(collection_path: Path, config):
+    if collection_path.resolve() == BENCHMARKS_DIR and not config.getoption('benchmarks'):
+        return True
+    return None
+
+
 class JSONAPIClient(APIClient):
     default_format = 'json'
 
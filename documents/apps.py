@@ -1,4 +1,11 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
+
+
+def invalidate_document_links(sender, **kwargs):
+    from aplans.rich_text import RichTextReferences
+    from .rich_text import DocumentLinkHandler
+    RichTextReferences.invalidate(DocumentLinkHandler)
 
 
 class DocumentsConfig(AppConfig):
@@ -19,3 +26,8 @@ class DocumentsConfig(AppConfig):
 
         from wagtail.documents import wagtail_hooks  # noqa
         from .rich_text import DocumentLinkHandler  # noqa
+
+        from wagtail.documents import get_document_model
+        document_model = get_document_model()
+        post_save.connect(invalidate_document_links, sender=document_model, dispatch_uid='document_links_saved')
+        post_delete.connect(invalidate_document_links, sender=document_model, dispatch_uid='document_links_deleted')
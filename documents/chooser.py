@@ -1,100 +1,141 @@
-from django.core.paginator import Paginator
-from django.template.response import TemplateResponse
-from django.urls import reverse
-from django.utils.translation import gettext as _
-
-from wagtail.admin.forms.search import SearchForm
-from wagtail.admin.modal_workflow import render_modal_workflow
-from wagtail import hooks
-from wagtail.models import Collection
-from wagtail.documents import get_document_model
-from wagtail.documents.forms import get_document_form
-from wagtail.documents.permissions import permission_policy
-
-_wagtail_get_chooser_context = None
-
-
-def chooser(request):
-    Document = get_document_model()
-
-    if permission_policy.user_has_permission(request.user, 'add'):
-        DocumentForm = get_document_form(Document)
-        uploadform = DocumentForm(user=request.user, prefix='document-chooser-upload')
-    else:
-        uploadform = None
-
-    documents = Document.objects.all()
-
-    # allow hooks to modify the queryset
-    for hook in hooks.get_hooks('construct_document_chooser_queryset'):
-        documents = hook(documents, request)
-
-    q = None
-    if 'q' in request.GET or 'p' in request.GET or 'collection_id' in request.GET:
-
-        collection_id = request.GET.get('collection_id')
-        if collection_id:
-            documents = documents.filter(collection=collection_id)
-        documents_exist = documents.exists()
-
-        searchform = SearchForm(request.GET)
-        if searchform.is_valid():
-            q = searchform.cleaned_data['q']
-
-            documents = documents.search(q)
-            is_searching = True
-        else:
-            documents = documents.order_by('-created_at')
-            is_searching = False
-
-        # Pagination
-        paginator = Paginator(documents, per_page=10)
-        documents = paginator.get_page(request.GET.get('p'))
-
-        return TemplateResponse(request, "wagtaildocs/chooser/results.html", {
-            'documents': documents,
-            'documents_exist': documents_exist,
-            'uploadform': uploadform,
-            'query_string': q,
-            'is_searching': is_searching,
-            'collection_id': collection_id,
-        })
-    else:
-        searchform = SearchForm()
-
-        plan = request.user.get_active_admin_plan()
-        if plan.root_collection is not None:
-            collections = plan.root_collection.get_descendants(inclusive=True)
-        else:
-            collections = []
-
-        if len(collections) < 2:
-            collections = None
-        else:
-            collections = Collection.order_for_display(collections)
-
-        documents = documents.order_by('-created_at')
-        documents_exist = documents.exists()
-        paginator = Paginator(documents, per_page=10)
-        documents = paginator.get_page(request.GET.get('p'))
-
-        return render_modal_workflow(request, 'wagtaildocs/chooser/chooser.html', None, {
-            'documents': documents,
-            'documents_exist': documents_exist,
-            'uploadform': uploadform,
-            'searchform': searchform,
-            'collections': collections,
-            'is_searching': False,
-        }, json_data={
-            'step': 'chooser',
-            'error_label': _("Server Error"),
-            'error_message': _("Report this error to your webmaster with the following information:"),
-            'tag_autocomplete_url': reverse('wagtailadmin_tag_autocomplete'),
-        })
+from __future__ import annotations
+
+import base64
+import binascii
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Q
+from django.http import Http404
+from wagtail.documents.views.chooser import DocumentChooseResultsView, DocumentChooseView
+
+from .permissions import permission_policy
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    value = f'{created_at.isoformat()}|{id}'
+    return base64.urlsafe_b64encode(value.encode('utf8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        value = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf8')
+        created_at, id = value.split('|')
+        return datetime.fromisoformat(created_at), int(id)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+
+@dataclass
+class KeysetPage:
+    """One page of chooser results, delimited by the (created_at, id) of its first and last document."""
+
+    object_list: list = field(default_factory=list)
+    has_next: bool = False
+    has_previous: bool = False
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def next_cursor(self) -> str | None:
+        if not self.has_next:
+            return None
+        last = self.object_list[-1]
+        return encode_cursor(last.created_at, last.id)
+
+    @property
+    def previous_cursor(self) -> str | None:
+        if not self.has_previous:
+            return None
+        first = self.object_list[0]
+        return encode_cursor(first.created_at, first.id)
+
+
+class PlanDocumentChooseViewMixin:
+    """Lists only the documents in the collections of the active plan.
+
+    Unless the user is searching, the results are paginated with a keyset on `(created_at, id)`
+    instead of page numbers, so that no page needs to count or skip over the documents before it.
+    The `after` and `before` query parameters hold the cursor of the last document of the previous
+    page and the first document of the next page, respectively.
+    """
+
+    ordering = ('-created_at', '-id')
+    results_template_name = 'documents/chooser/results.html'
+
+    def get_object_list(self):
+        plan = self.request.user.get_active_admin_plan()
+        if plan.root_collection is None:
+            return self.model_class.objects.none()
+        # The collections are used as a subquery, so that no separate query is made for them
+        collections = plan.root_collection.get_descendants(inclusive=True)
+        return self.permission_policy.instances_user_has_any_permission_for(
+            self.request.user, ['choose']
+        ).filter(collection__in=collections)
+
+    def get_cursor(self, request, name: str) -> tuple[datetime, int] | None:
+        cursor = request.GET.get(name)
+        if not cursor:
+            return None
+        try:
+            return decode_cursor(cursor)
+        except ValueError:
+            raise Http404
+
+    def get_results_page(self, request):
+        objects = self.get_object_list()
+        objects = self.apply_object_list_ordering(objects)
+        objects = self.filter_object_list(objects)
+        if self.filter_form.is_searching:
+            # Search results are ordered by relevance, so they are paginated by page number
+            paginator = Paginator(objects, per_page=self.per_page)
+            try:
+                return paginator.page(request.GET.get('p', 1))
+            except InvalidPage:
+                raise Http404
+
+        after = self.get_cursor(request, 'after')
+        before = self.get_cursor(request, 'before')
+        if after is not None:
+            created_at, id = after
+            objects = objects.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=id))
+        elif before is not None:
+            created_at, id = before
+            objects = objects.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=id))
+            objects = objects.order_by('created_at', 'id')
+
+        # Fetch one extra document to find out whether there is another page
+        documents = list(objects[:self.per_page + 1])
+        has_more = len(documents) > self.per_page
+        documents = documents[:self.per_page]
+        if before is not None:
+            documents.reverse()
+            return KeysetPage(documents, has_next=True, has_previous=has_more)
+        return KeysetPage(documents, has_next=has_more, has_previous=after is not None)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['keyset_pagination'] = isinstance(self.results, KeysetPage)
+        return context
+
+
+class PlanDocumentChooseView(PlanDocumentChooseViewMixin, DocumentChooseView):
+    pass
+
+
+class PlanDocumentChooseResultsView(PlanDocumentChooseViewMixin, DocumentChooseResultsView):
+    pass
 
 
 def monkeypatch_chooser():
-    from wagtail.documents.views import chooser as wagtail_chooser
-
-    wagtail_chooser.chooser = chooser
+    from wagtail.documents.views.chooser import viewset
 
+    # The URLs of the viewset are built from these when Wagtail's hooks are loaded
+    viewset.choose_view_class = PlanDocumentChooseView
+    viewset.choose_results_view_class = PlanDocumentChooseResultsView
+    viewset.permission_policy = permission_policy
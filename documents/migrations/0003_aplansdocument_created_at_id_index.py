@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0002_aplansdocument_uploaded_by_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aplansdocument',
+            index=models.Index(fields=['created_at', 'id'], name='documents_created_at_id'),
+        ),
+    ]
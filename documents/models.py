@@ -1,4 +1,5 @@
 from wagtail.documents.models import Document as WagtailDocument, AbstractDocument
+from django.db import models
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
@@ -9,6 +10,10 @@ class AplansDocument(AbstractDocument):
     class Meta:
         verbose_name = _('document')
         verbose_name_plural = _('documents')
+        indexes = [
+            # Keyset pagination of the document chooser
+            models.Index(fields=['created_at', 'id'], name='documents_created_at_id'),
+        ]
 
     @property
     def url(self):
@@ -6,8 +6,10 @@ from wagtail import hooks
 from wagtail.rich_text import LinkHandler
 from wagtail.documents import get_document_model
 
+from aplans.rich_text import PrefetchedEntityHandlerMixin
 
-class DocumentLinkHandler(LinkHandler):
+
+class DocumentLinkHandler(PrefetchedEntityHandlerMixin, LinkHandler):
     identifier = 'document'
 
     @staticmethod
@@ -0,0 +1,91 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from wagtail.documents import get_document_model
+from wagtail.test.utils.wagtail_factories import DocumentFactory
+
+from actions.tests.factories import PlanFactory
+from admin_site.tests.factories import ClientPlanFactory
+
+pytestmark = pytest.mark.django_db
+
+PER_PAGE = 10
+
+
+@pytest.fixture
+def other_plan():
+    return PlanFactory()
+
+
+@pytest.fixture
+def documents(plan, other_plan):
+    docs = [DocumentFactory(collection=plan.root_collection, title=f'Document {i}') for i in range(25)]
+    for i in range(5):
+        DocumentFactory(collection=other_plan.root_collection, title=f'Other plan document {i}')
+    return docs
+
+
+@pytest.fixture
+def chooser_client(client, plan, superuser):
+    ClientPlanFactory(plan=plan)
+    superuser.selected_admin_plan = plan
+    superuser.save(update_fields=['selected_admin_plan'])
+    client.force_login(superuser)
+    return client
+
+
+def get_page(client, **params):
+    response = client.get(reverse('wagtaildocs_chooser:choose_results'), params)
+    assert response.status_code == 200
+    return response.context['results']
+
+
+def get_all_pages(client):
+    pages = [get_page(client)]
+    while pages[-1].has_next:
+        pages.append(get_page(client, after=pages[-1].next_cursor))
+    return pages
+
+
+def test_chooser_lists_only_active_plan_documents(chooser_client, documents):
+    pages = get_all_pages(chooser_client)
+    assert [len(page) for page in pages] == [10, 10, 5]
+    listed = [doc for page in pages for doc in page]
+    assert [doc.id for doc in listed] == [doc.id for doc in reversed(documents)]
+
+
+def test_chooser_choose_view_lists_only_active_plan_documents(chooser_client, documents):
+    response = chooser_client.get(reverse('wagtaildocs_chooser:choose'))
+    assert response.status_code == 200
+    assert {doc.id for doc in response.context['results']} == {doc.id for doc in documents[-PER_PAGE:]}
+
+
+def test_chooser_pages_documents_with_same_timestamp(chooser_client, documents):
+    get_document_model().objects.update(created_at=timezone.now())
+    pages = get_all_pages(chooser_client)
+    listed = [doc.id for page in pages for doc in page]
+    assert listed == sorted((doc.id for doc in documents), reverse=True)
+
+    # Going back returns the previous page
+    previous = get_page(chooser_client, before=pages[2].previous_cursor)
+    assert [doc.id for doc in previous] == [doc.id for doc in pages[1]]
+    assert previous.has_previous
+
+
+def test_chooser_query_count_is_constant_per_page(chooser_client, documents):
+    def count_queries(**params):
+        with CaptureQueriesContext(connection) as ctx:
+            page = get_page(chooser_client, **params)
+        return ctx.captured_queries, page
+
+    first_queries, first = count_queries()
+    second_queries, second = count_queries(after=first.next_cursor)
+    assert len(first_queries) == len(second_queries)
+    assert not any('COUNT(' in query['sql'] for query in first_queries + second_queries)
+
+
+def test_chooser_rejects_invalid_cursor(chooser_client, documents):
+    response = chooser_client.get(reverse('wagtaildocs_chooser:choose_results'), {'after': 'invalid'})
+    assert response.status_code == 404
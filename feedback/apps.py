@@ -1,5 +1,21 @@
+import atexit
 from django.apps import AppConfig
+from django.core.signals import request_finished
+
+
+def flush_user_feedback(**kwargs):
+    from .intake import user_feedback_buffer
+    user_feedback_buffer.flush_if_due()
+
+
+def flush_user_feedback_at_exit():
+    from .intake import user_feedback_buffer
+    user_feedback_buffer.flush()
 
 
 class FeedbackConfig(AppConfig):
     name = 'feedback'
+
+    def ready(self):
+        request_finished.connect(flush_user_feedback, dispatch_uid='flush_user_feedback')
+        atexit.register(flush_user_feedback_at_exit)
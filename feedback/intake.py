@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from aplans.buffer import BulkCreateBuffer
+
+from .models import UserFeedback
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket rate limit stored in the Django cache.
+
+    Each key gets a bucket of `capacity` tokens that is refilled at `capacity` tokens per
+    `period` seconds. Reading and updating the bucket is not atomic, so concurrent requests
+    may occasionally get through a nearly empty bucket.
+    """
+
+    CACHE_KEY = 'rate-limit:{name}:{key}'
+
+    def __init__(self, name: str, capacity: int, period: float = 3600, clock: Callable[[], float] = time.time):
+        self.name = name
+        self.capacity = capacity
+        self.refill_rate = capacity / period
+        self.clock = clock
+
+    def get_cache_key(self, key: str) -> str:
+        return self.CACHE_KEY.format(name=self.name, key=key)
+
+    def consume(self, key: str) -> bool:
+        """Take a token from the bucket of `key` and return whether there was one."""
+        cache_key = self.get_cache_key(key)
+        now = self.clock()
+        state = cache.get(cache_key)
+        if state is None:
+            tokens = float(self.capacity)
+        else:
+            tokens, updated_at = state
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.refill_rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # Keep the bucket in the cache until it would be full again
+        timeout = math.ceil((self.capacity - tokens) / self.refill_rate) + 1
+        cache.set(cache_key, (tokens, now), timeout=timeout)
+        return allowed
+
+
+def get_client_ip(request: HttpRequest) -> str:
+    # The reverse proxy appends the address of the client to X-Forwarded-For, so the last
+    # address is the only one the client cannot forge.
+    forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if forwarded_for:
+        return forwarded_for.split(',')[-1].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def get_fingerprint(feedback: UserFeedback) -> str:
+    """Return a hash identifying submissions with the same target and comment."""
+    comment = ' '.join(feedback.comment.split()).casefold()
+    parts = [feedback.plan_id, feedback.type, feedback.action_id or '', comment]
+    return hashlib.sha256('\x1f'.join(str(part) for part in parts).encode('utf8')).hexdigest()
+
+
+class UserFeedbackBuffer(BulkCreateBuffer[UserFeedback]):
+    model = UserFeedback
+
+
+user_feedback_buffer = UserFeedbackBuffer(
+    max_size=settings.FEEDBACK_BUFFER_SIZE,
+    flush_interval=settings.FEEDBACK_FLUSH_INTERVAL,
+    flush_in_background=True,
+)
+
+
+class RateLimitExceeded(Exception):
+    message = _('Too many feedback submissions. Please try again later.')
+
+
+@dataclass
+class IntakeResult:
+    # The stored feedback, or None if the submission was dropped or queued
+    feedback: UserFeedback | None
+    stored: bool = False
+    queued: bool = False
+
+
+class UserFeedbackIntake:
+    """Checks and stores user feedback submissions.
+
+    A submission passes through these steps:
+
+    1. The IP address of the client is rate limited before the form is validated.
+    2. The plan is rate limited after validation.
+    3. Submissions caught by the spam traps of the form are dropped.
+    4. Submissions identical to an earlier one within `FEEDBACK_DUPLICATE_WINDOW` are dropped.
+    5. The feedback is saved, or queued for a bulk insert if `FEEDBACK_QUEUED` is set.
+
+    Spam and duplicates are dropped silently so that the client cannot tell them from stored
+    submissions.
+    """
+
+    DUPLICATE_CACHE_KEY = 'user-feedback-fingerprint:{fingerprint}'
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.ip_bucket = TokenBucket('feedback-ip', settings.FEEDBACK_RATE_LIMIT_PER_IP, clock=clock)
+        self.plan_bucket = TokenBucket('feedback-plan', settings.FEEDBACK_RATE_LIMIT_PER_PLAN, clock=clock)
+
+    def check_client(self, request: HttpRequest):
+        if not self.ip_bucket.consume(get_client_ip(request)):
+            raise RateLimitExceeded()
+
+    def is_spam(self, form) -> bool:
+        if form.cleaned_data.get('homepage'):
+            return True
+        started_at = form.cleaned_data.get('form_started_at')
+        if started_at is not None:
+            elapsed = (timezone.now() - started_at).total_seconds()
+            if elapsed < settings.FEEDBACK_MIN_FILL_TIME:
+                return True
+        return False
+
+    def is_duplicate(self, feedback: UserFeedback) -> bool:
+        key = self.DUPLICATE_CACHE_KEY.format(fingerprint=get_fingerprint(feedback))
+        return not cache.add(key, True, timeout=settings.FEEDBACK_DUPLICATE_WINDOW)
+
+    def submit(self, form) -> IntakeResult:
+        """Store the feedback of a validated form."""
+        feedback = form.save(commit=False)
+        if not self.plan_bucket.consume(str(feedback.plan_id)):
+            raise RateLimitExceeded()
+        if self.is_spam(form):
+            logger.info(f'Dropping user feedback for plan {feedback.plan_id} caught by spam traps')
+            return IntakeResult(feedback=None)
+        if self.is_duplicate(feedback):
+            logger.info(f'Dropping duplicate user feedback for plan {feedback.plan_id}')
+            return IntakeResult(feedback=None)
+        if settings.FEEDBACK_QUEUED:
+            user_feedback_buffer.add(feedback)
+            return IntakeResult(feedback=None, queued=True)
+        feedback.save()
+        return IntakeResult(feedback=feedback, stored=True)
@@ -1,14 +1,20 @@
 from django import forms
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.forms.mutation import DjangoModelFormMutation
+from graphene_django.types import ErrorType
 
 from actions.models import Plan
 from aplans.graphql_types import DjangoObjectType
-from graphene_django.forms.mutation import DjangoModelFormMutation
 
+from .intake import RateLimitExceeded, UserFeedbackIntake
 from .models import UserFeedback
 
 
 class UserFeedbackForm(forms.ModelForm):
     plan = forms.ModelChoiceField(queryset=Plan.objects.all(), to_field_name='identifier')
+    # Spam traps. The UI hides the honeypot field from humans and sends the time the form was shown.
+    homepage = forms.CharField(required=False)
+    form_started_at = forms.DateTimeField(required=False)
 
     class Meta:
         model = UserFeedback
@@ -25,3 +31,23 @@ class UserFeedbackMutation(DjangoModelFormMutation):
         form_class = UserFeedbackForm
         input_field_name = 'data'
         return_field_name = 'feedback'
+        # Submissions must not be able to modify existing feedback
+        exclude_fields = ('id',)
+
+    @classmethod
+    def error_response(cls, info, errors):
+        setattr(info.context, MUTATION_ERRORS_FLAG, True)
+        return cls(errors=errors)
+
+    @classmethod
+    def mutate_and_get_payload(cls, root, info, **input):
+        intake = UserFeedbackIntake()
+        try:
+            intake.check_client(info.context)
+            form = cls.get_form(root, info, **input)
+            if not form.is_valid():
+                return cls.error_response(info, ErrorType.from_errors(form.errors))
+            result = intake.submit(form)
+        except RateLimitExceeded as e:
+            return cls.error_response(info, [ErrorType(field='__all__', messages=[str(e.message)])])
+        return cls(errors=[], feedback=result.feedback)
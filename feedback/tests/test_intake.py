@@ -0,0 +1,128 @@
+import pytest
+from datetime import timedelta
+from django.core.cache import cache
+from django.utils import timezone
+
+from feedback.intake import TokenBucket, UserFeedbackBuffer
+from feedback.models import UserFeedback
+
+pytestmark = pytest.mark.django_db
+
+CREATE_USER_FEEDBACK = '''
+    mutation($data: UserFeedbackMutationInput!) {
+      createUserFeedback(data: $data) {
+        feedback {
+          id
+          comment
+        }
+        errors {
+          field
+          messages
+        }
+      }
+    }
+'''
+
+
+@pytest.fixture(autouse=True)
+def feedback_settings(settings):
+    settings.FEEDBACK_RATE_LIMIT_PER_IP = 3
+    settings.FEEDBACK_RATE_LIMIT_PER_PLAN = 5
+    settings.FEEDBACK_QUEUED = False
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def submit_feedback(plan, graphql_client_query):
+    def func(comment, ip='192.0.2.1', **data):
+        data = dict(plan=plan.identifier, comment=comment, url='https://example.com/feedback', **data)
+        response = graphql_client_query(
+            CREATE_USER_FEEDBACK, variables={'data': data}, headers={'HTTP_X_FORWARDED_FOR': f'10.0.0.1, {ip}'},
+        )
+        assert 'errors' not in response
+        return response['data']['createUserFeedback']
+    return func
+
+
+def test_submission_is_stored(plan, submit_feedback):
+    result = submit_feedback('Great plan')
+    assert result['errors'] == []
+    feedback = UserFeedback.objects.get()
+    assert result['feedback'] == {'id': str(feedback.id), 'comment': 'Great plan'}
+    assert feedback.plan == plan
+
+
+def test_burst_from_one_ip_is_rate_limited(submit_feedback):
+    results = [submit_feedback(f'Comment {i}') for i in range(5)]
+    assert [bool(r['errors']) for r in results] == [False, False, False, True, True]
+    assert results[-1]['errors'][0]['field'] == '__all__'
+    assert UserFeedback.objects.count() == 3
+    # Other clients are not affected
+    assert submit_feedback('Comment from elsewhere', ip='192.0.2.2')['errors'] == []
+
+
+def test_burst_from_many_ips_is_rate_limited_per_plan(submit_feedback):
+    results = [submit_feedback(f'Comment {i}', ip=f'192.0.2.{i}') for i in range(8)]
+    assert [bool(r['errors']) for r in results] == [False] * 5 + [True] * 3
+    assert UserFeedback.objects.count() == 5
+
+
+def test_duplicates_are_collapsed(submit_feedback):
+    comments = ['Fix the bike lanes', '  fix the   BIKE lanes ', 'Fix the bike lanes']
+    results = [submit_feedback(comment, ip=f'192.0.2.{i}') for i, comment in enumerate(comments)]
+    assert all(r['errors'] == [] for r in results)
+    assert results[0]['feedback'] is not None
+    assert results[1]['feedback'] is None
+    assert UserFeedback.objects.count() == 1
+
+
+def test_honeypot_submissions_are_dropped(submit_feedback):
+    result = submit_feedback('Buy cheap watches', homepage='https://spam.example.com')
+    assert result == {'feedback': None, 'errors': []}
+    assert not UserFeedback.objects.exists()
+
+
+def test_too_fast_submissions_are_dropped(submit_feedback):
+    now = timezone.now()
+    result = submit_feedback('Too fast', formStartedAt=now.isoformat())
+    assert result == {'feedback': None, 'errors': []}
+    result = submit_feedback('Took my time', formStartedAt=(now - timedelta(minutes=1)).isoformat())
+    assert result['feedback'] is not None
+    assert UserFeedback.objects.get().comment == 'Took my time'
+
+
+def test_existing_feedback_cannot_be_modified(plan, graphql_client_query):
+    data = dict(id='1', plan=plan.identifier, comment='Changed', url='https://example.com/feedback')
+    response = graphql_client_query(CREATE_USER_FEEDBACK, variables={'data': data})
+    assert 'errors' in response
+
+
+def test_queued_submissions_are_stored_in_bulk(settings, submit_feedback, monkeypatch, django_assert_num_queries):
+    settings.FEEDBACK_QUEUED = True
+    buffer = UserFeedbackBuffer(max_size=3, flush_interval=3600)
+    monkeypatch.setattr('feedback.intake.user_feedback_buffer', buffer)
+    results = [submit_feedback(f'Comment {i}', ip=f'192.0.2.{i}') for i in range(5)]
+    assert all(r == {'feedback': None, 'errors': []} for r in results)
+    assert UserFeedback.objects.count() == 3
+    assert len(buffer) == 2
+    with django_assert_num_queries(1):
+        assert buffer.flush() == 2
+    assert sorted(UserFeedback.objects.values_list('comment', flat=True)) == [f'Comment {i}' for i in range(5)]
+
+
+def test_token_bucket_refills():
+    now = [0.0]
+    bucket = TokenBucket('test', capacity=2, period=60, clock=lambda: now[0])
+    assert bucket.consume('a')
+    assert bucket.consume('a')
+    assert not bucket.consume('a')
+    assert bucket.consume('b')
+    now[0] += 30
+    assert bucket.consume('a')
+    assert not bucket.consume('a')
+    now[0] += 3600
+    assert bucket.consume('a')
+    assert bucket.consume('a')
+    assert not bucket.consume('a')
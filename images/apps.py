@@ -5,6 +5,8 @@ class ImagesConfig(AppConfig):
     name = 'images'
 
     def ready(self):
+        from . import signals  # noqa
+
         # monkeypatch filtering of Collections
         from .chooser import monkeypatch_chooser
         monkeypatch_chooser()
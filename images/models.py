@@ -4,6 +4,12 @@ from django.utils.translation import gettext_lazy as _
 from wagtail.images.models import AbstractImage, AbstractRendition
 from wagtail.images.models import Image as WagtailImage
 
+from aplans.context_vars import ctx_request
+
+
+# Renditions need to be regenerated when one of these fields changes
+RENDITION_SOURCE_FIELDS = ('file', 'focal_point_x', 'focal_point_y', 'focal_point_width', 'focal_point_height')
+
 
 class AplansImage(AbstractImage):
     admin_form_fields = WagtailImage.admin_form_fields + ('image_credit', 'alt_text')
@@ -15,6 +21,36 @@ class AplansImage(AbstractImage):
         verbose_name = _('image')
         verbose_name_plural = _('images')
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_rendition_source = {
+            name: value for name, value in zip(field_names, values) if name in RENDITION_SOURCE_FIELDS
+        }
+        # Images are usually loaded for a whole list of objects at once, so mark them for the rendition cache of
+        # the request. The cached renditions of all of them are then fetched when the first one is resolved.
+        watch_cache = getattr(ctx_request.get(None), 'watch_cache', None)
+        if watch_cache is not None:
+            watch_cache.image_renditions.add_pending(instance.id)
+        return instance
+
+    def get_rendition_source(self) -> dict:
+        source = {name: getattr(self, name) for name in RENDITION_SOURCE_FIELDS}
+        source['file'] = self.file.name
+        return source
+
+    def has_rendition_source_changed(self, update_fields=None) -> bool:
+        """Return whether the file or the focal point differs from the values last loaded or saved."""
+        if update_fields is not None and not set(RENDITION_SOURCE_FIELDS) & set(update_fields):
+            return False
+        stored = getattr(self, '_stored_rendition_source', None)
+        if stored is None or len(stored) != len(RENDITION_SOURCE_FIELDS):
+            return True
+        return self.get_rendition_source() != stored
+
+    def store_rendition_source(self):
+        self._stored_rendition_source = self.get_rendition_source()
+
 
 class AplansRendition(AbstractRendition):
     image = models.ForeignKey(AplansImage, related_name='renditions', on_delete=models.CASCADE)
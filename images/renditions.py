@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import logging
+import typing
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from sentry_sdk import capture_exception
+from wagtail.images.models import Filter, SourceImageIOError
+
+if typing.TYPE_CHECKING:
+    from .models import AplansImage, AplansRendition
+
+
+logger = logging.getLogger(__name__)
+
+RENDITION_URL_CACHE_TIMEOUT = 7 * 24 * 3600
+
+
+def rendition_cache_key(image_id: int) -> str:
+    return f'image-renditions:{image_id}'
+
+
+class RenditionURLCache:
+    """Attributes of image renditions by filter spec, stored in the cache per image.
+
+    Instances keep the entries they have loaded, so one should be used per request. The entries of many images
+    are loaded at once: images loaded from the database during a request are added as pending with
+    `add_pending()`, and the first lookup loads all of them with one cache query. Images that are not in the cache
+    get their existing renditions from the database with one query.
+    """
+
+    def __init__(self):
+        self.entries: dict[int, dict[str, dict]] = {}
+        self.pending: set[int] = set()
+        # Images whose entry contains all of their existing renditions
+        self.complete: set[int] = set()
+
+    def add_pending(self, image_id: int):
+        if image_id not in self.entries:
+            self.pending.add(image_id)
+
+    def load(self, image_ids: Iterable[int]):
+        missing = {image_id for image_id in image_ids if image_id not in self.entries}
+        if not missing:
+            return
+        missing |= {image_id for image_id in self.pending if image_id not in self.entries}
+        self.pending = set()
+        found = cache.get_many([rendition_cache_key(image_id) for image_id in missing])
+        not_cached = []
+        for image_id in missing:
+            entry = found.get(rendition_cache_key(image_id))
+            if entry is None:
+                not_cached.append(image_id)
+                entry = {}
+            self.entries[image_id] = entry
+        if not_cached:
+            self._load_from_db(not_cached)
+
+    def _load_from_db(self, image_ids: list[int]):
+        from .models import AplansRendition
+
+        renditions = AplansRendition.objects.filter(image__in=image_ids).select_related('image')
+        for rendition in renditions:
+            # Renditions made with an earlier focal point are not used
+            if rendition.focal_point_key != Filter(spec=rendition.filter_spec).get_cache_key(rendition.image):
+                continue
+            self.entries[rendition.image_id][rendition.filter_spec] = self._get_attrs(rendition)
+        cache.set_many(
+            {rendition_cache_key(image_id): self.entries[image_id] for image_id in image_ids},
+            RENDITION_URL_CACHE_TIMEOUT,
+        )
+        self.complete.update(image_ids)
+
+    @staticmethod
+    def _get_attrs(rendition: AplansRendition) -> dict:
+        return dict(id=rendition.id, **rendition.attrs_dict)
+
+    def get(self, image: AplansImage, filter_spec: str) -> dict | None:
+        self.load([image.id])
+        return self.entries[image.id].get(filter_spec)
+
+    def has_all_renditions(self, image: AplansImage) -> bool:
+        """Return True if the loaded entry of the image is known to contain all of its renditions."""
+        return image.id in self.complete
+
+    def store(self, image: AplansImage, renditions: dict[str, AplansRendition]):
+        self.load([image.id])
+        entry = self.entries[image.id]
+        for filter_spec, rendition in renditions.items():
+            entry[filter_spec] = self._get_attrs(rendition)
+        cache.set(rendition_cache_key(image.id), entry, RENDITION_URL_CACHE_TIMEOUT)
+
+    @staticmethod
+    def invalidate(image_id: int):
+        cache.delete(rendition_cache_key(image_id))
+
+
+def generate_renditions(image: AplansImage, filter_specs: Iterable[str] | None = None) -> dict[str, AplansRendition]:
+    """Create the renditions for the given filter specs (by default the pre-generated ones) and cache their URLs."""
+    if filter_specs is None:
+        filter_specs = settings.IMAGE_PREGENERATED_FILTER_SPECS
+    try:
+        renditions = image.get_renditions(*filter_specs)
+    except (FileNotFoundError, SourceImageIOError) as e:
+        capture_exception(e)
+        return {}
+    RenditionURLCache().store(image, renditions)
+    return renditions
+
+
+def schedule_renditions(image_id: int, filter_specs: list[str] | None = None):
+    """Generate renditions in a Celery task."""
+    from .tasks import generate_renditions as generate_renditions_task
+
+    try:
+        generate_renditions_task.delay(image_id, filter_specs)
+    except Exception as e:
+        # Not being able to queue the task should not break the request
+        logger.warning(f'Error scheduling renditions for image {image_id}: {e}')
+        capture_exception(e)
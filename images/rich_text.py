@@ -0,0 +1,16 @@
+from wagtail import hooks
+from wagtail.images.rich_text import ImageEmbedHandler as WagtailImageEmbedHandler
+
+from aplans.rich_text import PrefetchedEntityHandlerMixin
+
+
+class ImageEmbedHandler(PrefetchedEntityHandlerMixin, WagtailImageEmbedHandler):
+    @classmethod
+    def get_queryset(cls):
+        return cls.get_model().objects.prefetch_related('renditions')
+
+
+# Run after Wagtail has registered its own handler
+@hooks.register('register_rich_text_features', order=1)
+def register_image_embed_type(features):
+    features.register_embed_type(ImageEmbedHandler)
@@ -1,13 +1,12 @@
-import sentry_sdk
 import graphene
 from graphql.error import GraphQLError
-from wagtail.images.models import SourceImageIOError
+from wagtail.images.models import Filter
 
 from aplans.graphql_types import DjangoNode, replace_image_node
-import graphene_django_optimizer as gql_optimizer
 
 
 from .models import AplansImage, AplansRendition
+from .renditions import RenditionURLCache, schedule_renditions
 
 
 class ImageRendition(DjangoNode):
@@ -42,9 +41,6 @@ class ImageNode(DjangoNode):
             'focal_point_height', 'height', 'width', 'image_credit', 'alt_text'
         ]
 
-    @gql_optimizer.resolver_hints(
-        prefetch_related=('renditions',)
-    )
     def resolve_rendition(root: AplansImage, info, size=None, crop=True):
         if size is not None:
             try:
@@ -69,16 +65,31 @@ class ImageNode(DjangoNode):
         else:
             size = '800x600'
 
-        try:
-            if crop:
-                format_str = 'fill-%s-c50' % size
-            else:
-                format_str = 'max-%s' % size
-            rendition = root.get_rendition(format_str)
-        except (FileNotFoundError, SourceImageIOError) as e:
-            # We ignore the error so that the query will not fail, but report it to
-            # Sentry anyway.
-            sentry_sdk.capture_exception(e)
-            return None
-
-        return ImageRendition(id=rendition.id, **rendition.get_fqdn_attrs(info.context))
+        if crop:
+            format_str = 'fill-%s-c50' % size
+        else:
+            format_str = 'max-%s' % size
+
+        watch_cache = getattr(info.context, 'watch_cache', None)
+        rendition_cache = watch_cache.image_renditions if watch_cache is not None else RenditionURLCache()
+        attrs = rendition_cache.get(root, format_str)
+        if attrs is None:
+            try:
+                if rendition_cache.has_all_renditions(root):
+                    # The renditions of the image were just loaded from the database
+                    raise AplansRendition.DoesNotExist()
+                rendition = root.find_existing_rendition(Filter(spec=format_str))
+            except AplansRendition.DoesNotExist:
+                # Don't block the request on image processing; serve the original
+                # image until the rendition has been generated.
+                schedule_renditions(root.id, [format_str])
+                return ImageRendition(
+                    id='%d-%s-placeholder' % (root.id, format_str), src=info.context.build_absolute_uri(root.file.url),
+                    width=root.width, height=root.height, alt=root.default_alt_text,
+                )
+            rendition_cache.store(root, {format_str: rendition})
+            attrs = rendition_cache.get(root, format_str)
+
+        attrs = attrs.copy()
+        attrs['src'] = info.context.build_absolute_uri(attrs['src'])
+        return ImageRendition(**attrs)
@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from aplans.rich_text import RichTextReferences
+
+from .models import AplansImage, AplansRendition
+from .renditions import RenditionURLCache, schedule_renditions
+from .rich_text import ImageEmbedHandler
+
+
+@receiver(post_save, sender=AplansImage)
+def pregenerate_renditions(sender, instance: AplansImage, update_fields=None, **kwargs):
+    # Edits of e.g. the title or the alt text don't affect the renditions
+    if not instance.has_rendition_source_changed(update_fields):
+        return
+    instance.store_rendition_source()
+    RenditionURLCache.invalidate(instance.id)
+    image_id = instance.id
+    transaction.on_commit(lambda: schedule_renditions(image_id))
+
+
+@receiver(post_delete, sender=AplansRendition)
+def invalidate_rendition_urls(sender, instance: AplansRendition, **kwargs):
+    RenditionURLCache.invalidate(instance.image_id)
+
+
+@receiver(post_save, sender=AplansImage)
+@receiver(post_delete, sender=AplansImage)
+def invalidate_image_embeds(sender, instance: AplansImage, **kwargs):
+    RichTextReferences.invalidate(ImageEmbedHandler)
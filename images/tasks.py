@@ -0,0 +1,12 @@
+from celery import shared_task
+
+from .models import AplansImage
+from .renditions import generate_renditions as generate_image_renditions
+
+
+@shared_task
+def generate_renditions(image_id, filter_specs=None):
+    image = AplansImage.objects.filter(id=image_id).first()
+    if image is None:
+        return
+    generate_image_renditions(image, filter_specs)
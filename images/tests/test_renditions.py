@@ -0,0 +1,127 @@
+import pytest
+from types import SimpleNamespace
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from aplans.cache import WatchObjectCache
+from aplans.context_vars import set_request
+from images.renditions import RenditionURLCache, generate_renditions
+from images.schema import ImageNode
+from images.models import AplansImage
+from images.tests.factories import AplansImageFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def info():
+    request = RequestFactory().get('/')
+    request.watch_cache = WatchObjectCache()
+    return SimpleNamespace(context=request)
+
+
+@pytest.fixture
+def scheduled(monkeypatch):
+    calls = []
+    monkeypatch.setattr('images.schema.schedule_renditions', lambda image_id, specs: calls.append((image_id, specs)))
+    return calls
+
+
+def test_missing_rendition_is_scheduled_and_placeholder_returned(info, scheduled):
+    image = AplansImageFactory()
+    rendition = ImageNode.resolve_rendition(image, info, size='300x200')
+    assert scheduled == [(image.id, ['fill-300x200-c50'])]
+    assert rendition.src == 'http://testserver' + image.file.url
+    assert not image.renditions.exists()
+
+
+def test_pregenerated_rendition_is_served_from_cache(info, scheduled, django_assert_num_queries):
+    image = AplansImageFactory()
+    generate_renditions(image, ['fill-300x200-c50'])
+    expected = image.get_rendition('fill-300x200-c50')
+    with django_assert_num_queries(0):
+        rendition = ImageNode.resolve_rendition(image, info, size='300x200')
+    assert not scheduled
+    assert rendition.id == expected.id
+    assert rendition.src == 'http://testserver' + expected.url
+    assert (rendition.width, rendition.height) == (expected.width, expected.height)
+
+
+def test_existing_rendition_is_added_to_cache(info, scheduled):
+    image = AplansImageFactory()
+    image.get_rendition('max-800x600')
+    ImageNode.resolve_rendition(image, info, crop=False)
+    assert not scheduled
+    url_cache = RenditionURLCache()
+    assert url_cache.get(image, 'max-800x600') is not None
+
+
+def test_saving_image_invalidates_cache():
+    image = AplansImageFactory()
+    generate_renditions(image, ['max-800x600'])
+    image.focal_point_x = 10
+    image.save()
+    assert RenditionURLCache().get(image, 'max-800x600') is None
+
+
+def test_editing_image_metadata_keeps_cache(monkeypatch, django_capture_on_commit_callbacks):
+    scheduled = []
+    monkeypatch.setattr('images.signals.schedule_renditions', lambda image_id: scheduled.append(image_id))
+    image = AplansImageFactory()
+    generate_renditions(image, ['max-800x600'])
+    image = AplansImage.objects.get(id=image.id)
+    with django_capture_on_commit_callbacks(execute=True):
+        image.title = 'Changed'
+        image.alt_text = 'Changed'
+        image.save()
+    assert RenditionURLCache().get(image, 'max-800x600') is not None
+    assert not scheduled
+
+    with django_capture_on_commit_callbacks(execute=True):
+        image.focal_point_x = 10
+        image.save()
+    assert RenditionURLCache().get(image, 'max-800x600') is None
+    assert scheduled == [image.id]
+
+
+@pytest.fixture
+def cache_get_many_calls(monkeypatch):
+    calls = []
+    get_many = cache.get_many
+
+    def counting_get_many(keys, *args, **kwargs):
+        calls.append(keys)
+        return get_many(keys, *args, **kwargs)
+
+    monkeypatch.setattr('images.renditions.cache.get_many', counting_get_many)
+    return calls
+
+
+@pytest.mark.parametrize('warm_cache', [False, True])
+def test_renditions_of_loaded_images_are_batch_loaded(
+    info, scheduled, cache_get_many_calls, django_assert_num_queries, warm_cache,
+):
+    image_ids = [AplansImageFactory().id for _ in range(5)]
+    for image in AplansImage.objects.filter(id__in=image_ids):
+        if warm_cache:
+            generate_renditions(image, ['max-800x600'])
+        else:
+            image.get_rendition('max-800x600')
+    cache_get_many_calls.clear()
+
+    with set_request(info.context):
+        images = list(AplansImage.objects.filter(id__in=image_ids))
+        # The cache is queried once for all images, and the database once if they are not in the cache
+        with django_assert_num_queries(0 if warm_cache else 1):
+            renditions = [ImageNode.resolve_rendition(image, info, crop=False) for image in images]
+    assert len(cache_get_many_calls) == 1
+    assert len(cache_get_many_calls[0]) == len(image_ids)
+    assert not scheduled
+    assert all(rendition.src.startswith('http://testserver') for rendition in renditions)
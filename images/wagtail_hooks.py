@@ -1,5 +1,6 @@
 from wagtail import hooks
 from images.permissions import permission_policy
+from images import rich_text  # noqa
 
 
 @hooks.register('construct_image_chooser_queryset')
@@ -0,0 +1,43 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_summaries(apps, schema_editor):
+    Indicator = apps.get_model('indicators', 'Indicator')
+    IndicatorSummary = apps.get_model('indicators', 'IndicatorSummary')
+    summaries = []
+    for indicator in Indicator.objects.select_related('latest_value'):
+        goals = indicator.goals.order_by('date')
+        latest_value = indicator.latest_value
+        summaries.append(IndicatorSummary(
+            indicator=indicator,
+            first_value=indicator.values.filter(categories__isnull=True).order_by('date').first(),
+            latest_goal=goals.last(),
+            closest_goal=goals.filter(date__lte=latest_value.date).last() if latest_value is not None else None,
+        ))
+    IndicatorSummary.objects.bulk_create(summaries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('indicators', '0023_remove_fk_protection'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndicatorSummary',
+            fields=[
+                ('indicator', models.OneToOneField(editable=False, on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='indicators.indicator', verbose_name='indicator')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('closest_goal', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='indicators.indicatorgoal')),
+                ('first_value', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='indicators.indicatorvalue')),
+                ('latest_goal', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='indicators.indicatorgoal')),
+            ],
+            options={
+                'verbose_name': 'indicator summary',
+                'verbose_name_plural': 'indicator summaries',
+            },
+        ),
+        migrations.RunPython(populate_summaries, reverse_code=migrations.RunPython.noop),
+    ]
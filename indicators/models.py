@@ -462,6 +462,7 @@ class Indicator(ClusterableModel, index.Indexed, ModificationTracking, PlanDefau
                     indicator.generate_normalized_values(normalizator)
 
         self.save(update_fields=update_fields)
+        IndicatorSummary.update_for_indicator(self, goals=False)
 
     def handle_goals_update(self):
         if self.common is not None:
@@ -473,13 +474,19 @@ class Indicator(ClusterableModel, index.Indexed, ModificationTracking, PlanDefau
                 affected_indicators = normalizator.normalizable.indicators.filter(organization=self.organization)
                 for indicator in affected_indicators:
                     indicator.generate_normalized_goals(normalizator)
+        IndicatorSummary.update_for_indicator(self, values=False)
+
+    def get_summary(self) -> IndicatorSummary:
+        try:
+            return self.summary
+        except IndicatorSummary.DoesNotExist:
+            return IndicatorSummary.update_for_indicator(self)
 
     def has_current_data(self):
         return self.latest_value_id is not None
 
     def has_current_goals(self):
-        now = timezone.now()
-        return self.goals.filter(date__gte=now).exists()
+        return self.get_summary().has_current_goals()
 
     @display(boolean=True, description=_('Has datasets'))
     def has_datasets(self):
@@ -806,6 +813,67 @@ class IndicatorGoal(models.Model):
         return f"{indicator} {date} {self.value}"
 
 
+class IndicatorSummary(models.Model):
+    """Precomputed data points of an indicator.
+
+    Maintained by `Indicator.handle_values_update()` and `Indicator.handle_goals_update()` so that
+    status calculation and monitoring quality do not need to query values and goals separately
+    for each indicator. The latest value is stored in `Indicator.latest_value`.
+    """
+
+    indicator = models.OneToOneField(
+        Indicator, primary_key=True, related_name='summary', on_delete=models.CASCADE,
+        verbose_name=_('indicator'), editable=False,
+    )
+    first_value = models.ForeignKey(
+        IndicatorValue, null=True, blank=True, related_name='+', on_delete=models.SET_NULL, editable=False,
+    )
+    latest_goal = models.ForeignKey(
+        IndicatorGoal, null=True, blank=True, related_name='+', on_delete=models.SET_NULL, editable=False,
+    )
+    # The latest goal on or before the date of the latest value
+    closest_goal = models.ForeignKey(
+        IndicatorGoal, null=True, blank=True, related_name='+', on_delete=models.SET_NULL, editable=False,
+    )
+    updated_at = models.DateTimeField(auto_now=True, editable=False)
+
+    class Meta:
+        verbose_name = _('indicator summary')
+        verbose_name_plural = _('indicator summaries')
+
+    def __str__(self):
+        return str(self.indicator)
+
+    @classmethod
+    def update_for_indicator(cls, indicator: Indicator, values: bool = True, goals: bool = True) -> IndicatorSummary:
+        """Refresh the parts of the summary affected by changed values or goals."""
+        try:
+            summary = indicator.summary
+        except cls.DoesNotExist:
+            summary = cls(indicator=indicator)
+            values = goals = True
+
+        if values:
+            summary.first_value = indicator.values.filter(categories__isnull=True).order_by('date').first()
+        if goals:
+            summary.latest_goal = indicator.goals.order_by('date').last()
+
+        latest_value = indicator.latest_value
+        if latest_value is None:
+            summary.closest_goal = None
+        else:
+            summary.closest_goal = indicator.goals.filter(date__lte=latest_value.date).order_by('date').last()
+
+        summary.save()
+        indicator.summary = summary
+        return summary
+
+    def has_current_goals(self) -> bool:
+        if self.latest_goal is None:
+            return False
+        return self.latest_goal.date >= timezone.localdate()
+
+
 class RelatedIndicator(IndicatorRelationship):
     """A causal relationship between two indicators."""
     HIGH_CONFIDENCE = 'high'
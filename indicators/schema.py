@@ -2,10 +2,10 @@ import graphene
 import graphene_django_optimizer as gql_optimizer
 from django.forms import ModelForm
 from graphql.error import GraphQLError
-from wagtail.rich_text import RichText
 
 from aplans.graphql_helpers import UpdateModelInstanceMutation
 from aplans.graphql_types import DjangoNode, get_plan_from_context, order_queryset, register_django_node
+from aplans.rich_text import RichText
 from aplans.utils import public_fields
 from actions.schema import ScenarioNode
 from indicators.models import (
@@ -251,7 +251,7 @@ class IndicatorNode(DjangoNode):
         description = self.description_i18n
         if description is None:
             return None
-        return RichText(description)
+        return RichText(description, references=info.context.watch_cache.rich_text)
 
 
 class IndicatorDimensionNode(DjangoNode):
@@ -1,8 +1,12 @@
 import pytest
-from datetime import date
+from datetime import date, timedelta
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
-from indicators.tests.factories import IndicatorFactory, IndicatorValueFactory
+from indicators.models import IndicatorSummary
+from indicators.tests.factories import (
+    DimensionCategoryFactory, IndicatorFactory, IndicatorGoalFactory, IndicatorValueFactory
+)
 
 pytestmark = pytest.mark.django_db
 
@@ -49,3 +53,50 @@ def test_indicator_plans_with_access_dont_include_other_plans(plan):
 def test_indicator_plans_with_access_includes_indicator_plan(plan, indicator):
     indicator.plans.add(plan)
     assert plan in indicator.get_plans_with_access()
+
+
+def test_indicator_summary_updated_on_values_update():
+    indicator = IndicatorFactory()
+    first = IndicatorValueFactory(indicator=indicator, date=date(2018, 12, 31))
+    IndicatorValueFactory(indicator=indicator, date=date(2017, 12, 31), categories=[DimensionCategoryFactory()])
+    latest = IndicatorValueFactory(indicator=indicator, date=date(2020, 12, 31))
+    goal = IndicatorGoalFactory(indicator=indicator, date=date(2019, 12, 31))
+    IndicatorGoalFactory(indicator=indicator, date=date(2021, 12, 31))
+    indicator.handle_values_update()
+    summary = IndicatorSummary.objects.get(indicator=indicator)
+    assert indicator.latest_value == latest
+    assert summary.first_value == first
+    assert summary.closest_goal == goal
+
+
+def test_indicator_summary_updated_on_goals_update():
+    indicator = IndicatorFactory()
+    IndicatorValueFactory(indicator=indicator, date=date(2020, 12, 31))
+    indicator.handle_values_update()
+    assert indicator.summary.latest_goal is None
+    assert indicator.summary.closest_goal is None
+    closest = IndicatorGoalFactory(indicator=indicator, date=date(2020, 12, 31))
+    latest = IndicatorGoalFactory(indicator=indicator, date=date(2030, 12, 31))
+    indicator.handle_goals_update()
+    summary = IndicatorSummary.objects.get(indicator=indicator)
+    assert summary.latest_goal == latest
+    assert summary.closest_goal == closest
+
+
+def test_indicator_has_current_goals():
+    indicator = IndicatorFactory()
+    today = timezone.localdate()
+    IndicatorGoalFactory(indicator=indicator, date=today - timedelta(days=1))
+    indicator.handle_goals_update()
+    assert not indicator.has_current_goals()
+    IndicatorGoalFactory(indicator=indicator, date=today)
+    indicator.handle_goals_update()
+    assert indicator.has_current_goals()
+
+
+def test_indicator_get_summary_creates_missing_summary():
+    indicator = IndicatorFactory()
+    goal = IndicatorGoalFactory(indicator=indicator, date=date(2030, 12, 31))
+    assert not IndicatorSummary.objects.filter(indicator=indicator).exists()
+    assert indicator.get_summary().latest_goal == goal
+    assert IndicatorSummary.objects.filter(indicator=indicator).exists()
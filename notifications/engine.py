@@ -1,8 +1,9 @@
 from datetime import timedelta
 from django.conf import settings
 from django.core.mail import EmailMessage
-from django.db.models import Q
-from django.utils import translation
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone, translation
 from logging import getLogger
 from markupsafe import Markup
 from sentry_sdk import capture_exception
@@ -11,13 +12,13 @@ from typing import Dict, Sequence
 from .mjml import render_mjml_from_template
 from aplans.email_sender import EmailSender
 
-from .models import NotificationType
+from .models import NotificationCursor, NotificationType
 from .notifications import (
     ActionNotUpdatedNotification, Notification, NotEnoughTasksNotification, TaskDueSoonNotification,
     TaskLateNotification, UpdatedIndicatorValuesDueSoonNotification, UpdatedIndicatorValuesLateNotification,
     UserFeedbackReceivedNotification,
 )
-from .queue import NotificationQueue
+from .queue import NotificationQueue, NotificationQueueItem
 from .recipients import NotificationRecipient, PersonRecipient
 from actions.models import Plan, ActionTask, Action, ActionContactPerson
 from feedback.models import UserFeedback
@@ -27,12 +28,60 @@ logger = getLogger(__name__)
 
 TASK_DUE_SOON_DAYS = 30
 UPDATED_INDICATOR_VALUES_DUE_SOON_DAYS = 30
+# The creation time is set before the object is committed, so an object created this recently may still be
+# followed by an uncommitted one with an earlier creation time. The cursors are not advanced past such objects.
+CURSOR_SAFETY_MARGIN = timedelta(minutes=10)
 
 
 class InvalidStateException(Exception):
     pass
 
 
+class NotificationCursorTracker:
+    """Keeps track of the objects processed for a notification type and advances the plan's cursor.
+
+    Only the objects created after the cursor are processed, in the order of their creation time
+    and id. An object has been processed when all the notifications queued for it have been sent,
+    so the cursor never moves past objects whose notifications were filtered out, cut off by the
+    limit or not recorded because of a crash. The cursor is also not moved past objects created within
+    `CURSOR_SAFETY_MARGIN`; they are processed again in the next run, and the sent notifications keep them
+    from being notified twice.
+    """
+
+    def __init__(self, plan: Plan, type: NotificationType, qs: QuerySet):
+        self.plan = plan
+        self.type = type
+        self.cutoff = timezone.now() - CURSOR_SAFETY_MARGIN
+        self.cursor = NotificationCursor.objects.filter(plan=plan, type=type.identifier).first()
+        qs = qs.order_by('created_at', 'id')
+        if self.cursor is not None:
+            qs = self.cursor.filter_newer(qs)
+        self.objects = list(qs)
+        self.position = 0
+        self.unsent_counts: Dict[int, int] = {}
+
+    def queued(self, obj):
+        self.unsent_counts[obj.pk] = self.unsent_counts.get(obj.pk, 0) + 1
+
+    def processed(self, obj):
+        self.unsent_counts[obj.pk] -= 1
+
+    def advance(self):
+        last = None
+        while self.position < len(self.objects):
+            obj = self.objects[self.position]
+            if self.unsent_counts.get(obj.pk) or obj.created_at > self.cutoff:
+                break
+            last = obj
+            self.position += 1
+        if last is None:
+            return
+        self.cursor, _ = NotificationCursor.objects.update_or_create(
+            plan=self.plan, type=self.type.identifier,
+            defaults=dict(last_created_at=last.created_at, last_object_id=last.pk),
+        )
+
+
 class NotificationEngine:
     def __init__(
         self, plan: Plan, force_to=None, limit=None, only_type=None, noop=False, only_email=None,
@@ -214,6 +263,7 @@ class NotificationEngine:
         self.indicator_contact_person_recipients: Dict[int, Sequence[NotificationRecipient]] = {}
         self.organization_plan_admin_recipients: Dict[int, Sequence[NotificationRecipient]] = {}
         self.plan_admin_recipients: Sequence[NotificationRecipient] = []
+        self.cursor_trackers: Dict[NotificationType, NotificationCursorTracker] = {}
 
         self._fetch_data()
 
@@ -237,8 +287,13 @@ class NotificationEngine:
             if not self.ignore_action(action) and action.is_active():
                 self.generate_action_notifications(action)
 
-        for user_feedback in self.plan.user_feedbacks.all():
-            self.generate_user_feedback_notifications(user_feedback)
+        if NotificationType.USER_FEEDBACK_RECEIVED.identifier in self.templates_by_type:
+            tracker = NotificationCursorTracker(
+                self.plan, NotificationType.USER_FEEDBACK_RECEIVED, self.plan.user_feedbacks.all()
+            )
+            self.cursor_trackers[tracker.type] = tracker
+            for user_feedback in tracker.objects:
+                self.generate_user_feedback_notifications(user_feedback)
 
         from_email = base_template.get_from_email()
         reply_to = [base_template.reply_to] if base_template.reply_to else None
@@ -277,6 +332,8 @@ class NotificationEngine:
                 else:
                     to_email = recipient.get_email()  # can be None if the recipient has no corresponding email address
                 if not to_email:
+                    # The recipient cannot be notified, so there is nothing left to do for these items
+                    self.advance_cursors(queue_items)
                     continue
 
                 msg = EmailMessage(
@@ -297,8 +354,12 @@ class NotificationEngine:
 
                 email_sender.queue(msg)
                 if not self.force_to and not self.noop:
-                    for item in queue_items:
-                        item.notification.mark_sent(recipient)
+                    # Advance the cursors in the same transaction so that they never get ahead of the sent
+                    # notifications
+                    with transaction.atomic():
+                        for item in queue_items:
+                            item.notification.mark_sent(recipient)
+                        self.advance_cursors(queue_items)
                 notification_count += 1
                 if self.limit and notification_count >= self.limit:
                     if not self.noop:
@@ -306,8 +367,23 @@ class NotificationEngine:
                     return
         if self.noop:
             return
+        # Skip past the objects for which no notifications were queued
+        self.advance_cursors([])
         email_sender.send_all()
 
+    def advance_cursors(self, processed_items: Sequence[NotificationQueueItem]):
+        if self.noop or self.force_to:
+            return
+        for item in processed_items:
+            tracker = self.cursor_trackers.get(item.notification.type)
+            if tracker is not None:
+                tracker.processed(item.notification.obj)
+        for tracker in self.cursor_trackers.values():
+            tracker.advance()
+
     def queue_notification(self, notification: Notification, recipient: NotificationRecipient):
         item = recipient.queue_item(notification)
+        tracker = self.cursor_trackers.get(notification.type)
+        if tracker is not None:
+            tracker.queued(notification.obj)
         self.queue.push(item)
@@ -0,0 +1,29 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('actions', '0112_alter_action_visibility'),
+        ('notifications', '0012_remove_fk_protection'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCursor',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('task_late', 'Task is late'), ('task_due_soon', 'Task is due soon'), ('action_not_updated', 'Action metadata has not been updated recently'), ('not_enough_tasks', "Action doesn't have enough in-progress tasks"), ('updated_indicator_values_late', 'Updated indicator values are late'), ('updated_indicator_values_due_soon', 'Updated indicator values are due soon'), ('user_feedback_received', 'User feedback received')], max_length=100, verbose_name='type')),
+                ('last_created_at', models.DateTimeField(verbose_name='creation time of the last processed object')),
+                ('last_object_id', models.PositiveIntegerField(verbose_name='ID of the last processed object')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_cursors', to='actions.plan', verbose_name='plan')),
+            ],
+            options={
+                'verbose_name': 'notification cursor',
+                'verbose_name_plural': 'notification cursors',
+                'unique_together': {('plan', 'type')},
+            },
+        ),
+    ]
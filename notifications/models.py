@@ -126,6 +126,36 @@ class SentNotification(models.Model):
         return '%s: %s -> %s' % (self.content_object, self.type, self.person)
 
 
+class NotificationCursor(models.Model):
+    """High-water mark of the objects for which a plan's notifications of one type have been processed.
+
+    The objects are processed in the order of their creation time and id. Objects up to and
+    including the one the cursor points to are skipped by the notification engine. The cursor is kept
+    behind recently created objects because objects may be committed out of creation order.
+    """
+    plan = models.ForeignKey(
+        'actions.Plan', on_delete=models.CASCADE, related_name='notification_cursors', verbose_name=_('plan'),
+    )
+    type = models.CharField(verbose_name=_('type'), choices=notification_type_choice_builder(), max_length=100)
+    last_created_at = models.DateTimeField(verbose_name=_('creation time of the last processed object'))
+    last_object_id = models.PositiveIntegerField(verbose_name=_('ID of the last processed object'))
+    updated_at = models.DateTimeField(auto_now=True, editable=False)
+
+    class Meta:
+        unique_together = (('plan', 'type'),)
+        verbose_name = _('notification cursor')
+        verbose_name_plural = _('notification cursors')
+
+    def __str__(self):
+        return '%s: %s (%s)' % (self.plan, self.type, self.last_created_at)
+
+    def filter_newer(self, qs: models.QuerySet) -> models.QuerySet:
+        """Return the objects of `qs` that have been created after the last processed object."""
+        return qs.filter(
+            Q(created_at__gt=self.last_created_at) | Q(created_at=self.last_created_at, id__gt=self.last_object_id)
+        )
+
+
 class BaseTemplateManager(models.Manager):
     def get_by_natural_key(self, plan_identifier):
         return self.get(plan__identifier=plan_identifier)
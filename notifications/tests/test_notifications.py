@@ -1,6 +1,7 @@
 import pytest
 from datetime import datetime, timedelta
 from django.core import mail
+from django.utils import timezone
 
 from actions.tests.factories import (
     ActionContactFactory, ActionFactory, ActionTaskFactory, PlanFactory, ActionResponsiblePartyFactory
@@ -9,8 +10,10 @@ from admin_site.tests.factories import ClientPlanFactory
 from feedback.tests.factories import UserFeedbackFactory
 from indicators.tests.factories import IndicatorContactFactory, IndicatorFactory, IndicatorLevelFactory
 from orgs.tests.factories import OrganizationPlanAdminFactory
-from notifications.models import NotificationTemplate, NotificationType, SentNotification
+from notifications.engine import CURSOR_SAFETY_MARGIN
+from notifications.models import NotificationCursor, NotificationTemplate, NotificationType, SentNotification
 from notifications.management.commands.send_plan_notifications import NotificationEngine
+from notifications.notifications import UserFeedbackReceivedNotification
 from notifications.tests.factories import NotificationTemplateFactory
 from people.tests.factories import PersonFactory
 
@@ -233,6 +236,137 @@ def test_user_feedback_received(plan, plan_admin_person):
     assert len(mail.outbox) == 1
 
 
+@pytest.fixture
+def user_feedback_engine(plan):
+    NotificationTemplateFactory(base__plan=plan, type=NotificationType.USER_FEEDBACK_RECEIVED.identifier)
+    ClientPlanFactory(plan=plan)
+    now = plan.to_local_timezone(datetime(2000, 1, 1, 0, 0))
+
+    def make_engine(**kwargs):
+        return NotificationEngine(plan, now=now, **kwargs)
+    return make_engine
+
+
+def get_user_feedback_cursor(plan):
+    return NotificationCursor.objects.filter(plan=plan, type=NotificationType.USER_FEEDBACK_RECEIVED.identifier).first()
+
+
+def create_old_user_feedbacks(plan, count):
+    """Create feedback older than the safety margin of the cursor, in the order of the ids."""
+    feedbacks = [UserFeedbackFactory(plan=plan) for _ in range(count)]
+    created_at = timezone.now() - CURSOR_SAFETY_MARGIN - timedelta(minutes=1)
+    plan.user_feedbacks.filter(id__in=[feedback.id for feedback in feedbacks]).update(created_at=created_at)
+    for feedback in feedbacks:
+        feedback.refresh_from_db()
+    return feedbacks
+
+
+def test_user_feedback_cursor_skips_processed_feedback(plan, user_feedback_engine):
+    feedbacks = create_old_user_feedbacks(plan, 2)
+    user_feedback_engine().generate_notifications()
+    assert len(mail.outbox) == 1
+    cursor = get_user_feedback_cursor(plan)
+    assert cursor.last_object_id == feedbacks[-1].id
+
+    # Processed feedback is skipped even without the sent notifications
+    SentNotification.objects.all().delete()
+    engine = user_feedback_engine()
+    engine.generate_notifications()
+    assert engine.cursor_trackers[NotificationType.USER_FEEDBACK_RECEIVED].objects == []
+    assert len(mail.outbox) == 1
+
+    [new_feedback] = create_old_user_feedbacks(plan, 1)
+    engine = user_feedback_engine()
+    engine.generate_notifications()
+    assert engine.cursor_trackers[NotificationType.USER_FEEDBACK_RECEIVED].objects == [new_feedback]
+    assert len(mail.outbox) == 2
+    assert get_user_feedback_cursor(plan).last_object_id == new_feedback.id
+
+
+def test_user_feedback_cursor_orders_by_id_within_same_time(plan, user_feedback_engine):
+    feedbacks = [UserFeedbackFactory(plan=plan) for _ in range(3)]
+    created_at = timezone.now()
+    plan.user_feedbacks.update(created_at=created_at)
+    NotificationCursor.objects.create(
+        plan=plan, type=NotificationType.USER_FEEDBACK_RECEIVED.identifier, last_created_at=created_at,
+        last_object_id=feedbacks[0].id,
+    )
+    engine = user_feedback_engine()
+    engine.generate_notifications()
+    assert engine.cursor_trackers[NotificationType.USER_FEEDBACK_RECEIVED].objects == feedbacks[1:]
+    assert SentNotification.objects.count() == 2
+
+
+@pytest.mark.parametrize('filters', [
+    dict(only_email='other@example.com'),
+    dict(only_type=NotificationType.TASK_LATE.identifier),
+    dict(noop=True),
+    dict(force_to='other@example.com'),
+])
+def test_user_feedback_cursor_not_advanced_past_unsent(plan, user_feedback_engine, filters):
+    [feedback] = create_old_user_feedbacks(plan, 1)
+    user_feedback_engine(**filters).generate_notifications()
+    assert get_user_feedback_cursor(plan) is None
+    assert not SentNotification.objects.exists()
+
+    mail.outbox = []
+    user_feedback_engine().generate_notifications()
+    assert len(mail.outbox) == 1
+    assert get_user_feedback_cursor(plan).last_object_id == feedback.id
+
+
+def test_user_feedback_cursor_only_type(plan, user_feedback_engine):
+    [feedback] = create_old_user_feedbacks(plan, 1)
+    user_feedback_engine(only_type=NotificationType.USER_FEEDBACK_RECEIVED.identifier).generate_notifications()
+    assert len(mail.outbox) == 1
+    assert get_user_feedback_cursor(plan).last_object_id == feedback.id
+
+
+def test_user_feedback_cursor_crash_recovery(plan, user_feedback_engine, monkeypatch):
+    feedbacks = create_old_user_feedbacks(plan, 3)
+    original_mark_sent = UserFeedbackReceivedNotification.mark_sent
+    calls = []
+
+    def crashing_mark_sent(self, recipient, now=None):
+        calls.append(self.obj)
+        if len(calls) == 2:
+            raise RuntimeError('Crash')
+        original_mark_sent(self, recipient, now=now)
+
+    monkeypatch.setattr(UserFeedbackReceivedNotification, 'mark_sent', crashing_mark_sent)
+    with pytest.raises(RuntimeError):
+        user_feedback_engine().generate_notifications()
+    # Neither the sent notifications nor the cursor were recorded
+    assert not SentNotification.objects.exists()
+    assert get_user_feedback_cursor(plan) is None
+
+    monkeypatch.setattr(UserFeedbackReceivedNotification, 'mark_sent', original_mark_sent)
+    user_feedback_engine().generate_notifications()
+    assert SentNotification.objects.count() == len(feedbacks)
+    assert get_user_feedback_cursor(plan).last_object_id == feedbacks[-1].id
+
+
+def test_user_feedback_committed_out_of_order_is_notified(plan, user_feedback_engine):
+    [old_feedback] = create_old_user_feedbacks(plan, 1)
+    recent_feedback = UserFeedbackFactory(plan=plan)
+    user_feedback_engine().generate_notifications()
+    assert len(mail.outbox) == 1
+    # The cursor is not advanced past the recent feedback
+    assert get_user_feedback_cursor(plan).last_object_id == old_feedback.id
+
+    # Feedback created before the recent one but committed after the run is still notified
+    late_feedback = UserFeedbackFactory(plan=plan)
+    plan.user_feedbacks.filter(id=late_feedback.id).update(
+        created_at=recent_feedback.created_at - timedelta(seconds=1)
+    )
+    engine = user_feedback_engine()
+    engine.generate_notifications()
+    assert engine.cursor_trackers[NotificationType.USER_FEEDBACK_RECEIVED].objects == [late_feedback, recent_feedback]
+    # The recent feedback is not notified again
+    assert len(mail.outbox) == 2
+    assert SentNotification.objects.count() == 3
+
+
 def test_i18n(plan, plan_admin_person):
     plan = PlanFactory(primary_language='de')
     NotificationTemplateFactory(base__plan=plan,
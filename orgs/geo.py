@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import typing
+from typing import NamedTuple
+
+from django.contrib.gis.db.models import Collect
+from django.contrib.gis.db.models.functions import AsGeoJSON, Centroid, SnapToGrid
+from django.contrib.gis.geos import Polygon
+from django.db.models import Count, Min
+
+if typing.TYPE_CHECKING:
+    from .models import OrganizationQuerySet
+
+
+# Zoom levels of web map tiles
+MIN_ZOOM = 0
+MAX_ZOOM = 24
+# Points are clustered when the map is zoomed out to this level or further
+CLUSTER_MAX_ZOOM = 12
+# Points that are within the same 1/8 of a map tile are clustered
+CLUSTER_CELLS_PER_TILE = 8
+# About 10 cm at the equator
+GEOJSON_PRECISION = 6
+
+
+class BoundingBox(NamedTuple):
+    min_lon: float
+    min_lat: float
+    max_lon: float
+    max_lat: float
+
+    @classmethod
+    def from_coordinates(cls, coordinates: typing.Sequence[float]) -> BoundingBox:
+        if len(coordinates) != 4:
+            raise ValueError('Bounding box must have four coordinates')
+        bbox = cls(*(float(value) for value in coordinates))
+        if bbox.min_lon > bbox.max_lon or bbox.min_lat > bbox.max_lat:
+            raise ValueError('Bounding box minimum coordinates must not exceed the maximum coordinates')
+        return bbox
+
+    @classmethod
+    def from_string(cls, value: str) -> BoundingBox:
+        """Parse a bounding box given as `min_lon,min_lat,max_lon,max_lat`."""
+        return cls.from_coordinates(value.split(','))
+
+    def as_polygon(self) -> Polygon:
+        polygon = Polygon.from_bbox(self)
+        polygon.srid = 4326
+        return polygon
+
+
+def validate_zoom(zoom: int) -> int:
+    if not MIN_ZOOM <= zoom <= MAX_ZOOM:
+        raise ValueError(f'Zoom level must be between {MIN_ZOOM} and {MAX_ZOOM}')
+    return zoom
+
+
+def get_cluster_cell_size(zoom: int) -> float:
+    """Return the size of the clustering grid cells in degrees at the given zoom level."""
+    return 360 / (2 ** zoom * CLUSTER_CELLS_PER_TILE)
+
+
+def _feature(geometry: str, properties: dict, id: int | None = None) -> str:
+    # The geometry is already serialized by the database, so it is embedded as is
+    id_part = '' if id is None else f'"id":{id},'
+    return f'{{"type":"Feature",{id_part}"geometry":{geometry},"properties":{json.dumps(properties)}}}'
+
+
+def _organization_feature(id: int, name: str, abbreviation: str, geometry: str) -> str:
+    return _feature(geometry, dict(id=id, name=name, abbreviation=abbreviation), id=id)
+
+
+def organization_features(
+    qs: OrganizationQuerySet, bbox: BoundingBox | None = None, zoom: int | None = None, cluster: bool = False,
+) -> list[str]:
+    """Return the located organizations in `qs` as serialized GeoJSON features with one query.
+
+    If `bbox` is given, only the organizations inside it are returned. If `cluster` is set and the
+    map is zoomed out to `CLUSTER_MAX_ZOOM` or further, organizations close to each other are
+    returned as one feature with the `cluster` and `pointCount` properties.
+    """
+    qs = qs.filter(location__isnull=False)
+    if bbox is not None:
+        # Uses the spatial index of the location column
+        qs = qs.filter(location__intersects=bbox.as_polygon())
+
+    if not cluster or zoom is None or zoom > CLUSTER_MAX_ZOOM:
+        rows = qs.order_by('id').annotate(
+            geometry=AsGeoJSON('location', precision=GEOJSON_PRECISION),
+        ).values_list('id', 'name', 'abbreviation', 'geometry')
+        return [_organization_feature(*row) for row in rows]
+
+    # Clear the default ordering of the model so that it is not added to the GROUP BY
+    rows = qs.order_by().annotate(
+        cell=SnapToGrid('location', get_cluster_cell_size(zoom)),
+    ).values('cell').annotate(
+        point_count=Count('id'),
+        # These are the values of the organization itself in single-point clusters
+        organization_id=Min('id'),
+        organization_name=Min('name'),
+        organization_abbreviation=Min('abbreviation'),
+        geometry=AsGeoJSON(Centroid(Collect('location')), precision=GEOJSON_PRECISION),
+    ).order_by('organization_id').values_list(
+        'point_count', 'organization_id', 'organization_name', 'organization_abbreviation', 'geometry',
+    )
+    features = []
+    for point_count, id, name, abbreviation, geometry in rows:
+        if point_count == 1:
+            features.append(_organization_feature(id, name, abbreviation, geometry))
+        else:
+            features.append(_feature(geometry, dict(cluster=True, pointCount=point_count)))
+    return features
+
+
+def organization_feature_collection(*args, **kwargs) -> str:
+    """Return the result of `organization_features()` as a serialized GeoJSON FeatureCollection."""
+    features = organization_features(*args, **kwargs)
+    return '{"type":"FeatureCollection","features":[%s]}' % ','.join(features)
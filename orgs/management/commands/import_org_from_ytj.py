@@ -1,72 +1,13 @@
-import re
-import requests
 from django.core.management.base import BaseCommand
 
 from actions.models import Plan
-from orgs.models import Organization, OrganizationClass, OrganizationIdentifier, Namespace
+from orgs.models import Namespace
+from orgs.registry import YTJ_NAMESPACE, OrganizationImporter, YTJSource
 
 
 class Command(BaseCommand):
     help = 'Import an organisation from YTJ'
 
-    def import_organisation(self, name_or_id):
-        namespace = Namespace.objects.get(identifier='ytj')
-
-        if not name_or_id[0].isnumeric():
-            resp = requests.get('https://avoindata.prh.fi/bis/v1?name=%s' % name_or_id)
-            resp.raise_for_status()
-            res = resp.json()['results']
-            if len(res) == 0:
-                print('No matches for: %s' % name_or_id)
-                return
-            elif len(res) > 1:
-                print('Multiple matches for: %s' % name_or_id)
-                for org in res:
-                    print('\t%s: %s' % (res['businessId'], res['name']))
-                return
-            else:
-                data = res[0]
-        else:
-            resp = requests.get('https://avoindata.prh.fi/bis/v1/%s' % name_or_id)
-            resp.raise_for_status()
-            res = resp.json()['results']
-            if len(res) == 0:
-                print('No matches for: %s' % name_or_id)
-                return
-            assert len(res) == 1
-            data = res[0]
-
-        form = data['companyForm']
-        assert form == 'OY'
-
-        org_identifier = (OrganizationIdentifier.objects.filter(namespace=namespace, identifier=data['businessId'])
-                          .first())
-        if org_identifier is None:
-            print('Creating %s (%s)' % (data['name'], data['businessId']))
-            org = Organization()
-            create = True
-        else:
-            org = org_identifier.organization
-            create = False
-
-        org.name = data['name']
-        org.classification = OrganizationClass.objects.get(name='Osakeyhtiö')
-        if not org.abbreviation:
-            abbr = re.sub(' [oO][yY]', '', org.name)
-            org.abbreviation = abbr
-
-        if create:
-            org = Organization.add_root(instance=org)
-        else:
-            org.save()
-
-        if org_identifier is None:
-            OrganizationIdentifier.objects.create(namespace=namespace, identifier=data['businessId'], organization=org)
-
-        print('Imported %s (%s)' % (org.name, org.id))
-        if self.plan:
-            self.plan.related_organizations.add(org)
-
     def add_arguments(self, parser):
         # Positional arguments
         parser.add_argument('name_or_id', nargs='+', type=str)
@@ -79,10 +20,16 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         if options['plan']:
-            self.plan = Plan.objects.get(identifier=options['plan'])
+            plan = Plan.objects.get(identifier=options['plan'])
         else:
-            self.plan = None
-
-        for name_or_id in options['name_or_id']:
-            print(name_or_id)
-            self.import_organisation(name_or_id)
+            plan = None
+
+        namespace = Namespace.objects.get(identifier=YTJ_NAMESPACE)
+        importer = OrganizationImporter(namespace, plan=plan)
+        result = importer.import_records(YTJSource(options['name_or_id']).get_records())
+        for identifier in result.created:
+            print('Created %s' % identifier)
+        for identifier in result.updated:
+            print('Updated %s' % identifier)
+        for identifier, reason in result.skipped.items():
+            print('Skipped %s: %s' % (identifier, reason))
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from actions.models import Plan
+from orgs.models import Namespace, Organization
+from orgs.registry import BATCH_SIZE, YTJ_NAMESPACE, DumpFileSource, OrganizationImporter, RegistryError
+
+
+class Command(BaseCommand):
+    help = 'Import organizations from a dump file of a business registry in CSV or JSON lines format'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'file',
+            help='Dump file with the field names of the YTJ API (businessId, name, companyForm)',
+        )
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            help='Format of the dump file; by default determined from the file name',
+        )
+        parser.add_argument(
+            '--namespace',
+            default=YTJ_NAMESPACE,
+            help='Identifier of the namespace of the business IDs',
+        )
+        parser.add_argument(
+            '--plan',
+            help='Add imported organizations to plan',
+        )
+        parser.add_argument(
+            '--parent',
+            type=int,
+            help='ID of the organization under which new organizations are created; by default they are roots',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Number of organizations created or updated in one transaction',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report what would be created or updated',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            namespace = Namespace.objects.get(identifier=options['namespace'])
+        except Namespace.DoesNotExist:
+            raise CommandError(f"No namespace with identifier '{options['namespace']}' exists.")
+        plan = Plan.objects.get(identifier=options['plan']) if options['plan'] else None
+        parent = Organization.objects.get(id=options['parent']) if options['parent'] else None
+
+        importer = OrganizationImporter(
+            namespace, plan=plan, parent=parent, batch_size=options['batch_size'], dry_run=options['dry_run'],
+        )
+        try:
+            source = DumpFileSource(options['file'], format=options['format'])
+            result = importer.import_records(source.get_records())
+        except RegistryError as e:
+            raise CommandError(str(e))
+
+        for identifier, reason in result.skipped.items():
+            self.stderr.write(f"Skipped {identifier}: {reason}")
+        prefix = 'Dry run: ' if options['dry_run'] else ''
+        self.stdout.write(
+            f"{prefix}Created {len(result.created)} and updated {len(result.updated)} organizations; "
+            f"{result.unchanged} unchanged, {len(result.skipped)} skipped."
+        )
@@ -0,0 +1,274 @@
+"""Importing organizations from a business registry, such as the Finnish YTJ.
+
+Records are read from a source, which is either the YTJ API or a dump file of the registry, and compared to the
+existing organizations by their identifiers in the registry's namespace. New organizations are created and
+changed ones updated in batches.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import re
+import typing
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, Protocol
+
+import requests
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from treebeard.exceptions import PathOverflow
+from wagtail.search.backends import get_search_backends
+
+from .models import Namespace, Organization, OrganizationClass, OrganizationIdentifier
+
+if typing.TYPE_CHECKING:
+    from actions.models import Plan
+
+
+logger = logging.getLogger(__name__)
+
+YTJ_API_URL = 'https://avoindata.prh.fi/bis/v1'
+YTJ_NAMESPACE = 'ytj'
+BATCH_SIZE = 500
+# Names of the organization classes by the company form in the registry
+COMPANY_FORM_CLASSIFICATIONS = {
+    'OY': 'Osakeyhtiö',
+}
+
+
+class RegistryError(Exception):
+    pass
+
+
+@dataclass
+class RegistryRecord:
+    identifier: str
+    name: str
+    company_form: str | None = None
+
+    @classmethod
+    def from_ytj(cls, data: dict) -> RegistryRecord:
+        """Create a record from an entry in the format of the YTJ API, which is also used in dump files."""
+        try:
+            identifier = data['businessId'].strip()
+            name = data['name'].strip()
+        except (KeyError, AttributeError):
+            raise RegistryError(f"Invalid registry entry: {data}")
+        if not identifier or not name:
+            raise RegistryError(f"Invalid registry entry: {data}")
+        return cls(identifier=identifier, name=name, company_form=data.get('companyForm') or None)
+
+    def get_abbreviation(self) -> str:
+        return re.sub(' [oO][yY]', '', self.name)
+
+
+class RegistrySource(Protocol):
+    def get_records(self) -> Iterable[RegistryRecord]:
+        ...
+
+
+class DumpFileSource:
+    """Reads a registry dump in CSV or JSON lines format with the field names of the YTJ API."""
+
+    def __init__(self, path: str | Path, format: str | None = None):
+        self.path = Path(path)
+        if format is None:
+            format = 'csv' if self.path.suffix.lower() == '.csv' else 'jsonl'
+        if format not in ('csv', 'jsonl'):
+            raise RegistryError(f"Unsupported dump format: {format}")
+        self.format = format
+
+    def _read_entries(self) -> Iterator[dict]:
+        with self.path.open(encoding='utf8', newline='') as f:
+            if self.format == 'csv':
+                yield from csv.DictReader(f)
+                return
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise RegistryError(f"{self.path}:{line_number}: {e}")
+
+    def get_records(self) -> Iterator[RegistryRecord]:
+        for entry in self._read_entries():
+            yield RegistryRecord.from_ytj(entry)
+
+
+class YTJSource:
+    """Fetches organizations from the YTJ API by business ID or by name."""
+
+    def __init__(self, names_or_ids: Iterable[str], session: requests.Session | None = None):
+        self.names_or_ids = list(names_or_ids)
+        self.session = session or requests.Session()
+
+    def _search(self, name_or_id: str) -> list[dict]:
+        if name_or_id[0].isnumeric():
+            resp = self.session.get(f'{YTJ_API_URL}/{name_or_id}')
+        else:
+            resp = self.session.get(YTJ_API_URL, params={'name': name_or_id})
+        resp.raise_for_status()
+        return resp.json()['results']
+
+    def get_records(self) -> Iterator[RegistryRecord]:
+        for name_or_id in self.names_or_ids:
+            results = self._search(name_or_id)
+            if len(results) == 0:
+                logger.warning(f"No matches for: {name_or_id}")
+                continue
+            if len(results) > 1:
+                matches = ', '.join(f"{res['businessId']}: {res['name']}" for res in results)
+                logger.warning(f"Multiple matches for {name_or_id}: {matches}")
+                continue
+            yield RegistryRecord.from_ytj(results[0])
+
+
+@dataclass
+class ImportResult:
+    created: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    # Identifiers of the skipped records with the reason
+    skipped: dict[str, str] = field(default_factory=dict)
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class OrganizationImporter:
+    """Creates and updates organizations from registry records in batches.
+
+    New organizations are created as roots or, if `parent` is given, as its children. Their tree paths are computed
+    in memory so that they can be created with `bulk_create()`, which is why the tree must not be modified by anyone
+    else while importing.
+    """
+
+    def __init__(
+        self, namespace: Namespace, plan: Plan | None = None, parent: Organization | None = None,
+        primary_language: str | None = None, batch_size: int = BATCH_SIZE, dry_run: bool = False,
+    ):
+        self.namespace = namespace
+        self.plan = plan
+        self.parent = parent
+        if primary_language is None:
+            primary_language = plan.primary_language if plan is not None else 'fi'
+        self.primary_language = primary_language
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        classes = OrganizationClass.objects.filter(name__in=COMPANY_FORM_CLASSIFICATIONS.values())
+        classes_by_name = {org_class.name: org_class for org_class in classes}
+        self.classifications = {
+            form: classes_by_name[name]
+            for form, name in COMPANY_FORM_CLASSIFICATIONS.items() if name in classes_by_name
+        }
+        self._last_position: int | None = None
+
+    def _next_path(self) -> str:
+        if self._last_position is None:
+            if self.parent is not None:
+                last = self.parent.get_last_child()
+            else:
+                last = Organization.get_last_root_node()
+            self._last_position = last._get_lastpos_in_path() if last is not None else 0
+        self._last_position += 1
+        depth = self.parent.depth + 1 if self.parent is not None else 1
+        path = Organization._get_path(self.parent.path if self.parent else None, depth, self._last_position)
+        if len(path) > depth * Organization.steplen:
+            raise PathOverflow("Path overflow when adding organizations")
+        return path
+
+    def _get_changed_fields(self, org: Organization, record: RegistryRecord, classification) -> list[str]:
+        changed = []
+        if org.name != record.name:
+            org.name = record.name
+            changed.append('name')
+        if org.classification_id != classification.id:
+            org.classification = classification
+            changed.append('classification')
+        if not org.abbreviation:
+            org.abbreviation = record.get_abbreviation()
+            changed.append('abbreviation')
+        return changed
+
+    def _new_organization(self, record: RegistryRecord, classification) -> Organization:
+        path = self._next_path()
+        return Organization(
+            name=record.name, abbreviation=record.get_abbreviation(), classification=classification,
+            primary_language=self.primary_language, path=path, depth=len(path) // Organization.steplen, numchild=0,
+        )
+
+    def import_records(self, records: Iterable[RegistryRecord]) -> ImportResult:
+        result = ImportResult()
+        for batch in chunked(records, self.batch_size):
+            # A record may appear in a dump more than once; use the last one
+            by_identifier = {record.identifier: record for record in batch}
+            with transaction.atomic():
+                self._import_batch(by_identifier, result)
+                if self.dry_run:
+                    transaction.set_rollback(True)
+        return result
+
+    def _import_batch(self, records: dict[str, RegistryRecord], result: ImportResult):
+        existing = {
+            org_identifier.identifier: org_identifier.organization
+            for org_identifier in OrganizationIdentifier.objects.filter(
+                namespace=self.namespace, identifier__in=records.keys(),
+            ).select_related('organization')
+        }
+        to_create: list[tuple[str, Organization]] = []
+        to_update: dict[tuple[str, ...], list[Organization]] = {}
+        for identifier, record in records.items():
+            classification = self.classifications.get(record.company_form)
+            if classification is None:
+                result.skipped[identifier] = f"Unsupported company form: {record.company_form}"
+                continue
+            org = existing.get(identifier)
+            if org is None:
+                to_create.append((identifier, self._new_organization(record, classification)))
+                continue
+            changed = self._get_changed_fields(org, record, classification)
+            if changed:
+                org.last_modified_time = timezone.now()
+                to_update.setdefault(tuple(changed + ['last_modified_time']), []).append(org)
+                result.updated.append(identifier)
+            else:
+                result.unchanged += 1
+
+        created = Organization.objects.bulk_create([org for _, org in to_create])
+        OrganizationIdentifier.objects.bulk_create([
+            OrganizationIdentifier(organization=org, namespace=self.namespace, identifier=identifier)
+            for (identifier, _), org in zip(to_create, created)
+        ])
+        result.created += [identifier for identifier, _ in to_create]
+        if created and self.parent is not None:
+            Organization.objects.filter(pk=self.parent.pk).update(numchild=F('numchild') + len(created))
+        updated = []
+        for fields, orgs in to_update.items():
+            Organization.objects.bulk_update(orgs, fields)
+            updated += orgs
+        if self.plan is not None:
+            imported = [org for identifier, org in existing.items() if identifier not in result.skipped]
+            self.plan.related_organizations.add(*created, *imported)
+        if not self.dry_run and (created or updated):
+            changed = created + updated
+            transaction.on_commit(lambda: self._update_search_index(changed))
+
+    def _update_search_index(self, orgs: list[Organization]):
+        # Saving with `bulk_create()` and `bulk_update()` does not send the signals that update the index
+        for backend in get_search_backends(with_auto_update=True):
+            try:
+                backend.add_bulk(Organization, orgs)
+            except Exception:
+                logger.exception("Error updating the search index for imported organizations")
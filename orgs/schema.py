@@ -4,11 +4,14 @@ import graphene_django_optimizer as gql_optimizer
 from aplans.graphql_helpers import (
     AdminButtonsMixin, CreateModelInstanceMutation, DeleteModelInstanceMutation, UpdateModelInstanceMutation,
 )
-from aplans.graphql_types import AuthenticatedUserNode, DjangoNode, GQLInfo, register_django_node
+from aplans.graphql_gis import FeatureCollectionScalar
+from aplans.graphql_types import AuthenticatedUserNode, DjangoNode, GQLInfo, get_plan_from_context, register_django_node
 from graphene_django.forms.mutation import DjangoModelFormMutation
+from graphql.error import GraphQLError
 
 from actions.models import Plan
 from orgs.forms import NodeForm
+from orgs.geo import BoundingBox, organization_feature_collection, validate_zoom
 from orgs.models import Organization, OrganizationClass
 
 
@@ -107,10 +110,41 @@ class OrganizationNode(AdminButtonsMixin, DjangoNode):
 class Query:
     organization = graphene.Field(OrganizationNode, id=graphene.ID(required=True))
 
+    plan_organization_locations = graphene.Field(
+        FeatureCollectionScalar,
+        plan=graphene.ID(required=True),
+        bbox=graphene.List(
+            graphene.NonNull(graphene.Float),
+            description='Return only the organizations inside [minLon, minLat, maxLon, maxLat]',
+        ),
+        zoom=graphene.Int(description='Zoom level of the map'),
+        cluster=graphene.Boolean(
+            default_value=False, description='Cluster organizations close to each other at low zoom levels',
+        ),
+    )
+
     @staticmethod
     def resolve_organization(root, info, id):
         return Organization.objects.get(id=id)
 
+    @staticmethod
+    def resolve_plan_organization_locations(root, info: GQLInfo, plan, bbox=None, zoom=None, cluster=False):
+        plan_obj = get_plan_from_context(info, plan)
+        if plan_obj is None:
+            return None
+        if bbox is not None:
+            try:
+                bbox = BoundingBox.from_coordinates(bbox)
+            except ValueError as e:
+                raise GraphQLError(str(e))
+        if zoom is not None:
+            try:
+                zoom = validate_zoom(zoom)
+            except ValueError as e:
+                raise GraphQLError(str(e))
+        qs = Organization.objects.available_for_plan(plan_obj)
+        return organization_feature_collection(qs, bbox=bbox, zoom=zoom, cluster=cluster)
+
 
 class CreateOrganizationMutation(CreateModelInstanceMutation):
     class Meta:
@@ -0,0 +1,132 @@
+import json
+import pytest
+from django.contrib.gis.geos import Point
+from django.urls import reverse
+
+from orgs.geo import BoundingBox, organization_feature_collection, organization_features, validate_zoom
+from orgs.models import Organization
+from orgs.tests.factories import OrganizationFactory
+
+pytestmark = pytest.mark.django_db
+
+HELSINKI = (24.94, 60.17)
+ESPOO = (24.66, 60.21)
+TAMPERE = (23.76, 61.50)
+FINLAND = BoundingBox(19.0, 59.0, 32.0, 71.0)
+CAPITAL_REGION = BoundingBox(24.5, 60.0, 25.3, 60.4)
+
+PLAN_ORGANIZATION_LOCATIONS = '''
+    query($plan: ID!, $bbox: [Float!], $zoom: Int, $cluster: Boolean) {
+      planOrganizationLocations(plan: $plan, bbox: $bbox, zoom: $zoom, cluster: $cluster)
+    }
+'''
+
+
+@pytest.fixture
+def located_organizations(plan):
+    org = plan.organization
+    return {
+        'helsinki': OrganizationFactory(parent=org, name='Helsinki', location=Point(*HELSINKI, srid=4326)),
+        'espoo': OrganizationFactory(parent=org, name='Espoo', location=Point(*ESPOO, srid=4326)),
+        'tampere': OrganizationFactory(parent=org, name='Tampere', location=Point(*TAMPERE, srid=4326)),
+    }
+
+
+@pytest.fixture
+def other_plan_organization(plan_factory):
+    other_plan = plan_factory()
+    return OrganizationFactory(parent=other_plan.organization, location=Point(*HELSINKI, srid=4326))
+
+
+def feature_ids(collection):
+    return sorted(feature['id'] for feature in collection['features'] if 'id' in feature)
+
+
+def test_features_are_built_in_one_query(located_organizations, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        collection = json.loads(organization_feature_collection(Organization.objects.all()))
+    assert collection['type'] == 'FeatureCollection'
+    helsinki = located_organizations['helsinki']
+    feature = next(f for f in collection['features'] if f['id'] == helsinki.id)
+    assert feature['geometry'] == {'type': 'Point', 'coordinates': list(HELSINKI)}
+    assert feature['properties'] == {'id': helsinki.id, 'name': 'Helsinki', 'abbreviation': helsinki.abbreviation}
+
+
+def test_organizations_without_location_are_skipped(plan, located_organizations):
+    features = organization_features(Organization.objects.available_for_plan(plan))
+    assert len(features) == 3
+
+
+def test_bbox_filter(located_organizations):
+    features = organization_features(Organization.objects.all(), bbox=CAPITAL_REGION)
+    ids = feature_ids(json.loads('{"features":[%s]}' % ','.join(features)))
+    assert ids == sorted([located_organizations['helsinki'].id, located_organizations['espoo'].id])
+
+
+def test_nearby_organizations_are_clustered_at_low_zoom(located_organizations):
+    qs = Organization.objects.all()
+    features = [json.loads(f) for f in organization_features(qs, zoom=6, cluster=True)]
+    clusters = [f for f in features if f['properties'].get('cluster')]
+    assert len(clusters) == 1
+    assert clusters[0]['properties']['pointCount'] == 2
+    assert [f['id'] for f in features if 'id' in f] == [located_organizations['tampere'].id]
+
+    # Zoomed in, every organization is its own feature
+    features = organization_features(qs, zoom=14, cluster=True)
+    assert len(features) == 3
+
+
+def test_bbox_parsing():
+    assert BoundingBox.from_string('24.5,60,25.3,60.4') == CAPITAL_REGION
+    with pytest.raises(ValueError):
+        BoundingBox.from_string('24.5,60,25.3')
+    with pytest.raises(ValueError):
+        BoundingBox.from_string('25.3,60,24.5,60.4')
+
+
+
+def test_zoom_validation():
+    assert validate_zoom(0) == 0
+    assert validate_zoom(24) == 24
+    for zoom in (-1, -1100, 25):
+        with pytest.raises(ValueError):
+            validate_zoom(zoom)
+
+
+def test_graphql_plan_organization_locations(
+    plan, located_organizations, other_plan_organization, graphql_client_query_data,
+):
+    data = graphql_client_query_data(
+        PLAN_ORGANIZATION_LOCATIONS, variables={'plan': plan.identifier, 'bbox': list(FINLAND)},
+    )
+    collection = data['planOrganizationLocations']
+    assert feature_ids(collection) == sorted(org.id for org in located_organizations.values())
+
+
+def test_graphql_invalid_bbox(plan, graphql_client_query, contains_error):
+    response = graphql_client_query(
+        PLAN_ORGANIZATION_LOCATIONS, variables={'plan': plan.identifier, 'bbox': [1.0, 2.0]},
+    )
+    assert contains_error(response, message='Bounding box must have four coordinates')
+
+
+def test_graphql_invalid_zoom(plan, graphql_client_query, contains_error):
+    response = graphql_client_query(
+        PLAN_ORGANIZATION_LOCATIONS, variables={'plan': plan.identifier, 'zoom': -1100, 'cluster': True},
+    )
+    assert contains_error(response, message='Zoom level must be between 0 and 24')
+
+
+def test_rest_organization_locations(plan, located_organizations, other_plan_organization, client):
+    url = reverse('organization-locations')
+    response = client.get(url, {'plan': plan.identifier, 'bbox': ','.join(str(c) for c in CAPITAL_REGION)})
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/geo+json'
+    ids = feature_ids(json.loads(response.content))
+    assert ids == sorted([located_organizations['helsinki'].id, located_organizations['espoo'].id])
+
+    response = client.get(url, {'plan': plan.identifier, 'bbox': 'invalid'})
+    assert response.status_code == 400
+
+    response = client.get(url, {'plan': plan.identifier, 'zoom': '-1100', 'cluster': 'true'})
+    assert response.status_code == 400
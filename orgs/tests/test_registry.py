@@ -0,0 +1,125 @@
+import json
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+from orgs.models import Organization, OrganizationIdentifier
+from orgs.registry import DumpFileSource, OrganizationImporter, YTJSource
+from orgs.tests.factories import NamespaceFactory, OrganizationClassFactory, OrganizationFactory
+
+pytestmark = pytest.mark.django_db
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+
+@pytest.fixture
+def namespace():
+    OrganizationClassFactory(name='Osakeyhtiö')
+    return NamespaceFactory(identifier='ytj')
+
+
+class FixtureResponse:
+    def __init__(self, path: Path):
+        self.path = path
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.path.read_text())
+
+
+class FixtureSession:
+    """Stands in for `requests.Session` and returns the same fixture file for every request."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.requests = []
+
+    def get(self, url, params=None):
+        self.requests.append((url, params))
+        return FixtureResponse(self.path)
+
+
+def identifiers(namespace):
+    return dict(OrganizationIdentifier.objects.filter(namespace=namespace).values_list('identifier', 'organization'))
+
+
+def assert_tree_is_valid():
+    assert all(not problems for problems in Organization.find_problems())
+
+
+def test_import_dump_creates_roots(namespace, django_assert_max_num_queries):
+    OrganizationFactory()
+    records = DumpFileSource(FIXTURES / 'ytj_dump.jsonl').get_records()
+    with django_assert_max_num_queries(10):
+        result = OrganizationImporter(namespace).import_records(records)
+    assert sorted(result.created) == ['0000001-1', '0000002-2', '0000004-4']
+    assert result.skipped == {'0000003-3': 'Unsupported company form: KY'}
+
+    orgs = identifiers(namespace)
+    beta = Organization.objects.get(id=orgs['0000002-2'])
+    # The last entry of a business ID wins
+    assert beta.name == 'Beta Group Oy'
+    assert beta.abbreviation == 'Beta Group'
+    assert beta.classification.name == 'Osakeyhtiö'
+    assert beta.is_root()
+    assert_tree_is_valid()
+
+
+def test_import_updates_existing(namespace):
+    OrganizationImporter(namespace).import_records(DumpFileSource(FIXTURES / 'ytj_dump.jsonl').get_records())
+    before = identifiers(namespace)
+
+    result = OrganizationImporter(namespace).import_records(DumpFileSource(FIXTURES / 'ytj_dump.csv').get_records())
+    assert result.updated == ['0000001-1']
+    assert result.created == ['0000005-5']
+    after = identifiers(namespace)
+    assert after['0000001-1'] == before['0000001-1']
+    assert Organization.objects.get(id=after['0000001-1']).name == 'Alpha Renamed Oy'
+
+    result = OrganizationImporter(namespace).import_records(DumpFileSource(FIXTURES / 'ytj_dump.csv').get_records())
+    assert result.created == result.updated == []
+    assert result.unchanged == 2
+    assert_tree_is_valid()
+
+
+def test_import_under_parent_in_batches(namespace, plan):
+    parent = plan.organization
+    OrganizationFactory(parent=parent)
+    parent.refresh_from_db()
+    numchild = parent.numchild
+    importer = OrganizationImporter(namespace, plan=plan, parent=parent, batch_size=2)
+    importer.import_records(DumpFileSource(FIXTURES / 'ytj_dump.jsonl').get_records())
+    orgs = Organization.objects.filter(id__in=identifiers(namespace).values())
+    assert orgs.count() == 3
+    parent.refresh_from_db()
+    assert parent.numchild == numchild + 3
+    assert all(org.get_parent(update=True) == parent for org in orgs)
+    assert set(plan.related_organizations.all()) == set(orgs)
+    assert_tree_is_valid()
+
+
+def test_dry_run_changes_nothing(namespace):
+    importer = OrganizationImporter(namespace, dry_run=True)
+    result = importer.import_records(DumpFileSource(FIXTURES / 'ytj_dump.jsonl').get_records())
+    assert len(result.created) == 3
+    assert not OrganizationIdentifier.objects.exists()
+    assert not Organization.objects.exists()
+
+
+def test_ytj_source(namespace):
+    session = FixtureSession(FIXTURES / 'ytj_company.json')
+    records = list(YTJSource(['0000006-6', 'Zeta'], session=session).get_records())
+    assert [record.identifier for record in records] == ['0000006-6', '0000006-6']
+    assert session.requests[1][1] == {'name': 'Zeta'}
+
+    result = OrganizationImporter(namespace).import_records(records)
+    assert result.created == ['0000006-6']
+
+
+def test_import_command(namespace, capsys):
+    call_command('import_org_registry', str(FIXTURES / 'ytj_dump.csv'))
+    assert 'Created 2 and updated 0 organizations' in capsys.readouterr().out
+    assert set(identifiers(namespace)) == {'0000001-1', '0000005-5'}
@@ -1,6 +1,7 @@
 import typing
 from django.apps import AppConfig
 from django.conf import settings
+from django.db.models.signals import post_delete, post_save
 from wagtailorderable.signals import post_reorder
 
 if typing.TYPE_CHECKING:
@@ -66,6 +67,37 @@ def post_reorder_categories(sender, **kwargs):
         category_type.synchronize_pages()
 
 
+def rebuild_navigation_index(sender, instance, **kwargs):
+    from .navigation import invalidate_navigation_indexes
+    invalidate_navigation_indexes([instance], rebuild=True)
+
+
+def rebuild_navigation_index_after_move(sender, instance, parent_page_before, parent_page_after, **kwargs):
+    from .navigation import invalidate_navigation_indexes
+    invalidate_navigation_indexes([parent_page_before, parent_page_after], rebuild=True)
+
+
+def invalidate_navigation_index(sender, instance, update_fields=None, **kwargs):
+    from .navigation import INDEXED_PAGE_FIELDS, invalidate_navigation_indexes
+
+    if update_fields is not None and not INDEXED_PAGE_FIELDS.intersection(update_fields):
+        return
+    invalidate_navigation_indexes([instance])
+
+
+def invalidate_navigation_index_for_restriction(sender, instance, **kwargs):
+    from .navigation import invalidate_navigation_indexes
+    invalidate_navigation_indexes([instance.page])
+
+
+def invalidate_page_links(sender, **kwargs):
+    from aplans.rich_text import RichTextReferences
+    from .rich_text import PageLinkHandler
+
+    # Changing a page or a site may change the URLs of other pages, so all page links are invalidated
+    RichTextReferences.invalidate(PageLinkHandler)
+
+
 class PagesConfig(AppConfig):
     name = 'pages'
 
@@ -75,3 +107,32 @@ class PagesConfig(AppConfig):
         post_reorder.connect(
             post_reorder_categories, sender=CategoryAdmin, dispatch_uid='reorder_category_pages'
         )
+
+        from wagtail.models import PageViewRestriction, Site, get_page_models
+        from wagtail.signals import page_published, page_unpublished, post_page_move
+        page_published.connect(rebuild_navigation_index, dispatch_uid='navigation_index_published')
+        page_unpublished.connect(rebuild_navigation_index, dispatch_uid='navigation_index_unpublished')
+        post_page_move.connect(rebuild_navigation_index_after_move, dispatch_uid='navigation_index_moved')
+        # Pages may also be changed without publishing, e.g., when synchronizing category pages. The model signals
+        # are sent with the concrete page class as the sender, so connect them for each page model.
+        for page_model in get_page_models():
+            label = page_model._meta.label_lower
+            post_save.connect(
+                invalidate_navigation_index, sender=page_model, dispatch_uid=f'navigation_index_page_saved_{label}',
+            )
+            post_delete.connect(
+                invalidate_navigation_index, sender=page_model, dispatch_uid=f'navigation_index_page_deleted_{label}',
+            )
+        for model in (*get_page_models(), Site):
+            label = model._meta.label_lower
+            post_save.connect(invalidate_page_links, sender=model, dispatch_uid=f'page_links_saved_{label}')
+            post_delete.connect(invalidate_page_links, sender=model, dispatch_uid=f'page_links_deleted_{label}')
+        post_page_move.connect(invalidate_page_links, dispatch_uid='page_links_moved')
+        post_save.connect(
+            invalidate_navigation_index_for_restriction, sender=PageViewRestriction,
+            dispatch_uid='navigation_index_restriction_saved',
+        )
+        post_delete.connect(
+            invalidate_navigation_index_for_restriction, sender=PageViewRestriction,
+            dispatch_uid='navigation_index_restriction_deleted',
+        )
@@ -0,0 +1,127 @@
+"""Navigation index for the menus of a plan site.
+
+The index is a flat list of the live, public pages under a (translated) plan root page with the data needed to
+build the main menu, the footer and the additional links. It is kept in the cache and rebuilt when pages are
+published, unpublished or moved, so that the menu resolvers don't need to look at every page type.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+from wagtail.models import Page
+
+NAVIGATION_INDEX_CACHE_TIMEOUT = 24 * 3600
+
+MENU_FLAGS = ('show_in_menus', 'show_in_footer', 'show_in_additional_links')
+# Saving a page with only other fields changed does not affect the index
+INDEXED_PAGE_FIELDS = {'title', 'slug', 'url_path', 'live', 'path', 'depth', *MENU_FLAGS}
+
+
+def navigation_index_cache_key(root_page_id: int) -> str:
+    return f'navigation-index:{root_page_id}'
+
+
+@dataclass
+class NavigationEntry:
+    id: int
+    parent_id: int
+    path: str
+    depth: int
+    title: str
+    url_path: str
+    show_in_menus: bool
+    show_in_footer: bool
+    show_in_additional_links: bool
+
+
+class NavigationIndex:
+    def __init__(self, root_page_id: int, root_depth: int, entries: list[NavigationEntry]):
+        self.root_page_id = root_page_id
+        self.root_depth = root_depth
+        self.entries = entries
+        self.by_id = {entry.id: entry for entry in entries}
+
+    @classmethod
+    def build(cls, root_page: Page) -> NavigationIndex:
+        pages = list(root_page.get_descendants(inclusive=False).live().public().order_by('path').specific())
+        parent_ids = {root_page.path: root_page.id, **{page.path: page.id for page in pages}}
+        missing_parent_paths = {page.path[:-Page.steplen] for page in pages} - parent_ids.keys()
+        if missing_parent_paths:
+            # Live pages under a page that is not live are still listed among the descendants of the root page
+            parent_ids.update(Page.objects.filter(path__in=missing_parent_paths).values_list('path', 'id'))
+        entries = []
+        for page in pages:
+            entries.append(NavigationEntry(
+                id=page.id,
+                parent_id=parent_ids[page.path[:-Page.steplen]],
+                path=page.path,
+                depth=page.depth,
+                title=page.title,
+                url_path=page.url_path,
+                # Pages that are not AplansPages cannot be shown in the footer or additional links
+                **{flag: getattr(page, flag, False) for flag in MENU_FLAGS},
+            ))
+        return cls(root_page.id, root_page.depth, entries)
+
+    @classmethod
+    def for_root_page(cls, root_page: Page) -> NavigationIndex:
+        key = navigation_index_cache_key(root_page.id)
+        index = cache.get(key)
+        if index is None:
+            index = cls.build(root_page)
+            cache.set(key, index, NAVIGATION_INDEX_CACHE_TIMEOUT)
+        return index
+
+    def get_entries(
+        self, parent_id: int | None = None, with_descendants: bool = False, flag: str | None = None,
+    ) -> list[NavigationEntry]:
+        """Return the entries below `parent_id` (by default the root page) in tree order, optionally by menu flag."""
+        if parent_id is None:
+            parent_id = self.root_page_id
+        if with_descendants:
+            if parent_id == self.root_page_id:
+                entries: Iterable[NavigationEntry] = self.entries
+            else:
+                parent = self.by_id.get(parent_id)
+                if parent is None:
+                    return []
+                entries = (e for e in self.entries if e.path.startswith(parent.path) and e.id != parent_id)
+        else:
+            entries = (e for e in self.entries if e.parent_id == parent_id)
+        if flag is not None:
+            entries = (e for e in entries if getattr(e, flag))
+        return list(entries)
+
+    def get_pages(self, entries: list[NavigationEntry]) -> list[Page]:
+        """Return the specific pages for the entries in the same order."""
+        pages = {page.id: page for page in Page.objects.filter(id__in=[e.id for e in entries]).specific()}
+        return [pages[e.id] for e in entries if e.id in pages]
+
+
+def invalidate_navigation_indexes(pages: Iterable[Page | None], rebuild: bool = False):
+    """Remove the cached indexes of all trees containing the given pages.
+
+    If `rebuild` is set, the indexes of the plan root pages containing the pages are built again right away.
+    Both happen after the current transaction is committed, so that a concurrent request can't cache an index
+    built from the data before the change.
+    """
+    ancestor_ids: set[int] = set()
+    for page in pages:
+        if page is None:
+            continue
+        ancestor_ids.update(page.get_ancestors(inclusive=True).values_list('id', flat=True))
+    if not ancestor_ids:
+        return
+    transaction.on_commit(lambda: _invalidate_navigation_indexes(ancestor_ids, rebuild))
+
+
+def _invalidate_navigation_indexes(root_page_ids: set[int], rebuild: bool):
+    from .models import PlanRootPage
+
+    cache.delete_many([navigation_index_cache_key(page_id) for page_id in root_page_ids])
+    if rebuild:
+        for root_page in Page.objects.filter(id__in=root_page_ids).type(PlanRootPage):
+            NavigationIndex.for_root_page(root_page)
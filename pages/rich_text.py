@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.utils import translation
+from django.utils.html import escape
+from wagtail import hooks
+from wagtail.models import Locale, Page
+from wagtail.rich_text.pages import PageLinkHandler as WagtailPageLinkHandler
+
+from aplans.rich_text import PrefetchedEntityHandlerMixin
+
+
+class PageLinkHandler(PrefetchedEntityHandlerMixin, WagtailPageLinkHandler):
+    # Attribute of prefetched pages holding the language and the page to link to in that language
+    LOCALIZED_ATTR = '_rich_text_localized'
+
+    @classmethod
+    def get_queryset(cls):
+        return Page.objects.specific()
+
+    @classmethod
+    def prefetch_related(cls, pages: list[Page]):
+        """Find the translations of the pages in the active locale like `Page.localized` with one query."""
+        if not pages:
+            return
+        locale = None
+        if getattr(settings, 'WAGTAIL_I18N_ENABLED', False):
+            try:
+                locale = Locale.get_active()
+            except (LookupError, Locale.DoesNotExist):
+                pass
+        translations = {}
+        if locale is not None:
+            translation_keys = {page.translation_key for page in pages if page.locale_id != locale.id}
+            if translation_keys:
+                # Translations that are not live are not linked to
+                translated_pages = Page.objects.filter(
+                    translation_key__in=translation_keys, locale=locale, live=True,
+                ).specific()
+                translations = {page.translation_key: page for page in translated_pages}
+        language = translation.get_language()
+        for page in pages:
+            localized = page if locale is None else translations.get(page.translation_key, page)
+            setattr(page, cls.LOCALIZED_ATTR, (language, localized))
+
+    @classmethod
+    def get_localized(cls, page: Page) -> Page:
+        language, localized = getattr(page, cls.LOCALIZED_ATTR, (None, None))
+        if localized is None or language != translation.get_language():
+            localized = page.localized.specific
+        return localized
+
+    @classmethod
+    def expand_db_attributes(cls, attrs):
+        try:
+            page = cls.get_instance(attrs)
+        except Page.DoesNotExist:
+            return '<a>'
+        return '<a href="%s">' % escape(cls.get_localized(page).url)
+
+
+# Run after Wagtail has registered its own handler
+@hooks.register('register_rich_text_features', order=1)
+def register_page_link_type(features):
+    features.register_link_type(PageLinkHandler)
@@ -4,7 +4,7 @@ from wagtail.models import Page as WagtailPage
 from grapple.types.pages import PageInterface
 
 from aplans.graphql_types import get_plan_from_context, register_graphene_node
-from pages.models import AplansPage
+from pages.navigation import NavigationIndex
 
 
 @register_graphene_node
@@ -29,15 +29,30 @@ class PageMenuItemNode(graphene.ObjectType):
         return PageMenuItemNode(page=parent)
 
     def resolve_children(item, info):
-        pages = item.page.get_children().live().public()
+        index = getattr(item, 'navigation_index', None)
+        if index is None:
+            pages = item.page.get_children().live().public().specific()
+            return [PageMenuItemNode(page=page) for page in pages]
         # TODO: Get rid of this terrible hack
-        if 'footer' in info.path.as_list():
-            footer_page_ids = [page.id
-                               for Model in AplansPage.get_subclasses()
-                               for page in Model.objects.filter(show_in_footer=True)]
-            pages = pages.filter(id__in=footer_page_ids)
-        pages = pages.specific()
-        return [PageMenuItemNode(page=page) for page in pages]
+        flag = 'show_in_footer' if 'footer' in info.path.as_list() else None
+        entries = index.get_entries(item.page.id, flag=flag)
+        return menu_items_for_pages(index, index.get_pages(entries))
+
+
+def menu_items_for_pages(index: NavigationIndex, pages) -> list[PageMenuItemNode]:
+    items = []
+    for page in pages:
+        item = PageMenuItemNode(page=page)
+        # Used for resolving the children
+        item.navigation_index = index
+        items.append(item)
+    return items
+
+
+def get_menu_items(root_page, with_descendants: bool, flag: str) -> list[PageMenuItemNode]:
+    index = NavigationIndex.for_root_page(root_page)
+    entries = index.get_entries(root_page.id, with_descendants=with_descendants, flag=flag)
+    return menu_items_for_pages(index, index.get_pages(entries))
 
 
 @register_graphene_node
@@ -85,12 +100,7 @@ class MainMenuNode(MenuNodeMixin, graphene.ObjectType):
     def resolve_items(parent, info, with_descendants):
         if not parent:
             return []
-        if with_descendants:
-            pages = parent.get_descendants(inclusive=False)
-        else:
-            pages = parent.get_children()
-        pages = pages.live().public().in_menu().specific()
-        page_items = [PageMenuItemNode(page=page) for page in pages]
+        page_items = get_menu_items(parent, with_descendants, 'show_in_menus')
         links = parent.plan.links
         external_link_items = [
             ExternalLinkMenuItemNode(url=link.url_i18n, link_text=link.title_i18n) for link in links.all()
@@ -105,19 +115,7 @@ class FooterNode(MenuNodeMixin, graphene.ObjectType):
     def resolve_items(parent, info, with_descendants):
         if not parent:
             return []
-        if with_descendants:
-            pages = parent.get_descendants(inclusive=False)
-        else:
-            pages = parent.get_children()
-        pages = pages.live().public()
-        # AplansPage is abstract and thus has no manager, so we need to find footer pages for each subclass of
-        # AplansPage individually. Gather IDs first and then make a separate query for footer_pages because the latter
-        # gives us the correct order of the pages.
-        footer_page_ids = [page.id
-                           for Model in AplansPage.get_subclasses()
-                           for page in Model.objects.filter(show_in_footer=True)]
-        pages = pages.filter(id__in=footer_page_ids).specific()
-        return [PageMenuItemNode(page=page) for page in pages]
+        return get_menu_items(parent, with_descendants, 'show_in_footer')
 
 
 class AdditionalLinksNode(MenuNodeMixin, graphene.ObjectType):
@@ -127,19 +125,7 @@ class AdditionalLinksNode(MenuNodeMixin, graphene.ObjectType):
     def resolve_items(parent, info, with_descendants):
         if not parent:
             return []
-        if with_descendants:
-            pages = parent.get_descendants(inclusive=False)
-        else:
-            pages = parent.get_children()
-        pages = pages.live().public()
-        # AplansPage is abstract and thus has no manager, so we need to find additional links pages for each subclass of
-        # AplansPage individually. Gather IDs first and then make a separate query for additional_links_pages because
-        # the latter gives us the correct order of the pages.
-        additional_links_page_ids = [page.id
-                                     for Model in AplansPage.get_subclasses()
-                                     for page in Model.objects.filter(show_in_additional_links=True)]
-        pages = pages.filter(id__in=additional_links_page_ids).specific()
-        return [PageMenuItemNode(page=page) for page in pages]
+        return get_menu_items(parent, with_descendants, 'show_in_additional_links')
 
 
 class Query:
@@ -0,0 +1,106 @@
+import pytest
+from django.core.cache import cache
+
+from pages.models import StaticPage
+from pages.navigation import NavigationIndex, navigation_index_cache_key
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def root_page(plan_with_pages):
+    cache.clear()
+    return plan_with_pages.root_page.specific
+
+
+def cached_entries(root_page):
+    index = cache.get(navigation_index_cache_key(root_page.id))
+    assert index is not None
+    return index.entries
+
+
+def assert_index_consistent(root_page):
+    assert cached_entries(root_page) == NavigationIndex.build(root_page).entries
+
+
+def add_page(parent, title, **kwargs):
+    page = StaticPage(title=title, **kwargs)
+    parent.add_child(instance=page)
+    return page
+
+
+def test_index_contains_menu_flags(root_page):
+    page = add_page(root_page, 'footer page', show_in_footer=True, show_in_menus=False)
+    index = NavigationIndex.for_root_page(root_page)
+    entry = index.by_id[page.id]
+    assert entry.show_in_footer
+    assert not entry.show_in_menus
+    assert entry.url_path == page.url_path
+    assert [e.id for e in index.get_entries(flag='show_in_footer')] == [
+        e.id for e in index.entries if e.parent_id == root_page.id and e.show_in_footer
+    ]
+
+
+def test_index_is_rebuilt_on_publish(root_page, django_capture_on_commit_callbacks):
+    page = add_page(root_page, 'page')
+    NavigationIndex.for_root_page(root_page)
+    with django_capture_on_commit_callbacks(execute=True):
+        page.title = 'new title'
+        page.show_in_additional_links = True
+        page.save_revision().publish()
+        # The index is rebuilt only after the transaction has been committed
+        assert next(e for e in cached_entries(root_page) if e.id == page.id).title == 'page'
+    entry = next(e for e in cached_entries(root_page) if e.id == page.id)
+    assert entry.title == 'new title'
+    assert entry.show_in_additional_links
+    assert_index_consistent(root_page)
+
+
+def test_index_is_rebuilt_on_move(root_page, django_capture_on_commit_callbacks):
+    page1 = add_page(root_page, 'page1')
+    page2 = add_page(root_page, 'page2')
+    NavigationIndex.for_root_page(root_page)
+    with django_capture_on_commit_callbacks(execute=True):
+        page2.move(page1, pos='last-child')
+    entry = next(e for e in cached_entries(root_page) if e.id == page2.id)
+    assert entry.parent_id == page1.id
+    assert_index_consistent(root_page)
+
+
+def test_index_is_rebuilt_on_unpublish(root_page, django_capture_on_commit_callbacks):
+    page = add_page(root_page, 'page')
+    subpage = add_page(page, 'subpage')
+    NavigationIndex.for_root_page(root_page)
+    with django_capture_on_commit_callbacks(execute=True):
+        page.unpublish()
+    ids = {e.id for e in cached_entries(root_page)}
+    assert page.id not in ids
+    assert subpage.id in ids
+    assert_index_consistent(root_page)
+
+
+def test_live_pages_under_unpublished_page_are_descendants(root_page, django_capture_on_commit_callbacks):
+    page = add_page(root_page, 'page')
+    subpage = add_page(page, 'subpage')
+    with django_capture_on_commit_callbacks(execute=True):
+        page.unpublish()
+    index = NavigationIndex.for_root_page(root_page)
+    assert index.by_id[subpage.id].parent_id == page.id
+    # Like the live descendants of the root page, the page is listed among them but not among the children
+    assert subpage.id in [e.id for e in index.get_entries(with_descendants=True)]
+    assert subpage.id not in [e.id for e in index.get_entries()]
+
+
+def test_footer_is_served_from_index(root_page, graphql_client_query_data, plan_with_pages):
+    add_page(root_page, 'footer page', show_in_footer=True)
+    query = '''
+        query($plan: ID!) {
+          plan(id: $plan) {
+            footer { items { ... on PageMenuItem { id } } }
+          }
+        }
+    '''
+    data = graphql_client_query_data(query, variables={'plan': plan_with_pages.identifier})
+    assert cache.get(navigation_index_cache_key(root_page.id)) is not None
+    expected_ids = [str(e.id) for e in NavigationIndex.build(root_page).get_entries(flag='show_in_footer')]
+    assert [item['id'] for item in data['plan']['footer']['items']] == expected_ids
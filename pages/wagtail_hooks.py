@@ -1 +1 @@
-from . import wagtail_admin  # noqa
+from . import rich_text, wagtail_admin  # noqa
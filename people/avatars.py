@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import logging
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Iterable
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.db import transaction
+from django.utils import timezone
+from sentry_sdk import capture_exception
+
+from .models import Person
+
+if typing.TYPE_CHECKING:
+    from django.db.models import QuerySet
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 5
+DEFAULT_MAX_WORKERS = 10
+DEFAULT_BATCH_SIZE = 100
+
+
+@dataclass
+class AvatarFetchResult:
+    person: Person
+    status_code: int | None = None
+    content: bytes | None = None
+    etag: str = ''
+    last_modified: str = ''
+    error: Exception | None = None
+
+
+class AvatarUpdater:
+    """Refresh avatars of many persons with concurrent, conditional HTTP requests.
+
+    The HTTP requests are run in a bounded thread pool. The threads do not touch
+    the database; the results are applied and saved in batches by the calling thread.
+    """
+
+    def __init__(
+        self, max_workers: int = DEFAULT_MAX_WORKERS, batch_size: int = DEFAULT_BATCH_SIZE,
+        timeout: float = DEFAULT_TIMEOUT, get_source_url: Callable[[Person], str] | None = None,
+    ):
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.timeout = timeout
+        if get_source_url is None:
+            get_source_url = Person.get_avatar_source_url
+        self.get_source_url = get_source_url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def fetch(self, person: Person) -> AvatarFetchResult:
+        headers = {}
+        # Only ask for changes if we still have the previous image
+        if person.image:
+            if person.avatar_etag:
+                headers['If-None-Match'] = person.avatar_etag
+            if person.avatar_last_modified:
+                headers['If-Modified-Since'] = person.avatar_last_modified
+        url = self.get_source_url(person)
+        try:
+            resp = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.exceptions.RequestException as err:
+            return AvatarFetchResult(person=person, error=err)
+        return AvatarFetchResult(
+            person=person,
+            status_code=resp.status_code,
+            content=resp.content if resp.status_code == 200 else None,
+            etag=resp.headers.get('ETag', ''),
+            last_modified=resp.headers.get('Last-Modified', ''),
+        )
+
+    def apply(self, result: AvatarFetchResult) -> list[str]:
+        """Update the person from a fetch result and return the changed fields (not saved)."""
+        person = result.person
+        if result.error is not None:
+            logger.exception('Connection error downloading avatar for %s' % str(person), exc_info=result.error)
+            capture_exception(result.error)
+            return []
+
+        # If it's a 404, we accept it as it is and try again sometime
+        # later. 304 means that our copy is still up-to-date.
+        if result.status_code in (304, 404):
+            person.avatar_updated_at = timezone.now()
+            return ['avatar_updated_at']
+
+        # If it's another error, it might be transient, so we want to try
+        # again soon.
+        if result.status_code != 200:
+            logger.error('HTTP error %s downloading avatar for %s' % (result.status_code, str(person)))
+            return []
+
+        assert result.content is not None
+        update_fields = person.set_avatar(
+            result.content, etag=result.etag, last_modified=result.last_modified, save=False,
+        )
+        if 'image' in update_fields and not person.image_cropping:
+            person.update_focal_point()
+        return update_fields
+
+    def save_batch(self, batch: list[tuple[Person, list[str]]]):
+        by_fields: dict[tuple[str, ...], list[Person]] = {}
+        for person, update_fields in batch:
+            by_fields.setdefault(tuple(sorted(update_fields)), []).append(person)
+        for fields, persons in by_fields.items():
+            Person.objects.bulk_update(persons, fields)
+        changed_ids = [person.pk for person, update_fields in batch if 'image' in update_fields]
+        if changed_ids:
+            transaction.on_commit(lambda: [schedule_avatar_thumbnails(person_id) for person_id in changed_ids])
+
+    def update(self, persons: Iterable[Person]) -> int:
+        """Refresh the avatars and return the number of persons updated."""
+        updated = 0
+        persons = iter(persons)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Work in chunks so that we don't keep the downloaded images for everyone in memory
+            while chunk := list(islice(persons, self.batch_size)):
+                batch: list[tuple[Person, list[str]]] = []
+                for result in executor.map(self.fetch, chunk):
+                    update_fields = self.apply(result)
+                    if update_fields:
+                        batch.append((result.person, update_fields))
+                if batch:
+                    self.save_batch(batch)
+                    updated += len(batch)
+        return updated
+
+
+def update_avatars(persons: QuerySet[Person] | None = None, **kwargs) -> int:
+    if persons is None:
+        persons = Person.objects.needing_avatar_update()
+    return AvatarUpdater(**kwargs).update(persons.iterator())
+
+
+def schedule_avatar_thumbnails(person_id: int, sizes: list[str] | None = None):
+    """Generate avatar thumbnails in a Celery task."""
+    from .tasks import generate_avatar_thumbnails
+
+    try:
+        generate_avatar_thumbnails.delay(person_id, sizes)
+    except Exception as e:
+        # Not being able to queue the task should not break the request
+        logger.warning(f'Error scheduling avatar thumbnails for person {person_id}: {e}')
+        capture_exception(e)
@@ -1,13 +1,20 @@
 from django.core.management.base import BaseCommand
+from people.avatars import DEFAULT_BATCH_SIZE, DEFAULT_MAX_WORKERS, update_avatars
 from people.models import Person
 
 
 class Command(BaseCommand):
     help = 'Updates avatars for persons (if needed)'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS, help='Number of concurrent downloads')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Number of persons saved at once')
+        parser.add_argument('--force', action='store_true', help='Update also recently updated avatars')
+
     def handle(self, *args, **options):
-        for person in Person.objects.all():
-            if not person.should_update_avatar():
-                continue
-            print(person)
-            person.download_avatar()
+        if options['force']:
+            persons = Person.objects.all()
+        else:
+            persons = Person.objects.needing_avatar_update()
+        updated = update_avatars(persons, max_workers=options['workers'], batch_size=options['batch_size'])
+        print('%d avatars updated' % updated)
@@ -6,13 +6,14 @@ import io
 import hashlib
 import typing
 import uuid
-import requests
 import reversion
 import logging
 
 from datetime import timedelta
 
-from django.db import models
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
 from django.utils.translation import pgettext_lazy, gettext_lazy as _
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
@@ -23,7 +24,6 @@ from easy_thumbnails.files import get_thumbnailer  # type: ignore
 from image_cropping import ImageRatioField  # type: ignore
 from modelcluster.models import ClusterableModel
 from modeltrans.fields import TranslationField
-from sentry_sdk import capture_exception
 from wagtail.search import index
 from wagtail.images.rect import Rect
 from wagtail.admin.templatetags.wagtailadmin_tags import avatar_url as wagtail_avatar_url
@@ -46,6 +46,8 @@ logger = logging.getLogger(__name__)
 User: typing.Type[UserModel] = get_user_model()  # type: ignore
 
 DEFAULT_AVATAR_SIZE = 360
+AVATAR_UPDATE_INTERVAL = timedelta(minutes=60)
+AVATAR_URL_CACHE_TIMEOUT = 7 * 24 * 3600
 
 
 def determine_image_dim(image_width, image_height, width, height):
@@ -92,6 +94,10 @@ class PersonQuerySet(models.QuerySet['Person']):
             q |= Q(id__in=ActionContactPerson.objects.filter(action__plan=plan).values_list('person'))
         return self.filter(q)
 
+    def needing_avatar_update(self):
+        cutoff = timezone.now() - AVATAR_UPDATE_INTERVAL
+        return self.filter(Q(avatar_updated_at__isnull=True) | Q(avatar_updated_at__lte=cutoff))
+
     def is_action_contact_person(self, plan):
         return self.filter(contact_for_actions__plan=plan).distinct()
 
@@ -136,6 +142,10 @@ class Person(index.Indexed, ClusterableModel):
     image_height = models.PositiveIntegerField(null=True, editable=False)
     image_width = models.PositiveIntegerField(null=True, editable=False)
     avatar_updated_at = models.DateTimeField(null=True, editable=False)
+    # Used for conditional requests and change detection when refreshing avatars
+    avatar_etag = models.CharField(max_length=200, blank=True, editable=False)
+    avatar_last_modified = models.CharField(max_length=100, blank=True, editable=False)
+    avatar_hash = models.CharField(max_length=64, blank=True, editable=False)
 
     contact_for_actions_unordered = models.ManyToManyField(
         'actions.Action',
@@ -198,54 +208,40 @@ class Person(index.Indexed, ClusterableModel):
                 'email': _('Person with this email already exists')
             })
 
-    def set_avatar(self, photo):
-        update_fields = ['avatar_updated_at']
-        try:
-            if not self.image or self.image.read() != photo:
-                self.image.save('avatar.jpg', io.BytesIO(photo))  # type: ignore
-                update_fields += ['image', 'image_height', 'image_width', 'image_cropping']
-        except ValueError:
-            pass
+    def set_avatar(self, photo: bytes, etag: str = '', last_modified: str = '', save: bool = True) -> list[str]:
+        """Store a downloaded avatar and return the names of the changed fields.
+
+        The image file is only rewritten if the content hash differs from the
+        stored one. If `save` is false, the caller is responsible for saving.
+        """
+        update_fields = ['avatar_updated_at', 'avatar_etag', 'avatar_last_modified']
+        photo_hash = hashlib.sha256(photo).hexdigest()
+        if not self.image or self.avatar_hash != photo_hash:
+            self.image.save('avatar.jpg', io.BytesIO(photo), save=False)  # type: ignore
+            self.avatar_hash = photo_hash
+            update_fields += ['image', 'image_height', 'image_width', 'image_cropping', 'avatar_hash']
+        self.avatar_etag = etag
+        self.avatar_last_modified = last_modified
         self.avatar_updated_at = timezone.now()
-        self.save(update_fields=update_fields)
+        if save:
+            self.save(update_fields=update_fields)
+        return update_fields
 
-    def download_avatar(self):
-        url = None
+    def get_avatar_source_url(self) -> str:
         if self.email.endswith('@hel.fi'):
-            url = f'https://api.hel.fi/avatar/{self.email}?s={DEFAULT_AVATAR_SIZE}&d=404'
-        else:
-            md5_hash = hashlib.md5(self.email.encode('utf8')).hexdigest()
-            url = f'https://www.gravatar.com/avatar/{md5_hash}?f=y&s={DEFAULT_AVATAR_SIZE}&d=404'
-
-        try:
-            resp = requests.get(url, timeout=5)
-        except requests.exceptions.RequestException as err:
-            logger.exception('Connection error downloading avatar for %s' % str(self), exc_info=err)
-            capture_exception(err)
-            return
+            return f'https://api.hel.fi/avatar/{self.email}?s={DEFAULT_AVATAR_SIZE}&d=404'
+        md5_hash = hashlib.md5(self.email.encode('utf8')).hexdigest()
+        return f'https://www.gravatar.com/avatar/{md5_hash}?f=y&s={DEFAULT_AVATAR_SIZE}&d=404'
 
-        # If it's a 404, we accept it as it is and try again sometime
-        # later.
-        if resp.status_code == 404:
-            self.avatar_updated_at = timezone.now()
-            self.save(update_fields=['avatar_updated_at'])
-            return
-
-        # If it's another error, it might be transient, so we want to try
-        # again soon.
-        try:
-            resp.raise_for_status()
-        except Exception as err:
-            logger.exception('HTTP error downloading avatar for %s' % str(self), exc_info=err)
-            capture_exception(err)
-            return
+    def download_avatar(self):
+        from .avatars import AvatarUpdater
 
-        self.set_avatar(resp.content)
+        AvatarUpdater(max_workers=1).update([self])
 
     def should_update_avatar(self):
         if not self.avatar_updated_at:
             return True
-        return (timezone.now() - self.avatar_updated_at) > timedelta(minutes=60)
+        return (timezone.now() - self.avatar_updated_at) > AVATAR_UPDATE_INTERVAL
 
     def update_focal_point(self):
         if not self.image:
@@ -264,45 +260,86 @@ class Person(index.Indexed, ClusterableModel):
         bottom = max(face[3] for face in faces)
         self.image_cropping = ','.join([str(x) for x in (left, top, right, bottom)])
 
-    def get_avatar_url(self, request: WatchRequest, size: str | None = None) -> str | None:
+    def get_avatar_thumbnail_options(self, size: str) -> dict:
+        m = re.match(r'(\d+)?(x(\d+))?', size)
+        if not m:
+            raise ValueError('Invalid size argument (should be "<width>x<height>")')
+        width, _, height = m.groups()
+
+        dim = determine_image_dim(self.image_width, self.image_height, width, height)
+
+        tn_args: dict = {
+            'size': dim,
+        }
+        if self.image_cropping:
+            tn_args['focal_point'] = Rect(*[int(x) for x in self.image_cropping.split(',')])
+            tn_args['crop'] = 30
+        return tn_args
+
+    def get_avatar_cache_key(self, size: str | None) -> str:
+        # The key changes with the image and the cropping, so stale URLs are never used
+        digest = hashlib.md5(f'{self.image.name}:{self.image_cropping}:{size}'.encode('utf8')).hexdigest()
+        return f'person-avatar:{self.pk}:{digest}'
+
+    def generate_avatar_thumbnails(self, sizes: typing.Iterable[str] | None = None):
+        """Create the thumbnails for the given sizes (by default the pre-generated ones) and cache their URLs."""
         if not self.image:
-            return None
+            return
+        if sizes is None:
+            sizes = settings.AVATAR_PREGENERATED_SIZES
+        thumbnailer = get_thumbnailer(self.image)
+        for size in sizes:
+            try:
+                out_image = thumbnailer.get_thumbnail(self.get_avatar_thumbnail_options(size))
+            except FileNotFoundError:
+                logger.info('Avatar file for %s not found' % self)
+                return
+            if out_image is not None:
+                cache.set(self.get_avatar_cache_key(size), out_image.url, AVATAR_URL_CACHE_TIMEOUT)
 
-        try:
-            with self.image.open() as file:  # noqa
-                pass
-        except FileNotFoundError:
-            logger.info('Avatar file for %s not found' % self)
+    def get_avatar_url(self, request: WatchRequest, size: str | None = None) -> str | None:
+        if not self.image:
             return None
 
-        if size is None:
-            url = self.image.url
-        else:
-            m = re.match(r'(\d+)?(x(\d+))?', size)
-            if not m:
-                raise ValueError('Invalid size argument (should be "<width>x<height>")')
-            width, _, height = m.groups()
-
-            dim = determine_image_dim(self.image_width, self.image_height, width, height)
-
-            tn_args: dict = {
-                'size': dim,
-            }
-            if self.image_cropping:
-                tn_args['focal_point'] = Rect(*[int(x) for x in self.image_cropping.split(',')])
-                tn_args['crop'] = 30
-
-            out_image = get_thumbnailer(self.image).get_thumbnail(tn_args)
-            if out_image is None:
+        cache_key = self.get_avatar_cache_key(size)
+        url = cache.get(cache_key)
+        if url is None:
+            if not self.image.storage.exists(self.image.name):
+                logger.info('Avatar file for %s not found' % self)
                 return None
-            url = out_image.url
 
+            if size is None:
+                url = self.image.url
+            else:
+                out_image = get_thumbnailer(self.image).get_existing_thumbnail(self.get_avatar_thumbnail_options(size))
+                if out_image is None:
+                    # Don't block the request on image processing; serve the original
+                    # image until the thumbnail has been generated.
+                    from .avatars import schedule_avatar_thumbnails
+                    schedule_avatar_thumbnails(self.pk, [size])
+                    return self._absolute_avatar_url(request, self.image.url)
+                url = out_image.url
+            cache.set(cache_key, url, AVATAR_URL_CACHE_TIMEOUT)
+
+        return self._absolute_avatar_url(request, url)
+
+    def _absolute_avatar_url(self, request: WatchRequest, url: str) -> str:
         if request:
             url = request.build_absolute_uri(url)
         return url
 
+    def get_stored_avatar(self, update_fields=None) -> tuple[str, str] | None:
+        """Return the stored image file name and cropping, or None if the person has not been saved."""
+        if self.pk is None:
+            return None
+        if update_fields is not None and not {'image', 'image_cropping'} & set(update_fields):
+            # The avatar is not going to be saved, so it can't change
+            return (self.image.name, self.image_cropping)
+        return Person.objects.filter(pk=self.pk).values_list('image', 'image_cropping').first()
+
     def save(self, *args, **kwargs):
         old_cropping = self.image_cropping
+        old_avatar = self.get_stored_avatar(kwargs.get('update_fields'))
         ret = super().save(*args, **kwargs)
         if self.image and not old_cropping:
             self.update_focal_point()
@@ -320,6 +357,12 @@ class Person(index.Indexed, ClusterableModel):
             self.user = user
             super().save(update_fields=['user'])
 
+        if self.image and (self.image.name, self.image_cropping) != old_avatar:
+            # The thumbnails only need to be regenerated on upload or when the focal point changes
+            from .avatars import schedule_avatar_thumbnails
+            person_id = self.pk
+            transaction.on_commit(lambda: schedule_avatar_thumbnails(person_id))
+
         return ret
 
     def get_client_for_email_domain(self):
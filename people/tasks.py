@@ -0,0 +1,11 @@
+from celery import shared_task
+
+from .models import Person
+
+
+@shared_task
+def generate_avatar_thumbnails(person_id, sizes=None):
+    person = Person.objects.filter(id=person_id).first()
+    if person is None:
+        return
+    person.generate_avatar_thumbnails(sizes)
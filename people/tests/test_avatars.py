@@ -0,0 +1,185 @@
+import io
+import pytest
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.core.cache import cache
+from django.utils import timezone
+from PIL import Image
+
+from people.avatars import AvatarUpdater
+from people.models import Person
+from people.tests.factories import PersonFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def make_image(color='red'):
+    out = io.BytesIO()
+    Image.new('RGB', (20, 20), color).save(out, 'JPEG')
+    return out.getvalue()
+
+
+class AvatarStub:
+    """Local HTTP server serving avatars by email address."""
+
+    def __init__(self):
+        self.avatars: dict[str, bytes] = {}
+        self.requests: list[tuple[str, dict]] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                email = self.path.lstrip('/')
+                stub.requests.append((email, dict(self.headers)))
+                photo = stub.avatars.get(email)
+                if photo is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                etag = '"%d"' % hash(photo)
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(photo)))
+                self.end_headers()
+                self.wfile.write(photo)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url_for(self, person):
+        host, port = self.server.server_address
+        return f'http://{host}:{port}/{person.email}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def avatar_stub():
+    with AvatarStub() as stub:
+        yield stub
+
+
+def test_update_avatars_downloads_new_images(avatar_stub):
+    persons = [PersonFactory() for _ in range(5)]
+    for person in persons[:3]:
+        avatar_stub.avatars[person.email] = make_image()
+    updater = AvatarUpdater(max_workers=4, batch_size=2, get_source_url=avatar_stub.url_for)
+    assert updater.update(Person.objects.filter(id__in=[p.id for p in persons])) == 5
+
+    for person in persons[:3]:
+        person.refresh_from_db()
+        assert person.image
+        assert person.avatar_hash
+        assert person.avatar_etag
+        assert person.avatar_updated_at is not None
+    for person in persons[3:]:
+        person.refresh_from_db()
+        assert not person.image
+        assert person.avatar_updated_at is not None
+
+
+def test_update_avatars_sends_conditional_requests(avatar_stub):
+    person = PersonFactory()
+    avatar_stub.avatars[person.email] = make_image()
+    updater = AvatarUpdater(get_source_url=avatar_stub.url_for)
+    updater.update(Person.objects.filter(id=person.id))
+    person.refresh_from_db()
+    image_name = person.image.name
+
+    updater.update(Person.objects.filter(id=person.id))
+    _, headers = avatar_stub.requests[-1]
+    assert headers['If-None-Match'] == person.avatar_etag
+    person.refresh_from_db()
+    assert person.image.name == image_name
+
+
+def test_update_avatars_detects_changed_image_by_hash(avatar_stub):
+    person = PersonFactory()
+    avatar_stub.avatars[person.email] = make_image('red')
+    updater = AvatarUpdater(get_source_url=avatar_stub.url_for)
+    updater.update(Person.objects.filter(id=person.id))
+    person.refresh_from_db()
+    old_hash = person.avatar_hash
+
+    avatar_stub.avatars[person.email] = make_image('blue')
+    updater.update(Person.objects.filter(id=person.id))
+    person.refresh_from_db()
+    assert person.avatar_hash != old_hash
+
+
+def test_update_avatars_connection_error_does_not_mark_updated():
+    person = PersonFactory()
+    updater = AvatarUpdater(timeout=1, get_source_url=lambda p: 'http://127.0.0.1:1/')
+    assert updater.update([person]) == 0
+    person.refresh_from_db()
+    assert person.avatar_updated_at is None
+
+
+def test_needing_avatar_update():
+    fresh = PersonFactory()
+    fresh.avatar_updated_at = timezone.now()
+    fresh.save(update_fields=['avatar_updated_at'])
+    stale = PersonFactory()
+    stale.avatar_updated_at = timezone.now() - timedelta(days=1)
+    stale.save(update_fields=['avatar_updated_at'])
+    never = PersonFactory()
+    qs = Person.objects.needing_avatar_update()
+    assert fresh not in qs
+    assert stale in qs
+    assert never in qs
+
+
+def test_avatar_thumbnail_is_generated_in_background(monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(
+        'people.avatars.schedule_avatar_thumbnails', lambda person_id, sizes=None: scheduled.append((person_id, sizes))
+    )
+    person = PersonFactory()
+    person.set_avatar(make_image())
+    cache.clear()
+
+    assert person.get_avatar_url(None, '50x50') == person.image.url
+    assert scheduled == [(person.id, ['50x50'])]
+
+    person.generate_avatar_thumbnails(['50x50'])
+    # The URL comes from the cache without touching the storage
+    monkeypatch.setattr(type(person.image.storage), 'exists', lambda *args: pytest.fail('storage accessed'))
+    url = person.get_avatar_url(None, '50x50')
+    assert url != person.image.url
+    assert len(scheduled) == 1
+
+
+def test_avatar_thumbnails_are_scheduled_only_when_avatar_changes(monkeypatch, django_capture_on_commit_callbacks):
+    scheduled = []
+    monkeypatch.setattr(
+        'people.avatars.schedule_avatar_thumbnails', lambda person_id, sizes=None: scheduled.append(person_id)
+    )
+    person = PersonFactory()
+    with django_capture_on_commit_callbacks(execute=True):
+        person.set_avatar(make_image())
+    assert scheduled == [person.id]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        person.first_name = 'Changed'
+        person.save()
+        person.save(update_fields=['first_name'])
+    assert scheduled == [person.id]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        person.image_cropping = '1,1,10,10'
+        person.save()
+    assert scheduled == [person.id, person.id]
@@ -2,6 +2,7 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from collections.abc import Iterable
 
+import copy
 import graphene
 from django.db.models import Model
 from django.apps import apps
@@ -37,7 +38,7 @@ from reports.blocks.choosers import ReportTypeChooserBlock, ReportTypeFieldChoos
 import typing
 if typing.TYPE_CHECKING:
     from reports.spreadsheets import ExcelReport
-    from reports.models import ActionSnapshot
+    from reports.models import ActionSnapshot, ReportSnapshots
     from reports.utils import AttributePath, SerializedAttributeVersion, SerializedVersion
 
 from reports.utils import get_attribute_for_type_from_related_objects
@@ -87,6 +88,13 @@ class FieldBlockWithHelpPanel(blocks.Block):
     def value_for_action_snapshot(self, block_value, snapshot):
         raise NotImplementedError(f'value_for_action_snapshot should be implemented for {self.__class__}')
 
+    def values_for_action_snapshots(self, block_value, snapshots: ReportSnapshots) -> list:
+        """Return the value for each of the snapshots.
+
+        Subclasses should override this to load the values for all snapshots at once.
+        """
+        return [self.value_for_action_snapshot(block_value, snapshot) for snapshot in snapshots]
+
     def get_help_label(self, value: Model):
         return None
 
@@ -134,9 +142,25 @@ class ActionAttributeTypeReportFieldBlock(blocks.StructBlock, FieldBlockWithHelp
     def value_for_action_snapshot(self, block_value, snapshot) -> Optional[Any]:
         return snapshot.get_attribute_for_type(block_value['attribute_type'])
 
+    def values_for_action_snapshots(self, block_value, snapshots: ReportSnapshots) -> list:
+        attribute_type = block_value['attribute_type']
+        return [snapshots.get_attribute(snapshot, attribute_type) for snapshot in snapshots]
+
     def graphql_value_for_action_snapshot(self, field, snapshot):
         attribute = self.value_for_action_snapshot(field.value, snapshot)
+        return self._graphql_value(field, snapshot, attribute)
+
+    def graphql_values_for_action_snapshots(self, field, snapshots: ReportSnapshots) -> list:
+        attributes = self.values_for_action_snapshots(field.value, snapshots)
+        return [
+            self._graphql_value(field, snapshot, attribute)
+            for snapshot, attribute in zip(snapshots, attributes)
+        ]
+
+    def _graphql_value(self, field, snapshot, attribute):
         if attribute is not None:
+            # The instance may be shared by several fields, so don't change its ID in place
+            attribute = copy.copy(attribute)
             # Change the ID of the attribute to include the snapshot, otherwise Apollo would cache the attribute value from
             # one point in time and use this for all other points in time of the same attribute
             attribute.id = f'{attribute.id}-snapshot-{snapshot.id}'
@@ -240,6 +264,23 @@ class ActionCategoryReportFieldBlock(blocks.StructBlock, FieldBlockWithHelpPanel
         categories = Category.objects.filter(id__in=category_ids).filter(type=category_type)
         return categories
 
+    def values_for_action_snapshots(self, block_value, snapshots: ReportSnapshots) -> list:
+        category_type = block_value['category_type']
+        category_ids = {
+            snapshot: snapshots.get_action_data(snapshot)['categories'] for snapshot in snapshots
+        }
+        categories = Category.objects.filter(type=category_type).in_bulk(
+            {pk for pks in category_ids.values() for pk in pks}
+        )
+        # Sort like the default ordering of Category, which the single snapshot path uses
+        return [
+            sorted(
+                (categories[pk] for pk in category_ids[snapshot] if pk in categories),
+                key=lambda category: (category.type_id, category.order),
+            )
+            for snapshot in snapshots
+        ]
+
 
 @register_streamfield_block
 class ActionImplementationPhaseReportFieldBlock(blocks.StaticBlock, FieldBlockWithHelpPanel):
@@ -260,12 +301,23 @@ class ActionImplementationPhaseReportFieldBlock(blocks.StaticBlock, FieldBlockWi
             return ActionImplementationPhase.objects.get(id=implementation_phase_id)
         return None
 
+    def values_for_action_snapshots(self, block_value, snapshots: ReportSnapshots) -> list:
+        phase_ids = [snapshots.get_action_data(snapshot)['implementation_phase_id'] for snapshot in snapshots]
+        phases = ActionImplementationPhase.objects.in_bulk({pk for pk in phase_ids if pk})
+        return [phases.get(pk) if pk else None for pk in phase_ids]
+
     def graphql_value_for_action_snapshot(self, field, snapshot):
         return self.Value(
             field=field,
             implementation_phase=self.value_for_action_snapshot(field.value, snapshot),
         )
 
+    def graphql_values_for_action_snapshots(self, field, snapshots: ReportSnapshots) -> list:
+        return [
+            self.Value(field=field, implementation_phase=phase)
+            for phase in self.values_for_action_snapshots(field.value, snapshots)
+        ]
+
     def extract_action_values(
             self, report: 'ExcelReport', block_value: dict, action: dict,
             related_objects: dict[str, list[SerializedVersion]],
@@ -322,6 +374,11 @@ class ActionStatusReportFieldBlock(blocks.StaticBlock, FieldBlockWithHelpPanel):
         except ActionStatus.DoesNotExist:
             return None
 
+    def values_for_action_snapshots(self, block_value, snapshots: ReportSnapshots) -> list:
+        status_ids = [snapshots.get_action_data(snapshot)['status_id'] for snapshot in snapshots]
+        statuses = ActionStatus.objects.in_bulk({pk for pk in status_ids if pk})
+        return [statuses.get(pk) if pk else None for pk in status_ids]
+
 
 @register_streamfield_block
 class ActionResponsiblePartyReportFieldBlock(blocks.StructBlock, FieldBlockWithHelpPanel):
@@ -361,6 +418,17 @@ class ActionResponsiblePartyReportFieldBlock(blocks.StructBlock, FieldBlockWithH
         except Organization.DoesNotExist:
             return None
 
+    def values_for_action_snapshots(self, block_value, snapshots: ReportSnapshots) -> list:
+        org_ids = [
+            self._find_organization_id(
+                snapshots.get_related_data(snapshot, ActionResponsibleParty),
+                snapshots.get_action_data(snapshot)['id'],
+            )
+            for snapshot in snapshots
+        ]
+        organizations = Organization.objects.in_bulk({pk for pk in org_ids if pk})
+        return [organizations.get(pk) if pk else None for pk in org_ids]
+
     def graphql_value_for_action_snapshot(self, field, snapshot):
         result = self.Value(
             field=field,
@@ -368,6 +436,12 @@ class ActionResponsiblePartyReportFieldBlock(blocks.StructBlock, FieldBlockWithH
         )
         return result
 
+    def graphql_values_for_action_snapshots(self, field, snapshots: ReportSnapshots) -> list:
+        return [
+            self.Value(field=field, responsible_party=organization)
+            for organization in self.values_for_action_snapshots(field.value, snapshots)
+        ]
+
     def _find_organization_id(self, action_responsible_parties: Iterable[dict], action_id):
         """Each element of `action_responsible_parties` is a dict like the one in SerializedVersion.data."""
         try:
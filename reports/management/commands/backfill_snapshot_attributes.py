@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from reports.models import ActionSnapshot, ActionSnapshotAttribute
+
+
+class Command(BaseCommand):
+    help = 'Copies the attributes of existing action snapshots to the snapshot attribute projection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--report', type=int, help='ID of the report to process')
+        parser.add_argument('--force', action='store_true', help='Also process snapshots that have been projected')
+        parser.add_argument('--batch-size', type=int, default=500, help='Number of snapshots to process at once')
+
+    def handle(self, *args, **options):
+        snapshots = ActionSnapshot.objects.order_by('id')
+        if options['report']:
+            snapshots = snapshots.filter(report=options['report'])
+        if not options['force']:
+            snapshots = snapshots.filter(attributes_projected=False)
+        snapshot_ids = list(snapshots.values_list('id', flat=True))
+        batch_size = options['batch_size']
+        created = 0
+        for i in range(0, len(snapshot_ids), batch_size):
+            batch = ActionSnapshot.objects.filter(id__in=snapshot_ids[i:i + batch_size])
+            created += len(ActionSnapshotAttribute.create_for_snapshots(batch))
+        print("%d snapshots processed, %d attributes created" % (len(snapshot_ids), created))
@@ -0,0 +1,44 @@
+import django.contrib.postgres.indexes
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('actions', '0112_alter_action_visibility'),
+        ('reports', '0006_remove_fk_protection'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='actionsnapshot',
+            name='attributes_projected',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.CreateModel(
+            name='ActionSnapshotAttribute',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action_id', models.PositiveIntegerField()),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('attribute_content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+                ('attribute_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='actions.attributetype')),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reports.report')),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attributes', to='reports.actionsnapshot')),
+            ],
+            options={
+                'unique_together': {('snapshot', 'attribute_type')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='actionsnapshotattribute',
+            index=models.Index(fields=['report', 'action_id', 'attribute_type'], name='reports_snapshot_attr_lookup'),
+        ),
+        migrations.AddIndex(
+            model_name='actionsnapshotattribute',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['data'], name='reports_snapshot_attr_data'),
+        ),
+    ]
@@ -3,10 +3,13 @@ from __future__ import annotations
 import reversion
 import typing
 from autoslug.fields import AutoSlugField
+from collections import defaultdict
 from contextlib import contextmanager
 from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.indexes import GinIndex
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models, transaction
 from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
@@ -14,18 +17,17 @@ from modelcluster.fields import ParentalManyToManyDescriptor
 from reversion.models import Version
 from reversion.revisions import _current_frame, add_to_revision, create_revision
 from sentry_sdk import capture_message
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Iterable
 from wagtail.fields import StreamField
 from wagtail.blocks.stream_block import StreamValue
 
 from .spreadsheets import ExcelReport
 from aplans.utils import PlanRelatedModel
 from actions.models.action import Action
-from actions.models.attributes import Attribute
+from actions.models.attributes import Attribute, AttributeType
 from reports.blocks.action_content import ReportFieldBlock
 
 if TYPE_CHECKING:
-    from actions.models import AttributeType
     from users.models import User
 
 AttributePath = tuple[int, int, int]
@@ -273,6 +275,38 @@ class Report(models.Model, PlanRelatedModel):
                 created_explicitly=False,
             ).save()
 
+        # Also covers snapshots of actions that were marked as complete individually before
+        ActionSnapshotAttribute.create_for_snapshots(self.action_snapshots.filter(attributes_projected=False))
+
+    def get_snapshots_for_actions(self, action_ids: Iterable[int]) -> ReportSnapshots:
+        return ReportSnapshots(self, action_ids)
+
+    def get_values_for_actions(self, action_ids: Iterable[int]) -> dict[int, list[tuple[StreamValue.StreamChild, Any]]]:
+        """Return the field values of the latest snapshots of the given actions keyed by action ID.
+
+        Actions without a snapshot in this report are omitted.
+        """
+        snapshots = self.get_snapshots_for_actions(action_ids)
+        fields = [f for f in self.type.fields if hasattr(f.block, 'values_for_action_snapshots')]
+        columns = [f.block.values_for_action_snapshots(f.value, snapshots) for f in fields]
+        return {
+            action_id: [(field, column[i]) for field, column in zip(fields, columns)]
+            for i, action_id in enumerate(snapshots.by_action_id.keys())
+        }
+
+    def get_snapshot_attributes(
+        self, attribute_types: Iterable[AttributeType] | None = None
+    ) -> dict[tuple[int, int], models.Model]:
+        """Return the attributes in the action snapshots of this report keyed by action ID and attribute type ID.
+
+        Only snapshots with projected attribute data are considered.
+        """
+        qs = ActionSnapshotAttribute.objects.filter(report=self)
+        if attribute_types is not None:
+            qs = qs.filter(attribute_type__in=attribute_types)
+        instances = qs.get_instances()
+        return {(row.action_id, row.attribute_type_id): instances[row.pk] for row in instances.rows}
+
     def undo_marking_as_complete(self, user):
         if not self.is_complete:
             raise ValueError(_("The report is not marked as complete."))
@@ -288,6 +322,8 @@ class ActionSnapshot(models.Model):
     report = models.ForeignKey('reports.Report', on_delete=models.CASCADE, related_name='action_snapshots')
     action_version = models.ForeignKey(Version, on_delete=models.CASCADE, related_name='action_snapshots')
     created_explicitly = models.BooleanField(default=True)
+    # Set when the attributes of this snapshot have been copied to ActionSnapshotAttribute
+    attributes_projected = models.BooleanField(default=False, editable=False)
 
     class Meta:
         verbose_name = _('action snapshot')
@@ -370,6 +406,10 @@ class ActionSnapshot(models.Model):
 
         Returned model instances have the PK field set, but this does not mean they currently exist in the DB.
         """
+        if self.attributes_projected:
+            instances = ActionSnapshotAttribute.objects.filter(snapshot=self, attribute_type=attribute_type).get_instances()
+            return next(iter(instances.values()), None)
+        # Snapshots created before the projection existed; see the backfill_snapshot_attributes command
         ct = ContentType.objects.get_for_model(Action)
         return self.get_attribute_for_type_from_versions(
             attribute_type, self.get_related_versions(), ct
@@ -380,3 +420,179 @@ class ActionSnapshot(models.Model):
 
     def __str__(self):
         return f'{self.action_version} @ {self.report}'
+
+
+class AttributeInstances(dict):
+    """Model instances of projected attributes keyed by the ActionSnapshotAttribute PK."""
+
+    rows: list[ActionSnapshotAttribute]
+
+
+class ActionSnapshotAttributeQuerySet(models.QuerySet['ActionSnapshotAttribute']):
+    def get_instances(self) -> AttributeInstances:
+        """Build attribute model instances from the projected data.
+
+        Uses one query for the projection rows and one query per model referred to by many-to-many fields.
+        """
+        rows = list(self.select_related('attribute_content_type'))
+        pks_by_model: dict[type[models.Model], set] = defaultdict(set)
+        for row in rows:
+            for field, value in row.get_fields():
+                if field.many_to_many:
+                    pks_by_model[field.related_model].update(value)
+        related_objects = {model: model.objects.in_bulk(pks) for model, pks in pks_by_model.items()}
+
+        result = AttributeInstances()
+        result.rows = rows
+        for row in rows:
+            field_dict = {}
+            for field, value in row.get_fields():
+                if field.many_to_many:
+                    objs = related_objects[field.related_model]
+                    value = [objs[pk] for pk in value if pk in objs]
+                else:
+                    value = field.to_python(value)
+                field_dict[field.name if field.many_to_many else field.attname] = value
+            result[row.pk] = row.attribute_content_type.model_class()(**field_dict)
+        return result
+
+
+class ActionSnapshotAttribute(models.Model):
+    """Serialized attribute of an action snapshot.
+
+    Looking up attribute versions in the revision of a snapshot gets slow as the reversion history grows, so the
+    attributes are copied here when a report is completed.
+    """
+    snapshot = models.ForeignKey(ActionSnapshot, on_delete=models.CASCADE, related_name='attributes')
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='+')
+    action_id = models.PositiveIntegerField()
+    attribute_type = models.ForeignKey('actions.AttributeType', on_delete=models.CASCADE, related_name='+')
+    attribute_content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name='+')
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+
+    objects = ActionSnapshotAttributeQuerySet.as_manager()
+
+    class Meta:
+        unique_together = (('snapshot', 'attribute_type'),)
+        indexes = [
+            models.Index(fields=['report', 'action_id', 'attribute_type'], name='reports_snapshot_attr_lookup'),
+            GinIndex(fields=['data'], name='reports_snapshot_attr_data'),
+        ]
+
+    def get_fields(self):
+        model = self.attribute_content_type.model_class()
+        for field_name, value in self.data.items():
+            yield model._meta.get_field(field_name), value
+
+    @classmethod
+    def create_for_snapshots(cls, snapshots: Iterable[ActionSnapshot]) -> list[ActionSnapshotAttribute]:
+        """Copy the attribute versions in the revisions of the given snapshots to the projection."""
+        snapshots = list(snapshots)
+        if not snapshots:
+            return []
+        action_versions = Version.objects.in_bulk([s.action_version_id for s in snapshots])
+        revision_ids = {v.revision_id for v in action_versions.values()}
+        versions_by_revision: dict[int, list[Version]] = defaultdict(list)
+        for version in Version.objects.filter(revision__in=revision_ids).select_related('content_type'):
+            model = version.content_type.model_class()
+            if model is not None and issubclass(model, Attribute):
+                versions_by_revision[version.revision_id].append(version)
+        # Attribute types might have been deleted after the revision was created
+        attribute_type_ids = set(AttributeType.objects.filter(
+            id__in=[v.field_dict['type_id'] for versions in versions_by_revision.values() for v in versions]
+        ).values_list('id', flat=True))
+
+        action_ct = ContentType.objects.get_for_model(Action)
+        objs = []
+        for snapshot in snapshots:
+            action_version = action_versions[snapshot.action_version_id]
+            action_id = int(action_version.object_id)
+            seen_types = set()
+            for version in versions_by_revision[action_version.revision_id]:
+                field_dict = version.field_dict
+                if field_dict['content_type_id'] != action_ct.id or field_dict['object_id'] != action_id:
+                    continue
+                type_id = field_dict['type_id']
+                if type_id in seen_types or type_id not in attribute_type_ids:
+                    continue
+                seen_types.add(type_id)
+                objs.append(cls(
+                    snapshot=snapshot, report_id=snapshot.report_id, action_id=action_id, attribute_type_id=type_id,
+                    attribute_content_type=version.content_type, data=field_dict,
+                ))
+
+        with transaction.atomic():
+            cls.objects.filter(snapshot__in=snapshots).delete()
+            cls.objects.bulk_create(objs)
+            ActionSnapshot.objects.filter(id__in=[s.id for s in snapshots]).update(attributes_projected=True)
+        for snapshot in snapshots:
+            snapshot.attributes_projected = True
+        return objs
+
+    def __str__(self):
+        return f'{self.attribute_type_id} @ {self.snapshot}'
+
+
+class ReportSnapshots:
+    """The latest snapshots of a report for a set of actions.
+
+    Report field blocks use this to evaluate their values for many actions at once. The versions are deserialized
+    only once and related objects are loaded for all snapshots together.
+    """
+
+    def __init__(self, report: Report, action_ids: Iterable[int]):
+        action_ct = ContentType.objects.get_for_model(Action)
+        qs = (
+            ActionSnapshot.objects.filter(
+                report=report, action_version__content_type=action_ct,
+                action_version__object_id__in=[str(action_id) for action_id in action_ids],
+            )
+            .select_related('action_version__revision')
+            .order_by('action_version__revision__date_created', 'id')
+        )
+        by_action_id: dict[int, ActionSnapshot] = {}
+        for snapshot in qs:
+            # Later snapshots replace the earlier ones
+            by_action_id[int(snapshot.action_version.object_id)] = snapshot
+        self.report = report
+        self.by_action_id = by_action_id
+        self.snapshots = list(by_action_id.values())
+        self._action_data = {snapshot.id: snapshot.action_version.field_dict for snapshot in self.snapshots}
+        self._related_data: dict[type[models.Model], dict[int, list[dict]]] = {}
+        self._attributes: dict[tuple[int, int], models.Model] | None = None
+
+    def __iter__(self):
+        return iter(self.snapshots)
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def get_action_data(self, snapshot: ActionSnapshot) -> dict:
+        """Return the field dict of the action version of the snapshot."""
+        return self._action_data[snapshot.id]
+
+    def get_related_data(self, snapshot: ActionSnapshot, model: type[models.Model]) -> list[dict]:
+        """Return the field dicts of the versions of `model` in the revision of the snapshot."""
+        if model not in self._related_data:
+            ct = ContentType.objects.get_for_model(model)
+            revision_ids = {snapshot.action_version.revision_id for snapshot in self.snapshots}
+            data: dict[int, list[dict]] = defaultdict(list)
+            for version in Version.objects.filter(revision__in=revision_ids, content_type=ct):
+                data[version.revision_id].append(version.field_dict)
+            self._related_data[model] = data
+        return self._related_data[model].get(snapshot.action_version.revision_id, [])
+
+    def get_attribute(self, snapshot: ActionSnapshot, attribute_type: AttributeType) -> models.Model | None:
+        if not snapshot.attributes_projected:
+            return snapshot.get_attribute_for_type(attribute_type)
+        if self._attributes is None:
+            projected = [s for s in self.snapshots if s.attributes_projected]
+            instances = ActionSnapshotAttribute.objects.filter(report=self.report, snapshot__in=projected).get_instances()
+            self._attributes = {
+                (row.snapshot_id, row.attribute_type_id): instances[row.pk] for row in instances.rows
+            }
+        attribute = self._attributes.get((snapshot.id, attribute_type.id))
+        if attribute is not None:
+            # Avoid a query when the type is accessed
+            attribute.type = attribute_type
+        return attribute
@@ -9,6 +9,12 @@ from reports.blocks.action_content import ReportFieldBlock, ReportValueInterface
 from reports.models import ActionSnapshot, Report, ReportType
 
 
+class ReportActionValues(graphene.ObjectType):
+    action = graphene.Field('actions.schema.ActionNode', required=True)
+    # values is null if there is no snapshot for the action and the report
+    values = graphene.List(graphene.NonNull(ReportValueInterface))
+
+
 @register_django_node
 class ReportNode(DjangoNode):
     fields = graphene.List(graphene.NonNull(lambda: grapple_registry.streamfield_blocks.get(ReportFieldBlock)))
@@ -19,6 +25,10 @@ class ReportNode(DjangoNode):
         action_id=graphene.ID(),
         action_identifier=graphene.ID(),
     )
+    values_for_actions = graphene.List(
+        graphene.NonNull(ReportActionValues),
+        ids=graphene.List(graphene.NonNull(graphene.ID), required=True),
+    )
 
     class Meta:
         model = Report
@@ -42,6 +52,25 @@ class ReportNode(DjangoNode):
             if hasattr(field.block, 'graphql_value_for_action_snapshot')
         ]
 
+    def resolve_values_for_actions(root, info, ids):
+        try:
+            ids = [int(action_id) for action_id in ids]
+        except ValueError:
+            raise GraphQLError("Invalid action ID")
+        actions = Action.objects.filter(plan=root.type.plan, id__in=ids)
+        actions_by_id = {action.id: action for action in actions}
+        snapshots = root.get_snapshots_for_actions(actions_by_id.keys())
+        fields = [f for f in root.type.fields if hasattr(f.block, 'graphql_values_for_action_snapshots')]
+        columns = [f.block.graphql_values_for_action_snapshots(f, snapshots) for f in fields]
+        values_by_action_id = {
+            action_id: [column[i] for column in columns]
+            for i, action_id in enumerate(snapshots.by_action_id.keys())
+        }
+        return [
+            ReportActionValues(action=actions_by_id[action_id], values=values_by_action_id.get(action_id))
+            for action_id in dict.fromkeys(ids) if action_id in actions_by_id
+        ]
+
 
 @register_django_node
 class ReportTypeNode(DjangoNode):
@@ -3,8 +3,13 @@ import reversion
 import typing
 from reversion.models import Version, Revision
 
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from actions.models import Action
-from reports.models import Report, ActionSnapshot, SerializedActionVersion
+from reports.models import Report, ActionSnapshot, ActionSnapshotAttribute, SerializedActionVersion
+from reports.schema import ReportNode
 from .fixtures import *  # noqa
 
 
@@ -123,3 +128,97 @@ def test_report_action_snapshots(plan_with_some_actions, report_type_with_multip
         assert actions_by_pk[pk].__version != action_version
 
     assert Revision.objects.count() == 2 + 3
+
+
+def test_mark_as_complete_projects_snapshot_attributes(
+    plan_with_report_and_attributes, report_with_all_attributes, actions_having_attributes, user
+):
+    report = report_with_all_attributes
+    report.mark_as_complete(user)
+    assert not report.action_snapshots.filter(attributes_projected=False).exists()
+
+    action_ct = ContentType.objects.get_for_model(Action)
+    attribute_types = [
+        f.value['attribute_type'] for f in report.type.fields if f.block_type == 'attribute_type'
+    ]
+    for snapshot in report.action_snapshots.all():
+        for attribute_type in attribute_types:
+            projected = snapshot.get_attribute_for_type(attribute_type)
+            from_versions = snapshot.get_attribute_for_type_from_versions(
+                attribute_type, snapshot.get_related_versions(), action_ct
+            )
+            assert projected is not None
+            assert type(projected) is type(from_versions)
+            assert projected.pk == from_versions.pk
+            assert str(projected) == str(from_versions)
+            if hasattr(projected, 'categories'):
+                assert set(projected.categories.all()) == set(from_versions.categories.all())
+
+
+def test_get_snapshot_attributes_query_count(
+    plan_with_report_and_attributes, report_with_all_attributes, actions_having_attributes, user,
+    django_assert_num_queries,
+):
+    report = report_with_all_attributes
+    report.mark_as_complete(user)
+    # One query for the projected attributes and one for the categories of category choice attributes
+    with django_assert_num_queries(2):
+        attributes = report.get_snapshot_attributes()
+    attribute_type_count = len([f for f in report.type.fields if f.block_type == 'attribute_type'])
+    assert len(attributes) == len(actions_having_attributes) * attribute_type_count
+    for action in actions_having_attributes:
+        text = action.text_attributes.get()
+        assert attributes[(action.id, text.type_id)].text == text.text
+
+
+def test_backfill_snapshot_attributes(
+    plan_with_report_and_attributes, report_with_all_attributes, actions_having_attributes, user,
+):
+    from django.core.management import call_command
+
+    report = report_with_all_attributes
+    report.mark_as_complete(user)
+    count = ActionSnapshotAttribute.objects.filter(report=report).count()
+    ActionSnapshotAttribute.objects.all().delete()
+    report.action_snapshots.update(attributes_projected=False)
+
+    call_command('backfill_snapshot_attributes')
+    assert ActionSnapshotAttribute.objects.filter(report=report).count() == count
+    assert not report.action_snapshots.filter(attributes_projected=False).exists()
+
+
+def test_get_values_for_actions_matches_single_snapshot_values(
+    plan_with_report_and_attributes, report_with_all_attributes, actions_having_attributes, user,
+):
+    report = report_with_all_attributes
+    report.mark_as_complete(user)
+    values = report.get_values_for_actions([a.id for a in actions_having_attributes])
+    assert set(values.keys()) == {a.id for a in actions_having_attributes}
+    for action in actions_having_attributes:
+        snapshot = action.get_latest_snapshot(report)
+        for field, value in values[action.id]:
+            expected = field.block.value_for_action_snapshot(field.value, snapshot)
+            if field.block_type == 'category':
+                assert list(value) == list(expected)
+            elif field.block_type == 'attribute_type':
+                assert (value.pk, type(value)) == (expected.pk, type(expected))
+            else:
+                assert value == expected
+
+
+def test_values_for_actions_query_count_is_constant(
+    plan_with_report_and_attributes, report_with_all_attributes, actions_having_attributes, user,
+):
+    report = report_with_all_attributes
+    report.mark_as_complete(user)
+    # Warm up the content type cache
+    report.get_values_for_actions([actions_having_attributes[0].id])
+
+    def count_queries(actions):
+        with CaptureQueriesContext(connection) as ctx:
+            result = ReportNode.resolve_values_for_actions(report, None, [str(a.id) for a in actions])
+        assert [r.action for r in result] == actions
+        assert all(r.values for r in result)
+        return len(ctx.captured_queries)
+
+    assert count_queries(actions_having_attributes[:2]) == count_queries(actions_having_attributes)
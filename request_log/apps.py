@@ -1,6 +1,22 @@
+import atexit
 from django.apps import AppConfig
+from django.core.signals import request_finished
+
+
+def flush_request_log(**kwargs):
+    from .buffer import request_log_buffer
+    request_log_buffer.flush_if_due()
+
+
+def flush_request_log_at_exit():
+    from .buffer import request_log_buffer
+    request_log_buffer.flush()
 
 
 class RequestLogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'request_log'
+
+    def ready(self):
+        request_finished.connect(flush_request_log, dispatch_uid='flush_request_log')
+        atexit.register(flush_request_log_at_exit)
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from django.conf import settings
+
+from aplans.buffer import BulkCreateBuffer
+
+from .models import LoggedRequest
+
+
+class RequestLogBuffer(BulkCreateBuffer[LoggedRequest]):
+    model = LoggedRequest
+
+
+request_log_buffer = RequestLogBuffer(
+    max_size=settings.REQUEST_LOG_BUFFER_SIZE,
+    flush_interval=settings.REQUEST_LOG_FLUSH_INTERVAL,
+    flush_in_background=True,
+)
@@ -2,6 +2,7 @@ import logging
 from django.conf import settings
 from sentry_sdk import capture_exception
 
+from request_log.buffer import request_log_buffer
 from request_log.models import LoggedRequest
 
 logger = logging.getLogger(__name__)
@@ -37,9 +38,9 @@ class LogUnsafeRequestMiddleware:
         raw_request += f'Content-Length: {len(request_body)}\r\n\r\n'
         raw_request += request_body
         user_id = getattr(request.user, 'id', None)
-        LoggedRequest.objects.create(
+        request_log_buffer.add(LoggedRequest(
             method=request.method,
             path=path,
             raw_request=raw_request,
             user_id=user_id,
-        )
+        ))
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2024-03-14 09:12
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request_log', '0002_alter_loggedrequest_path'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='loggedrequest',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from datetime import timedelta
 from django.db import models
 from django.conf import settings
@@ -6,22 +8,37 @@ from django.utils import timezone
 from users.models import User
 
 
+class LoggedRequestQuerySet(models.QuerySet['LoggedRequest']):
+    def prune(self, max_days: int | None = None, chunk_size: int = 1000) -> int:
+        """Delete requests older than `max_days` in chunks and return the number of deleted requests."""
+        if max_days is None:
+            max_days = settings.REQUEST_LOG_MAX_DAYS
+        date_cutoff = timezone.now() - timedelta(days=max_days)
+        deleted = 0
+        while True:
+            ids = list(
+                self.filter(created_at__lt=date_cutoff).order_by('created_at').values_list('id', flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            count, _ = LoggedRequest.objects.filter(id__in=ids).delete()
+            deleted += count
+        return deleted
+
+
 class LoggedRequest(models.Model):
     method = models.CharField(max_length=8)
     path = models.CharField(max_length=2000)
     raw_request = models.TextField()
     user = models.ForeignKey(User, blank=True, null=True, on_delete=models.SET_NULL, related_name='logged_requests')
-    created_at = models.DateTimeField(auto_now_add=True, editable=False)
+    # Not auto_now_add because the requests are written in batches some time after they were made
+    created_at = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
+
+    objects = LoggedRequestQuerySet.as_manager()
 
     class Meta:
         ordering = ['created_at']
 
-    def save(self, *args, **kwargs):
-        result = super().save(*args, **kwargs)
-        date_cutoff = timezone.now() - timedelta(days=settings.REQUEST_LOG_MAX_DAYS)
-        LoggedRequest.objects.filter(created_at__lt=date_cutoff).delete()
-        return result
-
     def __str__(self):
         result = f'{self.method} {self.path}'
         if self.user:
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .models import LoggedRequest
+
+
+@shared_task
+def prune_request_log():
+    return LoggedRequest.objects.prune()
@@ -0,0 +1,125 @@
+import pytest
+from datetime import timedelta
+from django.test import RequestFactory
+from django.utils import timezone
+
+from aplans import celery_app
+from request_log.buffer import RequestLogBuffer
+from request_log.middleware import LogUnsafeRequestMiddleware
+from request_log.models import LoggedRequest
+from request_log.tasks import prune_request_log
+
+pytestmark = pytest.mark.django_db
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def buffer(clock):
+    return RequestLogBuffer(max_size=3, flush_interval=10, clock=clock)
+
+
+@pytest.fixture
+def celery_eager():
+    old_value = celery_app.conf.task_always_eager
+    celery_app.conf.task_always_eager = True
+    yield
+    celery_app.conf.task_always_eager = old_value
+
+
+def make_entry(path='/admin/'):
+    return LoggedRequest(method='POST', path=path, raw_request='')
+
+
+def test_buffer_flushes_when_full(buffer):
+    buffer.add(make_entry())
+    buffer.add(make_entry())
+    assert LoggedRequest.objects.count() == 0
+    buffer.add(make_entry())
+    assert LoggedRequest.objects.count() == 3
+    assert len(buffer) == 0
+
+
+def test_buffer_flushes_when_due(buffer, clock):
+    buffer.add(make_entry())
+    clock.now += 5
+    buffer.flush_if_due()
+    assert LoggedRequest.objects.count() == 0
+    clock.now += 5
+    buffer.flush_if_due()
+    assert LoggedRequest.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_buffer_flushes_in_background():
+    buffer = RequestLogBuffer(max_size=3, flush_interval=0.1, flush_in_background=True)
+    buffer.add(make_entry())
+    timer = buffer.timer
+    timer.join(timeout=5)
+    assert LoggedRequest.objects.count() == 1
+    assert len(buffer) == 0
+    assert buffer.timer is None
+
+
+def test_flush_cancels_background_flush(buffer):
+    buffer.flush_in_background = True
+    buffer.add(make_entry())
+    timer = buffer.timer
+    buffer.flush()
+    assert buffer.timer is None
+    assert timer.finished.is_set()
+
+
+def test_buffer_keeps_request_time(buffer):
+    before = timezone.now()
+    buffer.add(make_entry())
+    buffer.flush()
+    assert LoggedRequest.objects.get().created_at >= before
+
+
+def test_middleware_logs_unsafe_requests(monkeypatch, buffer, user):
+    monkeypatch.setattr('request_log.middleware.request_log_buffer', buffer)
+    middleware = LogUnsafeRequestMiddleware(lambda request: None)
+    rf = RequestFactory()
+    for method in ('get', 'post'):
+        request = getattr(rf, method)('/admin/foo/')
+        request.user = user
+        middleware(request)
+    assert len(buffer) == 1
+    buffer.flush()
+    logged = LoggedRequest.objects.get()
+    assert logged.method == 'POST'
+    assert logged.user == user
+
+
+def test_prune_request_log_task(celery_eager, settings):
+    settings.REQUEST_LOG_MAX_DAYS = 10
+    now = timezone.now()
+    LoggedRequest.objects.bulk_create([
+        LoggedRequest(method='POST', path=f'/{days}', raw_request='', created_at=now - timedelta(days=days))
+        for days in (0, 5, 9, 11, 15, 19)
+    ])
+    result = prune_request_log.delay()
+    assert result.get() == 3
+    assert not LoggedRequest.objects.filter(created_at__lt=now - timedelta(days=10)).exists()
+    assert LoggedRequest.objects.count() == 3
+
+
+def test_prune_deletes_in_chunks():
+    LoggedRequest.objects.bulk_create([
+        LoggedRequest(method='POST', path='/', raw_request='', created_at=timezone.now() - timedelta(days=100))
+        for _ in range(5)
+    ])
+    assert LoggedRequest.objects.prune(max_days=10, chunk_size=2) == 5
+    assert LoggedRequest.objects.count() == 0
@@ -111,19 +111,18 @@ class Query:
         plan_obj: Optional[Plan] = Plan.objects.filter(identifier=plan).first()
         if plan_obj is None:
             raise GraphQLError("Plan %s not found" % plan)
-        related_plans = plan_obj.get_all_related_plans().all()
+        related_plans = info.context.watch_cache.for_plan(plan_obj).get_all_related_plans()
         if plan_obj.is_live():
             # For live plans, restrict the related plans to be live also, preventing unreleased plans from showing up in the production site
-            related_plans = related_plans.live()
+            related_plans = [p for p in related_plans if p.is_live()]
+        related_plan_ids = [p.id for p in related_plans]
         if only_other_plans:
-            plans = Plan.objects.live().exclude(Q(id=plan_obj.id) | Q(id__in=related_plans))
+            plans = Plan.objects.live().exclude(Q(id=plan_obj.id) | Q(id__in=related_plan_ids))
+            plan_ids = list(plans.values_list('id', flat=True))
         else:
-            qs = Q(id=plan_obj.id)
+            plan_ids = [plan_obj.id]
             if include_related_plans:
-                qs |= Q(id__in=related_plans.values_list('id', flat=True))
-            plans = Plan.objects.filter(qs)
-
-        plan_ids = list(plans.values_list('id', flat=True))
+                plan_ids += related_plan_ids
 
         #backend = get_search_backend()
         #backend.watch_search(query, included_plans=plan_ids)